@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Adaptive Scan Schedule
+Gives every symbol a refresh interval (in scheduler cycles) from its activity:
+current BUY/WATCH names, scores close to a threshold and volatile movers are
+hot and rescanned every cycle, quiet low scorers go cold and are rescanned
+every few hours. Each cycle scans a fixed budget of symbols - hot and overdue
+first, spare capacity goes to whatever is closest to due - so the universe can
+grow without growing the runtime
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from market_data import MARKET_DATA_PROVIDER
+
+SCAN_SCHEDULE_FILE = os.getenv('SCAN_SCHEDULE_FILE', os.path.join(
+    'data_cache', 'scan_schedule_replay.json' if MARKET_DATA_PROVIDER == 'replay' else 'scan_schedule.json'))
+SCAN_BUDGET = int(os.getenv('SCAN_BUDGET', '300'))  # Symbols deep-scanned per cycle
+
+# Refresh interval per tier, in scheduler cycles (hourly runs)
+TIER_INTERVALS = {'hot': 1, 'warm': 2, 'cool': 4, 'cold': 8}
+
+HOT_VOLATILITY = 4.0      # Daily move std (%) that makes a symbol hot
+WARM_VOLATILITY = 2.5
+COLD_VOLATILITY = 1.5     # Cold needs a low score AND moves smaller than this
+COLD_SCORE_GAP = 4        # Points below the WATCH threshold
+
+def activity_tier(score: Optional[float], volatility: Optional[float], is_signal: bool,
+                  buy_threshold: int, watch_threshold: int) -> str:
+    """Most urgent tier any of status, threshold distance and volatility asks for"""
+    if is_signal:
+        return 'hot'
+    volatile = volatility is not None and volatility == volatility  # NaN = unknown
+    if score is None:
+        return 'hot' if volatile and volatility >= HOT_VOLATILITY else 'warm'
+    
+    distance = min(abs(score - watch_threshold), abs(score - buy_threshold))
+    if distance <= 1 or (volatile and volatility >= HOT_VOLATILITY):
+        return 'hot'
+    if distance <= 2 or (volatile and volatility >= WARM_VOLATILITY):
+        return 'warm'
+    if score <= watch_threshold - COLD_SCORE_GAP and volatile and volatility < COLD_VOLATILITY:
+        return 'cold'
+    return 'cool'
+
+class AdaptiveSchedule:
+    """Per-symbol last scan cycle and score, persisted as JSON"""
+    
+    def __init__(self, schedule_file: str = SCAN_SCHEDULE_FILE, budget: int = SCAN_BUDGET):
+        self.schedule_file = schedule_file
+        self.budget = budget
+        self._lock = threading.Lock()
+        self.data = self.load_schedule()
+    
+    def load_schedule(self) -> Dict:
+        """Load the schedule from file"""
+        if os.path.exists(self.schedule_file):
+            try:
+                with open(self.schedule_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error loading scan schedule: {e}")
+        return {'cycle': 0, 'symbols': {}}
+    
+    def save_schedule(self):
+        """Save the schedule to file"""
+        with self._lock:
+            snapshot = json.dumps(self.data)
+        try:
+            os.makedirs(os.path.dirname(self.schedule_file) or '.', exist_ok=True)
+            tmp_path = f"{self.schedule_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.schedule_file)
+        except Exception as e:
+            print(f"⚠️ Error saving scan schedule: {e}")
+    
+    def plan(self, symbols: List[str], volatility: Optional[Dict[str, float]] = None,
+             signals: Iterable[str] = (), buy_threshold: int = 7, watch_threshold: int = 5,
+             budget: Optional[int] = None) -> Dict:
+        """
+        Start a cycle and pick what to scan, keeping universe order
+        Current signals are always scanned (the budget stretches if they alone exceed it);
+        then due symbols, hot tiers first, then the nearest-to-due with spare budget
+        """
+        budget = self.budget if budget is None else budget
+        volatility = volatility or {}
+        signals = set(signals)
+        with self._lock:
+            self.data['cycle'] += 1
+            cycle = self.data['cycle']
+            entries = self.data['symbols']
+        
+        tiers, urgency = {}, {}
+        for symbol in symbols:
+            entry = entries.get(symbol, {})
+            tier = activity_tier(entry.get('score'), volatility.get(symbol), symbol in signals,
+                                 buy_threshold, watch_threshold)
+            tiers[symbol] = tier
+            last = entry.get('last_cycle')
+            # Cycles since the last scan in units of the tier's interval; never scanned = most overdue
+            urgency[symbol] = float('inf') if last is None else (cycle - last) / TIER_INTERVALS[tier]
+        
+        # Due symbols first, hottest tier first, most overdue first; then the nearest-to-due
+        ranks = {tier: rank for rank, tier in enumerate(TIER_INTERVALS)}
+        
+        def priority(symbol):
+            due = urgency[symbol] >= 1
+            return (0, ranks[tiers[symbol]], -urgency[symbol]) if due else (1, 0, -urgency[symbol])
+        
+        must = [s for s in symbols if s in signals]
+        rest = sorted((s for s in symbols if s not in signals), key=priority)
+        chosen = set(must + rest[:max(0, budget - len(must))])
+        selected = [s for s in symbols if s in chosen]
+        
+        counts = {tier: 0 for tier in TIER_INTERVALS}
+        for tier in tiers.values():
+            counts[tier] += 1
+        return {
+            'cycle': cycle,
+            'selected': selected,
+            'deferred': [s for s in symbols if s not in chosen],
+            'due': sum(1 for s in symbols if urgency[s] >= 1),
+            'overdue_deferred': sum(1 for s in symbols if s not in chosen and urgency[s] >= 1),
+            'tiers': counts,
+            'budget': budget
+        }
+    
+    def record(self, analyses: List[Optional[Dict]], scanned: Iterable[str], save: bool = True):
+        """Mark symbols scanned this cycle and remember their scores (None when there was nothing to score)"""
+        scores = {a['symbol']: a['score'] for a in analyses if a}
+        with self._lock:
+            cycle = self.data['cycle']
+            entries = self.data['symbols']
+            for symbol in scanned:
+                entries[symbol] = {'last_cycle': cycle, 'score': scores.get(symbol),
+                                   'scanned_at': datetime.now().isoformat(timespec='seconds')}
+        if save:
+            self.save_schedule()
+
+def format_schedule_report(plan: Dict) -> str:
+    tiers = ", ".join(f"{count} {tier}" for tier, count in plan['tiers'].items())
+    return (f"⏳ Cycle {plan['cycle']}: scanning {len(plan['selected'])} (budget {plan['budget']}), "
+            f"deferring {len(plan['deferred'])} ({plan['overdue_deferred']} overdue) | tiers: {tiers}")
+
+# Global instance
+adaptive_schedule = AdaptiveSchedule()
+
+def plan_scan_cycle(symbols: List[str], volatility: Optional[Dict[str, float]] = None, signals: Iterable[str] = (),
+                    buy_threshold: int = 7, watch_threshold: int = 5) -> Dict:
+    """Convenience function to pick this cycle's symbols"""
+    return adaptive_schedule.plan(symbols, volatility, signals, buy_threshold, watch_threshold)
+
+def record_scan_cycle(analyses: List[Optional[Dict]], scanned: Iterable[str]):
+    """Convenience function to record this cycle's scores"""
+    adaptive_schedule.record(analyses, scanned)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Bar Panel
+Compact columnar container for many symbols' daily bars: one shared date axis,
+float32 OHLC and float64 volume matrices (symbol x date), and zero-copy
+per-symbol views. Holds a full universe in a fraction of the memory of one
+pandas DataFrame per symbol; the panel indicator engine and the
+multi-timeframe resampler read it directly
+"""
+
+import os
+import sys
+import json
+import subprocess
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+PRICE_DTYPE = np.float32
+VOLUME_DTYPE = np.float64  # Not an integer type - a missing volume stays NaN instead of becoming 0
+
+class BarView:
+    """One symbol's bars: slices of the panel's arrays, nothing copied"""
+    
+    def __init__(self, symbol: str, dates: np.ndarray, prices: Dict[str, np.ndarray], volume: np.ndarray,
+                 present: np.ndarray):
+        self.symbol = symbol
+        self.dates = dates
+        self.open = prices['Open']
+        self.high = prices['High']
+        self.low = prices['Low']
+        self.close = prices['Close']
+        self.volume = volume
+        self.present = present  # False on shared-axis dates this symbol did not trade
+    
+    def __len__(self):
+        return int(self.present.sum())
+    
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+    
+    def to_frame(self) -> pd.DataFrame:
+        """A regular float64 OHLCV DataFrame of the days this symbol traded (copies)"""
+        mask = self.present
+        frame = pd.DataFrame({
+            'Open': self.open[mask].astype(np.float64),
+            'High': self.high[mask].astype(np.float64),
+            'Low': self.low[mask].astype(np.float64),
+            'Close': self.close[mask].astype(np.float64),
+            'Volume': self.volume[mask].astype(np.float64)
+        }, index=pd.DatetimeIndex(self.dates[mask], name='Date'))
+        return frame
+
+class BarPanel:
+    """Daily bars for many symbols on a shared date axis"""
+    
+    def __init__(self, symbols: List[str], dates: np.ndarray, prices: Dict[str, np.ndarray], volume: np.ndarray,
+                 present: np.ndarray, spans: np.ndarray):
+        self.symbols = symbols
+        self.dates = dates
+        self.prices = prices          # column -> (symbol x date) float32
+        self.volume = volume          # (symbol x date) float64, NaN where missing
+        self.present = present        # (symbol x date) bool
+        self.spans = spans            # (symbol x 2) first/last+1 date index each symbol covers
+        self._rows = {symbol: row for row, symbol in enumerate(symbols)}
+    
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, Dict[str, np.ndarray]]) -> 'BarPanel':
+        """Build from {symbol: {'dates': ..., 'Open': ..., ..., 'Volume': ...}} (empty symbols are skipped)"""
+        arrays = {s: a for s, a in arrays.items() if a is not None and len(a['dates'])}
+        symbols = list(arrays)
+        dates = np.unique(np.concatenate([a['dates'].astype('datetime64[ns]') for a in arrays.values()])) \
+            if arrays else np.array([], dtype='datetime64[ns]')
+        
+        shape = (len(symbols), len(dates))
+        prices = {column: np.full(shape, np.nan, dtype=PRICE_DTYPE) for column in PRICE_COLUMNS}
+        volume = np.full(shape, np.nan, dtype=VOLUME_DTYPE)
+        present = np.zeros(shape, dtype=bool)
+        spans = np.zeros((len(symbols), 2), dtype=np.int64)
+        for row, symbol in enumerate(symbols):
+            bars = arrays[symbol]
+            positions = np.searchsorted(dates, bars['dates'].astype('datetime64[ns]'))
+            for column in PRICE_COLUMNS:
+                prices[column][row, positions] = bars[column]
+            volume[row, positions] = bars['Volume']
+            present[row, positions] = True
+            spans[row] = positions[0], positions[-1] + 1
+        return cls(symbols, dates, prices, volume, present, spans)
+    
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> 'BarPanel':
+        """Build from per-symbol OHLCV DataFrames"""
+        return cls.from_arrays({
+            symbol: {'dates': pd.DatetimeIndex(frame.index).tz_localize(None).values,
+                     **{column: frame[column].to_numpy() for column in PRICE_COLUMNS + ['Volume']}}
+            for symbol, frame in frames.items() if frame is not None and not frame.empty
+        })
+    
+    @classmethod
+    def from_store(cls, symbols: List[str], period: str = "3mo", store=None) -> 'BarPanel':
+        """Read a lookback window for many symbols straight from the bar store partitions"""
+        from bar_store import bar_store, parse_period, period_start
+        store = store or bar_store
+        count, unit = parse_period(period)
+        start = None if unit == 'd' else np.datetime64(period_start(period), 'ns')
+        
+        windows = {}
+        for symbol in dict.fromkeys(symbols):
+            bars = store.load_arrays(symbol)
+            if bars is None or not len(bars['dates']):
+                continue
+            if unit == 'd':  # Calendar days back from the last stored bar, as slice_period
+                first = np.searchsorted(bars['dates'], bars['dates'][-1] - np.timedelta64(count, 'D'), side='right')
+            else:
+                first = np.searchsorted(bars['dates'], start)
+            windows[symbol] = {key: values[max(first, 0):] for key, values in bars.items()}
+        return cls.from_arrays(windows)
+    
+    def __len__(self):
+        return len(self.symbols)
+    
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rows
+    
+    def view(self, symbol: str) -> BarView:
+        """Zero-copy view of one symbol's span of the date axis"""
+        row = self._rows[symbol]
+        start, end = self.spans[row]
+        return BarView(symbol, self.dates[start:end],
+                       {column: self.prices[column][row, start:end] for column in PRICE_COLUMNS},
+                       self.volume[row, start:end], self.present[row, start:end])
+    
+    def select(self, symbols: List[str]) -> 'BarPanel':
+        """A panel with just these symbols (rows copied, date axis shared)"""
+        rows = [self._rows[symbol] for symbol in symbols if symbol in self._rows]
+        return BarPanel([self.symbols[row] for row in rows], self.dates,
+                        {column: values[rows] for column, values in self.prices.items()},
+                        self.volume[rows], self.present[rows], self.spans[rows])
+    
+    def lengths(self) -> np.ndarray:
+        """Bars each symbol actually traded"""
+        return self.present.sum(axis=1)
+    
+    def right_aligned(self, lookback: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        float64 (symbol x bar) matrices of each symbol's own bars, gaps on the shared
+        axis squeezed out and the latest bar in the last column (NaN padding on the left)
+        """
+        order = np.argsort(self.present, axis=1, kind='stable')  # Absent dates first, traded dates in order
+        width = int(self.lengths().max()) if len(self) else 0
+        if lookback:
+            width = min(width, lookback)
+        order = order[:, order.shape[1] - width:]
+        present = np.take_along_axis(self.present, order, axis=1)
+        
+        arrays = {}
+        for column in PRICE_COLUMNS:
+            arrays[column] = np.take_along_axis(self.prices[column], order, axis=1).astype(np.float64)
+        arrays['Volume'] = np.where(present, np.take_along_axis(self.volume, order, axis=1), np.nan)
+        return arrays
+    
+    def column_frame(self, column: str) -> pd.DataFrame:
+        """One column as a float64 (date x symbol) frame on the shared axis; absent days are NaN"""
+        values = self.prices[column] if column in self.prices else np.where(self.present, self.volume, np.nan)
+        return pd.DataFrame(values.T.astype(np.float64), index=pd.DatetimeIndex(self.dates), columns=self.symbols)
+    
+    @property
+    def nbytes(self) -> int:
+        return (sum(a.nbytes for a in self.prices.values()) + self.volume.nbytes + self.present.nbytes
+                + self.dates.nbytes + self.spans.nbytes)
+
+def frames_nbytes(frames: Dict[str, pd.DataFrame]) -> int:
+    """Memory held by a dict of per-symbol DataFrames (values plus index)"""
+    return sum(int(frame.memory_usage(index=True, deep=True).sum()) for frame in frames.values())
+
+# Peak RSS benchmark - each layout runs a full-universe indicator pass in a fresh process
+
+def _scan_peak_rss(layout: str, count: int, bars: int) -> Dict:
+    import resource
+    from bar_panel import BarPanel as Panel  # The class the engines check for, not __main__'s copy
+    from panel_indicators import synthetic_frames, compute_panel_indicators
+    from multi_timeframe import compute_timeframe_trends
+    
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    frames = synthetic_frames(count, bars=bars)
+    if layout == 'panel':
+        data = Panel.from_frames(frames)
+        del frames
+        held = data.nbytes
+    else:
+        data = frames
+        held = frames_nbytes(frames)
+    compute_panel_indicators(data, lookback=63)
+    compute_timeframe_trends(data)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'layout': layout, 'held_mb': held / 2 ** 20, 'peak_rss_mb': peak / 1024, 'scan_rss_mb': (peak - baseline) / 1024}
+
+def run_memory_benchmark(count: int = 600, bars: int = 504) -> Dict:
+    """Peak RSS of a full-universe scan with per-symbol DataFrames vs the compact panel"""
+    results = {}
+    for layout in ('frames', 'panel'):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--rss', layout, str(count), str(bars)],
+                                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if output.returncode != 0:
+            raise RuntimeError(f"{layout} benchmark failed: {output.stderr.strip()[-500:]}")
+        results[layout] = json.loads(output.stdout.strip().splitlines()[-1])
+    return results
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--rss':
+        print(json.dumps(_scan_peak_rss(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))))
+        sys.exit(0)
+    
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    bars = int(sys.argv[2]) if len(sys.argv) > 2 else 504
+    print(f"🧱 Bar panel memory benchmark ({count} symbols x {bars} bars)")
+    print("=" * 50)
+    for layout, result in run_memory_benchmark(count, bars).items():
+        print(f"{layout:8s} bars held {result['held_mb']:7.1f} MB | scan peak RSS {result['peak_rss_mb']:7.1f} MB "
+              f"(+{result['scan_rss_mb']:.1f} MB over start-up)")
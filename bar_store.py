@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Local OHLCV Bar Store
+Keeps daily bars on disk (one columnar partition per symbol) and only asks
+the market data provider for the days missing since the last stored bar
+"""
+
+import os
+import re
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from market_data import get_provider, MARKET_DATA_PROVIDER
+from symbol_quarantine import quarantine
+
+# Storage settings (replay runs get their own store so recorded bars never mix with live ones)
+BAR_STORE_DIR = os.getenv('BAR_STORE_DIR', os.path.join(
+    'data_cache', 'bars_replay' if MARKET_DATA_PROVIDER == 'replay' else 'bars'))
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+BACKFILL_PERIOD = "1y"             # First download for a symbol we have never stored
+REFRESH_INTERVAL_MINUTES = 30      # Don't re-check the provider more often than this per symbol
+BATCH_DOWNLOAD_SIZE = 50           # Symbols per multi-ticker request
+INTRADAY_INTERVAL = "5m"           # Bar size polled during regular hours
+
+def download_history_batches(symbols, period="60d", batch_size=BATCH_DOWNLOAD_SIZE, silent=False, start=None,
+                             interval="1d"):
+    """
+    Download daily bars for many symbols using grouped multi-ticker requests
+    Returns (frames, report) where frames maps symbol -> OHLCV DataFrame
+    """
+    frames = {}
+    report = {
+        'period': period if start is None else None,
+        'start': str(start) if start is not None else None,
+        'interval': interval,
+        'batch_size': batch_size,
+        'batches': [],
+        'failed_symbols': [],
+        'total_seconds': 0.0
+    }
+    
+    total_batches = (len(symbols) + batch_size - 1) // batch_size
+    for batch_num, i in enumerate(range(0, len(symbols), batch_size), 1):
+        batch = symbols[i:i + batch_size]
+        batch_start = time.time()
+        failed = []
+        error = None
+        
+        try:
+            data = get_provider().history_batch(batch, period=period, start=start, interval=interval)
+        except Exception as e:
+            data = {}
+            error = str(e)
+        
+        for sym in batch:
+            hist = data.get(sym)
+            if hist is None or hist.empty:
+                failed.append(sym)
+                continue
+            frames[sym] = hist
+        
+        elapsed = time.time() - batch_start
+        report['batches'].append({
+            'batch': batch_num,
+            'symbols': len(batch),
+            'downloaded': len(batch) - len(failed),
+            'failed': failed,
+            'seconds': round(elapsed, 2),
+            'error': error
+        })
+        report['failed_symbols'].extend(failed)
+        report['total_seconds'] += elapsed
+        
+        if not silent:
+            print(f"📦 Batch {batch_num}/{total_batches}: {len(batch) - len(failed)}/{len(batch)} symbols "
+                  f"in {elapsed:.1f}s" + (f" | ❌ {', '.join(failed[:5])}{'...' if len(failed) > 5 else ''}" if failed else ""))
+    
+    report['total_seconds'] = round(report['total_seconds'], 2)
+    return frames, report
+
+def normalize_bars(frame: pd.DataFrame) -> pd.DataFrame:
+    """Normalize a yfinance frame to tz-naive daily dates and the stored columns"""
+    frame = frame[[c for c in BAR_COLUMNS if c in frame.columns]].copy()
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame.index = index.normalize()
+    frame.index.name = 'Date'
+    frame = frame[~frame.index.duplicated(keep='last')].sort_index()
+    return frame.dropna(subset=['Close'])
+
+def aggregate_session(intraday: pd.DataFrame) -> pd.DataFrame:
+    """Roll intraday bars up into one daily bar per session date"""
+    index = pd.DatetimeIndex(intraday.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)  # Keep exchange wall time so the session date is right
+    frame = intraday.set_axis(index)
+    daily = frame.groupby(index.normalize()).agg(
+        {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'})
+    daily.index.name = 'Date'
+    return daily
+
+def parse_period(period: str) -> Tuple[int, str]:
+    """Split a yfinance-style period ('60d', '3mo', '1y') into count and unit"""
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    return int(match.group(1)), match.group(2)
+
+def period_start(period: str, as_of: Optional[datetime] = None) -> pd.Timestamp:
+    """First date inside a calendar lookback ('Nwk'/'Nmo'/'Ny') ending at as_of"""
+    count, unit = parse_period(period)
+    offsets = {
+        'wk': pd.DateOffset(weeks=count),
+        'mo': pd.DateOffset(months=count),
+        'y': pd.DateOffset(years=count)
+    }
+    as_of = as_of or get_provider().now()
+    return pd.Timestamp(as_of.date()) - offsets[unit]
+
+def slice_period(frame: pd.DataFrame, period: str, as_of: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Cut a stored frame down to a yfinance-style lookback period
+    'Nd' keeps the sessions of the last N calendar days up to the last stored bar (as Yahoo's
+    period='60d' returns about 41 bars, not 60), 'Nwk'/'Nmo'/'Ny' are calendar lookbacks from as_of
+    """
+    if frame is None or frame.empty or period == 'max':
+        return frame
+    
+    count, unit = parse_period(period)
+    if unit == 'd':
+        return frame[frame.index > frame.index[-1] - pd.Timedelta(days=count)]
+    return frame[frame.index >= period_start(period, as_of)]
+
+class BarStore:
+    """On-disk daily bar store with incremental updates"""
+    
+    def __init__(self, root: str = BAR_STORE_DIR, refresh_interval_minutes: int = REFRESH_INTERVAL_MINUTES):
+        self.root = root
+        self.refresh_interval = timedelta(minutes=refresh_interval_minutes)
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._fetched_at: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._intraday: Dict[str, pd.DataFrame] = {}  # Today's intraday bars per symbol
+        self.last_update_report: Dict = {}
+    
+    def _partition_path(self, symbol: str) -> str:
+        """One partition file per symbol"""
+        return os.path.join(self.root, f"{symbol.replace('/', '_')}.npz")
+    
+    def load(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Load every stored bar for a symbol (None if never stored)"""
+        if symbol in self._frames:
+            return self._frames[symbol]
+        
+        path = self._partition_path(symbol)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with np.load(path) as data:
+                frame = pd.DataFrame(
+                    {col: data[col] for col in BAR_COLUMNS},
+                    index=pd.DatetimeIndex(data['dates'].astype('datetime64[ns]'), name='Date')
+                )
+                fetched_at = datetime.fromtimestamp(float(data['fetched_at']))
+        except Exception as e:
+            print(f"⚠️ Could not read bar partition for {symbol}: {e}")
+            return None
+        
+        with self._lock:
+            self._frames[symbol] = frame
+            self._fetched_at[symbol] = fetched_at
+        return frame
+    
+    def load_arrays(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Stored bars as plain arrays ('dates' plus the bar columns) for bulk readers
+        Reads the partition directly when the symbol is not already held as a DataFrame
+        """
+        frame = self._frames.get(symbol)
+        if frame is not None:
+            return {'dates': frame.index.values, **{col: frame[col].to_numpy() for col in BAR_COLUMNS}}
+        
+        path = self._partition_path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return {'dates': data['dates'].astype('datetime64[ns]'), **{col: data[col] for col in BAR_COLUMNS}}
+        except Exception as e:
+            print(f"⚠️ Could not read bar partition for {symbol}: {e}")
+            return None
+    
+    def save(self, symbol: str, frame: pd.DataFrame, fetched_at: Optional[datetime] = None):
+        """Write a symbol partition atomically"""
+        fetched_at = fetched_at or datetime.now()
+        os.makedirs(self.root, exist_ok=True)
+        path = self._partition_path(symbol)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        
+        columns = {col: frame[col].to_numpy(dtype='float64') for col in BAR_COLUMNS}
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, dates=frame.index.values.astype('datetime64[ns]').astype('int64'),
+                     fetched_at=np.float64(fetched_at.timestamp()), **columns)
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            self._frames[symbol] = frame
+            self._fetched_at[symbol] = fetched_at
+    
+    def last_bar_date(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Date of the last stored bar"""
+        frame = self.load(symbol)
+        if frame is None or frame.empty:
+            return None
+        return frame.index[-1]
+    
+    def is_stale(self, symbol: str) -> bool:
+        """True if the symbol has not been checked against the provider recently"""
+        if self.load(symbol) is None:
+            return True
+        fetched_at = self._fetched_at.get(symbol)
+        return fetched_at is None or datetime.now() - fetched_at >= self.refresh_interval
+    
+    def merge(self, symbol: str, new_bars: pd.DataFrame, fetched_at: Optional[datetime] = None) -> pd.DataFrame:
+        """Merge freshly downloaded bars into the stored series (new bars win)"""
+        new_bars = normalize_bars(new_bars)
+        existing = self.load(symbol)
+        if existing is not None and not existing.empty and not new_bars.empty:
+            combined = pd.concat([existing[existing.index < new_bars.index[0]], new_bars])
+        elif existing is not None and new_bars.empty:
+            combined = existing
+        else:
+            combined = new_bars
+        self.save(symbol, combined, fetched_at)
+        return combined
+    
+    def update(self, symbols: List[str], force: bool = False, silent: bool = True,
+               batch_size: int = BATCH_DOWNLOAD_SIZE) -> Dict:
+        """
+        Bring stored bars up to date for many symbols
+        New symbols get a backfill, stored ones only download from their last bar onward
+        """
+        started = time.time()
+        requested = list(dict.fromkeys(symbols))
+        skipped = [s for s in requested if quarantine.is_quarantined(s)]
+        stale = [s for s in requested if s not in skipped and (force or self.is_stale(s))]
+        
+        backfill = [s for s in stale if self.last_bar_date(s) is None]
+        incremental: Dict[str, List[str]] = {}
+        for symbol in stale:
+            last_date = self.last_bar_date(symbol)
+            if last_date is not None:
+                # Re-download the last stored bar too, it may have been a partial day
+                incremental.setdefault(last_date.strftime('%Y-%m-%d'), []).append(symbol)
+        
+        report = {
+            'requested': len(symbols),
+            'up_to_date': len(requested) - len(stale) - len(skipped),
+            'quarantined': skipped,
+            'backfilled': 0,
+            'incremental': 0,
+            'bars_downloaded': 0,
+            'failed_symbols': [],
+            'batches': []
+        }
+        fetched_at = datetime.now()
+        
+        if backfill:
+            frames, batch_report = download_history_batches(backfill, period=BACKFILL_PERIOD,
+                                                           batch_size=batch_size, silent=silent)
+            for symbol, frame in frames.items():
+                self.merge(symbol, frame, fetched_at)
+                report['bars_downloaded'] += len(frame)
+            report['backfilled'] = len(frames)
+            report['failed_symbols'].extend(batch_report['failed_symbols'])
+            report['batches'].extend(batch_report['batches'])
+            quarantine.record_results(list(frames), batch_report['failed_symbols'])
+        
+        for start, group in incremental.items():
+            frames, batch_report = download_history_batches(group, start=start,
+                                                           batch_size=batch_size, silent=silent)
+            for symbol in group:
+                if symbol in frames:
+                    self.merge(symbol, frames[symbol], fetched_at)
+                    report['bars_downloaded'] += len(frames[symbol])
+                else:
+                    # The last stored bar is always re-requested, so no rows means the fetch failed -
+                    # keep the stored series, mark it checked and let the quarantine count the failure
+                    self.save(symbol, self.load(symbol), fetched_at)
+            report['incremental'] += len(frames)
+            report['failed_symbols'].extend(batch_report['failed_symbols'])
+            report['batches'].extend(batch_report['batches'])
+            quarantine.record_results(list(frames), batch_report['failed_symbols'])
+        
+        report['seconds'] = round(time.time() - started, 2)
+        self.last_update_report = report
+        
+        if not silent and stale:
+            print(f"🗄️ Bar store: {report['backfilled']} backfilled, {report['incremental']} incremental, "
+                  f"{report['up_to_date']} up to date, {report['bars_downloaded']} bars downloaded "
+                  f"in {report['seconds']:.1f}s")
+        return report
+    
+    def update_intraday(self, symbols: List[str], silent: bool = True, batch_size: int = BATCH_DOWNLOAD_SIZE) -> Dict:
+        """
+        Regular-hours refresh: only download intraday bars since the previous poll
+        and fold them into today's daily bar
+        """
+        started = time.time()
+        provider = get_provider()
+        if provider.offline:
+            return self.update(symbols, silent=silent, batch_size=batch_size)
+        
+        now = provider.now()
+        today = pd.Timestamp(now.date())
+        requested = [s for s in dict.fromkeys(symbols) if not quarantine.is_quarantined(s)]
+        
+        # Once a day (or for new symbols) bring the daily series up to date first
+        needs_daily = [s for s in requested if self.last_bar_date(s) is None
+                       or self._fetched_at.get(s, datetime.min).date() < now.date()]
+        daily_report = self.update(needs_daily, force=True, silent=silent, batch_size=batch_size) if needs_daily else {}
+        
+        # Poll since the last intraday bar we hold (re-requesting it, it may have been partial)
+        groups: Dict[datetime, List[str]] = {}
+        for symbol in requested:
+            if self.last_bar_date(symbol) is None:
+                continue
+            bars = self._intraday.get(symbol)
+            if bars is not None and not bars.empty and bars.index[-1].normalize() == today:
+                start = bars.index[-1].to_pydatetime()
+            else:
+                self._intraday.pop(symbol, None)
+                start = today.to_pydatetime()
+            groups.setdefault(start, []).append(symbol)
+        
+        report = {
+            'requested': len(symbols),
+            'daily_updated': len(needs_daily),
+            'polled': 0,
+            'intraday_bars': 0,
+            'failed_symbols': list(daily_report.get('failed_symbols', [])),
+            'batches': list(daily_report.get('batches', []))
+        }
+        fetched_at = datetime.now()
+        
+        for start, group in groups.items():
+            frames, batch_report = download_history_batches(group, start=start, interval=INTRADAY_INTERVAL,
+                                                           batch_size=batch_size, silent=silent)
+            report['batches'].extend(batch_report['batches'])
+            for symbol in group:
+                new_bars = frames.get(symbol)
+                if new_bars is None or new_bars.empty:
+                    # No trades since the last poll - just mark the symbol checked
+                    self.save(symbol, self.load(symbol), fetched_at)
+                    continue
+                
+                new_bars = new_bars[[c for c in BAR_COLUMNS if c in new_bars.columns]].dropna(subset=['Close'])
+                index = pd.DatetimeIndex(new_bars.index)
+                new_bars = new_bars.set_axis(index.tz_localize(None) if index.tz is not None else index)
+                new_bars = new_bars[new_bars.index.normalize() == today]
+                
+                held = self._intraday.get(symbol)
+                if held is not None and not held.empty and not new_bars.empty:
+                    new_bars = pd.concat([held[held.index < new_bars.index[0]], new_bars])
+                elif held is not None:
+                    new_bars = held if new_bars.empty else new_bars
+                if new_bars.empty:
+                    self.save(symbol, self.load(symbol), fetched_at)
+                    continue
+                
+                self._intraday[symbol] = new_bars
+                self.merge(symbol, aggregate_session(new_bars), fetched_at)
+                report['polled'] += 1
+                report['intraday_bars'] += len(frames[symbol])
+        
+        report['seconds'] = round(time.time() - started, 2)
+        self.last_update_report = report
+        
+        if not silent:
+            print(f"⏱️ Intraday poll: {report['intraday_bars']} {INTRADAY_INTERVAL} bars for {report['polled']} symbols "
+                  f"({report['daily_updated']} daily catch-ups) in {report['seconds']:.1f}s")
+        return report
+    
+    def get_history(self, symbol: str, period: str = "3mo", refresh: bool = True) -> pd.DataFrame:
+        """Get a lookback window for one symbol, downloading only missing days"""
+        if refresh and self.is_stale(symbol):
+            self.update([symbol])
+        frame = self.load(symbol)
+        if frame is None:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        return slice_period(frame, period)
+    
+    def get_histories(self, symbols: List[str], period: str = "3mo", refresh: bool = True) -> Dict[str, pd.DataFrame]:
+        """Get lookback windows for many symbols after one bulk update"""
+        if refresh:
+            self.update(symbols)
+        histories = {}
+        for symbol in symbols:
+            frame = self.load(symbol)
+            if frame is not None and not frame.empty:
+                histories[symbol] = slice_period(frame, period)
+        return histories
+
+# Global store instance
+bar_store = BarStore()
+
+def get_history(symbol: str, period: str = "3mo", refresh: bool = True) -> pd.DataFrame:
+    """Convenience function to read a lookback window from the bar store"""
+    return bar_store.get_history(symbol, period=period, refresh=refresh)
+
+def update_bars(symbols: List[str], force: bool = False, silent: bool = True) -> Dict:
+    """Convenience function to bulk-refresh the bar store"""
+    return bar_store.update(symbols, force=force, silent=silent)
+
+def update_intraday_bars(symbols: List[str], silent: bool = True) -> Dict:
+    """Convenience function for the regular-hours intraday delta poll"""
+    return bar_store.update_intraday(symbols, silent=silent)
+
+if __name__ == "__main__":
+    from stock_universe import get_comprehensive_stock_list
+    
+    print("🗄️ Updating local bar store")
+    print("=" * 50)
+    universe = get_comprehensive_stock_list()
+    update_report = update_bars(universe, silent=False)
+    print(f"✅ {update_report['requested']} symbols | {update_report['bars_downloaded']} bars downloaded "
+          f"| {len(update_report['failed_symbols'])} failed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Cache Warm-up
+Prefetches bars, quotes, the earnings calendar and sector ETF data into the
+local caches a few minutes before the scheduled report jobs, so the jobs
+themselves are mostly compute
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from bar_store import update_bars
+from symbol_quarantine import screen_symbols
+from enhanced_yahoo_client import EnhancedYahooClient, SECTOR_ETFS
+
+WARMUP_LEAD_MINUTES = 10  # How far ahead of a report job the warm-up runs
+
+def warmup_time(job_time: str, lead_minutes: int = WARMUP_LEAD_MINUTES) -> str:
+    """Schedule time ("HH:MM") of the warm-up for a job scheduled at job_time"""
+    start = datetime.strptime(job_time, "%H:%M") - timedelta(minutes=lead_minutes)
+    return start.strftime("%H:%M")
+
+def warm_caches(symbols: List[str], context: bool = True, silent: bool = True) -> Dict:
+    """
+    Warm the caches a report job reads from
+    - daily bars for the job's symbols and the sector ETFs (bar store)
+    - earnings calendar and investment themes, incl. theme quotes (market context cache)
+    Failures are reported, never raised - the job still runs and fetches what's missing
+    """
+    start_time = time.time()
+    report = {
+        'symbols': 0,
+        'bars_downloaded': 0,
+        'earnings': 0,
+        'sectors': 0,
+        'themes': 0,
+        'errors': [],
+        'seconds': 0.0
+    }
+    
+    try:
+        active = screen_symbols(symbols)
+        bars_report = update_bars(active + [etf for etf in SECTOR_ETFS if etf not in active])
+        report['symbols'] = len(active)
+        report['bars_downloaded'] = bars_report.get('bars_downloaded', 0)
+    except Exception as e:
+        report['errors'].append(f"bars: {e}")
+    
+    if context:
+        client = EnhancedYahooClient()
+        try:
+            report['earnings'] = len(client.get_earnings_calendar(days_ahead=7, refresh=True))
+        except Exception as e:
+            report['errors'].append(f"earnings: {e}")
+        try:
+            themes = client.get_investment_themes(refresh=True)
+            report['sectors'] = len(themes.get('trending_sectors', []))
+            report['themes'] = len(themes.get('themes', []))
+        except Exception as e:
+            report['errors'].append(f"themes: {e}")
+    
+    report['seconds'] = time.time() - start_time
+    if not silent:
+        print(format_warmup_report(report))
+    return report
+
+def format_warmup_report(report: Dict) -> str:
+    """One-line summary for logs"""
+    line = (f"🔥 Warm-up: {report['symbols']} symbols, {report['bars_downloaded']} new bars, "
+            f"{report['earnings']} earnings, {report['sectors']} sectors, {report['themes']} themes "
+            f"in {report['seconds']:.1f}s")
+    if report['errors']:
+        line += f" | ⚠️ {'; '.join(report['errors'])}"
+    return line
+
+if __name__ == "__main__":
+    import sys
+    from stock_universe import get_comprehensive_stock_list
+    
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    print("🔥 Warming caches")
+    print("=" * 50)
+    warm_caches(get_comprehensive_stock_list()[:count], silent=False)
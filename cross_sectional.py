@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Cross-Sectional Ranks
+Percentile ranks of momentum, RSI, volume ratio and 1-month return across the
+scan snapshot and within each sector, so the scorers can judge a stock against
+its peers instead of only against fixed thresholds. Every feature is ranked in
+one vectorized pass (universe) plus one grouped pass (sectors)
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+UNKNOWN_SECTOR = "Unknown"
+
+# Ranked features: name -> field of the scheduler's get_technical_score result
+SCHEDULER_FEATURES = {
+    'momentum': 'roc',
+    'rsi': 'rsi',
+    'volume': 'volume_ratio',
+    'return_1m': 'price_1m'
+}
+
+# The same features in main_enhanced's stock_info (dotted = nested dict)
+ENHANCED_FEATURES = {
+    'momentum': 'momentum.roc',
+    'rsi': 'rsi',
+    'volume': 'volume_analysis.volume_ratio',
+    'return_1m': 'return_1m'
+}
+
+# The same features in prefilter.quote_snapshot columns (the whole universe from stored bars)
+SNAPSHOT_FEATURES = {
+    'momentum': 'roc',
+    'rsi': 'rsi',
+    'volume': 'volume_ratio',
+    'return_1m': 'change_1m'
+}
+
+def field_value(row: Dict, field: str):
+    """Read a (possibly dotted, nested) field; missing values are None"""
+    for part in field.split('.'):
+        if not isinstance(row, dict):
+            return None
+        row = row.get(part)
+    return row
+
+def cached_sectors(symbols: List[str]) -> Dict[str, str]:
+    """Sectors from the fundamentals cache (no downloads; unknown symbols stay unknown)"""
+    from fundamentals_cache import fundamentals_cache
+    return {s: fundamentals_cache.cached_field(s, 'sector') or UNKNOWN_SECTOR for s in symbols}
+
+def rank_snapshot(values: pd.DataFrame, sectors: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Percentile ranks (0-1, ties averaged, NaN stays NaN) of every column of a
+    symbol-indexed frame: `<col>_pct` across the universe, `<col>_sector_pct` within the sector
+    """
+    ranks = values.rank(pct=True).add_suffix('_pct')
+    sector = pd.Series({s: (sectors or {}).get(s) or UNKNOWN_SECTOR for s in values.index}, name='sector')
+    sector_ranks = values.groupby(sector.reindex(values.index)).rank(pct=True).add_suffix('_sector_pct')
+    return pd.concat([ranks, sector_ranks], axis=1)
+
+def add_cross_sectional_ranks(rows: List[Dict], features: Dict[str, str] = None,
+                              sectors: Optional[Dict[str, str]] = None, universe: Optional[pd.DataFrame] = None) -> Dict:
+    """
+    Rank a scan snapshot in place: each row gets `<feature>_pct` and `<feature>_sector_pct`
+    Sectors default to what the fundamentals cache already holds
+    `universe` (symbol-indexed, one column per feature name) widens the peer group beyond the rows,
+    e.g. to symbols this cycle didn't scan; a row's own values replace its universe entry
+    """
+    started = time.time()
+    features = features or SCHEDULER_FEATURES
+    rows = [row for row in rows if row and row.get('symbol')]
+    if not rows:
+        return {'symbols': 0, 'milliseconds': 0.0}
+    
+    symbols = [row['symbol'] for row in rows]
+    values = pd.DataFrame({name: [field_value(row, field) for row in rows] for name, field in features.items()},
+                          index=symbols, dtype=float)
+    if universe is not None and len(universe):
+        peers = universe.reindex(columns=list(features)).drop(index=symbols, errors='ignore')
+        values = pd.concat([values, peers.astype(float)])
+    if sectors is None:
+        sectors = cached_sectors(list(values.index))
+    ranks = rank_snapshot(values, sectors)
+    
+    records = ranks.iloc[:len(rows)].to_dict('records')
+    for row, record in zip(rows, records):
+        row.update({k: round(v, 4) for k, v in record.items() if v == v})
+        row.setdefault('sector', sectors.get(row['symbol']) or UNKNOWN_SECTOR)
+    
+    return {'symbols': len(rows), 'peers': len(values), 'milliseconds': round((time.time() - started) * 1000, 1)}
+
+if __name__ == "__main__":
+    import numpy as np
+    
+    rng = np.random.default_rng(5)
+    snapshot = [{'symbol': f"SYM{i:03d}", 'roc': rng.normal(0, 5), 'rsi': rng.uniform(20, 80),
+                 'volume_ratio': rng.lognormal(0, 0.4), 'price_1m': rng.normal(1, 8)} for i in range(600)]
+    sector_names = ['Technology', 'Healthcare', 'Financial Services', 'Energy', 'Industrials']
+    report = add_cross_sectional_ranks(snapshot, sectors={row['symbol']: sector_names[i % 5]
+                                                          for i, row in enumerate(snapshot)})
+    print("🏅 Cross-sectional ranks")
+    print("=" * 50)
+    print(f"Symbols:        {report['symbols']}")
+    print(f"Ranked in:      {report['milliseconds']:.1f}ms")
@@ -4,16 +4,19 @@ Current Stock Summary - US and Canadian Markets
 Generate comprehensive BUY/SELL recommendations
 """
 
-import yfinance as yf
-import pandas as pd
-import numpy as np
+from fundamentals_cache import get_fundamentals, warm_fundamentals, fundamentals_cache
 from datetime import datetime
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import requests
+from http_client import http_post
 import os
 from dotenv import load_dotenv
+from bar_store import get_history, update_bars
+from indicators import get_indicators, INDICATOR_LOOKBACK
+from scan_executor import format_scan_report
+from scan_checkpoint import ScanCheckpoint
+from symbol_quarantine import screen_symbols
 
 # Load environment variables
 load_dotenv()
@@ -102,12 +105,33 @@ def calculate_growth_potential(price_data, technical_indicators):
     
     return growth_potential, confidence, factors
 
+# Fundamentals fields the analysis reports
+SUMMARY_INFO_FIELDS = ['longName', 'marketCap', 'sector', 'trailingPE', 'forwardPE', 'pegRatio', 'priceToBook',
+                       'dividendYield']
+
+def fetch_technical_inputs(symbol):
+    """I/O stage: price history and fundamentals for one stock (None if too little history)"""
+    hist = get_history(symbol, period=INDICATOR_LOOKBACK)
+    if hist.empty or len(hist) < 20:
+        return None
+    
+    info = get_fundamentals(symbol)
+    return {'hist': hist, 'info': {k: info[k] for k in SUMMARY_INFO_FIELDS if k in info}}
+
 def get_technical_analysis(symbol):
     """Get comprehensive technical analysis with BUY/SELL signals"""
     try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="3mo")
-        info = ticker.info
+        inputs = fetch_technical_inputs(symbol)
+    except Exception as e:
+        print(f"Error analyzing {symbol}: {e}")
+        return None
+    return analyze_technical_inputs(symbol, inputs) if inputs else None
+
+def analyze_technical_inputs(symbol, inputs):
+    """CPU stage of get_technical_analysis - module-level so it can run in a worker process"""
+    try:
+        hist = inputs['hist']
+        info = inputs['info']
         
         # Skip if no data (delisted or invalid symbol)
         if hist.empty or len(hist) < 20:
@@ -123,66 +147,48 @@ def get_technical_analysis(symbol):
         high = hist['High']
         low = hist['Low']
         
-        # Enhanced Technical Indicators
-        current_price = close.iloc[-1]
+        # Enhanced Technical Indicators (shared with the other scanners)
+        indicators = get_indicators(symbol, hist)
+        current_price = indicators.price
         
         # Moving Averages
-        ma_5 = close.rolling(window=5).mean().iloc[-1]
-        ma_10 = close.rolling(window=10).mean().iloc[-1]
-        ma_20 = close.rolling(window=20).mean().iloc[-1]
-        ma_50 = close.rolling(window=50).mean().iloc[-1]
-        ma_200 = close.rolling(window=min(200, len(close))).mean().iloc[-1]
+        ma_5 = indicators.sma(5)
+        ma_10 = indicators.sma(10)
+        ma_20 = indicators.sma(20)
+        ma_50 = indicators.sma(50)
+        ma_200 = indicators.sma(min(200, indicators.bars))
         
         # RSI (Relative Strength Index)
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = (100 - (100 / (1 + rs))).iloc[-1]
+        rsi = indicators.rsi
         
         # MACD (Moving Average Convergence Divergence)
-        exp1 = close.ewm(span=12).mean()
-        exp2 = close.ewm(span=26).mean()
-        macd_line = exp1 - exp2
-        macd = macd_line.iloc[-1]
-        signal_line = macd_line.ewm(span=9).mean().iloc[-1]
-        macd_histogram = macd - signal_line
+        macd = indicators.macd['macd']
+        signal_line = indicators.macd['signal']
+        macd_histogram = indicators.macd['histogram']
         
         # Bollinger Bands
-        bb_period = 20
-        bb_std = 2
-        bb_ma = close.rolling(window=bb_period).mean()
-        bb_std_dev = close.rolling(window=bb_period).std()
-        bb_upper = (bb_ma + (bb_std_dev * bb_std)).iloc[-1]
-        bb_lower = (bb_ma - (bb_std_dev * bb_std)).iloc[-1]
-        bb_width = ((bb_upper - bb_lower) / bb_ma.iloc[-1]) * 100
-        bb_position = ((current_price - bb_lower) / (bb_upper - bb_lower)) * 100
-        
-        # Stochastic Oscillator
-        lowest_low = low.rolling(window=14).min()
-        highest_high = high.rolling(window=14).max()
-        k_percent = 100 * ((close - lowest_low) / (highest_high - lowest_low))
-        stoch_k = k_percent.rolling(window=3).mean().iloc[-1]
-        stoch_d = k_percent.rolling(window=3).mean().rolling(window=3).mean().iloc[-1]
-        
-        # Williams %R
-        williams_r = -100 * ((highest_high.iloc[-1] - current_price) / (highest_high.iloc[-1] - lowest_low.iloc[-1]))
+        bollinger = indicators.bollinger
+        bb_upper = bollinger['upper_band']
+        bb_lower = bollinger['lower_band']
+        bb_width = ((bb_upper - bb_lower) / bollinger['sma']) * 100
+        bb_position = bollinger['band_position'] * 100
+        
+        # Stochastic Oscillator and Williams %R
+        stoch_k = indicators.momentum['stoch_k']
+        stoch_d = indicators.momentum['stoch_d']
+        williams_r = indicators.momentum['williams_r']
         
         # Average True Range (ATR) for volatility
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = true_range.rolling(window=14).mean().iloc[-1]
+        atr = indicators.atr
         atr_percent = (atr / current_price) * 100
         
         # Volume analysis
-        avg_volume = volume.tail(20).mean()
-        recent_volume = volume.iloc[-1]
-        volume_ratio = recent_volume / avg_volume if avg_volume > 0 else 1
+        avg_volume = indicators.volume_analysis['avg_volume_20']
+        recent_volume = indicators.volume_analysis['current_volume']
+        volume_ratio = indicators.volume_analysis['volume_ratio']
         
         # On-Balance Volume (OBV)
-        obv = (np.sign(close.diff()) * volume).fillna(0).cumsum()
+        obv = indicators.obv
         obv_trend = obv.iloc[-1] - obv.iloc[-10] if len(obv) > 10 else 0
         
         # Price Performance Analysis
@@ -480,23 +486,8 @@ def get_technical_analysis(symbol):
         return None
 
 def filter_active_stocks(stock_list):
-    """Filter out delisted or inactive stocks"""
-    active_stocks = []
-    delisted_keywords = ['delisted', 'not found', 'invalid', 'suspended']
-    
-    for symbol in stock_list:
-        # Skip known problematic symbols
-        skip_symbols = [
-            'DFS', 'ANSS', 'WISH', 'C3AI', 'TWTR', 'SQ', 'ATLASSIAN', 'ATVI',
-            'EXPR', 'NAKD', 'ASTR', 'MAXR', 'HEXO', 'PARA', 'ABX', 'GOLD',
-            'ERF.TO', 'KL.TO', 'FCU.TO', 'TFI.TO', 'PWF.TO', 'NVEI.TO', 
-            'NUVEI.TO', 'CRH.TO', 'PHM.TO', 'BBBY'
-        ]
-        
-        if symbol not in skip_symbols:
-            active_stocks.append(symbol)
-    
-    return active_stocks
+    """Filter out delisted or inactive stocks (symbols the quarantine has seen failing)"""
+    return screen_symbols(stock_list, silent=False)
 
 def analyze_stock_universe():
     """Analyze comprehensive stock universe - ALL active stocks"""
@@ -645,22 +636,30 @@ def analyze_stock_universe():
     us_results = []
     canadian_results = []
     
+    # Refresh the local bar store in bulk - only missing days are downloaded
+    store_report = update_bars(us_stocks + canadian_stocks)
+    print(f"🗄️ Bar store refreshed: {store_report['bars_downloaded']} new bars in {store_report['seconds']:.1f}s")
+    warm_fundamentals(us_stocks + canadian_stocks, silent=False)
+    
+    # History and fundamentals are read on I/O threads, indicators and scoring run on a process pool;
+    # results are checkpointed as they land so a killed run resumes instead of starting over
+    checkpoint = ScanCheckpoint('stock_summary')
     print(f"📊 Analyzing {len(us_stocks)} US stocks...")
-    for i, symbol in enumerate(us_stocks):
-        result = get_technical_analysis(symbol)
-        if result:
-            us_results.append(result)
-        if (i + 1) % 10 == 0:
-            print(f"   Processed {i + 1}/{len(us_stocks)} US stocks...")
+    results, report = checkpoint.run(us_stocks, fetch_technical_inputs, analyze_technical_inputs, progress_every=10,
+                                     on_progress=lambda done, total: print(f"   Processed {done}/{total} US stocks..."))
+    us_results.extend(r for r in results if r)
+    print(format_scan_report(report))
     
     print(f"🇨🇦 Analyzing {len(canadian_stocks)} Canadian stocks...")
-    for i, symbol in enumerate(canadian_stocks):
-        result = get_technical_analysis(symbol)
-        if result:
-            canadian_results.append(result)
-        if (i + 1) % 10 == 0:
-            print(f"   Processed {i + 1}/{len(canadian_stocks)} Canadian stocks...")
-    
+    results, report = checkpoint.run(canadian_stocks, fetch_technical_inputs, analyze_technical_inputs,
+                                     progress_every=10,
+                                     on_progress=lambda done, total: print(f"   Processed {done}/{total} Canadian stocks..."))
+    canadian_results.extend(r for r in results if r)
+    print(format_scan_report(report))
+    checkpoint.clear()  # Both markets done - the next run scans fresh bars from scratch
+    
+    print(checkpoint.format_stats())
+    print(fundamentals_cache.format_stats())
     return us_results, canadian_results
 
 def send_telegram_message(message):
@@ -702,7 +701,7 @@ def send_telegram_message(message):
                 'disable_web_page_preview': True
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = http_post(url, json=payload, timeout=10)
             if response.status_code != 200:
                 return False
         
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Distributed Scan
+Shards the scan universe across worker processes and nodes through a local work
+queue. The coordinator (the hourly scheduler) splits the symbols into shards and
+pushes them to an SQLite queue; workers - local processes it starts, or
+`python distributed_scan.py worker` on other nodes pointed at the same database -
+claim shards, score them and write the results back for the merge and
+change-detection step. Workers heartbeat while they run; shards held by a
+worker whose heartbeat has gone stale are put back on the queue
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import importlib
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from market_data import MARKET_DATA_PROVIDER
+from scan_executor import SCAN_START_METHOD
+
+DISTRIBUTED_SCAN_ENABLED = os.getenv('DISTRIBUTED_SCAN', '0') == '1'
+SCAN_QUEUE_DB = os.getenv('SCAN_QUEUE_DB', os.path.join(
+    'data_cache', 'scan_queue_replay.db' if MARKET_DATA_PROVIDER == 'replay' else 'scan_queue.db'))
+SCAN_SHARD_SIZE = int(os.getenv('SCAN_SHARD_SIZE', '50'))
+LOCAL_SCAN_WORKERS = int(os.getenv('LOCAL_SCAN_WORKERS', str(os.cpu_count() or 1)))  # 0 = remote workers only
+HEARTBEAT_SECONDS = float(os.getenv('SCAN_HEARTBEAT_SECONDS', '5'))
+HEARTBEAT_TIMEOUT = float(os.getenv('SCAN_HEARTBEAT_TIMEOUT', '30'))  # Stale heartbeat = dead worker
+MAX_SHARD_ATTEMPTS = int(os.getenv('MAX_SHARD_ATTEMPTS', '3'))
+DISTRIBUTED_SCAN_TIMEOUT = float(os.getenv('DISTRIBUTED_SCAN_TIMEOUT', '1800'))
+POLL_SECONDS = 0.2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    run_id TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    task TEXT NOT NULL,
+    symbols TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_at REAL,
+    results TEXT,
+    error TEXT,
+    PRIMARY KEY (run_id, shard)
+);
+CREATE TABLE IF NOT EXISTS workers (
+    worker TEXT PRIMARY KEY,
+    host TEXT,
+    pid INTEGER,
+    heartbeat REAL NOT NULL,
+    shards_done INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+def _json_default(value):
+    """NumPy scalars in analyses serialize as plain numbers"""
+    return value.item() if hasattr(value, 'item') else str(value)
+
+def resolve_task(spec: str) -> Callable:
+    """'module:function' → the shard task, which maps a list of symbols to a list of results"""
+    module_name, _, func_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), func_name)
+
+class ShardQueue:
+    """SQLite-backed shard queue; every method is one short transaction, safe across processes"""
+    
+    def __init__(self, db_path: str = SCAN_QUEUE_DB, heartbeat_timeout: float = HEARTBEAT_TIMEOUT,
+                 max_attempts: int = MAX_SHARD_ATTEMPTS):
+        self.db_path = db_path
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with self._write() as conn:
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+    
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()  # An open BEGIN IMMEDIATE rolls back
+    
+    @contextmanager
+    def _write(self):
+        """
+        Write transaction that takes the write lock up front - a deferred transaction that
+        reads first can fail with 'database is locked' without waiting out the busy timeout
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+    
+    def submit(self, run_id: str, symbols: List[str], task: str, shard_size: int = SCAN_SHARD_SIZE) -> int:
+        """Split the symbols into shards and queue them; returns the shard count"""
+        shards = [symbols[i:i + shard_size] for i in range(0, len(symbols), max(1, shard_size))]
+        with self._write() as conn:
+            conn.executemany("INSERT INTO shards (run_id, shard, task, symbols) VALUES (?, ?, ?, ?)",
+                             [(run_id, i, task, json.dumps(shard)) for i, shard in enumerate(shards)])
+        return len(shards)
+    
+    def drop_other_runs(self, run_id: str) -> int:
+        """
+        Delete every shard not belonging to `run_id` - leftovers of a coordinator that was killed
+        before it purged. There is one coordinator per queue, and claim() takes the oldest shard
+        first, so left in place they would be redone ahead of the current run's; returns the count
+        """
+        with self._write() as conn:
+            return conn.execute("DELETE FROM shards WHERE run_id != ?", (run_id,)).rowcount
+    
+    def heartbeat(self, worker: str):
+        """Register or refresh a worker"""
+        with self._write() as conn:
+            conn.execute("INSERT INTO workers (worker, host, pid, heartbeat) VALUES (?, ?, ?, ?) "
+                         "ON CONFLICT(worker) DO UPDATE SET heartbeat = excluded.heartbeat",
+                         (worker, socket.gethostname(), os.getpid(), time.time()))
+    
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Take the oldest pending shard for this worker, None when the queue is empty"""
+        with self._write() as conn:
+            row = conn.execute("SELECT run_id, shard, task, symbols, attempts FROM shards "
+                               "WHERE status = 'pending' ORDER BY rowid LIMIT 1").fetchone()
+            if row is not None:
+                conn.execute("UPDATE shards SET status = 'claimed', worker = ?, claimed_at = ?, "
+                             "attempts = attempts + 1 WHERE run_id = ? AND shard = ?",
+                             (worker, time.time(), row['run_id'], row['shard']))
+        if row is None:
+            return None
+        return {'run_id': row['run_id'], 'shard': row['shard'], 'task': row['task'],
+                'symbols': json.loads(row['symbols']), 'attempts': row['attempts'] + 1}
+    
+    def complete(self, worker: str, run_id: str, shard: int, results: List) -> bool:
+        """
+        Store a shard's results; first finisher wins
+        A worker presumed dead that finishes anyway still counts if nobody else has
+        """
+        payload = json.dumps(results, default=_json_default)
+        with self._write() as conn:
+            updated = conn.execute("UPDATE shards SET status = 'done', worker = ?, results = ?, error = NULL "
+                                   "WHERE run_id = ? AND shard = ? AND status != 'done'",
+                                   (worker, payload, run_id, shard)).rowcount
+            conn.execute("UPDATE workers SET shards_done = shards_done + ? WHERE worker = ?", (updated, worker))
+        return bool(updated)
+    
+    def fail(self, worker: str, run_id: str, shard: int, error: str):
+        """Put a failed shard back on the queue, or give up on it after max_attempts"""
+        with self._write() as conn:
+            conn.execute("UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                         "worker = NULL, error = ? WHERE run_id = ? AND shard = ? AND status = 'claimed' AND worker = ?",
+                         (self.max_attempts, error, run_id, shard, worker))
+    
+    def requeue_dead(self) -> List[Dict]:
+        """Release shards claimed by workers whose heartbeat went stale; returns what was released"""
+        cutoff = time.time() - self.heartbeat_timeout
+        with self._write() as conn:
+            rows = conn.execute("SELECT s.run_id, s.shard, s.worker, s.attempts FROM shards s "
+                                "LEFT JOIN workers w ON w.worker = s.worker "
+                                "WHERE s.status = 'claimed' AND (w.heartbeat IS NULL OR w.heartbeat < ?)",
+                                (cutoff,)).fetchall()
+            for row in rows:
+                status = 'failed' if row['attempts'] >= self.max_attempts else 'pending'
+                conn.execute("UPDATE shards SET status = ?, worker = NULL, error = ? WHERE run_id = ? AND shard = ?",
+                             (status, f"worker {row['worker']} stopped heartbeating", row['run_id'], row['shard']))
+        return [dict(row) for row in rows]
+    
+    def progress(self, run_id: str) -> Dict[str, int]:
+        """Shard counts by status"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM shards WHERE run_id = ? GROUP BY status",
+                                (run_id,)).fetchall()
+        counts = {'pending': 0, 'claimed': 0, 'done': 0, 'failed': 0}
+        counts.update({row['status']: row['n'] for row in rows})
+        return counts
+    
+    def finished_shards(self, run_id: str, exclude: Optional[set] = None) -> List[Dict]:
+        """Done and failed shards with their symbols, results and errors"""
+        exclude = exclude or set()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT shard, status, worker, symbols, results, error FROM shards "
+                                "WHERE run_id = ? AND status IN ('done', 'failed') ORDER BY shard",
+                                (run_id,)).fetchall()
+        return [{'shard': row['shard'], 'status': row['status'], 'worker': row['worker'],
+                 'symbols': json.loads(row['symbols']),
+                 'results': json.loads(row['results']) if row['results'] else None, 'error': row['error']}
+                for row in rows if row['shard'] not in exclude]
+    
+    def live_workers(self) -> List[Dict]:
+        """Workers heartbeating within the timeout"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT worker, host, pid, heartbeat, shards_done FROM workers WHERE heartbeat >= ?",
+                                (time.time() - self.heartbeat_timeout,)).fetchall()
+        return [dict(row) for row in rows]
+    
+    def purge(self, run_id: str):
+        """Drop a merged run's shards and long-dead workers"""
+        with self._write() as conn:
+            conn.execute("DELETE FROM shards WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM workers WHERE heartbeat < ?", (time.time() - 24 * 3600,))
+
+class ScanWorker:
+    """Pulls shards until stopped (or idle for `idle_exit` seconds), heartbeating from a side thread"""
+    
+    def __init__(self, queue: ShardQueue, worker_id: Optional[str] = None,
+                 heartbeat_seconds: float = HEARTBEAT_SECONDS, idle_exit: Optional[float] = None):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_seconds = heartbeat_seconds
+        self.idle_exit = idle_exit
+        self.stop_event = threading.Event()
+        self.shards_done = 0
+    
+    def _heartbeat_loop(self):
+        while not self.stop_event.wait(self.heartbeat_seconds):
+            try:
+                self.queue.heartbeat(self.worker_id)
+            except sqlite3.Error as e:
+                print(f"⚠️ Heartbeat failed for {self.worker_id}: {e}")
+    
+    def run(self) -> int:
+        """Work the queue; returns the number of shards completed"""
+        self.queue.heartbeat(self.worker_id)
+        beat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        beat.start()
+        idle_since = time.time()
+        try:
+            while not self.stop_event.is_set():
+                self.queue.requeue_dead()  # Any live worker can rescue a dead one's shards
+                job = self.queue.claim(self.worker_id)
+                if job is None:
+                    if self.idle_exit is not None and time.time() - idle_since >= self.idle_exit:
+                        break
+                    time.sleep(POLL_SECONDS)
+                    continue
+                
+                try:
+                    results = resolve_task(job['task'])(job['symbols'])
+                    if len(results) != len(job['symbols']):
+                        raise ValueError(f"task returned {len(results)} results for {len(job['symbols'])} symbols")
+                    if self.queue.complete(self.worker_id, job['run_id'], job['shard'], results):
+                        self.shards_done += 1
+                except Exception as e:
+                    print(f"⚠️ Shard {job['run_id']}/{job['shard']} failed on {self.worker_id}: {e}")
+                    self.queue.fail(self.worker_id, job['run_id'], job['shard'], str(e))
+                idle_since = time.time()
+        finally:
+            self.stop_event.set()
+        return self.shards_done
+    
+    def stop(self):
+        self.stop_event.set()
+
+def _local_worker_main(db_path: str, worker_id: str, idle_exit: float):
+    queue = ShardQueue(db_path)
+    ScanWorker(queue, worker_id, idle_exit=idle_exit).run()
+
+def start_local_workers(count: int, db_path: str = SCAN_QUEUE_DB, idle_exit: float = 5.0) -> List:
+    """Worker processes on this host; they exit on their own once the queue stays empty"""
+    context = multiprocessing.get_context(SCAN_START_METHOD)
+    processes = []
+    for i in range(count):
+        process = context.Process(target=_local_worker_main, daemon=True,
+                                  args=(db_path, f"{socket.gethostname()}-local{i}-{os.getpid()}", idle_exit))
+        process.start()
+        processes.append(process)
+    return processes
+
+def run_distributed_scan(symbols: List[str], task: str, shard_size: int = SCAN_SHARD_SIZE,
+                         local_workers: int = LOCAL_SCAN_WORKERS, queue: Optional[ShardQueue] = None,
+                         timeout: float = DISTRIBUTED_SCAN_TIMEOUT,
+                         on_shard: Optional[Callable[[List[str], List], None]] = None) -> Dict:
+    """
+    Coordinator: shard `symbols`, wait for the workers, merge the results in universe order
+    `on_shard(symbols, results)` runs as each shard lands (e.g. for early alerts). Symbols come
+    back as None from shards that failed ('errors') or were still outstanding at the timeout ('skipped')
+    """
+    started = time.time()
+    queue = queue or ShardQueue()
+    run_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{os.getpid()}"
+    abandoned = queue.drop_other_runs(run_id)
+    shard_count = queue.submit(run_id, symbols, task, shard_size)
+    processes = []
+    
+    merged, errors, seen, requeued, workers = {}, {}, set(), 0, set()
+    try:
+        if local_workers > 0:
+            processes = start_local_workers(local_workers, queue.db_path)
+        while len(seen) < shard_count and time.time() - started < timeout:
+            requeued += len(queue.requeue_dead())
+            for shard in queue.finished_shards(run_id, exclude=seen):
+                seen.add(shard['shard'])
+                if shard['status'] == 'done':
+                    workers.add(shard['worker'])
+                    merged.update(zip(shard['symbols'], shard['results']))
+                    if on_shard:
+                        on_shard(shard['symbols'], shard['results'])
+                else:
+                    errors.update({symbol: shard['error'] for symbol in shard['symbols']})
+            if len(seen) < shard_count:
+                time.sleep(POLL_SECONDS)
+        
+        progress = queue.progress(run_id)
+        skipped = [s for s in symbols if s not in merged and s not in errors]
+    finally:
+        queue.purge(run_id)  # Even when on_shard raised - a dead run's shards must not be worked again
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+    
+    return {
+        'analyses': [merged.get(symbol) for symbol in symbols],
+        'errors': errors,
+        'skipped': skipped,
+        'shards': shard_count,
+        'failed_shards': progress['failed'],
+        'unfinished_shards': progress['pending'] + progress['claimed'],
+        'requeued': requeued,
+        'abandoned_shards': abandoned,
+        'workers': len(workers),
+        'local_workers': len(processes),
+        'seconds': round(time.time() - started, 2)
+    }
+
+def format_distributed_report(report: Dict) -> str:
+    line = (f"🛰️ Distributed scan: {report['shards']} shards on {report['workers']} workers "
+            f"({report['local_workers']} local) in {report['seconds']:.1f}s")
+    if report.get('abandoned_shards'):
+        line += f" | {report['abandoned_shards']} shards of an interrupted run dropped"
+    if report['requeued']:
+        line += f" | {report['requeued']} shards re-queued from dead workers"
+    if report['errors']:
+        line += f" | {len(report['errors'])} symbols unscored"
+    if report['skipped']:
+        line += f" | {report['unfinished_shards']} shards unfinished at the timeout"
+    return line
+
+if __name__ == "__main__":
+    # Worker node: python distributed_scan.py worker [queue db]
+    if len(sys.argv) < 2 or sys.argv[1] != 'worker':
+        print("Usage: python distributed_scan.py worker [queue_db]")
+        sys.exit(1)
+    db_path = sys.argv[2] if len(sys.argv) > 2 else SCAN_QUEUE_DB
+    worker = ScanWorker(ShardQueue(db_path))
+    print(f"🛰️ Scan worker {worker.worker_id} pulling shards from {db_path}")
+    try:
+        done = worker.run()
+    except KeyboardInterrupt:
+        done = worker.shards_done
+    print(f"👋 Worker stopped after {done} shards")
@@ -5,12 +5,16 @@ Scans 600+ stocks from stock universe for best dividend opportunities
 Combines growth potential with dividend income
 """
 
-import yfinance as yf
+from fundamentals_cache import get_fundamentals, warm_fundamentals, fundamentals_cache
 import json
 from datetime import datetime
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
+from bar_store import get_history, update_bars
+from indicators import get_indicators, indicator_memo, INDICATOR_LOOKBACK
+from symbol_quarantine import screen_symbols
+from scan_executor import format_scan_report, SCAN_CPU_WORKERS
+from scan_checkpoint import ScanCheckpoint
 
 # Import comprehensive stock universe
 try:
@@ -24,28 +28,39 @@ except ImportError:
         USE_COMPREHENSIVE_UNIVERSE = False
         print("⚠️ Could not import stock universe")
 
-def get_stock_dividend_data(symbol):
+def fetch_dividend_inputs(symbol):
     """
-    Get dividend and technical data for a single stock
-    Returns None if stock doesn't meet criteria
+    I/O stage: fundamentals and price history for one stock
+    Returns None if the stock can't meet the criteria (no dividend, too little history)
+    """
+    info = get_fundamentals(symbol)
+    
+    # Get dividend yield
+    dividend_yield = info.get('dividendYield', 0)
+    if dividend_yield:
+        dividend_yield = dividend_yield * 100  # Convert to percentage
+    
+    # Skip if no dividend or yield too low
+    if not dividend_yield or dividend_yield < 2.0:
+        return None
+    
+    # Get price data for technical analysis
+    hist = get_history(symbol, period=INDICATOR_LOOKBACK)
+    if hist.empty or len(hist) < 20:
+        return None
+    
+    fields = ['fiftyTwoWeekHigh', 'fiftyTwoWeekLow', 'longName', 'sector', 'marketCap']
+    return {'info': {k: info[k] for k in fields if k in info}, 'dividend_yield': dividend_yield, 'hist': hist}
+
+def score_dividend_stock(symbol, inputs):
+    """
+    CPU stage: technical and dividend scores from fetched inputs
+    Module-level so the hybrid executor can run it in a worker process
     """
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        
-        # Get dividend yield
-        dividend_yield = info.get('dividendYield', 0)
-        if dividend_yield:
-            dividend_yield = dividend_yield * 100  # Convert to percentage
-        
-        # Skip if no dividend or yield too low
-        if not dividend_yield or dividend_yield < 2.0:
-            return None
-        
-        # Get price data for technical analysis
-        hist = ticker.history(period='3mo')
-        if hist.empty or len(hist) < 20:
-            return None
+        info = inputs['info']
+        dividend_yield = inputs['dividend_yield']
+        hist = inputs['hist']
         
         current_price = hist['Close'].iloc[-1]
         price_52w_high = info.get('fiftyTwoWeekHigh', current_price)
@@ -57,13 +72,8 @@ def get_stock_dividend_data(symbol):
         else:
             price_position = 50
         
-        # Calculate RSI
-        delta = hist['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        current_rsi = rsi.iloc[-1] if not rsi.empty else 50
+        # RSI (shared with the other scanners)
+        current_rsi = get_indicators(symbol, hist).rsi
         
         # Calculate volume trend
         avg_volume = hist['Volume'].mean()
@@ -123,6 +133,17 @@ def get_stock_dividend_data(symbol):
     except Exception as e:
         return None
 
+def get_stock_dividend_data(symbol):
+    """
+    Get dividend and technical data for a single stock
+    Returns None if stock doesn't meet criteria
+    """
+    try:
+        inputs = fetch_dividend_inputs(symbol)
+    except Exception:
+        return None
+    return score_dividend_stock(symbol, inputs) if inputs else None
+
 def calculate_technical_score(rsi, price_position, volume_trend, change_1w, change_1m):
     """
     Calculate technical score (0-10)
@@ -212,53 +233,46 @@ def scan_all_stocks_for_dividends(max_workers=10):
     
     # Get stock universe
     if USE_COMPREHENSIVE_UNIVERSE:
-        all_stocks = get_comprehensive_stock_list()
+        all_stocks = screen_symbols(get_comprehensive_stock_list(), silent=False)
         print(f"📊 Scanning {len(all_stocks)} stocks from comprehensive universe")
     else:
         print("❌ Stock universe not available")
         return []
     
     print(f"🔍 Looking for stocks with dividend yield ≥ 2.0%")
-    print(f"⚡ Using {max_workers} parallel workers for faster analysis")
+    print(f"⚡ Using {max_workers} I/O threads and {SCAN_CPU_WORKERS} scoring processes")
     print("=" * 70)
     
     dividend_stocks = []
     processed = 0
     start_time = time.time()
     
-    # Process stocks in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_symbol = {
-            executor.submit(get_stock_dividend_data, symbol): symbol 
-            for symbol in all_stocks
-        }
-        
-        # Process completed tasks
-        for future in as_completed(future_to_symbol):
-            symbol = future_to_symbol[future]
-            processed += 1
-            
-            try:
-                result = future.result()
-                if result:
-                    dividend_stocks.append(result)
-                    print(f"✅ {symbol:8s} | Yield: {result['dividend_yield']:5.2f}% | "
-                          f"Growth: {result['change_1m']:6.2f}% | Score: {result['dividend_score']:5.1f} | "
-                          f"{result['category']}")
-                
-                # Progress update every 50 stocks
-                if processed % 50 == 0:
-                    elapsed = time.time() - start_time
-                    rate = processed / elapsed
-                    remaining = (len(all_stocks) - processed) / rate
-                    print(f"\n📊 Progress: {processed}/{len(all_stocks)} stocks "
-                          f"({processed/len(all_stocks)*100:.1f}%) | "
-                          f"Found: {len(dividend_stocks)} dividend stocks | "
-                          f"ETA: {remaining/60:.1f} min\n")
-                    
-            except Exception as e:
-                continue
+    # Refresh the local bar store in bulk - only missing days are downloaded
+    store_report = update_bars(all_stocks)
+    print(f"🗄️ Bar store refreshed: {store_report['bars_downloaded']} new bars in {store_report['seconds']:.1f}s")
+    warm_fundamentals(all_stocks, silent=False)
+    
+    # Fundamentals and bars are fetched on I/O threads, scoring runs on a process pool
+    def report_progress(done, total):
+        elapsed = time.time() - start_time
+        rate = done / elapsed
+        remaining = (total - done) / rate
+        print(f"\n📊 Progress: {done}/{total} stocks "
+              f"({done/total*100:.1f}%) | "
+              f"ETA: {remaining/60:.1f} min\n")
+    
+    # Each result is checkpointed as it lands - a killed or timed-out run picks up where it stopped
+    checkpoint = ScanCheckpoint('dividend_scan')
+    results, scan_report = checkpoint.run(all_stocks, fetch_dividend_inputs, score_dividend_stock,
+                                          io_workers=max_workers, progress_every=50, on_progress=report_progress)
+    checkpoint.clear()  # Completed - only an interrupted run resumes
+    processed = scan_report['resumed'] + scan_report['completed']
+    for result in results:
+        if result:
+            dividend_stocks.append(result)
+            print(f"✅ {result['symbol']:8s} | Yield: {result['dividend_yield']:5.2f}% | "
+                  f"Growth: {result['change_1m']:6.2f}% | Score: {result['dividend_score']:5.1f} | "
+                  f"{result['category']}")
     
     elapsed_time = time.time() - start_time
     print("\n" + "=" * 70)
@@ -266,6 +280,10 @@ def scan_all_stocks_for_dividends(max_workers=10):
     print(f"📊 Processed: {processed} stocks")
     print(f"💰 Found: {len(dividend_stocks)} dividend-paying stocks")
     print(f"⚡ Rate: {processed/elapsed_time:.1f} stocks/second")
+    print(format_scan_report(scan_report))
+    print(checkpoint.format_stats())
+    print(fundamentals_cache.format_stats())
+    print(indicator_memo.format_stats())
     
     # Sort by dividend score
     dividend_stocks.sort(key=lambda x: x['dividend_score'], reverse=True)
@@ -4,33 +4,102 @@ Adds earnings calendar and investment themes to your existing setup
 No additional API keys required!
 """
 
-import yfinance as yf
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime, timedelta
 import json
-from typing import Dict, List, Optional
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from market_data import get_provider, MARKET_DATA_PROVIDER
+from http_client import get_session
+from fundamentals_cache import get_fundamentals
+from bar_store import get_history, update_bars
+
+# Earnings calendar / themes are slow to build (page scrapes + dozens of quotes) and change slowly
+CONTEXT_CACHE_FILE = os.getenv('CONTEXT_CACHE_FILE', os.path.join(
+    'data_cache', 'market_context_replay.json' if MARKET_DATA_PROVIDER == 'replay' else 'market_context.json'))
+CONTEXT_TTL_MINUTES = {
+    'earnings_calendar': 240,
+    'investment_themes': 30
+}
+
+SECTOR_ETFS = {
+    'XLK': 'Technology',
+    'XLF': 'Financial',
+    'XLV': 'Healthcare', 
+    'XLE': 'Energy',
+    'XLI': 'Industrial',
+    'XLY': 'Consumer Discretionary',
+    'XLP': 'Consumer Staples',
+    'XLB': 'Materials',
+    'XLRE': 'Real Estate',
+    'XLU': 'Utilities'
+}
+
+_context_lock = threading.Lock()
+
+def load_context_cache() -> Dict:
+    """Load cached earnings calendar / themes"""
+    if os.path.exists(CONTEXT_CACHE_FILE):
+        try:
+            with open(CONTEXT_CACHE_FILE, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Error loading market context cache: {e}")
+    return {}
+
+def save_context_cache(cache: Dict):
+    """Save cached earnings calendar / themes"""
+    try:
+        os.makedirs(os.path.dirname(CONTEXT_CACHE_FILE) or '.', exist_ok=True)
+        tmp_path = f"{CONTEXT_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=2, default=str)
+        os.replace(tmp_path, CONTEXT_CACHE_FILE)
+    except Exception as e:
+        print(f"⚠️ Error saving market context cache: {e}")
 
 class EnhancedYahooClient:
     """Enhanced Yahoo Finance client with earnings and themes"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
+        # Shared pooled session (browser User-Agent is set on it by http_client)
+        self.session = get_session()
+    
+    def _cached(self, key: str, fetch: Callable, refresh: bool = False):
+        """
+        Return a cached result younger than its TTL, otherwise fetch and store it
+        Empty results (failed scrapes) are never cached
+        """
+        ttl = timedelta(minutes=CONTEXT_TTL_MINUTES[key.split(':')[0]])
+        with _context_lock:
+            entry = load_context_cache().get(key)
+        if entry and not refresh:
+            try:
+                if datetime.now() - datetime.fromisoformat(entry['fetched_at']) < ttl:
+                    return entry['data']
+            except (KeyError, ValueError):
+                pass
+        
+        data = fetch()
+        if data and (not isinstance(data, dict) or any(data.values())):
+            with _context_lock:
+                cache = load_context_cache()
+                cache[key] = {'fetched_at': datetime.now().isoformat(), 'data': data}
+                save_context_cache(cache)
+        return data
     
     def get_stock_quote(self, symbol: str) -> Optional[Dict]:
         """Get real-time stock quote"""
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            hist = ticker.history(period="1d")
+            info = get_fundamentals(symbol)
+            hist = get_history(symbol, period="1d")
             
             if not hist.empty:
-                current_price = hist['Close'].iloc[-1]
-                open_price = hist['Open'].iloc[-1]
+                current_price = float(hist['Close'].iloc[-1])
+                open_price = float(hist['Open'].iloc[-1])
                 change_pct = ((current_price - open_price) / open_price) * 100
                 
                 return {
@@ -38,7 +107,7 @@ class EnhancedYahooClient:
                     'current_price': current_price,
                     'open_price': open_price,
                     'change_percent': change_pct,
-                    'volume': hist['Volume'].iloc[-1],
+                    'volume': float(hist['Volume'].iloc[-1]),
                     'market_cap': info.get('marketCap'),
                     'pe_ratio': info.get('trailingPE'),
                     'company_name': info.get('longName', symbol)
@@ -47,10 +116,19 @@ class EnhancedYahooClient:
             print(f"Error getting quote for {symbol}: {e}")
             return None
     
-    def get_earnings_calendar(self, days_ahead: int = 7) -> List[Dict]:
+    def get_earnings_calendar(self, days_ahead: int = 7, refresh: bool = False) -> List[Dict]:
         """
-        Get earnings calendar from Yahoo Finance
+        Get earnings calendar from Yahoo Finance (cached for a few hours)
         """
+        return self._cached(f"earnings_calendar:{days_ahead}",
+                            lambda: self._fetch_earnings_calendar(days_ahead), refresh=refresh)
+    
+    def _fetch_earnings_calendar(self, days_ahead: int) -> List[Dict]:
+        """Scrape the earnings calendar, falling back to per-symbol calendars"""
+        if get_provider().offline:
+            # Replay runs skip the scraped page and use recorded calendars
+            return self._get_earnings_from_calendar_api(days_ahead)[:20]
+        
         try:
             # Yahoo Finance earnings calendar URL
             url = "https://finance.yahoo.com/calendar/earnings"
@@ -65,7 +143,7 @@ class EnhancedYahooClient:
                 'day': start_date.strftime('%Y-%m-%d')
             }
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=15)
             soup = BeautifulSoup(response.text, 'html.parser')
             
             earnings_data = []
@@ -115,14 +193,13 @@ class EnhancedYahooClient:
         earnings_data = []
         for symbol in major_stocks[:10]:  # Check first 10 to avoid rate limits
             try:
-                ticker = yf.Ticker(symbol)
-                calendar = ticker.calendar
+                calendar = get_provider().calendar(symbol)
                 if calendar is not None and not calendar.empty:
                     next_earnings = calendar.index[0] if len(calendar.index) > 0 else None
                     if next_earnings:
                         earnings_data.append({
                             'symbol': symbol,
-                            'company': ticker.info.get('longName', symbol),
+                            'company': get_fundamentals(symbol).get('longName', symbol),
                             'date': next_earnings.strftime('%Y-%m-%d'),
                             'source': 'yfinance_calendar'
                         })
@@ -131,37 +208,25 @@ class EnhancedYahooClient:
         
         return earnings_data
     
-    def get_investment_themes(self) -> Dict:
+    def get_investment_themes(self, refresh: bool = False) -> Dict:
         """
-        Get investment themes and trending sectors
+        Get investment themes and trending sectors (cached for half an hour)
         """
-        themes_data = {
+        return self._cached("investment_themes", lambda: {
             'trending_sectors': self._get_sector_performance(),
             'hot_stocks': self._get_trending_stocks(),
             'themes': self._get_market_themes()
-        }
-        return themes_data
+        }, refresh=refresh)
     
     def _get_sector_performance(self) -> List[Dict]:
         """Get sector ETF performance as proxy for sector themes"""
-        sector_etfs = {
-            'XLK': 'Technology',
-            'XLF': 'Financial',
-            'XLV': 'Healthcare', 
-            'XLE': 'Energy',
-            'XLI': 'Industrial',
-            'XLY': 'Consumer Discretionary',
-            'XLP': 'Consumer Staples',
-            'XLB': 'Materials',
-            'XLRE': 'Real Estate',
-            'XLU': 'Utilities'
-        }
+        # One bulk bar store refresh instead of a request per ETF
+        update_bars(list(SECTOR_ETFS))
         
         sector_data = []
-        for etf, sector_name in sector_etfs.items():
+        for etf, sector_name in SECTOR_ETFS.items():
             try:
-                ticker = yf.Ticker(etf)
-                hist = ticker.history(period="5d")
+                hist = get_history(etf, period="5d", refresh=False)
                 if not hist.empty:
                     current = hist['Close'].iloc[-1]
                     previous = hist['Close'].iloc[0]
@@ -182,10 +247,13 @@ class EnhancedYahooClient:
     
     def _get_trending_stocks(self) -> List[Dict]:
         """Get trending/most active stocks"""
+        if get_provider().offline:
+            return []  # Scraped page, not available in replay runs
+        
         try:
             # Yahoo Finance trending tickers
             url = "https://finance.yahoo.com/trending-tickers"
-            response = self.session.get(url)
+            response = self.session.get(url, timeout=15)
             soup = BeautifulSoup(response.text, 'html.parser')
             
             trending_stocks = []
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Fundamentals Cache
+Persisted cache for Ticker.info fields with per-field TTLs, so slow-changing
+fundamentals are fetched once per TTL instead of once per symbol per scan
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from market_data import get_provider, MARKET_DATA_PROVIDER
+
+FUNDAMENTALS_CACHE_FILE = os.getenv('FUNDAMENTALS_CACHE_FILE', os.path.join(
+    'data_cache', 'fundamentals_replay.json' if MARKET_DATA_PROVIDER == 'replay' else 'fundamentals.json'))
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+# Fields we cache and how long each one stays fresh (seconds)
+FIELD_TTLS = {
+    # Identity - changes rarely
+    'longName': WEEK,
+    'shortName': WEEK,
+    'sector': WEEK,
+    'industry': WEEK,
+    'country': WEEK,
+    'exchange': WEEK,
+    'currency': WEEK,
+    'quoteType': WEEK,
+    # Size, valuation and ranges - refreshed daily
+    'marketCap': DAY,
+    'trailingPE': DAY,
+    'forwardPE': DAY,
+    'pegRatio': DAY,
+    'priceToBook': DAY,
+    'dividendYield': DAY,
+    'fiftyTwoWeekHigh': DAY,
+    'fiftyTwoWeekLow': DAY,
+    'averageVolume': DAY,
+    'beta': DAY
+}
+
+SAVE_EVERY = 25  # Flush to disk after this many fresh fetches
+
+class FundamentalsCache:
+    """Per-field TTL cache in front of the provider's info() call"""
+    
+    def __init__(self, cache_file: str = FUNDAMENTALS_CACHE_FILE, field_ttls: Dict[str, int] = None):
+        self.cache_file = cache_file
+        self.field_ttls = field_ttls or FIELD_TTLS
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self.stats = {'hits': 0, 'misses': 0, 'errors': 0}
+        self.data = self.load_cache()
+    
+    def load_cache(self) -> Dict:
+        """Load cached fundamentals from file"""
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error loading fundamentals cache: {e}")
+        return {}
+    
+    def save_cache(self):
+        """Save cached fundamentals to file"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            snapshot = json.dumps(self.data, default=str)
+            self._unsaved = 0
+        
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            print(f"⚠️ Error saving fundamentals cache: {e}")
+    
+    def is_fresh(self, symbol: str, fields: Optional[List[str]] = None, now: Optional[float] = None) -> bool:
+        """True if every requested field is cached and inside its TTL"""
+        entry = self.data.get(symbol)
+        if not entry:
+            return False
+        
+        now = now or time.time()
+        fetched_at = entry.get('fetched_at', {})
+        for field in fields or self.field_ttls:
+            ttl = self.field_ttls.get(field, DAY)
+            if field not in fetched_at or now - fetched_at[field] >= ttl:
+                return False
+        return True
+    
+    def _cached_fields(self, symbol: str) -> Dict:
+        """Cached values for a symbol (fields Yahoo did not report are left out)"""
+        values = self.data.get(symbol, {}).get('fields', {})
+        return {k: v for k, v in values.items() if v is not None}
+    
+    def cached_field(self, symbol: str, field: str):
+        """One cached value regardless of age, without calling the provider (None if never fetched)"""
+        with self._lock:
+            return self.data.get(symbol, {}).get('fields', {}).get(field)
+    
+    def _store(self, symbol: str, info: Dict):
+        """Keep the tracked fields of a fresh info() response"""
+        now = time.time()
+        with self._lock:
+            entry = self.data.setdefault(symbol, {'fields': {}, 'fetched_at': {}})
+            for field in self.field_ttls:
+                # Missing fields are cached as None so we don't re-ask for them every run
+                entry['fields'][field] = info.get(field)
+                entry['fetched_at'][field] = now
+            self._unsaved += 1
+            should_save = self._unsaved >= SAVE_EVERY
+        
+        if should_save:
+            self.save_cache()
+    
+    def get(self, symbol: str, fields: Optional[List[str]] = None) -> Dict:
+        """
+        Get fundamentals for a symbol, calling the provider only when a field expired
+        Provider errors propagate like a direct Ticker.info call would
+        """
+        if self.is_fresh(symbol, fields):
+            with self._lock:
+                self.stats['hits'] += 1
+            return self._cached_fields(symbol)
+        
+        with self._lock:
+            self.stats['misses'] += 1
+        try:
+            info = get_provider().info(symbol) or {}
+        except Exception:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        
+        self._store(symbol, info)
+        return self._cached_fields(symbol)
+    
+    def warm(self, symbols: List[str], fields: Optional[List[str]] = None, max_workers: int = 8,
+             silent: bool = True) -> Dict:
+        """Fetch every stale symbol up front (in parallel) so scans only read the cache"""
+        started = time.time()
+        stale = [s for s in dict.fromkeys(symbols) if not self.is_fresh(s, fields)]
+        failed = []
+        
+        def fetch(symbol):
+            try:
+                self.get(symbol, fields)
+            except Exception:
+                failed.append(symbol)
+        
+        if stale:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(fetch, stale))
+            self.save_cache()
+        
+        report = {
+            'requested': len(symbols),
+            'fresh': len(symbols) - len(stale),
+            'fetched': len(stale) - len(failed),
+            'failed_symbols': failed,
+            'seconds': round(time.time() - started, 2)
+        }
+        if not silent:
+            print(f"🗃️ Fundamentals cache warmed: {report['fetched']} fetched, {report['fresh']} fresh, "
+                  f"{len(failed)} failed in {report['seconds']:.1f}s")
+        return report
+    
+    def get_stats(self) -> Dict:
+        """Hit/miss counters since start-up"""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0.0
+        stats['symbols_cached'] = len(self.data)
+        return stats
+    
+    def format_stats(self) -> str:
+        """One-line summary for scan logs"""
+        stats = self.get_stats()
+        return (f"🗃️ Fundamentals cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0f}% hit rate), {stats['errors']} errors")
+
+# Global cache instance
+fundamentals_cache = FundamentalsCache()
+atexit.register(fundamentals_cache.save_cache)
+
+def get_fundamentals(symbol: str, fields: Optional[List[str]] = None) -> Dict:
+    """Convenience function to read cached fundamentals"""
+    return fundamentals_cache.get(symbol, fields)
+
+def warm_fundamentals(symbols: List[str], silent: bool = True) -> Dict:
+    """Convenience function to warm the cache for a symbol list"""
+    return fundamentals_cache.warm(symbols, silent=silent)
+
+if __name__ == "__main__":
+    from stock_universe import get_comprehensive_stock_list
+    
+    print("🗃️ Warming fundamentals cache")
+    print("=" * 50)
+    warm_fundamentals(get_comprehensive_stock_list(), silent=False)
+    print(fundamentals_cache.format_stats())
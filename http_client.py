@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client
+One pooled, keep-alive requests session per process for every outbound call
+(Telegram, n8n webhooks, X API, Yahoo pages) with per-host connection limits,
+a configurable retry policy and connection-reuse statistics
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Pool and retry settings (override per deployment with env vars)
+HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', '20'))          # Distinct hosts kept pooled
+HTTP_POOL_PER_HOST = int(os.getenv('HTTP_POOL_PER_HOST', '10'))    # Keep-alive connections per host
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '3'))
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', '0.5'))
+HTTP_DEFAULT_TIMEOUT = float(os.getenv('HTTP_DEFAULT_TIMEOUT', '15'))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+}
+
+def build_retry(total: int = HTTP_RETRIES, backoff_factor: float = HTTP_BACKOFF_FACTOR) -> Retry:
+    """
+    Retry policy: connection errors are retried for every method, HTTP error statuses
+    only for idempotent ones (a retried POST could send a Telegram alert twice)
+    """
+    return Retry(
+        total=total,
+        connect=total,
+        read=total,
+        status=total,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+class HTTPClient:
+    """Process-wide pooled session with reuse statistics"""
+    
+    def __init__(self, pool_hosts: int = HTTP_POOL_HOSTS, pool_per_host: int = HTTP_POOL_PER_HOST,
+                 retry: Optional[Retry] = None, timeout: float = HTTP_DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_per_host,
+                                   max_retries=retry or build_retry(), pool_block=False)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self._lock = threading.Lock()
+        self._requests_by_host: Dict[str, int] = {}
+        self._errors = 0
+    
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the shared pool (default timeout applied)"""
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlparse(url).netloc
+        with self._lock:
+            self._requests_by_host[host] = self._requests_by_host.get(host, 0) + 1
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self._errors += 1
+            raise
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+    
+    def get_stats(self) -> Dict:
+        """
+        Connection reuse per host from the urllib3 pools:
+        every request that did not open a new connection reused a kept-alive one
+        """
+        per_host = {}
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.host}:{pool.port}" if pool.port else pool.host
+            stats = per_host.setdefault(host, {'requests': 0, 'new_connections': 0})
+            stats['requests'] += pool.num_requests
+            stats['new_connections'] += pool.num_connections
+        
+        totals = {'requests': 0, 'new_connections': 0}
+        for stats in per_host.values():
+            stats['reused_connections'] = max(0, stats['requests'] - stats['new_connections'])
+            totals['requests'] += stats['requests']
+            totals['new_connections'] += stats['new_connections']
+        
+        totals['reused_connections'] = max(0, totals['requests'] - totals['new_connections'])
+        totals['reuse_rate'] = round(totals['reused_connections'] / totals['requests'] * 100, 1) \
+            if totals['requests'] else 0.0
+        with self._lock:
+            totals['calls_by_host'] = dict(self._requests_by_host)
+            totals['errors'] = self._errors
+        totals['per_host'] = per_host
+        return totals
+    
+    def format_stats(self) -> str:
+        """One-line summary for logs"""
+        stats = self.get_stats()
+        return (f"🌐 HTTP pool: {stats['requests']} requests over {stats['new_connections']} connections "
+                f"({stats['reuse_rate']:.0f}% reused), {stats['errors']} errors")
+
+# Global client instance
+http_client = HTTPClient()
+
+def get_session() -> requests.Session:
+    """The shared session, for code that needs session-level APIs"""
+    return http_client.session
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """Convenience function for a pooled GET"""
+    return http_client.get(url, **kwargs)
+
+def http_post(url: str, **kwargs) -> requests.Response:
+    """Convenience function for a pooled POST"""
+    return http_client.post(url, **kwargs)
+
+def get_http_stats() -> Dict:
+    """Convenience function for connection-reuse statistics"""
+    return http_client.get_stats()
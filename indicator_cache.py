@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Indicator Result Cache
+On-disk tier behind the in-memory IndicatorMemo. Results are keyed by symbol,
+last bar, indicator and parameters, so whichever report runs second in a cycle
+(n8n endpoints, dividend scan, Gemma picks) reads what the first one computed
+instead of recomputing it. Only the newest bar is kept per symbol
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from market_data import MARKET_DATA_PROVIDER
+
+INDICATOR_CACHE_FILE = os.getenv('INDICATOR_CACHE_FILE', os.path.join(
+    'data_cache', 'indicator_results_replay.json' if MARKET_DATA_PROVIDER == 'replay' else 'indicator_results.json'))
+INDICATOR_DISK_CACHE = os.getenv('INDICATOR_DISK_CACHE', '1') != '0'
+
+SAVE_EVERY = 100  # Flush to disk after this many new results
+
+def to_json_value(value: Any) -> Any:
+    """NumPy scalars and nested dicts as plain JSON types"""
+    if isinstance(value, dict):
+        return {k: to_json_value(v) for k, v in value.items()}
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return float(value)
+
+class IndicatorResultCache:
+    """Indicator results per symbol for its latest bar, persisted as JSON"""
+    
+    def __init__(self, cache_file: str = INDICATOR_CACHE_FILE):
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._loaded_mtime = 0.0
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+        self.data = self.load_cache()
+    
+    def _file_mtime(self) -> float:
+        try:
+            return os.stat(self.cache_file).st_mtime
+        except OSError:
+            return 0.0
+    
+    def load_cache(self) -> Dict:
+        """Load cached results from file"""
+        if os.path.exists(self.cache_file):
+            try:
+                self._loaded_mtime = self._file_mtime()
+                with open(self.cache_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error loading indicator cache: {e}")
+        return {}
+    
+    def _refresh_from_disk(self):
+        """Pick up results another process saved since we last read the file"""
+        if self._file_mtime() <= self._loaded_mtime:
+            return
+        on_disk = self.load_cache()
+        with self._lock:
+            for symbol, entry in on_disk.items():
+                mine = self.data.get(symbol)
+                if mine is None or (mine['bar'] != entry.get('bar') and entry.get('saved_at', 0) > mine['saved_at']):
+                    self.data[symbol] = entry
+                elif mine['bar'] == entry.get('bar'):
+                    mine['results'] = {**entry.get('results', {}), **mine['results']}
+    
+    def save_cache(self):
+        """Save cached results to file"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            snapshot = json.dumps(self.data)
+            self._unsaved = 0
+        
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.cache_file)
+            self._loaded_mtime = self._file_mtime()
+        except Exception as e:
+            print(f"⚠️ Error saving indicator cache: {e}")
+    
+    def _lookup(self, symbol: str, bar: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self.data.get(symbol)
+            if entry and entry.get('bar') == bar:
+                return entry['results'].get(key)
+        return None
+    
+    def get(self, symbol: str, bar: str, key: str) -> Optional[Any]:
+        """Cached result for this symbol's bar, or None"""
+        value = self._lookup(symbol, bar, key)
+        if value is None:
+            self._refresh_from_disk()
+            value = self._lookup(symbol, bar, key)
+        with self._lock:
+            self.stats['hits' if value is not None else 'misses'] += 1
+        return value
+    
+    def put(self, symbol: str, bar: str, key: str, value: Any):
+        """Store a result; a newer bar replaces everything held for the symbol"""
+        try:
+            value = to_json_value(value)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            entry = self.data.get(symbol)
+            if entry is None or entry.get('bar') != bar:
+                entry = self.data[symbol] = {'bar': bar, 'saved_at': time.time(), 'results': {}}
+            entry['results'][key] = value
+            self.stats['stored'] += 1
+            self._unsaved += 1
+            should_save = self._unsaved >= SAVE_EVERY
+        
+        if should_save:
+            self.save_cache()
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0.0
+        stats['symbols_cached'] = len(self.data)
+        return stats
+
+# Global cache instance
+indicator_result_cache = IndicatorResultCache()
+atexit.register(indicator_result_cache.save_cache)
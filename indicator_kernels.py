@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Indicator Kernels
+Rolling min/max, OBV, true range/ATR and Wilder smoothing over plain arrays.
+When numba is installed the loop kernels are JIT-compiled (monotonic deque
+for the rolling extremes, single pass for the rest); otherwise the vectorized
+NumPy/pandas versions run. Both give the same answers, so the rest of the
+code never has to care which one is active
+"""
+
+import os
+import time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Optional dependency - compiled kernels need numba
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# INDICATOR_JIT=0 forces the NumPy kernels even when numba is installed
+JIT_ENABLED = NUMBA_AVAILABLE and os.getenv('INDICATOR_JIT', '1') != '0'
+
+# Loop kernels - plain Python, compiled below when numba is available
+
+def _rolling_extreme_loop(values, window, sign):
+    """Rolling max (sign=1) or min (sign=-1) with a monotonic deque; NaN in the window gives NaN"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    queue = np.empty(n, np.int64)
+    head = 0
+    tail = 0
+    last_nan = -1
+    for i in range(n):
+        x = values[i]
+        if x != x:
+            last_nan = i
+        else:
+            while tail > head and values[queue[tail - 1]] * sign <= x * sign:
+                tail -= 1
+            queue[tail] = i
+            tail += 1
+        while tail > head and queue[head] <= i - window:
+            head += 1
+        if i >= window - 1 and last_nan <= i - window:
+            out[i] = values[queue[head]]
+    return out
+
+def _obv_loop(close, volume):
+    """On-Balance Volume; flat closes and missing values add nothing"""
+    n = close.shape[0]
+    out = np.zeros(n)
+    total = 0.0
+    for i in range(1, n):
+        diff = close[i] - close[i - 1]
+        if volume[i] == volume[i]:
+            if diff > 0:
+                total += volume[i]
+            elif diff < 0:
+                total -= volume[i]
+        out[i] = total
+    return out
+
+def _true_range_loop(high, low, close):
+    """Largest of high-low and the gaps from the previous close, skipping NaN"""
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    for i in range(n):
+        best = high[i] - low[i]
+        if i > 0:
+            for gap in (abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])):
+                if best != best or gap > best:
+                    best = gap
+        out[i] = best
+    return out
+
+def _rolling_mean_loop(values, window):
+    """Rolling mean; NaN in the window gives NaN"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += values[j]
+        out[i] = total / window
+    return out
+
+def _wilder_loop(values, period):
+    """Wilder smoothing: seeded with the mean of the first `period` values, NaN inputs are skipped"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    count = 0
+    total = 0.0
+    state = np.nan
+    alpha = 1.0 / period
+    for i in range(n):
+        x = values[i]
+        if x != x:
+            if count >= period:
+                out[i] = state
+            continue
+        if count < period:
+            total += x
+            count += 1
+            if count == period:
+                state = total / period
+                out[i] = state
+        else:
+            state = (1.0 - alpha) * state + alpha * x
+            out[i] = state
+    return out
+
+if JIT_ENABLED:
+    _rolling_extreme_jit = njit(cache=True)(_rolling_extreme_loop)
+    _obv_jit = njit(cache=True)(_obv_loop)
+    _true_range_jit = njit(cache=True)(_true_range_loop)
+    _rolling_mean_jit = njit(cache=True)(_rolling_mean_loop)
+    _wilder_jit = njit(cache=True)(_wilder_loop)
+
+# NumPy kernels
+
+def _windows(values: np.ndarray, window: int) -> np.ndarray:
+    return np.lib.stride_tricks.sliding_window_view(values, window)
+
+def _rolling_extreme_numpy(values: np.ndarray, window: int, sign: int) -> np.ndarray:
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] >= window:
+        windows = _windows(values, window)
+        out[window - 1:] = windows.max(axis=1) if sign > 0 else windows.min(axis=1)  # NaN propagates
+    return out
+
+def _obv_numpy(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    steps = np.zeros(close.shape[0])
+    if close.shape[0] > 1:
+        steps[1:] = np.nan_to_num(np.sign(np.diff(close)) * volume[1:])
+    return np.cumsum(steps)
+
+def _true_range_numpy(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    previous = np.concatenate(([np.nan], close[:-1]))
+    with np.errstate(invalid='ignore'):
+        return np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+
+def _rolling_mean_numpy(values: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] >= window:
+        out[window - 1:] = _windows(values, window).sum(axis=1) / window
+    return out
+
+def _wilder_numpy(values: np.ndarray, period: int) -> np.ndarray:
+    out = np.full(values.shape[0], np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < period:
+        return out
+    seed_at = valid[period - 1]
+    tail = values[seed_at:].copy()
+    tail[0] = values[valid[:period]].mean()
+    out[seed_at:] = pd.Series(tail).ewm(alpha=1.0 / period, adjust=False, ignore_na=True).mean().to_numpy()
+    return out
+
+# Public kernels
+
+def _as_array(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+def rolling_max(values, window: int) -> np.ndarray:
+    """Rolling maximum, NaN until `window` bars (pandas rolling(window).max())"""
+    values = _as_array(values)
+    if JIT_ENABLED:
+        return _rolling_extreme_jit(values, window, 1.0)
+    return _rolling_extreme_numpy(values, window, 1)
+
+def rolling_min(values, window: int) -> np.ndarray:
+    """Rolling minimum, NaN until `window` bars (pandas rolling(window).min())"""
+    values = _as_array(values)
+    if JIT_ENABLED:
+        return _rolling_extreme_jit(values, window, -1.0)
+    return _rolling_extreme_numpy(values, window, -1)
+
+def obv(close, volume) -> np.ndarray:
+    """On-Balance Volume starting at 0 on the first bar"""
+    close, volume = _as_array(close), _as_array(volume)
+    if JIT_ENABLED:
+        return _obv_jit(close, volume)
+    return _obv_numpy(close, volume)
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range including gaps from the previous close"""
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    if JIT_ENABLED:
+        return _true_range_jit(high, low, close)
+    return _true_range_numpy(high, low, close)
+
+def atr(high, low, close, period: int) -> np.ndarray:
+    """Average True Range as the simple mean of the last `period` true ranges"""
+    tr = true_range(high, low, close)
+    if JIT_ENABLED:
+        return _rolling_mean_jit(tr, period)
+    return _rolling_mean_numpy(tr, period)
+
+def wilder_smooth(values, period: int) -> np.ndarray:
+    """Wilder's smoothing (RMA), seeded with the simple mean of the first `period` values"""
+    values = _as_array(values)
+    if JIT_ENABLED:
+        return _wilder_jit(values, period)
+    return _wilder_numpy(values, period)
+
+def backend() -> str:
+    return "numba" if JIT_ENABLED else "numpy"
+
+# Microbenchmark
+
+def synthetic_series(bars: int = 2520, seed: int = 3) -> pd.DataFrame:
+    """Ten years of random-walk daily bars"""
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    return pd.DataFrame({
+        'High': close * (1 + np.abs(rng.normal(0, 0.01, bars))),
+        'Low': close * (1 - np.abs(rng.normal(0, 0.01, bars))),
+        'Close': close,
+        'Volume': rng.integers(100_000, 5_000_000, bars).astype(float)
+    }, index=pd.bdate_range(end='2024-06-28', periods=bars))
+
+def _pandas_reference(hist: pd.DataFrame, window: int) -> Dict[str, np.ndarray]:
+    """What the scanners did before: stacked pandas rolling passes and Python loops"""
+    prices, volumes = hist['Close'], hist['Volume']
+    obv_values = [0.0]
+    for i in range(1, len(prices)):
+        if prices.iloc[i] > prices.iloc[i - 1]:
+            obv_values.append(obv_values[-1] + volumes.iloc[i])
+        elif prices.iloc[i] < prices.iloc[i - 1]:
+            obv_values.append(obv_values[-1] - volumes.iloc[i])
+        else:
+            obv_values.append(obv_values[-1])
+    previous = prices.shift(1)
+    tr = pd.concat([hist['High'] - hist['Low'], (hist['High'] - previous).abs(),
+                    (hist['Low'] - previous).abs()], axis=1).max(axis=1)
+    return {
+        'rolling_max': hist['High'].rolling(window=window).max().to_numpy(),
+        'rolling_min': hist['Low'].rolling(window=window).min().to_numpy(),
+        'obv': np.array(obv_values),
+        'atr': tr.rolling(window=window).mean().to_numpy(),
+        'wilder': _wilder_loop(tr.to_numpy(), window)
+    }
+
+def _kernel_results(hist: pd.DataFrame, window: int) -> Dict[str, np.ndarray]:
+    return {
+        'rolling_max': rolling_max(hist['High'], window),
+        'rolling_min': rolling_min(hist['Low'], window),
+        'obv': obv(hist['Close'], hist['Volume']),
+        'atr': atr(hist['High'], hist['Low'], hist['Close'], window),
+        'wilder': wilder_smooth(true_range(hist['High'], hist['Low'], hist['Close']), window)
+    }
+
+def run_benchmark(bars: int = 2520, repeats: int = 20, window: int = 14) -> Dict:
+    """Time the kernels against the pandas/loop code they replace on `bars` daily bars"""
+    hist = synthetic_series(bars)
+    _kernel_results(hist, window)  # First call compiles when numba is active
+    
+    start = time.time()
+    for _ in range(repeats):
+        expected = _pandas_reference(hist, window)
+    reference_seconds = (time.time() - start) / repeats
+    
+    start = time.time()
+    for _ in range(repeats):
+        actual = _kernel_results(hist, window)
+    kernel_seconds = (time.time() - start) / repeats
+    
+    mismatches = [name for name in expected
+                  if not np.allclose(expected[name], actual[name], rtol=1e-9, equal_nan=True)]
+    return {
+        'backend': backend(),
+        'bars': bars,
+        'reference_seconds': reference_seconds,
+        'kernel_seconds': kernel_seconds,
+        'speedup': reference_seconds / kernel_seconds if kernel_seconds else 0,
+        'mismatches': mismatches
+    }
+
+if __name__ == "__main__":
+    import sys
+    
+    print("⚙️ Indicator kernel benchmark")
+    print("=" * 50)
+    result = run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2520)
+    print(f"Backend:        {result['backend']}")
+    print(f"Bars:           {result['bars']}")
+    print(f"Pandas/loops:   {result['reference_seconds'] * 1000:.2f}ms")
+    print(f"Kernels:        {result['kernel_seconds'] * 1000:.2f}ms")
+    print(f"Speedup:        {result['speedup']:.0f}x")
+    print(f"Mismatches:     {len(result['mismatches'])} {result['mismatches']}")
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Technical Indicators
+The one implementation of RSI, MACD, Bollinger Bands, moving averages,
+stochastics, OBV, ATR and volume ratios used by every scanner. Results for a
+symbol are held in a shared IndicatorSet, so each indicator is computed once
+per symbol per bar no matter how many reports ask for it. The array-level
+work (rolling extremes, OBV, true range) runs in indicator_kernels
+"""
+
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels
+from bar_panel import BarView
+from indicator_cache import IndicatorResultCache, indicator_result_cache, INDICATOR_DISK_CACHE
+
+# Canonical settings - every consumer reads the same lookback with the same parameters
+INDICATOR_LOOKBACK = "3mo"
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BOLLINGER_PERIOD, BOLLINGER_STD = 20, 2
+STOCH_PERIOD, STOCH_SMOOTH = 14, 3
+ATR_PERIOD = 14
+VOLUME_AVG_PERIOD = 20
+ROC_PERIOD = 10
+MEMO_SIZE = 2000  # IndicatorSets kept in memory (one per symbol per bar)
+
+# Parameters each technical_summary() indicator is memoized under
+SUMMARY_PARAMS = {
+    'rsi': (RSI_PERIOD,),
+    'macd': (MACD_FAST, MACD_SLOW, MACD_SIGNAL),
+    'bollinger': (BOLLINGER_PERIOD, BOLLINGER_STD),
+    'moving_averages': (20, 50, 12, 26),
+    'volume_analysis': (VOLUME_AVG_PERIOD,),
+    'momentum': (STOCH_PERIOD, STOCH_SMOOTH, ROC_PERIOD)
+}
+
+def rsi_series(prices: pd.Series, period: int = RSI_PERIOD) -> pd.Series:
+    """RSI from simple moving averages of gains and losses"""
+    delta = prices.diff()
+    up, down = delta.clip(lower=0), -1 * delta.clip(upper=0)
+    rs = up.rolling(window=period).mean() / down.rolling(window=period).mean()
+    return 100 - (100 / (1 + rs))
+
+def macd_series(prices: pd.Series, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL):
+    """MACD line, signal line and histogram"""
+    macd_line = prices.ewm(span=fast).mean() - prices.ewm(span=slow).mean()
+    signal_line = macd_line.ewm(span=signal).mean()
+    return macd_line, signal_line, macd_line - signal_line
+
+def obv_series(close: pd.Series, volume: pd.Series) -> pd.Series:
+    """On-Balance Volume (starts at 0 on the first bar)"""
+    return pd.Series(indicator_kernels.obv(close, volume), index=close.index)
+
+def true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    """True range including gaps from the previous close"""
+    return pd.Series(indicator_kernels.true_range(high, low, close), index=close.index)
+
+def macd_summary(prices: pd.Series, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL) -> Dict:
+    """Latest MACD, signal, histogram and a fresh bullish crossover flag"""
+    if len(prices) < slow:
+        return {'macd': 0, 'signal': 0, 'histogram': 0, 'bullish_crossover': False}
+    macd_line, signal_line, histogram = macd_series(prices, fast, slow, signal)
+    return {
+        'macd': macd_line.iloc[-1],
+        'signal': signal_line.iloc[-1],
+        'histogram': histogram.iloc[-1],
+        'bullish_crossover': macd_line.iloc[-1] > signal_line.iloc[-1] and macd_line.iloc[-2] <= signal_line.iloc[-2]
+    }
+
+def bollinger_summary(prices: pd.Series, period: int = BOLLINGER_PERIOD, std_dev: float = BOLLINGER_STD) -> Dict:
+    """Latest bands plus the price position within them (0 = lower band, 1 = upper band)"""
+    sma = prices.rolling(window=period).mean()
+    std = prices.rolling(window=period).std()
+    current_price = prices.iloc[-1]
+    current_upper = (sma + std * std_dev).iloc[-1]
+    current_lower = (sma - std * std_dev).iloc[-1]
+    current_sma = sma.iloc[-1]
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'upper_band': current_upper,
+            'lower_band': current_lower,
+            'sma': current_sma,
+            'band_position': (current_price - current_lower) / (current_upper - current_lower),
+            'squeeze': (current_upper - current_lower) / current_sma < 0.1,  # Tight bands
+            'breakout_up': current_price > current_upper,
+            'breakout_down': current_price < current_lower
+        }
+
+def moving_average_summary(prices: pd.Series) -> Dict:
+    """SMA/EMA summary; the 50-day falls back to the 20-day on short histories"""
+    if len(prices) < 20:
+        return {'sma_20': 0, 'sma_50': 0, 'ema_12': 0, 'ema_26': 0, 'above_sma_20': False,
+                'above_sma_50': False, 'golden_cross': False, 'death_cross': False}
+    
+    sma_20 = prices.rolling(window=20).mean().iloc[-1]
+    sma_50 = prices.rolling(window=50).mean().iloc[-1] if len(prices) >= 50 else sma_20
+    current_price = prices.iloc[-1]
+    return {
+        'sma_20': sma_20,
+        'sma_50': sma_50,
+        'ema_12': prices.ewm(span=12).mean().iloc[-1],
+        'ema_26': prices.ewm(span=26).mean().iloc[-1],
+        'above_sma_20': current_price > sma_20,
+        'above_sma_50': current_price > sma_50,
+        'golden_cross': sma_20 > sma_50,  # Bullish signal
+        'death_cross': sma_20 < sma_50    # Bearish signal
+    }
+
+def volume_summary(hist: pd.DataFrame) -> Dict:
+    """Volume ratio against the 20-bar average, PVT/OBV trends and volume breakout"""
+    volumes = hist['Volume']
+    prices = hist['Close']
+    
+    avg_volume_20 = volumes.rolling(window=VOLUME_AVG_PERIOD).mean().iloc[-1]
+    current_volume = volumes.iloc[-1]
+    volume_ratio = current_volume / avg_volume_20 if avg_volume_20 > 0 else 1
+    
+    pvt = (prices.pct_change() * volumes).cumsum()
+    obv = obv_series(prices, volumes).iloc[1:]  # OBV changes start on the second bar
+    
+    return {
+        'current_volume': current_volume,
+        'avg_volume_20': avg_volume_20,
+        'volume_ratio': volume_ratio,
+        'high_volume': volume_ratio > 1.5,
+        'very_high_volume': volume_ratio > 2.0,
+        'pvt_bullish': pvt.iloc[-1] > pvt.iloc[-5] if len(pvt) >= 5 else False,
+        'obv_bullish': len(obv) >= 5 and obv.iloc[-1] > obv.iloc[-5],
+        'volume_breakout': volume_ratio > 2.0 and prices.iloc[-1] > prices.iloc[-2]
+    }
+
+def momentum_summary(hist: pd.DataFrame) -> Dict:
+    """Fast stochastic %K/%D, Williams %R and rate of change"""
+    prices = hist['Close']
+    lowest_low = pd.Series(indicator_kernels.rolling_min(hist['Low'], STOCH_PERIOD), index=prices.index)
+    highest_high = pd.Series(indicator_kernels.rolling_max(hist['High'], STOCH_PERIOD), index=prices.index)
+    k_percent = 100 * ((prices - lowest_low) / (highest_high - lowest_low))
+    d_percent = k_percent.rolling(window=STOCH_SMOOTH).mean()
+    williams_r = -100 * ((highest_high - prices) / (highest_high - lowest_low))
+    roc = ((prices - prices.shift(ROC_PERIOD)) / prices.shift(ROC_PERIOD)) * 100
+    
+    return {
+        'stoch_k': k_percent.iloc[-1],
+        'stoch_d': d_percent.iloc[-1],
+        'williams_r': williams_r.iloc[-1],
+        'roc': roc.iloc[-1],
+        'stoch_oversold': k_percent.iloc[-1] < 20,
+        'stoch_overbought': k_percent.iloc[-1] > 80,
+        'momentum_bullish': roc.iloc[-1] > 5
+    }
+
+def bar_key(hist: pd.DataFrame) -> str:
+    """
+    Identity of a bar window: bar count, last bar date and the last bar's close, high, low and
+    volume (an intraday poll rewrites today's bar in place, often without moving the close).
+    Values are compared exactly, so float32 BarPanel bars and float64 frames get separate entries
+    """
+    last = "|".join(repr(float(hist[column].iloc[-1])) for column in ('Close', 'High', 'Low', 'Volume'))
+    return f"{hist.index[-1]}|{len(hist)}|{last}"
+
+class IndicatorSet:
+    """Indicators for one symbol's bars; each one is computed on first use and then reused"""
+    
+    def __init__(self, symbol: str, hist: pd.DataFrame, disk: Optional[IndicatorResultCache] = None,
+                 sink: Optional[Callable] = None):
+        self.symbol = symbol
+        self.hist = hist
+        self.close = hist['Close']
+        self.bars = len(hist)
+        self.disk = disk if symbol else None
+        self.sink = sink  # Takes new results instead of the disk tier (scan worker processes)
+        self.bar_key = bar_key(hist)
+        self._results: Dict[str, object] = {}
+    
+    def cached(self, name: str, params: Optional[tuple] = None):
+        """Result already held in memory or on disk, without computing it (None if missing)"""
+        key = f"{name}{params or SUMMARY_PARAMS[name]}"
+        if key not in self._results and self.disk:
+            value = self.disk.get(self.symbol, self.bar_key, key)
+            if value is not None:
+                self._results[key] = value
+        return self._results.get(key)
+    
+    def store(self, name: str, value, params: Optional[tuple] = None):
+        """Record a result computed elsewhere (e.g. by the panel engine)"""
+        key = f"{name}{params or SUMMARY_PARAMS[name]}"
+        self._results[key] = value
+        if self.sink:
+            self.sink(self.symbol, self.bar_key, key, value)
+        elif self.disk:
+            self.disk.put(self.symbol, self.bar_key, key, value)
+    
+    def _result(self, name: str, compute, params: Optional[tuple] = None):
+        """Memoized result for (indicator, params), read through the disk tier when there is one"""
+        value = self.cached(name, params)
+        if value is None:
+            value = compute()
+            self.store(name, value, params)
+        return value
+    
+    @property
+    def price(self) -> float:
+        return self.close.iloc[-1]
+    
+    def sma(self, window: int) -> float:
+        """Latest simple moving average (NaN when there are fewer bars than the window)"""
+        return self._result('sma', lambda: self.close.rolling(window=window).mean().iloc[-1], (window,))
+    
+    def change(self, bars_back: int) -> float:
+        """Percent change from `bars_back` bars ago (0 without enough history)"""
+        if self.bars <= bars_back:
+            return 0
+        past = self.close.iloc[-1 - bars_back]
+        return ((self.price - past) / past) * 100
+    
+    @property
+    def rsi(self) -> float:
+        return self._result('rsi', lambda: rsi_series(self.close).iloc[-1])
+    
+    @property
+    def macd(self) -> Dict:
+        return self._result('macd', lambda: macd_summary(self.close))
+    
+    @property
+    def bollinger(self) -> Dict:
+        return self._result('bollinger', lambda: bollinger_summary(self.close))
+    
+    @property
+    def moving_averages(self) -> Dict:
+        return self._result('moving_averages', lambda: moving_average_summary(self.close))
+    
+    @property
+    def volume_analysis(self) -> Dict:
+        return self._result('volume_analysis', lambda: volume_summary(self.hist))
+    
+    @property
+    def momentum(self) -> Dict:
+        return self._result('momentum', lambda: momentum_summary(self.hist))
+    
+    @cached_property
+    def obv(self) -> pd.Series:
+        return obv_series(self.close, self.hist['Volume'])
+    
+    @property
+    def atr(self) -> float:
+        return self._result('atr', lambda: indicator_kernels.atr(
+            self.hist['High'], self.hist['Low'], self.close, ATR_PERIOD)[-1], (ATR_PERIOD,))
+    
+    def technical_summary(self) -> Dict:
+        """Everything main_enhanced scores on (same shape as the panel engine returns)"""
+        return {
+            'rsi': self.rsi,
+            'macd': self.macd,
+            'bollinger': self.bollinger,
+            'moving_averages': self.moving_averages,
+            'volume_analysis': self.volume_analysis,
+            'momentum': self.momentum
+        }
+    
+    def cached_summary(self) -> Optional[Dict]:
+        """technical_summary() if every part of it is already memoized, else None"""
+        summary = {name: self.cached(name) for name in SUMMARY_PARAMS}
+        return summary if all(value is not None for value in summary.values()) else None
+    
+    def store_summary(self, summary: Dict):
+        for name in SUMMARY_PARAMS:
+            self.store(name, summary[name])
+
+class IndicatorMemo:
+    """IndicatorSets keyed by symbol and latest bar, shared by every report in the process"""
+    
+    def __init__(self, max_size: int = MEMO_SIZE, disk: Optional[IndicatorResultCache] = None):
+        self.max_size = max_size
+        self.disk = disk
+        self._sets: 'OrderedDict[tuple, IndicatorSet]' = OrderedDict()
+        self._absorbed: 'OrderedDict[tuple, Dict]' = OrderedDict()  # Worker results for sets not built yet
+        self._lock = threading.Lock()
+        self.exported: Optional[List[tuple]] = None  # Results waiting to go back to the parent process
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key_for(symbol: str, hist: pd.DataFrame) -> tuple:
+        """Same symbol and same bar_key() = same indicators"""
+        return (symbol, bar_key(hist))
+    
+    def get(self, symbol: str, hist: pd.DataFrame) -> IndicatorSet:
+        key = self.key_for(symbol, hist)
+        with self._lock:
+            indicator_set = self._sets.get(key)
+            if indicator_set is not None:
+                self._sets.move_to_end(key)
+                self.hits += 1
+                return indicator_set
+            self.misses += 1
+            sink = self._export if self.exported is not None else None
+            indicator_set = self._sets[key] = IndicatorSet(symbol, hist, self.disk, sink)
+            indicator_set._results.update(self._absorbed.pop(key, {}))
+            while len(self._sets) > self.max_size:
+                self._sets.popitem(last=False)
+            return indicator_set
+    
+    def export_results(self):
+        """
+        Scan worker mode: still read the disk tier, but collect new results for the
+        parent (drain_exported) instead of writing a file other workers also write
+        """
+        with self._lock:
+            self.exported = []
+    
+    def _export(self, symbol: str, bar: str, key: str, value):
+        with self._lock:
+            self.exported.append((symbol, bar, key, value))
+    
+    def drain_exported(self) -> List[tuple]:
+        """(symbol, bar, result key, value) computed since the last drain"""
+        with self._lock:
+            results = self.exported or []
+            if self.exported is not None:
+                self.exported = []
+        return results
+    
+    def absorb(self, results: List[tuple]):
+        """Store results a worker process computed as if they had been computed here"""
+        for symbol, bar, key, value in results:
+            with self._lock:
+                indicator_set = self._sets.get((symbol, bar))
+                if indicator_set is not None:
+                    indicator_set._results.setdefault(key, value)
+                else:
+                    self._absorbed.setdefault((symbol, bar), {})[key] = value
+                    self._absorbed.move_to_end((symbol, bar))
+                    while len(self._absorbed) > self.max_size:
+                        self._absorbed.popitem(last=False)
+            if self.disk:
+                self.disk.put(symbol, bar, key, value)
+    
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        stats = {
+            'sets': len(self._sets),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total * 100, 1) if total else 0.0
+        }
+        if self.disk:
+            disk_stats = self.disk.get_stats()
+            stats.update({'disk_hits': disk_stats['hits'], 'disk_misses': disk_stats['misses']})
+        return stats
+    
+    def save_disk_tier(self):
+        """Flush the disk tier so other processes see this cycle's results"""
+        if self.disk:
+            self.disk.save_cache()
+    
+    def format_stats(self) -> str:
+        """One-line summary for logs"""
+        stats = self.get_stats()
+        line = f"🧮 Indicator memo: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0f}% hit rate)"
+        if self.disk:
+            line += f" | disk tier {stats['disk_hits']} hits, {stats['disk_misses']} computed"
+        return line
+
+# Global memo instance (the disk tier shares results with other processes; INDICATOR_DISK_CACHE=0 turns it off)
+indicator_memo = IndicatorMemo(disk=indicator_result_cache if INDICATOR_DISK_CACHE else None)
+
+def get_indicators(symbol: str, hist: Optional[pd.DataFrame] = None) -> Optional[IndicatorSet]:
+    """
+    Shared indicators for a symbol
+    Reads the canonical INDICATOR_LOOKBACK window from the bar store unless `hist`
+    (a DataFrame or a BarPanel view) is given
+    """
+    if hist is None:
+        from bar_store import get_history
+        hist = get_history(symbol, period=INDICATOR_LOOKBACK)
+    if isinstance(hist, BarView):
+        hist = hist.to_frame()
+    if hist is None or hist.empty:
+        return None
+    return indicator_memo.get(symbol, hist)
+
+def save_indicator_cache():
+    """Convenience function to flush the memo's disk tier"""
+    indicator_memo.save_disk_tier()
@@ -12,8 +12,8 @@ Combines all sophisticated features:
 import os
 import sys
 import argparse
-import yfinance as yf
-import requests
+import time
+from http_client import http_get, http_post
 import holidays
 import datetime
 from datetime import datetime as dt
@@ -26,6 +26,14 @@ load_dotenv()
 # Import our enhanced modules
 from stock_universe import get_comprehensive_stock_list
 from enhanced_yahoo_client import EnhancedYahooClient
+from bar_store import bar_store, BATCH_DOWNLOAD_SIZE
+from market_data import get_provider
+from symbol_quarantine import screen_symbols
+from panel_indicators import compute_panel_indicators
+from bar_panel import BarPanel, BarView
+from cross_sectional import add_cross_sectional_ranks, ENHANCED_FEATURES
+from indicators import (get_indicators, rsi_series, macd_summary, bollinger_summary, moving_average_summary,
+                        volume_summary, momentum_summary, save_indicator_cache, INDICATOR_LOOKBACK)
 
 # Configuration
 x_bearer_token = os.getenv("X_BEARER_TOKEN", "")
@@ -37,6 +45,9 @@ email_password = os.getenv("ALERT_EMAIL_PASS", "")
 BULLISH = ["upgrade", "buy", "strong", "growth", "beat", "outperform", "positive", "bullish", "rally"]
 BEARISH = ["downgrade", "sell", "misses", "fall", "weak", "underperform", "disappoint", "decline"]
 
+# Report from the last multi-symbol bar download
+LAST_FETCH_REPORT = {}
+
 def is_market_open():
     """Check if US market is open"""
     today = datetime.date.today()
@@ -47,341 +58,286 @@ def is_market_open():
 
 def calc_rsi(prices, period=14):
     """Calculate RSI"""
-    delta = prices.diff()
-    up, down = delta.clip(lower=0), -1 * delta.clip(upper=0)
-    roll_up = up.rolling(window=period).mean()
-    roll_down = down.rolling(window=period).mean()
-    rs = roll_up / roll_down
-    rsi = 100 - (100 / (1 + rs))
-    return rsi.iloc[-1]
+    return rsi_series(prices, period).iloc[-1]
 
 def calc_macd(prices, fast=12, slow=26, signal=9):
     """Calculate MACD (Moving Average Convergence Divergence)"""
     try:
-        # Ensure prices is a pandas Series
-        if not hasattr(prices, 'ewm') or len(prices) < slow:
-            return {'macd': 0, 'signal': 0, 'histogram': 0, 'bullish_crossover': False}
-            
-        ema_fast = prices.ewm(span=fast).mean()
-        ema_slow = prices.ewm(span=slow).mean()
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal).mean()
-        histogram = macd_line - signal_line
-        
-        return {
-            'macd': macd_line.iloc[-1],
-            'signal': signal_line.iloc[-1],
-            'histogram': histogram.iloc[-1],
-            'bullish_crossover': macd_line.iloc[-1] > signal_line.iloc[-1] and macd_line.iloc[-2] <= signal_line.iloc[-2]
-        }
+        return macd_summary(prices, fast, slow, signal)
     except:
         return {'macd': 0, 'signal': 0, 'histogram': 0, 'bullish_crossover': False}
 
 def calc_bollinger_bands(prices, period=20, std_dev=2):
     """Calculate Bollinger Bands"""
     try:
-        sma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
-        upper_band = sma + (std * std_dev)
-        lower_band = sma - (std * std_dev)
-        
-        current_price = prices.iloc[-1]
-        current_upper = upper_band.iloc[-1]
-        current_lower = lower_band.iloc[-1]
-        current_sma = sma.iloc[-1]
-        
-        # Calculate position within bands (0 = lower band, 1 = upper band)
-        band_position = (current_price - current_lower) / (current_upper - current_lower)
-        
-        return {
-            'upper_band': current_upper,
-            'lower_band': current_lower,
-            'sma': current_sma,
-            'band_position': band_position,
-            'squeeze': (current_upper - current_lower) / current_sma < 0.1,  # Tight bands
-            'breakout_up': current_price > current_upper,
-            'breakout_down': current_price < current_lower
-        }
+        return bollinger_summary(prices, period, std_dev)
     except:
         return {'upper_band': 0, 'lower_band': 0, 'sma': 0, 'band_position': 0.5, 'squeeze': False, 'breakout_up': False, 'breakout_down': False}
 
 def calc_moving_averages(prices):
     """Calculate various moving averages"""
     try:
-        # Ensure prices is a pandas Series
-        if not hasattr(prices, 'rolling') or not hasattr(prices, 'ewm'):
-            return {'sma_20': 0, 'sma_50': 0, 'ema_12': 0, 'ema_26': 0, 'above_sma_20': False, 'above_sma_50': False, 'golden_cross': False, 'death_cross': False}
-        
-        if len(prices) < 20:
-            return {'sma_20': 0, 'sma_50': 0, 'ema_12': 0, 'ema_26': 0, 'above_sma_20': False, 'above_sma_50': False, 'golden_cross': False, 'death_cross': False}
-            
-        sma_20 = prices.rolling(window=20).mean().iloc[-1]
-        sma_50 = prices.rolling(window=50).mean().iloc[-1] if len(prices) >= 50 else sma_20
-        ema_12 = prices.ewm(span=12).mean().iloc[-1]
-        ema_26 = prices.ewm(span=26).mean().iloc[-1]
-        
-        current_price = prices.iloc[-1]
-        
-        return {
-            'sma_20': sma_20,
-            'sma_50': sma_50,
-            'ema_12': ema_12,
-            'ema_26': ema_26,
-            'above_sma_20': current_price > sma_20,
-            'above_sma_50': current_price > sma_50,
-            'golden_cross': sma_20 > sma_50,  # Bullish signal
-            'death_cross': sma_20 < sma_50    # Bearish signal
-        }
+        return moving_average_summary(prices)
     except:
         return {'sma_20': 0, 'sma_50': 0, 'ema_12': 0, 'ema_26': 0, 'above_sma_20': False, 'above_sma_50': False, 'golden_cross': False, 'death_cross': False}
 
 def calc_volume_analysis(hist):
     """Calculate volume-based indicators"""
     try:
-        volumes = hist['Volume']
-        prices = hist['Close']
-        
-        avg_volume_20 = volumes.rolling(window=20).mean().iloc[-1]
-        current_volume = volumes.iloc[-1]
-        volume_ratio = current_volume / avg_volume_20 if avg_volume_20 > 0 else 1
-        
-        # Price-Volume Trend (PVT)
-        price_changes = prices.pct_change()
-        pvt = (price_changes * volumes).cumsum()
-        pvt_trend = pvt.iloc[-1] > pvt.iloc[-5] if len(pvt) >= 5 else False
-        
-        # On-Balance Volume (OBV)
-        obv = []
-        obv_value = 0
-        for i in range(1, len(prices)):
-            if prices.iloc[i] > prices.iloc[i-1]:
-                obv_value += volumes.iloc[i]
-            elif prices.iloc[i] < prices.iloc[i-1]:
-                obv_value -= volumes.iloc[i]
-            obv.append(obv_value)
-        
-        obv_trend = len(obv) >= 5 and obv[-1] > obv[-5] if obv else False
-        
-        return {
-            'current_volume': current_volume,
-            'avg_volume_20': avg_volume_20,
-            'volume_ratio': volume_ratio,
-            'high_volume': volume_ratio > 1.5,
-            'very_high_volume': volume_ratio > 2.0,
-            'pvt_bullish': pvt_trend,
-            'obv_bullish': obv_trend,
-            'volume_breakout': volume_ratio > 2.0 and prices.iloc[-1] > prices.iloc[-2]
-        }
+        return volume_summary(hist)
     except:
         return {'current_volume': 0, 'avg_volume_20': 0, 'volume_ratio': 1, 'high_volume': False, 'very_high_volume': False, 'pvt_bullish': False, 'obv_bullish': False, 'volume_breakout': False}
 
 def calc_momentum_indicators(hist):
     """Calculate momentum indicators"""
     try:
-        prices = hist['Close']
-        highs = hist['High']
-        lows = hist['Low']
-        
-        # Stochastic Oscillator
-        lowest_low = lows.rolling(window=14).min()
-        highest_high = highs.rolling(window=14).max()
-        k_percent = 100 * ((prices - lowest_low) / (highest_high - lowest_low))
-        d_percent = k_percent.rolling(window=3).mean()
+        return momentum_summary(hist)
+    except:
+        return {'stoch_k': 50, 'stoch_d': 50, 'williams_r': -50, 'roc': 0, 'stoch_oversold': False, 'stoch_overbought': False, 'momentum_bullish': False}
+
+def analyze_stock_history(sym, hist, include_sentiment=True, silent=False, indicators=None):
+    """
+    Run the full technical analysis on one symbol's daily bars
+    `indicators` can carry precomputed results from the panel engine
+    """
+    if len(hist) < 20:  # Need minimum data for technical analysis
+        if not silent:
+            print(f"❌ Insufficient data for {sym}")
+        return None
+    
+    close = hist["Close"].iloc[-1]
+    open_ = hist["Open"].iloc[-1]
+    high = hist["High"].iloc[-1]
+    low = hist["Low"].iloc[-1]
+    volume = hist["Volume"].iloc[-1]
+    
+    # Basic price metrics
+    growth = ((close - open_) / open_) * 100
+    daily_range = ((high - low) / low) * 100
+    
+    # Comprehensive Technical Analysis (shared with the other scanners through the indicator memo)
+    indicators = indicators or get_indicators(sym, hist).technical_summary()
+    rsi = indicators['rsi']
+    macd_data = indicators['macd']
+    bollinger_data = indicators['bollinger']
+    ma_data = indicators['moving_averages']
+    volume_data = indicators['volume_analysis']
+    momentum_data = indicators['momentum']
+    
+    # 1-month return (same 19-bar lookback as the scheduler's price_1m)
+    month_ago = hist["Close"].iloc[-20]
+    return_1m = ((close - month_ago) / month_ago) * 100
+    
+    # Enhanced data structure with all technical indicators
+    stock_info = {
+        # Basic Price Data
+        "symbol": sym,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "current_price": close,
+        "change_percent": growth,
+        "growth": growth,
+        "daily_range": daily_range,
+        "volume": volume,
+        "return_1m": return_1m,
         
-        # Williams %R
-        williams_r = -100 * ((highest_high - prices) / (highest_high - lowest_low))
+        # Technical Indicators
+        "rsi": rsi,
+        "macd": macd_data,
+        "bollinger": bollinger_data,
+        "moving_averages": ma_data,
+        "volume_analysis": volume_data,
+        "momentum": momentum_data,
         
-        # Rate of Change (ROC)
-        roc = ((prices - prices.shift(10)) / prices.shift(10)) * 100
+        # Technical Signals
+        "technical_score": 0,  # Will be calculated
+        "technical_signals": [],
         
-        return {
-            'stoch_k': k_percent.iloc[-1] if not k_percent.empty else 50,
-            'stoch_d': d_percent.iloc[-1] if not d_percent.empty else 50,
-            'williams_r': williams_r.iloc[-1] if not williams_r.empty else -50,
-            'roc': roc.iloc[-1] if not roc.empty else 0,
-            'stoch_oversold': k_percent.iloc[-1] < 20 if not k_percent.empty else False,
-            'stoch_overbought': k_percent.iloc[-1] > 80 if not k_percent.empty else False,
-            'momentum_bullish': roc.iloc[-1] > 5 if not roc.empty else False
-        }
-    except:
-        return {'stoch_k': 50, 'stoch_d': 50, 'williams_r': -50, 'roc': 0, 'stoch_oversold': False, 'stoch_overbought': False, 'momentum_bullish': False}
+        # Price Levels
+        "support_level": min(hist["Low"].tail(20)),
+        "resistance_level": max(hist["High"].tail(20)),
+        "price_near_support": abs(close - min(hist["Low"].tail(20))) / close < 0.02,
+        "price_near_resistance": abs(close - max(hist["High"].tail(20))) / close < 0.02
+    }
+    
+    # Calculate Technical Score (0-100)
+    technical_score = 0
+    signals = []
+    
+    # RSI Analysis (20 points)
+    if 30 <= rsi <= 70:
+        technical_score += 15
+        if 40 <= rsi <= 60:
+            technical_score += 5
+    elif rsi < 30:
+        signals.append("RSI_OVERSOLD")
+        technical_score += 10  # Potential bounce
+    elif rsi > 70:
+        signals.append("RSI_OVERBOUGHT")
+        technical_score -= 5
+    
+    # MACD Analysis (15 points)
+    if macd_data['bullish_crossover']:
+        technical_score += 15
+        signals.append("MACD_BULLISH_CROSSOVER")
+    elif macd_data['macd'] > macd_data['signal']:
+        technical_score += 8
+        signals.append("MACD_BULLISH")
+    
+    # Moving Average Analysis (15 points)
+    if ma_data['above_sma_20'] and ma_data['above_sma_50']:
+        technical_score += 15
+        signals.append("ABOVE_KEY_MAs")
+    elif ma_data['golden_cross']:
+        technical_score += 10
+        signals.append("GOLDEN_CROSS")
+    elif ma_data['death_cross']:
+        technical_score -= 10
+        signals.append("DEATH_CROSS")
+    
+    # Bollinger Bands Analysis (10 points)
+    if bollinger_data['breakout_up']:
+        technical_score += 10
+        signals.append("BOLLINGER_BREAKOUT_UP")
+    elif bollinger_data['squeeze']:
+        technical_score += 5
+        signals.append("BOLLINGER_SQUEEZE")
+    elif bollinger_data['breakout_down']:
+        technical_score -= 10
+        signals.append("BOLLINGER_BREAKOUT_DOWN")
+    
+    # Volume Analysis (15 points)
+    if volume_data['volume_breakout']:
+        technical_score += 15
+        signals.append("VOLUME_BREAKOUT")
+    elif volume_data['very_high_volume']:
+        technical_score += 10
+        signals.append("VERY_HIGH_VOLUME")
+    elif volume_data['high_volume']:
+        technical_score += 5
+        signals.append("HIGH_VOLUME")
+    
+    # Momentum Analysis (10 points)
+    if momentum_data['momentum_bullish']:
+        technical_score += 10
+        signals.append("MOMENTUM_BULLISH")
+    elif momentum_data['stoch_oversold']:
+        technical_score += 5
+        signals.append("STOCH_OVERSOLD")
+    elif momentum_data['stoch_overbought']:
+        technical_score -= 5
+        signals.append("STOCH_OVERBOUGHT")
+    
+    # Price Action Analysis (15 points)
+    if growth > 3 and volume_data['high_volume']:
+        technical_score += 15
+        signals.append("STRONG_PRICE_ACTION")
+    elif growth > 1:
+        technical_score += 8
+        signals.append("POSITIVE_PRICE_ACTION")
+    elif growth < -3:
+        technical_score -= 10
+        signals.append("WEAK_PRICE_ACTION")
+    
+    # Update stock info with technical analysis
+    stock_info["technical_score"] = min(100, max(0, technical_score))  # Cap at 0-100
+    stock_info["technical_signals"] = signals
+    
+    # Add X (Twitter) sentiment if requested
+    if include_sentiment:
+        try:
+            x_sentiment = fetch_x_feed_sentiment(sym)
+            stock_info["x_sentiment"] = x_sentiment
+            stock_info["social_sentiment"] = x_sentiment
+            if not silent:
+                print(f"🐦 {sym}: X sentiment = {x_sentiment} | Tech Score: {technical_score}")
+        except Exception as e:
+            if not silent:
+                print(f"⚠️ X sentiment failed for {sym}: {e}")
+            stock_info["x_sentiment"] = "Unknown"
+            stock_info["social_sentiment"] = "Unknown"
+    
+    return stock_info
 
-def fetch_stocks(symbols, include_sentiment=True, silent=False):
-    """Enhanced fetch_stocks with comprehensive technical analysis and X sentiment"""
+def fetch_stocks(symbols, include_sentiment=True, silent=False, batch_size=BATCH_DOWNLOAD_SIZE):
+    """
+    Enhanced fetch_stocks with comprehensive technical analysis and X sentiment
+    Multi-symbol calls refresh the local bar store in grouped batches instead of one request per symbol
+    """
+    global LAST_FETCH_REPORT
     stock_data = {}
+    
+    if len(symbols) > 1:
+        # One bulk incremental update, then read every lookback window from the local store
+        LAST_FETCH_REPORT = bar_store.update(symbols, silent=silent, batch_size=batch_size)
+        bars = BarPanel.from_store(symbols, period=INDICATOR_LOOKBACK)  # Compact float32 columns, zero-copy views
+        frames = {sym: bars.view(sym) for sym in bars.symbols}
+        if not silent:
+            print(f"📦 Bars ready for {len(bars)}/{len(symbols)} symbols "
+                  f"({LAST_FETCH_REPORT['bars_downloaded']} new bars in {LAST_FETCH_REPORT['seconds']:.1f}s)")
+    else:
+        bars = None
+        frames = {}
+        for sym in symbols:
+            try:
+                frames[sym] = bar_store.get_history(sym, period=INDICATOR_LOOKBACK)  # Same window as every other scanner
+            except Exception as e:
+                if not silent:
+                    print(f"❌ Failed to fetch data for {sym}: {e}")
+    
+    # All indicators for all symbols in one vectorized pass, skipping symbols another report already computed
+    panel = {}
+    sets = {}
+    if len(frames) > 1:
+        try:
+            sets = {sym: get_indicators(sym, hist) for sym, hist in frames.items() if hist is not None and not hist.empty}
+            panel = {sym: summary for sym, summary in ((sym, s.cached_summary()) for sym, s in sets.items()) if summary}
+            pending = [sym for sym in sets if sym not in panel]
+            if pending:
+                computed = compute_panel_indicators(bars.select(pending) if bars is not None else
+                                                    {sym: frames[sym] for sym in pending})
+                for sym, summary in computed.items():
+                    sets[sym].store_summary(summary)
+                panel.update(computed)
+            save_indicator_cache()
+        except Exception as e:
+            if not silent:
+                print(f"⚠️ Panel indicators failed, using per-symbol path: {e}")
+    
     for sym in symbols:
-        ticker = yf.Ticker(sym)
-        hist = ticker.history(period="60d")  # Extended period for better technical analysis
+        hist = sets[sym].hist if sym in sets else frames.get(sym)
+        if hist is None:
+            continue
         try:
-            if len(hist) < 20:  # Need minimum data for technical analysis
-                if not silent:
-                    print(f"❌ Insufficient data for {sym}")
-                continue
-                
-            close = hist["Close"].iloc[-1]
-            open_ = hist["Open"].iloc[-1]
-            high = hist["High"].iloc[-1]
-            low = hist["Low"].iloc[-1]
-            volume = hist["Volume"].iloc[-1]
-            
-            # Basic price metrics
-            growth = ((close - open_) / open_) * 100
-            daily_range = ((high - low) / low) * 100
-            
-            # Comprehensive Technical Analysis
-            rsi = calc_rsi(hist["Close"])
-            macd_data = calc_macd(hist["Close"])
-            bollinger_data = calc_bollinger_bands(hist["Close"])
-            ma_data = calc_moving_averages(hist["Close"])
-            volume_data = calc_volume_analysis(hist)
-            momentum_data = calc_momentum_indicators(hist)
-            
-            # Enhanced data structure with all technical indicators
-            stock_info = {
-                # Basic Price Data
-                "symbol": sym,
-                "open": open_,
-                "high": high,
-                "low": low,
-                "close": close,
-                "current_price": close,
-                "change_percent": growth,
-                "growth": growth,
-                "daily_range": daily_range,
-                "volume": volume,
-                
-                # Technical Indicators
-                "rsi": rsi,
-                "macd": macd_data,
-                "bollinger": bollinger_data,
-                "moving_averages": ma_data,
-                "volume_analysis": volume_data,
-                "momentum": momentum_data,
-                
-                # Technical Signals
-                "technical_score": 0,  # Will be calculated
-                "technical_signals": [],
-                
-                # Price Levels
-                "support_level": min(hist["Low"].tail(20)),
-                "resistance_level": max(hist["High"].tail(20)),
-                "price_near_support": abs(close - min(hist["Low"].tail(20))) / close < 0.02,
-                "price_near_resistance": abs(close - max(hist["High"].tail(20))) / close < 0.02
-            }
-            
-            # Calculate Technical Score (0-100)
-            technical_score = 0
-            signals = []
-            
-            # RSI Analysis (20 points)
-            if 30 <= rsi <= 70:
-                technical_score += 15
-                if 40 <= rsi <= 60:
-                    technical_score += 5
-            elif rsi < 30:
-                signals.append("RSI_OVERSOLD")
-                technical_score += 10  # Potential bounce
-            elif rsi > 70:
-                signals.append("RSI_OVERBOUGHT")
-                technical_score -= 5
-            
-            # MACD Analysis (15 points)
-            if macd_data['bullish_crossover']:
-                technical_score += 15
-                signals.append("MACD_BULLISH_CROSSOVER")
-            elif macd_data['macd'] > macd_data['signal']:
-                technical_score += 8
-                signals.append("MACD_BULLISH")
-            
-            # Moving Average Analysis (15 points)
-            if ma_data['above_sma_20'] and ma_data['above_sma_50']:
-                technical_score += 15
-                signals.append("ABOVE_KEY_MAs")
-            elif ma_data['golden_cross']:
-                technical_score += 10
-                signals.append("GOLDEN_CROSS")
-            elif ma_data['death_cross']:
-                technical_score -= 10
-                signals.append("DEATH_CROSS")
-            
-            # Bollinger Bands Analysis (10 points)
-            if bollinger_data['breakout_up']:
-                technical_score += 10
-                signals.append("BOLLINGER_BREAKOUT_UP")
-            elif bollinger_data['squeeze']:
-                technical_score += 5
-                signals.append("BOLLINGER_SQUEEZE")
-            elif bollinger_data['breakout_down']:
-                technical_score -= 10
-                signals.append("BOLLINGER_BREAKOUT_DOWN")
-            
-            # Volume Analysis (15 points)
-            if volume_data['volume_breakout']:
-                technical_score += 15
-                signals.append("VOLUME_BREAKOUT")
-            elif volume_data['very_high_volume']:
-                technical_score += 10
-                signals.append("VERY_HIGH_VOLUME")
-            elif volume_data['high_volume']:
-                technical_score += 5
-                signals.append("HIGH_VOLUME")
-            
-            # Momentum Analysis (10 points)
-            if momentum_data['momentum_bullish']:
-                technical_score += 10
-                signals.append("MOMENTUM_BULLISH")
-            elif momentum_data['stoch_oversold']:
-                technical_score += 5
-                signals.append("STOCH_OVERSOLD")
-            elif momentum_data['stoch_overbought']:
-                technical_score -= 5
-                signals.append("STOCH_OVERBOUGHT")
-            
-            # Price Action Analysis (15 points)
-            if growth > 3 and volume_data['high_volume']:
-                technical_score += 15
-                signals.append("STRONG_PRICE_ACTION")
-            elif growth > 1:
-                technical_score += 8
-                signals.append("POSITIVE_PRICE_ACTION")
-            elif growth < -3:
-                technical_score -= 10
-                signals.append("WEAK_PRICE_ACTION")
-            
-            # Update stock info with technical analysis
-            stock_info["technical_score"] = min(100, max(0, technical_score))  # Cap at 0-100
-            stock_info["technical_signals"] = signals
-            
-            # Add X (Twitter) sentiment if requested
-            if include_sentiment:
-                try:
-                    x_sentiment = fetch_x_feed_sentiment(sym)
-                    stock_info["x_sentiment"] = x_sentiment
-                    stock_info["social_sentiment"] = x_sentiment
-                    if not silent:
-                        print(f"🐦 {sym}: X sentiment = {x_sentiment} | Tech Score: {technical_score}")
-                except Exception as e:
-                    if not silent:
-                        print(f"⚠️ X sentiment failed for {sym}: {e}")
-                    stock_info["x_sentiment"] = "Unknown"
-                    stock_info["social_sentiment"] = "Unknown"
-            
-            stock_data[sym] = stock_info
-            
+            if isinstance(hist, BarView):
+                hist = hist.to_frame()
+            stock_info = analyze_stock_history(sym, hist, include_sentiment=include_sentiment, silent=silent,
+                                               indicators=panel.get(sym))
+            if stock_info:
+                stock_data[sym] = stock_info
         except Exception as e:
             if not silent:
                 print(f"❌ Failed to fetch data for {sym}: {e}")
             continue
     
+    # Percentile ranks against the rest of the scan and the symbol's sector
+    if len(stock_data) > 1:
+        add_cross_sectional_ranks(list(stock_data.values()), ENHANCED_FEATURES)
+    
     return stock_data
 
 def fetch_x_feed_sentiment(symbol):
     """Fetch X (Twitter) sentiment for a stock symbol"""
+    if get_provider().offline:
+        return "Neutral"  # Replay runs never call the live X API
+    
     headers = {"Authorization": f"Bearer {x_bearer_token}"}
     search_url = f"https://api.twitter.com/2/tweets/search/recent?query=%24{symbol}&max_results=10"
     
     try:
-        response = requests.get(search_url, headers=headers, timeout=10)
+        response = http_get(search_url, headers=headers, timeout=10)
         if response.status_code == 200:
             tweets = response.json().get("data", [])
             if tweets:
@@ -460,6 +416,10 @@ def make_recommendation(info, headlines=[], x_sentiment=None, earnings_soon=Fals
     elif volume > 1000000:  # Fallback for basic volume check
         score += 0.3
     
+    # Peer comparison - momentum leaders of the scan and their sector (ranks exist for multi-symbol scans)
+    if info.get('momentum_pct', 0) >= 0.9 and info.get('momentum_sector_pct', 0) >= 0.8:
+        score += 0.5
+    
     # Technical Signal Bonuses (10% weight)
     signal_bonus = 0
     strong_signals = ['MACD_BULLISH_CROSSOVER', 'GOLDEN_CROSS', 'BOLLINGER_BREAKOUT_UP', 
@@ -564,7 +524,7 @@ def run_enhanced_analysis(silent=False):
         print("=" * 60)
     
     # Get comprehensive stock universe
-    all_symbols = get_comprehensive_stock_list()
+    all_symbols = screen_symbols(get_comprehensive_stock_list(), silent=silent)
     if not silent:
         print(f"📊 Stock Universe: {len(all_symbols)} stocks")
         print(f"🎯 Analyzing: {len(all_symbols)} stocks")
@@ -582,6 +542,14 @@ def run_enhanced_analysis(silent=False):
         print(f"🎯 Hot theme stocks: {len(hot_theme_stocks)} stocks")
         print("\n🔍 Performing comprehensive analysis...")
     
+    # Download bars for the whole universe in grouped batches, then analyze
+    stock_data = fetch_stocks(all_symbols, include_sentiment=True, silent=silent)
+    
+    if not silent and LAST_FETCH_REPORT:
+        failed = LAST_FETCH_REPORT.get('failed_symbols', [])
+        print(f"📦 Batched download: {len(LAST_FETCH_REPORT.get('batches', []))} batches, "
+              f"{LAST_FETCH_REPORT.get('seconds', 0):.1f}s, {len(failed)} failed symbols")
+    
     # Perform comprehensive analysis
     results = []
     
@@ -590,9 +558,6 @@ def run_enhanced_analysis(silent=False):
             if not silent:
                 print(f"   Analyzing {symbol} ({i}/{len(all_symbols)})...", end=" ")
             
-            # Get stock data with X sentiment
-            stock_data = fetch_stocks([symbol], include_sentiment=True, silent=silent)
-            
             if symbol in stock_data:
                 info = stock_data[symbol]
                 
@@ -698,7 +663,6 @@ def run_enhanced_analysis(silent=False):
         
         # Send via our email system
         try:
-            import requests
             
             # Create market context
             market_context = {
@@ -727,7 +691,7 @@ def run_enhanced_analysis(silent=False):
                 }
             }
             
-            response = requests.post(
+            response = http_post(
                 "http://localhost:5002/api/send-email-alert",
                 json=email_data,
                 headers={"Content-Type": "application/json"},
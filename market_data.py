@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Market Data Providers
+One interface for history, quotes, info, news and calendar data with a live
+yfinance backend and an offline replay backend built from recorded fixtures
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import yfinance as yf
+
+# Provider selection
+MARKET_DATA_PROVIDER = os.getenv('MARKET_DATA_PROVIDER', 'yfinance')
+MARKET_DATA_FIXTURES = os.getenv('MARKET_DATA_FIXTURES', os.path.join('fixtures', 'market_data'))
+
+def period_start(period: str, as_of: datetime) -> Optional[pd.Timestamp]:
+    """Calendar start date for a yfinance-style period string (None for 'max')"""
+    if period == 'max':
+        return None
+    
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    
+    count, unit = int(match.group(1)), match.group(2)
+    offsets = {
+        'd': pd.DateOffset(days=count),
+        'wk': pd.DateOffset(weeks=count),
+        'mo': pd.DateOffset(months=count),
+        'y': pd.DateOffset(years=count)
+    }
+    return pd.Timestamp(as_of.date()) - offsets[unit]
+
+class RateLimiter:
+    """Thread-safe token bucket: `rate` calls per second, up to `capacity` saved for bursts"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        if self.rate <= 0:
+            return
+        
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            delay = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            self.tokens -= 1  # May go negative: later callers queue up behind this one
+            self.waited += delay
+        if delay:
+            time.sleep(delay)
+
+_request_budget = threading.local()
+
+@contextmanager
+def rate_limited(limiter: Optional[RateLimiter]):
+    """
+    Live requests made by this thread inside the block take a token from `limiter` first
+    Reads answered by the bar store or another local cache never reach a live provider, so they are not throttled
+    """
+    previous = getattr(_request_budget, 'limiter', None)
+    _request_budget.limiter = limiter
+    try:
+        yield
+    finally:
+        _request_budget.limiter = previous
+
+def throttle_request():
+    """Called by live providers before every network request"""
+    limiter = getattr(_request_budget, 'limiter', None)
+    if limiter is not None:
+        limiter.acquire()
+
+def quote_from_history(symbol: str, hist: pd.DataFrame) -> Optional[Dict]:
+    """Build a quote snapshot from the last bars of a history frame"""
+    if hist is None or hist.empty:
+        return None
+    
+    last = hist.iloc[-1]
+    previous_close = hist['Close'].iloc[-2] if len(hist) > 1 else last['Open']
+    return {
+        'symbol': symbol,
+        'price': float(last['Close']),
+        'open': float(last['Open']),
+        'high': float(last['High']),
+        'low': float(last['Low']),
+        'previous_close': float(previous_close),
+        'volume': float(last['Volume']),
+        'change_percent': float((last['Close'] - last['Open']) / last['Open'] * 100) if last['Open'] else 0.0
+    }
+
+class MarketDataProvider(ABC):
+    """Interface every market data backend implements"""
+    
+    name = "base"
+    offline = False  # True when the backend never touches the network
+    
+    def now(self) -> datetime:
+        """Clock used for lookback windows (replay backends pin it to the recording date)"""
+        return datetime.now()
+    
+    @abstractmethod
+    def history(self, symbol: str, period: str = "1mo", interval: str = "1d",
+                start: Optional[str] = None) -> pd.DataFrame:
+        """OHLCV bars for one symbol"""
+    
+    def history_batch(self, symbols: List[str], period: str = "1mo", interval: str = "1d",
+                      start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """OHLCV bars for many symbols (symbols with no data are left out)"""
+        frames = {}
+        for symbol in symbols:
+            try:
+                hist = self.history(symbol, period=period, interval=interval, start=start)
+                if hist is not None and not hist.empty:
+                    frames[symbol] = hist
+            except Exception:
+                continue
+        return frames
+    
+    def quote(self, symbol: str) -> Optional[Dict]:
+        """Latest price snapshot"""
+        return quote_from_history(symbol, self.history(symbol, period="5d"))
+    
+    @abstractmethod
+    def info(self, symbol: str) -> Dict:
+        """Company fundamentals (the Ticker.info dictionary)"""
+    
+    @abstractmethod
+    def news(self, symbol: str) -> List[Dict]:
+        """Recent news articles"""
+    
+    @abstractmethod
+    def calendar(self, symbol: str) -> Any:
+        """Upcoming events (earnings dates)"""
+
+class YFinanceProvider(MarketDataProvider):
+    """Live Yahoo Finance backend"""
+    
+    name = "yfinance"
+    
+    def history(self, symbol, period="1mo", interval="1d", start=None):
+        throttle_request()
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start, interval=interval)
+        return ticker.history(period=period, interval=interval)
+    
+    def history_batch(self, symbols, period="1mo", interval="1d", start=None):
+        throttle_request()
+        kwargs = {'start': start} if start is not None else {'period': period}
+        data = yf.download(list(symbols), interval=interval, group_by='ticker', auto_adjust=True,
+                           actions=False, threads=True, progress=False, **kwargs)
+        
+        frames = {}
+        if data is None or data.empty:
+            return frames
+        
+        available = set(data.columns.get_level_values(0))
+        for symbol in symbols:
+            if symbol not in available:
+                continue
+            hist = data[symbol].dropna(how='all')
+            if not hist.empty:
+                frames[symbol] = hist
+        return frames
+    
+    def info(self, symbol):
+        throttle_request()
+        return yf.Ticker(symbol).info or {}
+    
+    def news(self, symbol):
+        throttle_request()
+        return yf.Ticker(symbol).news or []
+    
+    def calendar(self, symbol):
+        throttle_request()
+        return yf.Ticker(symbol).calendar
+
+def _fixture_name(symbol: str) -> str:
+    """File-safe fixture name for a symbol"""
+    return symbol.replace('/', '_')
+
+class RecordingProvider(MarketDataProvider):
+    """Wraps another provider and records every response as a replay fixture"""
+    
+    name = "recording"
+    
+    def __init__(self, inner: MarketDataProvider, fixtures_dir: str = MARKET_DATA_FIXTURES):
+        self.inner = inner
+        self.fixtures_dir = fixtures_dir
+        for kind in ('history', 'info', 'news', 'calendar'):
+            os.makedirs(os.path.join(fixtures_dir, kind), exist_ok=True)
+    
+    def _record_history(self, symbol, hist, interval):
+        if hist is None or hist.empty or interval != "1d":
+            return
+        path = os.path.join(self.fixtures_dir, 'history', f"{_fixture_name(symbol)}.csv")
+        frame = hist[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+        index = pd.DatetimeIndex(frame.index)
+        frame.index = (index.tz_localize(None) if index.tz is not None else index).normalize()
+        frame.index.name = 'Date'
+        if os.path.exists(path):
+            existing = pd.read_csv(path, index_col='Date', parse_dates=True)
+            frame = pd.concat([existing[~existing.index.isin(frame.index)], frame]).sort_index()
+        frame.to_csv(path)
+    
+    def _record_json(self, kind, symbol, payload):
+        path = os.path.join(self.fixtures_dir, kind, f"{_fixture_name(symbol)}.json")
+        with open(path, 'w') as f:
+            json.dump(payload, f, indent=2, default=str)
+    
+    def history(self, symbol, period="1mo", interval="1d", start=None):
+        hist = self.inner.history(symbol, period=period, interval=interval, start=start)
+        self._record_history(symbol, hist, interval)
+        return hist
+    
+    def history_batch(self, symbols, period="1mo", interval="1d", start=None):
+        frames = self.inner.history_batch(symbols, period=period, interval=interval, start=start)
+        for symbol, hist in frames.items():
+            self._record_history(symbol, hist, interval)
+        return frames
+    
+    def info(self, symbol):
+        data = self.inner.info(symbol)
+        self._record_json('info', symbol, data)
+        return data
+    
+    def news(self, symbol):
+        data = self.inner.news(symbol)
+        self._record_json('news', symbol, data)
+        return data
+    
+    def calendar(self, symbol):
+        data = self.inner.calendar(symbol)
+        if isinstance(data, pd.DataFrame):
+            payload = {'format': 'dataframe', 'data': data.reset_index().to_dict('records')}
+        else:
+            payload = {'format': 'dict', 'data': data}
+        self._record_json('calendar', symbol, payload)
+        return data
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Offline backend that serves recorded fixtures
+    The clock is pinned to the last recorded bar so lookback windows are reproducible
+    """
+    
+    name = "replay"
+    offline = True
+    
+    def __init__(self, fixtures_dir: str = MARKET_DATA_FIXTURES, as_of: Optional[str] = None):
+        self.fixtures_dir = fixtures_dir
+        self._history_cache: Dict[str, pd.DataFrame] = {}
+        self._json_cache: Dict[str, Any] = {}
+        self._as_of = pd.Timestamp(as_of).to_pydatetime() if as_of else None
+    
+    def now(self):
+        if self._as_of is None:
+            history_dir = os.path.join(self.fixtures_dir, 'history')
+            last_dates = []
+            if os.path.isdir(history_dir):
+                for name in os.listdir(history_dir):
+                    symbol = name[:-4] if name.endswith('.csv') else None
+                    if symbol:
+                        frame = self._load_history(symbol)
+                        if frame is not None and not frame.empty:
+                            last_dates.append(frame.index[-1])
+            last = max(last_dates) if last_dates else pd.Timestamp(datetime.now().date())
+            self._as_of = (last + timedelta(hours=16)).to_pydatetime()
+        return self._as_of
+    
+    def _load_history(self, symbol):
+        if symbol not in self._history_cache:
+            path = os.path.join(self.fixtures_dir, 'history', f"{_fixture_name(symbol)}.csv")
+            self._history_cache[symbol] = (pd.read_csv(path, index_col='Date', parse_dates=True)
+                                           if os.path.exists(path) else None)
+        return self._history_cache[symbol]
+    
+    def _load_json(self, kind, symbol, default):
+        key = f"{kind}/{symbol}"
+        if key not in self._json_cache:
+            path = os.path.join(self.fixtures_dir, kind, f"{_fixture_name(symbol)}.json")
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    self._json_cache[key] = json.load(f)
+            else:
+                self._json_cache[key] = default
+        return self._json_cache[key]
+    
+    def history(self, symbol, period="1mo", interval="1d", start=None):
+        frame = self._load_history(symbol)
+        if frame is None or interval != "1d":
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        
+        as_of = pd.Timestamp(self.now().date())
+        frame = frame[frame.index <= as_of]
+        if start is None and period.endswith('d') and not frame.empty:
+            # Sessions of the last N calendar days, like the bar store's slice_period
+            return frame[frame.index > frame.index[-1] - pd.Timedelta(days=int(period[:-1]))].copy()
+        begin = pd.Timestamp(start) if start is not None else period_start(period, self.now())
+        return frame[frame.index >= begin].copy() if begin is not None else frame.copy()
+    
+    def info(self, symbol):
+        return self._load_json('info', symbol, {})
+    
+    def news(self, symbol):
+        return self._load_json('news', symbol, [])
+    
+    def calendar(self, symbol):
+        payload = self._load_json('calendar', symbol, None)
+        if not payload:
+            return None
+        if payload.get('format') == 'dataframe':
+            frame = pd.DataFrame(payload['data'])
+            if not frame.empty:
+                frame = frame.set_index(frame.columns[0])
+                frame.index = pd.to_datetime(frame.index, errors='ignore')
+            return frame
+        return payload.get('data')
+
+def create_provider(name: str = MARKET_DATA_PROVIDER, fixtures_dir: str = MARKET_DATA_FIXTURES) -> MarketDataProvider:
+    """Build a provider by name ('yfinance', 'replay' or 'record')"""
+    if name == 'replay':
+        return ReplayProvider(fixtures_dir)
+    if name == 'record':
+        return RecordingProvider(YFinanceProvider(), fixtures_dir)
+    
+    from request_coalescer import CoalescingProvider, COALESCE_ENABLED
+    if COALESCE_ENABLED:
+        # Share identical live fetches between threads and processes
+        return CoalescingProvider(YFinanceProvider())
+    return YFinanceProvider()
+
+# Process-wide provider instance
+_provider: Optional[MarketDataProvider] = None
+
+def get_provider() -> MarketDataProvider:
+    """Get the process-wide market data provider"""
+    global _provider
+    if _provider is None:
+        _provider = create_provider()
+    return _provider
+
+def set_provider(provider: MarketDataProvider) -> MarketDataProvider:
+    """Swap the process-wide provider (tests, benchmarks, recording runs)"""
+    global _provider
+    _provider = provider
+    return provider
+
+def record_fixtures(symbols: List[str], fixtures_dir: str = MARKET_DATA_FIXTURES, period: str = "1y"):
+    """Record history, info, news and calendar fixtures for a symbol list"""
+    recorder = RecordingProvider(YFinanceProvider(), fixtures_dir)
+    print(f"🎙️ Recording fixtures for {len(symbols)} symbols into {fixtures_dir}")
+    
+    for i in range(0, len(symbols), 50):
+        recorder.history_batch(symbols[i:i + 50], period=period)
+        print(f"   📦 History recorded for {min(i + 50, len(symbols))}/{len(symbols)} symbols")
+    
+    for i, symbol in enumerate(symbols, 1):
+        for method in (recorder.info, recorder.news, recorder.calendar):
+            try:
+                method(symbol)
+            except Exception as e:
+                print(f"   ⚠️ {symbol} {method.__name__}: {e}")
+        if i % 50 == 0:
+            print(f"   📋 Metadata recorded for {i}/{len(symbols)} symbols")
+    
+    print("✅ Fixtures recorded")
+
+def run_replay_benchmark(fixtures_dir: str = MARKET_DATA_FIXTURES):
+    """Time the main scanners end-to-end against recorded fixtures"""
+    import tempfile
+    import market_data  # The scanners read the provider from this module, also when this file runs as a script
+    
+    market_data.set_provider(ReplayProvider(fixtures_dir))
+    os.environ.setdefault('BAR_STORE_DIR', tempfile.mkdtemp(prefix='replay_bars_'))
+    
+    from stock_universe import get_comprehensive_stock_list
+    import scheduled_market_alerts
+    import dividend_stock_analyzer
+    import main_enhanced
+    
+    symbols = get_comprehensive_stock_list()
+    timings = {}
+    
+    start = time.time()
+    results = [scheduled_market_alerts.get_technical_score(s) for s in symbols]
+    timings['get_technical_score'] = (time.time() - start, len([r for r in results if r]))
+    
+    start = time.time()
+    stock_data = main_enhanced.fetch_stocks(symbols, include_sentiment=False, silent=True)
+    timings['fetch_stocks'] = (time.time() - start, len(stock_data))
+    
+    start = time.time()
+    dividends = [dividend_stock_analyzer.get_stock_dividend_data(s) for s in symbols]
+    timings['get_stock_dividend_data'] = (time.time() - start, len([d for d in dividends if d]))
+    
+    print(f"⏱️ Replay benchmark ({len(symbols)} symbols, as of {market_data.get_provider().now():%Y-%m-%d})")
+    for name, (seconds, produced) in timings.items():
+        rate = len(symbols) / seconds if seconds > 0 else 0
+        print(f"   {name:26s} {seconds:7.2f}s | {rate:8.1f} symbols/s | {produced} results")
+    return timings
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'help'
+    
+    if command == 'record':
+        from stock_universe import get_comprehensive_stock_list
+        record_symbols = sys.argv[2:] or get_comprehensive_stock_list()
+        record_fixtures(record_symbols)
+    elif command == 'bench':
+        os.environ['MARKET_DATA_PROVIDER'] = 'replay'  # Replay-specific cache files for every module imported from here on
+        import market_data
+        market_data.run_replay_benchmark()
+    else:
+        print("Usage:")
+        print("  python market_data.py record [SYMBOL ...]   # record fixtures from Yahoo Finance")
+        print("  python market_data.py bench                 # benchmark scanners against fixtures")
+        print()
+        print("Set MARKET_DATA_PROVIDER=replay to run any scanner offline against the fixtures")
@@ -4,9 +4,9 @@ Market Sentiment Analysis Integration
 Combines X/Twitter sentiment, news sentiment, and technical indicators
 """
 
-import requests
 import json
-import yfinance as yf
+from market_data import get_provider
+from http_client import get_session
 from datetime import datetime, timedelta
 import re
 from textblob import TextBlob
@@ -16,16 +16,13 @@ class MarketSentimentAnalyzer:
     """Comprehensive market sentiment analysis from multiple sources"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
+        # Shared pooled session (browser User-Agent is set on it by http_client)
+        self.session = get_session()
     
     def get_yahoo_news_sentiment(self, symbol):
         """Get news sentiment from Yahoo Finance"""
         try:
-            ticker = yf.Ticker(symbol)
-            news = ticker.news
+            news = get_provider().news(symbol)
             
             if not news:
                 return {'sentiment_score': 0, 'news_count': 0, 'headlines': []}
@@ -67,8 +64,7 @@ class MarketSentimentAnalyzer:
         """Get social sentiment using proxy indicators"""
         try:
             # Use search trends and volume as proxy for social interest
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="5d")
+            hist = get_provider().history(symbol, period="5d")
             
             if hist.empty:
                 return {'social_score': 0, 'volume_trend': 0, 'interest_level': 'low'}
@@ -215,8 +211,7 @@ class MarketSentimentAnalyzer:
         """Get market-wide fear & greed indicators"""
         try:
             # Use VIX as fear indicator
-            vix = yf.Ticker("^VIX")
-            vix_data = vix.history(period="5d")
+            vix_data = get_provider().history("^VIX", period="5d")
             
             if not vix_data.empty:
                 current_vix = vix_data['Close'].iloc[-1]
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Multi-Timeframe Trends
+Weekly RSI/MACD and the monthly moving-average slope, derived by resampling
+the daily bars already in the local bar store - no extra downloads. The whole
+universe is resampled as one (date x symbol) frame and the indicators run
+through the panel engine, so both timeframes cost one vectorized pass
+"""
+
+import time
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bar_panel import BarPanel
+from indicators import RSI_PERIOD
+from panel_indicators import IndicatorPanel, PANEL_COLUMNS, panel_rsi, panel_macd, rolling_last
+
+TIMEFRAME_LOOKBACK = "1y"     # Daily bars resampled (52 weeks / 12 months, what the store backfills)
+WEEKLY_RULE = "W-FRI"
+MONTHLY_RULE = "ME"
+MONTHLY_MA_PERIOD = 6         # Months in the monthly moving average
+WEEKLY_RSI_RANGE = (40, 70)   # Weekly RSI that confirms a healthy uptrend
+
+# How each daily column rolls up into a longer bar
+RESAMPLE_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+def daily_universe(frames) -> Dict[str, pd.DataFrame]:
+    """Daily bars as one (date x symbol) frame per OHLCV column; `frames` is {symbol: DataFrame} or a BarPanel"""
+    bars = frames if isinstance(frames, BarPanel) else BarPanel.from_frames(frames)
+    return {column: bars.column_frame(column) for column in PANEL_COLUMNS}
+
+def resample_universe(daily: Dict[str, pd.DataFrame], rule: str) -> IndicatorPanel:
+    """
+    Resample every symbol's daily bars to `rule` in one pass and right-align the
+    result, so column -1 is each symbol's latest (possibly still forming) period
+    """
+    symbols = list(daily['Close'].columns)
+    if not symbols:
+        return IndicatorPanel([], {c: np.empty((0, 0)) for c in PANEL_COLUMNS}, np.zeros(0, dtype=int))
+    
+    arrays = {}
+    for column in PANEL_COLUMNS:
+        resampler = daily[column].resample(rule)
+        if RESAMPLE_AGG[column] == 'sum':
+            periods = resampler.sum(min_count=1)
+        else:
+            periods = getattr(resampler, RESAMPLE_AGG[column])()
+        arrays[column] = periods.to_numpy(dtype=float).T
+    
+    # Periods with no trading for a symbol (before its history starts) stay NaN;
+    # shift each row so its last traded period lands in the final column
+    close = arrays['Close']
+    width = close.shape[1]
+    valid = ~np.isnan(close)
+    lengths = valid.sum(axis=1)
+    trailing = np.argmax(valid[:, ::-1], axis=1)
+    source = np.arange(width)[None, :] - trailing[:, None]
+    inside = source >= 0
+    rows = np.arange(len(symbols))[:, None]
+    for column, values in arrays.items():
+        aligned = np.full(values.shape, np.nan)
+        aligned[inside] = values[np.broadcast_to(rows, source.shape)[inside], source[inside]]
+        arrays[column] = aligned
+    return IndicatorPanel(symbols, arrays, lengths)
+
+def compute_timeframe_trends(frames) -> Dict[str, Dict]:
+    """Weekly RSI/MACD and monthly MA slope for every symbol"""
+    daily = daily_universe(frames)
+    weekly = resample_universe(daily, WEEKLY_RULE)
+    monthly = resample_universe(daily, MONTHLY_RULE)
+    
+    weekly_rsi = panel_rsi(weekly, RSI_PERIOD)
+    weekly_macd = panel_macd(weekly)
+    monthly_ma = rolling_last(monthly.close, MONTHLY_MA_PERIOD, np.mean)
+    previous_ma = rolling_last(monthly.close, MONTHLY_MA_PERIOD, np.mean, offset=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        monthly_slope = (monthly_ma - previous_ma) / previous_ma * 100
+    
+    monthly_rows = {symbol: row for row, symbol in enumerate(monthly.symbols)}
+    trends = {}
+    for row, symbol in enumerate(weekly.symbols):
+        macd = weekly_macd[row]
+        slope = monthly_slope[monthly_rows[symbol]]
+        rsi = weekly_rsi[row]
+        weekly_bullish = bool(weekly.lengths[row] >= 26 and macd['macd'] > macd['signal']
+                              and WEEKLY_RSI_RANGE[0] < rsi < WEEKLY_RSI_RANGE[1])
+        trends[symbol] = {
+            'weekly_rsi': float(rsi),
+            'weekly_macd': float(macd['macd']),
+            'weekly_signal': float(macd['signal']),
+            'monthly_ma_slope': float(slope),
+            'weekly_bullish': weekly_bullish,
+            'monthly_uptrend': bool(slope > 0)
+        }
+    return trends
+
+class TimeframeTrends:
+    """Trends for the current scan, computed for the whole universe up front"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.trends: Dict[str, Dict] = {}
+        self.last_seconds = 0.0
+    
+    def refresh(self, symbols: List[str]) -> Dict:
+        """Recompute trends from locally stored bars (call after the bar store update)"""
+        started = time.time()
+        bars = BarPanel.from_store(symbols, period=TIMEFRAME_LOOKBACK)  # Compact float32, read straight from disk
+        trends = compute_timeframe_trends(bars)
+        with self._lock:
+            self.trends = trends
+            self.last_seconds = time.time() - started
+        return {'symbols': len(trends), 'seconds': round(self.last_seconds, 2)}
+    
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Trend for one symbol; symbols outside the last refresh are computed on their own"""
+        with self._lock:
+            trend = self.trends.get(symbol)
+        if trend is not None:
+            return trend
+        try:
+            from bar_store import get_history
+            hist = get_history(symbol, period=TIMEFRAME_LOOKBACK, refresh=False)
+            return compute_timeframe_trends({symbol: hist}).get(symbol)
+        except Exception:
+            return None
+
+# Global instance
+timeframe_trends = TimeframeTrends()
+
+def refresh_timeframe_trends(symbols: List[str]) -> Dict:
+    """Convenience function to compute the scan's weekly/monthly trends"""
+    return timeframe_trends.refresh(symbols)
+
+def get_timeframe_trend(symbol: str) -> Optional[Dict]:
+    """Convenience function to read one symbol's weekly/monthly trend"""
+    return timeframe_trends.get(symbol)
+
+if __name__ == "__main__":
+    import sys
+    from panel_indicators import synthetic_frames
+    
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    bench_frames = synthetic_frames(count, bars=252)
+    print("🗓️ Multi-timeframe benchmark")
+    print("=" * 50)
+    start = time.time()
+    result = compute_timeframe_trends(bench_frames)
+    print(f"Symbols:        {len(result)}")
+    print(f"Weekly+monthly: {time.time() - start:.3f}s")
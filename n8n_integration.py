@@ -14,7 +14,7 @@ from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 from flask import Flask, request, jsonify
 from threading import Thread
-import requests
+from http_client import http_get, http_post, get_http_stats
 import time
 from dotenv import load_dotenv
 from main_enhanced import fetch_stocks, make_recommendation, get_enhanced_data
@@ -74,7 +74,7 @@ class N8NStockAgent:
         """Trigger an n8n workflow with data"""
         try:
             webhook_url = f"{N8N_BASE_URL}/webhook/{workflow_name}"
-            response = requests.post(webhook_url, json=data, timeout=30)
+            response = http_post(webhook_url, json=data, timeout=30)
             return response.json() if response.status_code == 200 else None
         except Exception as e:
             print(f"Error triggering n8n workflow {workflow_name}: {e}")
@@ -126,7 +126,7 @@ def send_telegram_message(message, parse_mode='Markdown'):
                 'disable_web_page_preview': True
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = http_post(url, json=payload, timeout=10)
             
             if response.status_code == 200:
                 print(f"✅ Telegram message sent (part {i+1}/{len(messages)})")
@@ -251,11 +251,11 @@ def quick_analysis():
         all_stocks = get_comprehensive_stock_list()
         symbols_to_analyze = all_stocks[:stock_limit]
         
-        # Quick analysis without sentiment (faster)
+        # Quick analysis without sentiment (faster), bars downloaded in grouped batches
+        stock_data = fetch_stocks(symbols_to_analyze, include_sentiment=False)
         results = []
         for symbol in symbols_to_analyze[:stock_limit]:
             try:
-                stock_data = fetch_stocks([symbol], include_sentiment=False)
                 if symbol in stock_data:
                     info = stock_data[symbol]
                     
@@ -336,10 +336,11 @@ def comprehensive_analysis():
             print("🔍 Analyzing market sentiment from multiple sources...")
             sentiment_batch = sentiment_analyzer.analyze_market_sentiment_batch(symbols_to_analyze, max_symbols=100)
         
+        # Get stock data using our enhanced system (batched download, we'll add our own sentiment)
+        stock_data = fetch_stocks(symbols_to_analyze, include_sentiment=False)
+        
         for symbol in symbols_to_analyze:
             try:
-                # Get stock data using our enhanced system
-                stock_data = fetch_stocks([symbol], include_sentiment=False)  # We'll add our own sentiment
                 if symbol in stock_data:
                     info = stock_data[symbol]
                     
@@ -901,7 +902,7 @@ def telegram_config():
             try:
                 # Test with a simple API call
                 url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getMe"
-                response = requests.get(url, timeout=5)
+                response = http_get(url, timeout=5)
                 if response.status_code == 200:
                     telegram_status = 'connected'
                 else:
@@ -951,7 +952,8 @@ def health_check():
             'market_data': True,
             'alerts': True,
             'telegram': bool(TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID)
-        }
+        },
+        'http_pool': get_http_stats()
     })
 
 if __name__ == '__main__':
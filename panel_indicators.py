@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Panel Indicator Engine
+Stacks the universe into 2-D (symbol x bar) NumPy arrays and computes every
+technical indicator main_enhanced scores on for all symbols in one vectorized
+pass, returning per-symbol dicts identical to IndicatorSet.technical_summary()
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bar_panel import BarPanel
+from indicators import (IndicatorSet, RSI_PERIOD, MACD_FAST, MACD_SLOW, MACD_SIGNAL, BOLLINGER_PERIOD,
+                        BOLLINGER_STD, STOCH_PERIOD, STOCH_SMOOTH, VOLUME_AVG_PERIOD, ROC_PERIOD)
+
+PANEL_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+class IndicatorPanel:
+    """
+    OHLCV bars of many symbols, right-aligned so column -1 is every symbol's latest bar
+    Shorter histories are padded on the left with NaN, which the rolling windows below
+    treat exactly like pandas treats a window with missing observations
+    """
+    
+    def __init__(self, symbols: List[str], arrays: Dict[str, np.ndarray], lengths: np.ndarray):
+        self.symbols = symbols
+        self.open = arrays['Open']
+        self.high = arrays['High']
+        self.low = arrays['Low']
+        self.close = arrays['Close']
+        self.volume = arrays['Volume']
+        self.lengths = lengths
+    
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], lookback: Optional[int] = None) -> 'IndicatorPanel':
+        """Build a panel from per-symbol history frames (empty frames are skipped)"""
+        frames = {s: f for s, f in frames.items() if f is not None and not f.empty}
+        symbols = list(frames)
+        width = max((len(f) for f in frames.values()), default=0)
+        if lookback:
+            width = min(width, lookback)
+        
+        arrays = {column: np.full((len(symbols), width), np.nan) for column in PANEL_COLUMNS}
+        lengths = np.zeros(len(symbols), dtype=int)
+        for row, symbol in enumerate(symbols):
+            frame = frames[symbol].tail(width)
+            lengths[row] = len(frame)
+            for column in PANEL_COLUMNS:
+                arrays[column][row, width - len(frame):] = frame[column].to_numpy(dtype=float)
+        return cls(symbols, arrays, lengths)
+    
+    @classmethod
+    def from_bar_panel(cls, bars, lookback: Optional[int] = None) -> 'IndicatorPanel':
+        """Build a panel from a compact BarPanel (float32 storage, float64 math)"""
+        arrays = bars.right_aligned(lookback)
+        width = arrays['Close'].shape[1]
+        return cls(list(bars.symbols), arrays, np.minimum(bars.lengths(), width))
+    
+    def __len__(self):
+        return len(self.symbols)
+
+def rolling_last(values: np.ndarray, window: int, func, offset: int = 0) -> np.ndarray:
+    """
+    func over the `window` bars ending `offset` bars before the latest one
+    NaN inside the window gives NaN, like pandas rolling with min_periods=window
+    """
+    end = values.shape[1] - offset
+    if end < window:
+        return np.full(values.shape[0], np.nan)
+    return func(values[:, end - window:end], axis=1)
+
+def ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """
+    Exponentially weighted mean along the bar axis, identical to pandas
+    Series.ewm(span=span).mean() (adjust=True, ignore_na=False) row by row
+    """
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    numerator = np.zeros(values.shape[0])
+    denominator = np.zeros(values.shape[0])
+    result = np.full(values.shape, np.nan)
+    
+    for col in range(values.shape[1]):
+        x = values[:, col]
+        valid = ~np.isnan(x)
+        numerator = numerator * decay + np.where(valid, x, 0.0)
+        denominator = denominator * decay + valid
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[:, col] = np.where(denominator > 0, numerator / denominator, np.nan)
+    return result
+
+def panel_rsi(panel: IndicatorPanel, period: int = RSI_PERIOD) -> np.ndarray:
+    """RSI (simple moving average of gains/losses)"""
+    delta = np.diff(panel.close, axis=1)
+    up = np.clip(delta, 0, None)
+    down = -np.clip(delta, None, 0)
+    roll_up = rolling_last(up, period, np.mean)
+    roll_down = rolling_last(down, period, np.mean)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = roll_up / roll_down
+        return 100 - (100 / (1 + rs))
+
+def panel_macd(panel: IndicatorPanel, fast: int = MACD_FAST, slow: int = MACD_SLOW,
+               signal: int = MACD_SIGNAL) -> List[Dict]:
+    """MACD per symbol, same dict as indicators.macd_summary"""
+    macd_line = ewm_mean(panel.close, fast) - ewm_mean(panel.close, slow)
+    signal_line = ewm_mean(macd_line, signal)
+    histogram = macd_line - signal_line
+    
+    results = []
+    for row in range(len(panel)):
+        if panel.lengths[row] < slow:
+            results.append({'macd': 0, 'signal': 0, 'histogram': 0, 'bullish_crossover': False})
+            continue
+        results.append({
+            'macd': macd_line[row, -1],
+            'signal': signal_line[row, -1],
+            'histogram': histogram[row, -1],
+            'bullish_crossover': macd_line[row, -1] > signal_line[row, -1] and macd_line[row, -2] <= signal_line[row, -2]
+        })
+    return results
+
+def panel_bollinger_bands(panel: IndicatorPanel, period: int = BOLLINGER_PERIOD,
+                          std_dev: float = BOLLINGER_STD) -> List[Dict]:
+    """Bollinger Bands per symbol, same dict as indicators.bollinger_summary"""
+    sma = rolling_last(panel.close, period, np.mean)
+    std = rolling_last(panel.close, period, lambda w, axis: np.std(w, axis=axis, ddof=1))
+    upper = sma + std * std_dev
+    lower = sma - std * std_dev
+    price = panel.close[:, -1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        band_position = (price - lower) / (upper - lower)
+        squeeze = (upper - lower) / sma < 0.1
+    
+    return [{
+        'upper_band': upper[row],
+        'lower_band': lower[row],
+        'sma': sma[row],
+        'band_position': band_position[row],
+        'squeeze': squeeze[row],
+        'breakout_up': price[row] > upper[row],
+        'breakout_down': price[row] < lower[row]
+    } for row in range(len(panel))]
+
+def panel_moving_averages(panel: IndicatorPanel) -> List[Dict]:
+    """Moving averages per symbol, same dict as indicators.moving_average_summary"""
+    sma_20 = rolling_last(panel.close, 20, np.mean)
+    sma_50 = rolling_last(panel.close, 50, np.mean)
+    ema_12 = ewm_mean(panel.close, 12)[:, -1]
+    ema_26 = ewm_mean(panel.close, 26)[:, -1]
+    price = panel.close[:, -1]
+    
+    results = []
+    for row in range(len(panel)):
+        if panel.lengths[row] < 20:
+            results.append({'sma_20': 0, 'sma_50': 0, 'ema_12': 0, 'ema_26': 0, 'above_sma_20': False,
+                            'above_sma_50': False, 'golden_cross': False, 'death_cross': False})
+            continue
+        long_sma = sma_50[row] if panel.lengths[row] >= 50 else sma_20[row]
+        results.append({
+            'sma_20': sma_20[row],
+            'sma_50': long_sma,
+            'ema_12': ema_12[row],
+            'ema_26': ema_26[row],
+            'above_sma_20': price[row] > sma_20[row],
+            'above_sma_50': price[row] > long_sma,
+            'golden_cross': sma_20[row] > long_sma,  # Bullish signal
+            'death_cross': sma_20[row] < long_sma    # Bearish signal
+        })
+    return results
+
+def panel_volume_analysis(panel: IndicatorPanel) -> List[Dict]:
+    """Volume indicators per symbol, same dict as indicators.volume_summary"""
+    prices, volumes = panel.close, panel.volume
+    avg_volume_20 = rolling_last(volumes, VOLUME_AVG_PERIOD, np.mean)
+    current_volume = volumes[:, -1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        volume_ratio = np.where(avg_volume_20 > 0, current_volume / avg_volume_20, 1)
+        
+        # Price-Volume Trend: cumulative sum that skips missing changes, like Series.cumsum
+        pvt_steps = (prices[:, 1:] / prices[:, :-1] - 1) * volumes[:, 1:]
+    pvt = np.nancumsum(pvt_steps, axis=1)
+    pvt[np.isnan(pvt_steps)] = np.nan
+    
+    # On-Balance Volume (missing volume counts as 0, like indicators.obv_series)
+    rising = prices[:, 1:] > prices[:, :-1]
+    falling = prices[:, 1:] < prices[:, :-1]
+    obv_steps = np.where(rising, volumes[:, 1:], np.where(falling, -volumes[:, 1:], 0.0))
+    obv = np.cumsum(np.nan_to_num(obv_steps), axis=1)
+    
+    results = []
+    for row in range(len(panel)):
+        length = panel.lengths[row]
+        pvt_trend = pvt[row, -1] > pvt[row, -5] if length >= 5 else False
+        obv_trend = length - 1 >= 5 and obv[row, -1] > obv[row, -5]
+        results.append({
+            'current_volume': current_volume[row],
+            'avg_volume_20': avg_volume_20[row],
+            'volume_ratio': volume_ratio[row],
+            'high_volume': volume_ratio[row] > 1.5,
+            'very_high_volume': volume_ratio[row] > 2.0,
+            'pvt_bullish': pvt_trend,
+            'obv_bullish': obv_trend,
+            'volume_breakout': volume_ratio[row] > 2.0 and prices[row, -1] > prices[row, -2]
+        })
+    return results
+
+def panel_momentum_indicators(panel: IndicatorPanel) -> List[Dict]:
+    """Stochastics, Williams %R and ROC per symbol, same dict as indicators.momentum_summary"""
+    prices = panel.close
+    
+    # %K for the last three bars (needed for the 3-bar %D)
+    k_percent = []
+    for offset in range(STOCH_SMOOTH - 1, -1, -1):
+        lowest_low = rolling_last(panel.low, STOCH_PERIOD, np.min, offset)
+        highest_high = rolling_last(panel.high, STOCH_PERIOD, np.max, offset)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            k_percent.append(100 * ((prices[:, -1 - offset] - lowest_low) / (highest_high - lowest_low)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        williams_r = -100 * ((highest_high - prices[:, -1]) / (highest_high - lowest_low))
+        roc = ((prices[:, -1] - prices[:, -1 - ROC_PERIOD]) / prices[:, -1 - ROC_PERIOD]) * 100 \
+            if prices.shape[1] > ROC_PERIOD \
+            else np.full(len(panel), np.nan)
+    stoch_k = k_percent[-1]
+    stoch_d = np.mean(np.vstack(k_percent), axis=0)
+    
+    return [{
+        'stoch_k': stoch_k[row],
+        'stoch_d': stoch_d[row],
+        'williams_r': williams_r[row],
+        'roc': roc[row],
+        'stoch_oversold': stoch_k[row] < 20,
+        'stoch_overbought': stoch_k[row] > 80,
+        'momentum_bullish': roc[row] > 5
+    } for row in range(len(panel))]
+
+def compute_panel_indicators(frames, lookback: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    Every main_enhanced indicator for every symbol in one vectorized pass
+    `frames` is {symbol: DataFrame} or a BarPanel
+    Returns {symbol: {'rsi', 'macd', 'bollinger', 'moving_averages', 'volume_analysis', 'momentum'}}
+    """
+    if isinstance(frames, BarPanel):
+        panel = IndicatorPanel.from_bar_panel(frames, lookback)
+    else:
+        panel = IndicatorPanel.from_frames(frames, lookback)
+    if not len(panel):
+        return {}
+    
+    rsi = panel_rsi(panel)
+    macd = panel_macd(panel)
+    bollinger = panel_bollinger_bands(panel)
+    moving_averages = panel_moving_averages(panel)
+    volume_analysis = panel_volume_analysis(panel)
+    momentum = panel_momentum_indicators(panel)
+    
+    return {symbol: {
+        'rsi': rsi[row],
+        'macd': macd[row],
+        'bollinger': bollinger[row],
+        'moving_averages': moving_averages[row],
+        'volume_analysis': volume_analysis[row],
+        'momentum': momentum[row]
+    } for row, symbol in enumerate(panel.symbols)}
+
+def per_symbol_indicators(hist: pd.DataFrame) -> Dict:
+    """The same indicators through the per-symbol pandas path"""
+    return IndicatorSet('', hist).technical_summary()
+
+def indicators_match(a, b, rtol: float = 1e-9) -> bool:
+    """Compare two indicator results (NaN equals NaN)"""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(indicators_match(a[k], b[k], rtol) for k in a)
+    return bool(np.isclose(float(a), float(b), rtol=rtol, atol=1e-9, equal_nan=True))
+
+def synthetic_frames(count: int, bars: int = 60, seed: int = 7) -> Dict[str, pd.DataFrame]:
+    """Random-walk OHLCV frames for benchmarking"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2024-06-28', periods=bars)
+    frames = {}
+    for i in range(count):
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+        frames[f"SYM{i:03d}"] = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.005, bars)),
+            'High': close * (1 + np.abs(rng.normal(0, 0.01, bars))),
+            'Low': close * (1 - np.abs(rng.normal(0, 0.01, bars))),
+            'Close': close,
+            'Volume': rng.integers(100_000, 5_000_000, bars).astype(float)
+        }, index=dates)
+    return frames
+
+def run_benchmark(frames: Dict[str, pd.DataFrame]) -> Dict:
+    """Time the per-symbol pandas path against the panel engine and check they agree"""
+    start = time.time()
+    expected = {symbol: per_symbol_indicators(hist) for symbol, hist in frames.items()}
+    per_symbol_seconds = time.time() - start
+    
+    start = time.time()
+    actual = compute_panel_indicators(frames)
+    panel_seconds = time.time() - start
+    
+    mismatches = [s for s in expected if not indicators_match(expected[s], actual[s])]
+    return {
+        'symbols': len(frames),
+        'per_symbol_seconds': per_symbol_seconds,
+        'panel_seconds': panel_seconds,
+        'speedup': per_symbol_seconds / panel_seconds if panel_seconds else 0,
+        'mismatches': mismatches
+    }
+
+if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == 'store':
+        # Benchmark on the real universe from the local bar store
+        from stock_universe import get_comprehensive_stock_list
+        from bar_store import get_history
+        bench_frames = {s: get_history(s, period="60d", refresh=False) for s in get_comprehensive_stock_list()}
+        bench_frames = {s: f for s, f in bench_frames.items() if len(f) >= 20}
+    else:
+        bench_frames = synthetic_frames(int(sys.argv[1]) if len(sys.argv) > 1 else 600)
+    
+    print("📐 Panel indicator benchmark")
+    print("=" * 50)
+    result = run_benchmark(bench_frames)
+    print(f"Symbols:        {result['symbols']}")
+    print(f"Per-symbol:     {result['per_symbol_seconds']:.2f}s")
+    print(f"Panel:          {result['panel_seconds']:.3f}s")
+    print(f"Speedup:        {result['speedup']:.0f}x")
+    print(f"Mismatches:     {len(result['mismatches'])} {result['mismatches'][:5]}")
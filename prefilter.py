@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Universe Prefilter
+Phase one of the two-phase scan: one vectorized snapshot of the whole universe
+(last price, 1-week/1-month change, volume vs its 20-day average, distance from
+the 20-day MA) read from the bar store the bulk update just refreshed, keeping
+only symbols that could plausibly reach WATCH. Phase two - full history and
+indicators - then runs on the shortlist. A random sample of pruned symbols is
+deep-scanned as well, so every run measures whether the prefilter missed a signal
+"""
+
+import os
+import time
+import random
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bar_panel import BarPanel
+from indicators import RSI_PERIOD, ROC_PERIOD
+
+PREFILTER_ENABLED = os.getenv('PREFILTER_ENABLED', '1') != '0'
+PREFILTER_AUDIT_SAMPLE = int(os.getenv('PREFILTER_AUDIT_SAMPLE', '25'))  # Pruned symbols deep-scanned per run
+
+# A symbol is kept if ANY of these holds - each is a scoring or growth-filter input
+MA20_DISTANCE_FLOOR = -2.0   # % below the 20-day MA (scorer: +2 above MA20, RSI/MACD often still healthy just below)
+VOLUME_RATIO_FLOOR = 1.2     # Scorer's high-volume point
+CHANGE_1W_FLOOR = 3.0        # % over 1 week - momentum the growth filter and MACD pick up
+CHANGE_1M_FLOOR = 7.0        # % over 1 month - the 7% growth filter
+OVERSOLD_1M_CEILING = -10.0  # % over 1 month - deep pullbacks can score on oversold RSI
+
+SNAPSHOT_BARS = 21
+SNAPSHOT_PERIOD = "45d"  # Calendar lookback that always holds SNAPSHOT_BARS sessions, holidays included
+
+def quote_snapshot(symbols: List[str], store=None) -> pd.DataFrame:
+    """
+    Latest quote fields (plus 20-day volatility, dollar volume, RSI and ROC) for every symbol
+    with stored bars, one vectorized pass
+    """
+    bars = BarPanel.from_store(symbols, period=SNAPSHOT_PERIOD, store=store)
+    columns = ['price', 'change_1w', 'change_1m', 'volume_ratio', 'ma20_distance', 'volatility', 'dollar_volume',
+               'rsi', 'roc']
+    if not len(bars):
+        return pd.DataFrame(columns=columns, dtype=float)
+    
+    arrays = bars.right_aligned(SNAPSHOT_BARS)
+    close, volume = arrays['Close'], arrays['Volume']
+    price = close[:, -1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ma20 = np.nanmean(close[:, -20:], axis=1)
+        avg_volume = np.nanmean(volume[:, -20:], axis=1)
+        delta = np.diff(close[:, -RSI_PERIOD - 1:], axis=1)  # Simple-average RSI, as indicators.rsi_series
+        gain, loss = np.clip(delta, 0, None).mean(axis=1), np.clip(-delta, 0, None).mean(axis=1)
+        snapshot = pd.DataFrame({
+            'price': price,
+            'change_1w': (price / close[:, -5] - 1) * 100,
+            'change_1m': (price / close[:, -20] - 1) * 100,
+            'volume_ratio': np.where(avg_volume > 0, volume[:, -1] / avg_volume, 1.0),
+            'ma20_distance': (price / ma20 - 1) * 100,
+            'volatility': np.nanstd(np.diff(close, axis=1) / close[:, :-1], axis=1) * 100,  # Daily moves, %
+            'dollar_volume': price * avg_volume,  # Liquidity, for scan priority
+            'rsi': 100 - 100 / (1 + gain / loss),
+            'roc': (price / close[:, -1 - ROC_PERIOD] - 1) * 100
+        }, index=bars.symbols)
+    return snapshot
+
+def plausible(snapshot: pd.DataFrame) -> pd.Series:
+    """True for symbols that could reach WATCH; NaN fields (short history) count as plausible"""
+    keep = ((snapshot['ma20_distance'] >= MA20_DISTANCE_FLOOR)
+            | (snapshot['volume_ratio'] >= VOLUME_RATIO_FLOOR)
+            | (snapshot['change_1w'] >= CHANGE_1W_FLOOR)
+            | (snapshot['change_1m'] >= CHANGE_1M_FLOOR)
+            | (snapshot['change_1m'] <= OVERSOLD_1M_CEILING))
+    unknown = snapshot[['change_1w', 'change_1m', 'ma20_distance']].isna().any(axis=1)
+    return keep | unknown
+
+def run_prefilter(symbols: List[str], always_keep: Iterable[str] = (), audit_sample: int = PREFILTER_AUDIT_SAMPLE,
+                  store=None, seed: Optional[int] = None) -> Dict:
+    """
+    Split the universe for phase two, keeping universe order
+    shortlist: plausible symbols, symbols without stored bars and `always_keep` (current BUY/WATCH)
+    audit: a random sample of the pruned symbols, deep-scanned to measure misses
+    """
+    started = time.time()
+    if not PREFILTER_ENABLED:
+        return {'shortlist': list(symbols), 'pruned': [], 'audit': [], 'snapshot': None, 'milliseconds': 0.0}
+    
+    snapshot = quote_snapshot(symbols, store=store)
+    passed = plausible(snapshot)
+    always_keep = set(always_keep)
+    pruned = [s for s in symbols if s in passed.index and not passed[s] and s not in always_keep]
+    pruned_set = set(pruned)
+    shortlist = [s for s in symbols if s not in pruned_set]
+    audit = sorted(random.Random(seed).sample(pruned, min(audit_sample, len(pruned))), key=symbols.index)
+    
+    return {
+        'shortlist': shortlist,
+        'pruned': pruned,
+        'audit': audit,
+        'snapshot': snapshot,
+        'milliseconds': round((time.time() - started) * 1000, 1)
+    }
+
+def audit_misses(analyses: List[Optional[Dict]], audit: List[str], watch_threshold: int) -> List[Dict]:
+    """Audited (pruned) symbols that scored WATCH or better - signals the prefilter would have missed"""
+    audit_set = set(audit)
+    return [a for a in analyses if a and a['symbol'] in audit_set and a['score'] >= watch_threshold]
+
+def estimate_misses(missed: int, sampled: int, pruned: int) -> Dict:
+    """
+    The audit is a sample: extrapolate its miss rate to the whole pruned set
+    (None when no audited symbol was scanned, e.g. a deadline cut them all)
+    """
+    rate = missed / sampled if sampled else None
+    return {'sampled': sampled, 'pruned': pruned, 'missed': missed, 'miss_rate': rate,
+            'estimated_misses': rate * pruned if rate is not None else None}
+
+def format_prefilter_report(report: Dict, missed: Optional[List[Dict]] = None, sampled: Optional[int] = None) -> str:
+    """
+    One-line summary; with the audit's `missed` analyses it adds the sample's misses and the
+    estimated miss rate over every pruned symbol. `sampled` = audited symbols actually scanned
+    """
+    total = len(report['shortlist']) + len(report['pruned'])
+    line = (f"🔎 Prefilter: kept {len(report['shortlist'])}/{total}, pruned {len(report['pruned'])} "
+            f"in {report['milliseconds']:.0f}ms ({len(report['audit'])} pruned symbols audited")
+    if missed is None:
+        return line + ")"
+    estimate = estimate_misses(len(missed), len(report['audit']) if sampled is None else sampled, len(report['pruned']))
+    if estimate['miss_rate'] is None:
+        return line + ", none scanned - miss rate unknown)"
+    line += (f", {len(missed)} miss{'' if len(missed) == 1 else 'es'} in {estimate['sampled']}/{estimate['pruned']} sampled, "
+             f"est. miss rate {estimate['miss_rate']:.0%} ≈ {estimate['estimated_misses']:.0f} pruned signals")
+    if missed:
+        line += f": {', '.join(a['symbol'] for a in missed)}"
+    return line + ")"
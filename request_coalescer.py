@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Request Coalescer
+Single-flight layer in front of the market data provider: identical fetches
+(same endpoint, symbol and window) that are in flight or were just completed
+share one result - across threads in-process and across processes through a
+locked on-disk cache
+"""
+
+import os
+import copy
+import json
+import time
+import atexit
+import pickle
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from market_data import MarketDataProvider
+
+# Optional dependency - cross-process locking needs POSIX flock
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+COALESCE_DIR = os.getenv('COALESCE_DIR', os.path.join('data_cache', 'coalesce'))
+COALESCE_ENABLED = os.getenv('COALESCE_ENABLED', '1') != '0'
+
+# How long a completed result is shared with later callers (seconds)
+ENDPOINT_WINDOWS = {
+    'history': 60,
+    'history_batch': 60,
+    'quote': 30,
+    'info': 300,
+    'news': 300,
+    'calendar': 3600
+}
+
+MAX_RECENT_RESULTS = 2000  # Completed results kept in memory before expired ones are pruned
+
+STAT_KEYS = ('fetches', 'shared_in_flight', 'shared_recent', 'shared_cross_process', 'errors')
+
+class _Flight:
+    """One in-flight fetch that other threads can wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+def _copy(value):
+    """Hand every caller its own deep copy of mutable results (frames, dicts of frames, info dicts)"""
+    try:
+        return copy.deepcopy(value)
+    except Exception:
+        return value
+
+class RequestCoalescer:
+    """Shares identical fetches between threads and processes"""
+    
+    def __init__(self, cache_dir: str = COALESCE_DIR, windows: Dict[str, int] = None, cross_process: bool = True):
+        self.cache_dir = cache_dir
+        self.windows = windows or ENDPOINT_WINDOWS
+        self.cross_process = cross_process
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, _Flight] = {}
+        self._recent: Dict[str, tuple] = {}
+        self.stats = {key: 0 for key in STAT_KEYS}
+    
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+    
+    def make_key(self, endpoint: str, symbol: Any, window: str = "") -> str:
+        """Stable key for (endpoint, symbol, window)"""
+        if isinstance(symbol, (list, tuple)):
+            symbol = ",".join(sorted(symbol))
+        return f"{endpoint}|{symbol}|{window}"
+    
+    def _cache_paths(self, key: str):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return f"{base}.pkl", f"{base}.lock"
+    
+    def _read_shared(self, path: str, max_age: float):
+        """Result another process stored within the window (None if missing/expired)"""
+        try:
+            if time.time() - os.path.getmtime(path) >= max_age:
+                return None
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+    
+    def _write_shared(self, path: str, value):
+        try:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'value': value}, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            pass  # Sharing is best effort, the caller already has its result
+    
+    def _fetch_shared(self, key: str, max_age: float, fetch: Callable):
+        """Fetch under a per-key file lock so only one process calls Yahoo"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path, lock_path = self._cache_paths(key)
+        
+        cached = self._read_shared(data_path, max_age)
+        if cached is not None:
+            self._count('shared_cross_process')
+            return cached['value']
+        
+        with open(lock_path, 'w') as lock_file:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another process may have finished the same fetch while we waited for the lock
+                cached = self._read_shared(data_path, max_age)
+                if cached is not None:
+                    self._count('shared_cross_process')
+                    return cached['value']
+                
+                self._count('fetches')
+                value = fetch()
+                self._write_shared(data_path, value)
+                return value
+            finally:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def call(self, endpoint: str, symbol: Any, window: str, fetch: Callable):
+        """Run fetch() once for every identical request in flight or inside the endpoint's window"""
+        key = self.make_key(endpoint, symbol, window)
+        max_age = self.windows.get(endpoint, 60)
+        
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent and time.time() - recent[0] < max_age:
+                self.stats['shared_recent'] += 1
+                return _copy(recent[1])
+            
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+            else:
+                self.stats['shared_in_flight'] += 1
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return _copy(flight.result)
+        
+        try:
+            if self.cross_process:
+                flight.result = self._fetch_shared(key, max_age, fetch)
+            else:
+                self._count('fetches')
+                flight.result = fetch()
+            with self._lock:
+                self._recent[key] = (time.time(), flight.result)
+                if len(self._recent) > MAX_RECENT_RESULTS:
+                    self._prune_recent()
+            return _copy(flight.result)
+        except BaseException as e:
+            flight.error = e
+            self._count('errors')
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.done.set()
+    
+    def _prune_recent(self):
+        """Drop completed results whose window has passed (caller holds the lock)"""
+        now = time.time()
+        for key in list(self._recent):
+            endpoint = key.split('|', 1)[0]
+            if now - self._recent[key][0] >= self.windows.get(endpoint, 60):
+                del self._recent[key]
+    
+    def prune_shared(self, max_age: float = 24 * 3600):
+        """Delete on-disk results older than max_age"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if now - os.path.getmtime(path) >= max_age:
+                    os.remove(path)
+                    os.remove(path[:-4] + '.lock')
+            except OSError:
+                pass
+    
+    def saved_fetches(self) -> int:
+        """Duplicate fetches answered without a new request"""
+        with self._lock:
+            return self.stats['shared_in_flight'] + self.stats['shared_recent'] + self.stats['shared_cross_process']
+    
+    def get_stats(self) -> Dict:
+        """Counters for this process"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['saved_fetches'] = self.saved_fetches()
+        return stats
+    
+    def format_stats(self) -> str:
+        """One-line summary for logs"""
+        stats = self.get_stats()
+        return (f"🔗 Request coalescing: {stats['fetches']} fetches, {stats['saved_fetches']} duplicates saved "
+                f"({stats['shared_in_flight']} in flight, {stats['shared_recent']} recent, "
+                f"{stats['shared_cross_process']} cross-process)")
+    
+    def flush_stats(self):
+        """Add this process's counters to the shared totals file"""
+        stats = self.get_stats()
+        if not stats['fetches'] and not stats['saved_fetches']:
+            return
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            totals_path = os.path.join(self.cache_dir, 'stats.json')
+            with open(os.path.join(self.cache_dir, 'stats.lock'), 'w') as lock_file:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                totals = load_shared_stats(self.cache_dir)
+                for key in STAT_KEYS + ('saved_fetches',):
+                    totals[key] = totals.get(key, 0) + stats[key]
+                totals['last_updated'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+                with open(totals_path, 'w') as f:
+                    json.dump(totals, f, indent=2)
+            with self._lock:
+                self.stats = {key: 0 for key in STAT_KEYS}
+            self.prune_shared()
+        except Exception as e:
+            print(f"⚠️ Error saving coalescing stats: {e}")
+
+def load_shared_stats(cache_dir: str = COALESCE_DIR) -> Dict:
+    """Totals across every process that flushed its counters"""
+    path = os.path.join(cache_dir, 'stats.json')
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return {}
+
+class CoalescingProvider(MarketDataProvider):
+    """Provider wrapper that routes every call through the coalescer"""
+    
+    name = "coalescing"
+    
+    def __init__(self, inner: MarketDataProvider, coalescer: Optional[RequestCoalescer] = None):
+        self.inner = inner
+        self.coalescer = coalescer or request_coalescer
+        self.offline = inner.offline
+    
+    def now(self):
+        return self.inner.now()
+    
+    def history(self, symbol, period="1mo", interval="1d", start=None):
+        window = f"{start or period}|{interval}"
+        return self.coalescer.call('history', symbol, window,
+                                   lambda: self.inner.history(symbol, period=period, interval=interval, start=start))
+    
+    def history_batch(self, symbols, period="1mo", interval="1d", start=None):
+        window = f"{start or period}|{interval}"
+        return self.coalescer.call('history_batch', list(symbols), window,
+                                   lambda: self.inner.history_batch(symbols, period=period, interval=interval, start=start))
+    
+    def quote(self, symbol):
+        return self.coalescer.call('quote', symbol, "", lambda: self.inner.quote(symbol))
+    
+    def info(self, symbol):
+        return self.coalescer.call('info', symbol, "", lambda: self.inner.info(symbol))
+    
+    def news(self, symbol):
+        return self.coalescer.call('news', symbol, "", lambda: self.inner.news(symbol))
+    
+    def calendar(self, symbol):
+        return self.coalescer.call('calendar', symbol, "", lambda: self.inner.calendar(symbol))
+
+# Global coalescer instance
+request_coalescer = RequestCoalescer()
+atexit.register(request_coalescer.flush_stats)
+
+if __name__ == "__main__":
+    totals = load_shared_stats()
+    print("🔗 Request coalescing totals")
+    print("=" * 50)
+    if not totals:
+        print("No coalescing stats recorded yet")
+    else:
+        print(f"   Fetches issued:        {totals.get('fetches', 0)}")
+        print(f"   Duplicates saved:      {totals.get('saved_fetches', 0)}")
+        print(f"     in flight:           {totals.get('shared_in_flight', 0)}")
+        print(f"     recently completed:  {totals.get('shared_recent', 0)}")
+        print(f"     cross-process:       {totals.get('shared_cross_process', 0)}")
+        print(f"   Errors:                {totals.get('errors', 0)}")
+        print(f"   Last updated:          {totals.get('last_updated', 'n/a')}")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Scan Checkpoint
+Durable partial results for long universe scans. Every symbol's result is
+appended to a JSONL file (flushed and fsynced) the moment it finishes, so a run
+that is killed - the dashboard updater's timeout, a crash, Ctrl+C - loses at
+most the symbols in flight. The next run loads the checkpoint, reuses results
+younger than the max age and only scans the rest. A run that completes clears
+its checkpoint, so only interrupted runs resume - a fresh run after the bar
+store moves on never reuses the previous run's results
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from market_data import MARKET_DATA_PROVIDER
+from scan_executor import run_hybrid_scan
+
+SCAN_CHECKPOINT_DIR = os.getenv('SCAN_CHECKPOINT_DIR', os.path.join('data_cache', 'scan_checkpoints'))
+SCAN_CHECKPOINT_MAX_AGE_HOURS = float(os.getenv('SCAN_CHECKPOINT_MAX_AGE_HOURS', '12'))  # Older results are re-fetched
+SCAN_CHECKPOINT_ENABLED = os.getenv('SCAN_CHECKPOINT_ENABLED', '1') != '0'
+
+def _json_default(value):
+    """NumPy scalars in results serialize as plain numbers"""
+    return value.item() if hasattr(value, 'item') else str(value)
+
+class ScanCheckpoint:
+    """Append-only per-symbol results for one named scan"""
+    
+    def __init__(self, name: str, max_age_hours: float = SCAN_CHECKPOINT_MAX_AGE_HOURS,
+                 checkpoint_dir: str = SCAN_CHECKPOINT_DIR):
+        suffix = '_replay' if MARKET_DATA_PROVIDER == 'replay' else ''
+        self.name = name
+        self.path = os.path.join(checkpoint_dir, f"{name}{suffix}.jsonl")
+        self.max_age = timedelta(hours=max_age_hours)
+        self._lock = threading.Lock()
+        self._file = None
+        self.entries = self.load_checkpoint()
+        self.stats = {'resumed': 0, 'scanned': 0}
+    
+    def load_checkpoint(self) -> Dict[str, Dict]:
+        """Fresh entries by symbol (latest line wins); a torn last line from a killed run is skipped"""
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        cutoff = datetime.now() - self.max_age
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        completed_at = datetime.fromisoformat(entry['completed_at'])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if completed_at >= cutoff:
+                        entries[entry['symbol']] = entry
+                    else:
+                        entries.pop(entry['symbol'], None)
+        except Exception as e:
+            print(f"⚠️ Error loading scan checkpoint {self.path}: {e}")
+        return entries
+    
+    def split(self, symbols: List[str]) -> Tuple[Dict[str, Optional[Dict]], List[str]]:
+        """(checkpointed results, symbols still to scan) for this run"""
+        done = {s: self.entries[s]['result'] for s in symbols if s in self.entries}
+        return done, [s for s in symbols if s not in done]
+    
+    def record(self, symbol: str, result: Optional[Dict]):
+        """Append one finished symbol and push it to disk before returning"""
+        entry = {'symbol': symbol, 'completed_at': datetime.now().isoformat(timespec='seconds'), 'result': result}
+        line = json.dumps(entry, default=_json_default) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                    self._file = open(self.path, 'a+')
+                    self._file.seek(0, os.SEEK_END)
+                    if self._file.tell():
+                        self._file.seek(self._file.tell() - 1)
+                        if self._file.read(1) != "\n":
+                            self._file.write("\n")  # Start clear of a torn line
+                self._file.write(line)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.entries[symbol] = json.loads(line)
+            except Exception as e:
+                print(f"⚠️ Error writing scan checkpoint: {e}")
+    
+    def clear(self):
+        """Delete the checkpoint once the whole scan completed - its results are only for resuming"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.entries = {}
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Error clearing scan checkpoint: {e}")
+    
+    def run(self, symbols: List[str], fetch: Callable, compute: Callable, **scan_kwargs) -> Tuple[List, Dict]:
+        """
+        run_hybrid_scan over the symbols the checkpoint doesn't cover, checkpointing as they finish
+        Results come back in input order, checkpointed ones included; the report adds 'resumed'
+        """
+        done, pending = self.split(symbols) if SCAN_CHECKPOINT_ENABLED else ({}, list(symbols))
+        if done:
+            print(f"♻️ Resuming {self.name}: {len(done)}/{len(symbols)} symbols from checkpoint, "
+                  f"{len(pending)} to scan")
+        
+        on_result = self.record if SCAN_CHECKPOINT_ENABLED else None
+        fresh, report = run_hybrid_scan(pending, fetch, compute, on_result=on_result, **scan_kwargs)
+        fresh = dict(zip(pending, fresh))
+        self.stats['resumed'] += len(done)
+        self.stats['scanned'] += len(pending)
+        
+        report = dict(report, symbols=len(symbols), resumed=len(done))
+        return [done[s] if s in done else fresh[s] for s in symbols], report
+    
+    def format_stats(self) -> str:
+        return (f"💾 Checkpoint {self.name}: {self.stats['resumed']} resumed, {self.stats['scanned']} scanned "
+                f"(results kept {self.max_age.total_seconds() / 3600:.0f}h)")
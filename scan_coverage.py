@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Scan Coverage
+Time budget for the hourly scan. The run gets a deadline; symbols are scanned
+in priority order (current BUY/WATCH, then whatever the last run had to skip,
+then by liquidity), the scan stops cleanly once the deadline passes, and the
+skipped symbols carry over to the front of the next run. Keeps a slow provider
+from pushing one hourly run into the next
+"""
+
+import os
+import json
+import math
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from market_data import MARKET_DATA_PROVIDER
+
+SCAN_DEADLINE_MINUTES = float(os.getenv('SCAN_DEADLINE_MINUTES', '45'))  # 0 = no deadline
+BAR_REFRESH_SHARE = float(os.getenv('BAR_REFRESH_SHARE', '0.5'))  # Share of the budget the bar refresh may use
+SCAN_CARRYOVER_FILE = os.getenv('SCAN_CARRYOVER_FILE', os.path.join(
+    'data_cache', 'scan_carryover_replay.json' if MARKET_DATA_PROVIDER == 'replay' else 'scan_carryover.json'))
+
+class ScanDeadline:
+    """Wall-clock budget for one run; `at` is None when there is no deadline"""
+    
+    def __init__(self, minutes: float = SCAN_DEADLINE_MINUTES, started: Optional[float] = None):
+        self.started = time.time() if started is None else started
+        self.seconds = minutes * 60 if minutes > 0 else None
+    
+    @property
+    def at(self) -> Optional[float]:
+        return self.started + self.seconds if self.seconds else None
+    
+    def share(self, fraction: float) -> Optional[float]:
+        """Point in time by which `fraction` of the budget is used"""
+        return self.started + self.seconds * fraction if self.seconds else None
+    
+    def expired(self) -> bool:
+        return self.seconds is not None and time.time() >= self.at
+    
+    def elapsed(self) -> float:
+        return time.time() - self.started
+
+def prioritize_symbols(symbols: List[str], signals: Iterable[str] = (), carryover: Iterable[str] = (),
+                       liquidity: Optional[Dict[str, float]] = None) -> List[str]:
+    """Current signals, then last run's skipped symbols, then the rest by liquidity (unknown last)"""
+    liquidity = liquidity or {}
+    signals, carryover = set(signals), set(carryover)
+    
+    def value(symbol):
+        amount = liquidity.get(symbol)
+        return amount if amount is not None and not math.isnan(amount) else -1.0
+    
+    first = [s for s in symbols if s in signals]
+    carried = [s for s in symbols if s in carryover and s not in signals]
+    rest = sorted((s for s in symbols if s not in signals and s not in carryover), key=value, reverse=True)
+    return first + carried + rest
+
+class ScanCarryover:
+    """Symbols the last run skipped at its deadline, persisted as JSON"""
+    
+    def __init__(self, carryover_file: str = SCAN_CARRYOVER_FILE):
+        self.carryover_file = carryover_file
+        self.data = self.load_carryover()
+    
+    def load_carryover(self) -> Dict:
+        """Load the carryover from file"""
+        if os.path.exists(self.carryover_file):
+            try:
+                with open(self.carryover_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error loading scan carryover: {e}")
+        return {'symbols': [], 'saved_at': None}
+    
+    def save_carryover(self, skipped: List[str]):
+        """Replace the carryover with this run's skipped symbols (empty when the run finished)"""
+        self.data = {'symbols': list(skipped), 'saved_at': datetime.now().isoformat(timespec='seconds')}
+        try:
+            os.makedirs(os.path.dirname(self.carryover_file) or '.', exist_ok=True)
+            tmp_path = f"{self.carryover_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.data, f)
+            os.replace(tmp_path, self.carryover_file)
+        except Exception as e:
+            print(f"⚠️ Error saving scan carryover: {e}")
+    
+    @property
+    def symbols(self) -> List[str]:
+        return self.data.get('symbols', [])
+
+def format_coverage(covered: int, planned: int, seconds: float, skipped: int = 0) -> str:
+    """'487/600 scanned in 14m', plus the carryover when the deadline cut the scan short"""
+    elapsed = f"{seconds / 60:.0f}m" if seconds >= 60 else f"{seconds:.0f}s"
+    line = f"{covered}/{planned} scanned in {elapsed}"
+    if skipped:
+        line += f" - deadline reached, {skipped} carried over to the next run"
+    return line
+
+# Global instance
+scan_carryover = ScanCarryover()
+
+def get_carryover() -> List[str]:
+    """Convenience function: symbols skipped by the last run"""
+    return scan_carryover.symbols
+
+def save_carryover(skipped: List[str]):
+    """Convenience function to persist this run's skipped symbols"""
+    scan_carryover.save_carryover(skipped)
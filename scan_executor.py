@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Hybrid Scan Executor
+Two-stage scan engine: the fetch stage (bar store reads, fundamentals, anything
+that waits on disk or network) runs on an I/O thread pool, and the indicator and
+scoring stage runs on a process pool sized to the cores, so pandas/NumPy work is
+no longer serialized behind the GIL. The stages are connected by a bounded queue;
+compute tasks are shipped to the workers in small batches to amortize pickling.
+Indicator results the workers compute are handed back and stored by the parent
+"""
+
+import os
+import time
+import queue
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+
+import indicators
+from market_data import get_provider, RateLimiter, rate_limited
+
+# Defaults keep sustained traffic under Yahoo's throttling (short bursts are tolerated,
+# sustained hammering gets HTTP 429s) - override per deployment with env vars
+SCAN_RATE_PER_SECOND = float(os.getenv('SCAN_RATE_PER_SECOND', '8'))
+SCAN_BURST = int(os.getenv('SCAN_BURST', '16'))
+
+# Bounded fetch concurrency (SCAN_MAX_CONCURRENCY is the older name for the same limit)
+SCAN_IO_WORKERS = int(os.getenv('SCAN_IO_WORKERS', os.getenv('SCAN_MAX_CONCURRENCY', '16')))
+SCAN_CPU_WORKERS = int(os.getenv('SCAN_CPU_WORKERS', str(os.cpu_count() or 1)))
+SCAN_QUEUE_SIZE = int(os.getenv('SCAN_QUEUE_SIZE', '256'))   # Fetched payloads waiting for a CPU worker
+SCAN_CPU_BATCH = int(os.getenv('SCAN_CPU_BATCH', '8'))       # Payloads per process task
+# Workers start from a clean interpreter: the scanners run inside threaded processes (Flask,
+# the scheduler's fetch threads), and forking one of those can copy a lock held by another thread
+SCAN_START_METHOD = os.getenv('SCAN_START_METHOD',
+                              'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+def _compute_batch(compute: Callable, items: List[Tuple[int, str, object]]) -> List[Tuple[int, bool, object]]:
+    """Compute loop: (index, ok, result or error message) per item"""
+    out = []
+    for index, symbol, payload in items:
+        try:
+            out.append((index, True, compute(symbol, payload)))
+        except Exception as e:
+            out.append((index, False, str(e)))
+    return out
+
+def _compute_batch_in_worker(compute: Callable, items: List[Tuple[int, str, object]]) -> Tuple[List, List]:
+    """Worker-side loop: the batch's outcomes plus the indicator results computed for it"""
+    return _compute_batch(compute, items), indicators.indicator_memo.drain_exported()
+
+def _init_worker():
+    """Workers never write the indicator disk tier - the parent stores what they compute"""
+    indicators.indicator_memo.export_results()
+
+def _noop():
+    return None
+
+# One process pool per (size, start method), reused by every scan in the process
+_pools: Dict[Tuple[int, str], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def _shared_pool(workers: int, start_method: str) -> ProcessPoolExecutor:
+    """The process's pool for this size, started (workers running) on first use"""
+    with _pools_lock:
+        pool = _pools.get((workers, start_method))
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method),
+                                       initializer=_init_worker)
+            try:
+                for future in [pool.submit(_noop) for _ in range(workers)]:
+                    future.result()
+            except Exception:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            _pools[(workers, start_method)] = pool
+        return pool
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Forget a broken pool so the next scan starts a new one"""
+    with _pools_lock:
+        for key, shared in list(_pools.items()):
+            if shared is pool:
+                del _pools[key]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_pools():
+    """Stop every shared worker pool"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+atexit.register(shutdown_pools)
+
+class HybridExecutor:
+    """I/O thread pool feeding a CPU process pool through a bounded queue"""
+    
+    def __init__(self, io_workers: int = SCAN_IO_WORKERS, cpu_workers: int = SCAN_CPU_WORKERS,
+                 rate_per_second: float = SCAN_RATE_PER_SECOND, queue_size: int = SCAN_QUEUE_SIZE,
+                 batch_size: int = SCAN_CPU_BATCH, start_method: str = SCAN_START_METHOD):
+        self.io_workers = max(1, io_workers)
+        self.cpu_workers = max(1, cpu_workers)
+        self.rate_per_second = rate_per_second
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.start_method = start_method
+    
+    def _start_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """The shared process pool with its workers running, or None to compute in-process"""
+        if self.cpu_workers <= 1:
+            return None
+        try:
+            return _shared_pool(self.cpu_workers, self.start_method)
+        except Exception as e:
+            print(f"⚠️ Process pool unavailable ({e}) - computing in-process")
+            return None
+    
+    def run(self, symbols: List[str], fetch: Callable, compute: Callable, progress_every: int = 25,
+            on_progress: Optional[Callable] = None, on_error: Optional[Callable] = None,
+            on_result: Optional[Callable] = None) -> Tuple[List, Dict]:
+        """
+        results[i] is compute(symbols[i], fetch(symbols[i])), or None when fetch
+        returned None (nothing to score) or either stage raised
+        `compute` must be a module-level function and payloads picklable
+        `on_result(symbol, result)` runs as each symbol finishes without an error (result may be None)
+        """
+        started = time.time()
+        results = [None] * len(symbols)
+        errors = {}
+        completed = 0
+        fetch_seconds = 0.0
+        limiter = RateLimiter(self.rate_per_second, SCAN_BURST)
+        handoff = queue.Queue(maxsize=self.queue_size)
+        timing_lock = threading.Lock()
+        
+        def record_error(symbol, error):
+            errors[symbol] = str(error)
+            if on_error:
+                on_error(symbol, error)
+        
+        def finish(count=1):
+            nonlocal completed
+            for _ in range(count):
+                completed += 1
+                if on_progress and progress_every and completed % progress_every == 0:
+                    on_progress(completed, len(symbols))
+        
+        def fetch_one(index, symbol):
+            nonlocal fetch_seconds
+            began = time.time()
+            try:
+                with rate_limited(limiter):  # Only live requests inside fetch take a token, store reads don't
+                    item = (index, symbol, fetch(symbol), None)
+            except Exception as e:
+                item = (index, symbol, None, e)
+            with timing_lock:
+                fetch_seconds += time.time() - began
+            handoff.put(item)  # Blocks while the CPU stage is behind
+        
+        pool = self._start_process_pool()
+        mode = 'processes' if pool else 'inline'
+        in_flight = {}  # process future -> batch
+        absorbed = 0
+        
+        def apply(outcome):
+            for index, ok, value in outcome:
+                if ok:
+                    results[index] = value
+                    if on_result:
+                        on_result(symbols[index], value)
+                else:
+                    record_error(symbols[index], value)
+            finish(len(outcome))
+        
+        def collect(block: bool):
+            nonlocal absorbed, pool
+            if not in_flight:
+                return
+            done, _ = wait(list(in_flight), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = in_flight.pop(future)
+                try:
+                    outcome, computed = future.result()
+                    indicators.indicator_memo.absorb(computed)
+                    absorbed += len(computed)
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool) and pool is not None:
+                        _discard_pool(pool)
+                        pool = None
+                    outcome = _compute_batch(compute, batch)  # Worker died or batch would not pickle - finish it here
+                apply(outcome)
+        
+        def dispatch(batch):
+            nonlocal pool
+            if pool is not None:
+                try:
+                    in_flight[pool.submit(_compute_batch_in_worker, compute, batch)] = batch
+                    while len(in_flight) > self.cpu_workers * 2:  # Keep the workers busy, not flooded
+                        collect(block=True)
+                    return
+                except (BrokenProcessPool, RuntimeError) as e:
+                    print(f"⚠️ Process pool failed ({e}) - computing in-process")
+                    _discard_pool(pool)
+                    pool = None
+            apply(_compute_batch(compute, batch))
+        
+        fetch_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="scan-io")
+        fetches = []
+        try:
+            fetches = [fetch_pool.submit(fetch_one, index, symbol) for index, symbol in enumerate(symbols)]
+            
+            received = 0
+            batch = []
+            while received < len(symbols):
+                item = handoff.get()
+                while True:
+                    received += 1
+                    index, symbol, payload, error = item
+                    if error is not None:
+                        record_error(symbol, error)
+                        finish()
+                    elif payload is None:
+                        if on_result:
+                            on_result(symbol, None)
+                        finish()
+                    else:
+                        batch.append((index, symbol, payload))
+                    if len(batch) >= self.batch_size or received >= len(symbols):
+                        break
+                    try:
+                        item = handoff.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    dispatch(batch)
+                    batch = []
+                collect(block=False)
+            while in_flight:
+                collect(block=True)
+        finally:
+            # Normally every fetch has been received; after an error, unblock the stragglers
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
+            while not all(future.done() for future in fetches):
+                try:
+                    handoff.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+            if absorbed:
+                indicators.indicator_memo.save_disk_tier()
+        
+        report = {
+            'symbols': len(symbols),
+            'completed': completed,
+            'errors': errors,
+            'seconds': round(time.time() - started, 2),
+            'fetch_seconds': round(fetch_seconds, 2),
+            'rate_limited_seconds': round(limiter.waited, 2),
+            'io_workers': self.io_workers,
+            'cpu_workers': self.cpu_workers if mode == 'processes' else 1,
+            'mode': mode
+        }
+        return results, report
+
+def run_hybrid_scan(symbols: List[str], fetch: Callable, compute: Callable, io_workers: int = SCAN_IO_WORKERS,
+                    cpu_workers: int = SCAN_CPU_WORKERS, rate_per_second: float = SCAN_RATE_PER_SECOND,
+                    progress_every: int = 25, on_progress: Optional[Callable] = None,
+                    on_error: Optional[Callable] = None, on_result: Optional[Callable] = None) -> Tuple[List, Dict]:
+    """Convenience function: fetch on threads, compute on processes, results in input order"""
+    if get_provider().offline:
+        rate_per_second = 0  # Replay runs never touch Yahoo, no need to throttle
+    
+    executor = HybridExecutor(io_workers=io_workers, cpu_workers=cpu_workers, rate_per_second=rate_per_second)
+    return executor.run(symbols, fetch, compute, progress_every=progress_every,
+                        on_progress=on_progress, on_error=on_error, on_result=on_result)
+
+def format_scan_report(report: Dict) -> str:
+    return (f"⚡ Scan finished in {report['seconds']:.1f}s: {report['io_workers']} I/O threads, "
+            f"{report['cpu_workers']} CPU {'processes' if report['mode'] == 'processes' else 'worker'} "
+            f"({len(report['errors'])} errors, {report['rate_limited_seconds']:.1f}s rate-limited)")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Streaming Scan Pipeline
+Symbols flow through named stages (fetch → indicators → score → filter) on
+worker threads connected by bounded queues, and every finished item reaches
+the sink as soon as it is ready - so an alert found on symbol #12 doesn't wait
+for symbol #600. Per-stage metrics show where the pipeline backs up: time
+spent waiting for input (starved) vs blocked on a full output queue (backpressure)
+"""
+
+import os
+import time
+import queue
+import threading
+from typing import Callable, Dict, List, Optional
+
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '64'))
+
+_DONE = object()  # End-of-stream marker, passed from stage to stage
+
+class Stage:
+    """One pipeline step: func(symbol, value) -> value for the next stage, or None to drop the item"""
+    
+    def __init__(self, name: str, func: Callable, workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.stats = {'processed': 0, 'dropped': 0, 'errors': 0, 'busy_seconds': 0.0,
+                      'starved_seconds': 0.0, 'blocked_seconds': 0.0, 'max_queue_depth': 0}
+    
+    def record(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                if key == 'max_queue_depth':
+                    self.stats[key] = max(self.stats[key], value)
+                else:
+                    self.stats[key] += value
+
+class ScanPipeline:
+    """Bounded-queue pipeline of thread stages ending in a sink called on the caller's thread"""
+    
+    def __init__(self, stages: List[Stage], queue_size: int = PIPELINE_QUEUE_SIZE):
+        self.stages = stages
+        self.queue_size = queue_size
+    
+    def run(self, symbols: List[str], sink: Callable, on_error: Optional[Callable] = None,
+            deadline: Optional[float] = None) -> Dict:
+        """
+        Push every symbol through the stages; sink(index, symbol, value) gets each
+        surviving item in completion order. Returns the run report with per-stage metrics
+        With a deadline (epoch seconds) the scan stops cleanly: no symbol starts the first
+        stage after it, items already past the first stage still finish, the rest are 'skipped'
+        """
+        started = time.time()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        errors = {}
+        errors_lock = threading.Lock()
+        skipped = []
+        
+        def past_deadline():
+            return deadline is not None and time.time() >= deadline
+        
+        def record_error(symbol, error):
+            with errors_lock:
+                errors[symbol] = str(error)
+            if on_error:
+                on_error(symbol, error)
+        
+        def source():
+            for index, symbol in enumerate(symbols):
+                if past_deadline():
+                    with errors_lock:
+                        skipped.extend((i, s) for i, s in enumerate(symbols[index:], index))
+                    break
+                queues[0].put((index, symbol, None))
+            queues[0].put(_DONE)
+        
+        def worker(stage: Stage, inbox: queue.Queue, outbox: queue.Queue, remaining: List[int], lock: threading.Lock):
+            while True:
+                waited = time.time()
+                item = inbox.get()
+                stage.record(starved_seconds=time.time() - waited, max_queue_depth=inbox.qsize() + 1)
+                if item is _DONE:
+                    inbox.put(_DONE)  # Let the stage's other workers see it too
+                    with lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    if last:
+                        outbox.put(_DONE)
+                    return
+                
+                index, symbol, value = item
+                if stage is self.stages[0] and past_deadline():
+                    with errors_lock:
+                        skipped.append((index, symbol))  # Queued before the deadline, never started
+                    continue
+                began = time.time()
+                try:
+                    value = stage.func(symbol, value)
+                except Exception as e:
+                    stage.record(errors=1, busy_seconds=time.time() - began)
+                    record_error(symbol, e)
+                    continue
+                stage.record(busy_seconds=time.time() - began)
+                if value is None:
+                    stage.record(dropped=1)
+                    continue
+                
+                stage.record(processed=1)
+                blocked = time.time()
+                outbox.put((index, symbol, value))
+                stage.record(blocked_seconds=time.time() - blocked)
+        
+        threads = [threading.Thread(target=source, name="pipeline-source", daemon=True)]
+        for position, stage in enumerate(self.stages):
+            stage.reset()
+            remaining, lock = [stage.workers], threading.Lock()
+            for n in range(stage.workers):
+                threads.append(threading.Thread(target=worker, name=f"pipeline-{stage.name}-{n}", daemon=True,
+                                                args=(stage, queues[position], queues[position + 1], remaining, lock)))
+        for thread in threads:
+            thread.start()
+        
+        # Sink runs here, on the caller's thread
+        delivered = 0
+        sink_seconds = 0.0
+        outbox = queues[-1]
+        while True:
+            item = outbox.get()
+            if item is _DONE:
+                break
+            index, symbol, value = item
+            began = time.time()
+            try:
+                sink(index, symbol, value)
+                delivered += 1
+            except Exception as e:
+                record_error(symbol, e)
+            sink_seconds += time.time() - began
+        for thread in threads:
+            thread.join()
+        
+        return {
+            'symbols': len(symbols),
+            'delivered': delivered,
+            'errors': errors,
+            'skipped': [symbol for _, symbol in sorted(skipped)],
+            'seconds': round(time.time() - started, 2),
+            'sink_seconds': round(sink_seconds, 2),
+            'stages': {stage.name: {k: round(v, 2) if isinstance(v, float) else v for k, v in stage.stats.items()}
+                       | {'workers': stage.workers} for stage in self.stages}
+        }
+
+def format_pipeline_report(report: Dict) -> str:
+    """One log line per stage: throughput plus where its time went"""
+    lines = [f"🚰 Pipeline: {report['delivered']}/{report['symbols']} symbols in {report['seconds']:.1f}s "
+             f"({len(report['errors'])} errors, sink {report['sink_seconds']:.1f}s)"]
+    if report.get('skipped'):
+        lines[0] += f" | deadline: {len(report['skipped'])} not started"
+    for name, stats in report['stages'].items():
+        lines.append(f"   {name:10s} x{stats['workers']:<2d} {stats['processed']:4d} out, {stats['dropped']:3d} dropped | "
+                     f"busy {stats['busy_seconds']:.1f}s, starved {stats['starved_seconds']:.1f}s, "
+                     f"blocked {stats['blocked_seconds']:.1f}s, queue peak {stats['max_queue_depth']}")
+    return "\n".join(lines)
@@ -6,18 +6,31 @@ Runs every hour but only sends emails when stock recommendations change
 
 import schedule
 import time
-import yfinance as yf
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 import holidays
 from enhanced_yahoo_client import EnhancedYahooClient
+from bar_store import get_history, update_bars, update_intraday_bars, BATCH_DOWNLOAD_SIZE
+from indicators import INDICATOR_LOOKBACK, ROC_PERIOD
+from streaming_indicators import get_streaming_indicators, save_streaming_state, streaming_store
+from multi_timeframe import get_timeframe_trend, refresh_timeframe_trends
+from cross_sectional import add_cross_sectional_ranks, SNAPSHOT_FEATURES
+from scan_executor import run_hybrid_scan, SCAN_IO_WORKERS
+from scan_pipeline import ScanPipeline, Stage, format_pipeline_report
+from prefilter import run_prefilter, audit_misses, estimate_misses, format_prefilter_report, quote_snapshot
+from adaptive_schedule import plan_scan_cycle, record_scan_cycle, format_schedule_report
+from distributed_scan import DISTRIBUTED_SCAN_ENABLED, run_distributed_scan, format_distributed_report
+from scan_coverage import (ScanDeadline, BAR_REFRESH_SHARE, prioritize_symbols, get_carryover, save_carryover,
+                           format_coverage)
+from symbol_quarantine import quarantine, screen_symbols
 import json
 import os
 import hashlib
 import sys
-import requests
+from http_client import http_post, http_client
+from cache_warmup import warm_caches, format_warmup_report, warmup_time, WARMUP_LEAD_MINUTES
 from dotenv import load_dotenv
 sys.path.append('utils')
 from stock_change_tracker import track_watchlist_changes, get_stock_status, format_stock_with_status
@@ -40,6 +53,14 @@ RECOMMENDATIONS_FILE = "last_recommendations.json"
 OVERNIGHT_ACTIONS_FILE = "overnight_actions.json"
 LOG_FILE = "scheduled_alerts.log"
 
+# Report job times (EST) - each job's cache warm-up runs WARMUP_LEAD_MINUTES earlier
+MORNING_BRIEF_TIME = "07:00"
+DAILY_SUMMARY_TIME = "16:05"
+WEEKEND_SUMMARY_TIME = "08:00"
+
+# New BUYs at or above this score are alerted mid-scan instead of waiting for the summary
+PRIORITY_BUY_SCORE = 9
+
 def load_sent_alerts():
     """Load previously sent alerts to avoid duplicates"""
     if os.path.exists(ALERTS_FILE):
@@ -151,17 +172,23 @@ def get_recommendations_hash(buy_signals, watch_signals):
     combined = f"{','.join(buy_sorted)}|{','.join(watch_sorted)}"
     return hashlib.md5(combined.encode()).hexdigest()
 
-def detect_significant_changes(current_buy, current_watch):
-    """Detect significant changes in recommendations with enhanced logic"""
+def detect_significant_changes(current_buy, current_watch, skipped=()):
+    """
+    Detect significant changes in recommendations with enhanced logic
+    `skipped`: symbols a deadline-cut run never got to - their previous signals are left out
+    instead of being reported as removed, so changes cover only what was scanned
+    """
     last_data = load_last_recommendations()
+    skipped = set(skipped)
     
     # Get current symbols with scores
     current_buy_data = {s['symbol']: s['score'] for s in current_buy}
     current_watch_data = {s['symbol']: s['score'] for s in current_watch}
     
     # Get previous symbols with scores
-    last_buy_data = {s['symbol']: s['score'] for s in last_data.get('buy_signals', [])}
-    last_watch_data = {s['symbol']: s['score'] for s in last_data.get('watch_signals', [])}
+    last_buy_data = {s['symbol']: s['score'] for s in last_data.get('buy_signals', []) if s['symbol'] not in skipped}
+    last_watch_data = {s['symbol']: s['score'] for s in last_data.get('watch_signals', [])
+                       if s['symbol'] not in skipped}
     
     # Current and previous symbol sets
     current_buy_symbols = set(current_buy_data.keys())
@@ -343,42 +370,64 @@ def calculate_growth_potential_simple(close_prices, rsi, macd, signal, volume_ra
     
     return growth_potential, min(confidence, 1.0)
 
-def get_technical_score(symbol):
+def load_score_history(symbol, refresh=True):
+    """
+    Stored bars for scoring, None if there are too few
+    The hourly scan passes refresh=False: it already refreshed the store in bulk, and symbols a
+    deadline cut out of that refresh must score from their stored bars, not download one by one
+    """
+    hist = get_history(symbol, period=INDICATOR_LOOKBACK, refresh=refresh)
+    
+    if hist.empty or len(hist) < 20:
+        return None
+    return hist
+
+def fetch_score_inputs(symbol, refresh=True):
+    """
+    I/O stage of get_technical_score: stored bars, streamed indicator state and the
+    weekly/monthly trend. Stays in the scheduler process, which owns the streaming state
+    """
+    hist = load_score_history(symbol, refresh)
+    return build_score_inputs(symbol, hist) if hist is not None else None
+
+def build_score_inputs(symbol, hist):
+    """Streamed indicator values, recent changes and the weekly/monthly trend for one symbol"""
+    # Technical indicators - streamed state from the last run plus only the new bars
+    state = get_streaming_indicators(symbol, hist)
+    return {
+        'indicators': state.values(),
+        'changes': {'1w': state.change(4), '2w': state.change(9), '1m': state.change(19),
+                    'roc': state.change(ROC_PERIOD)},
+        'trend': get_timeframe_trend(symbol) or {},
+        'close': hist['Close'].tail(5)
+    }
+
+def get_technical_score(symbol, refresh=True):
     """Get technical analysis score for a stock with 7% growth filter"""
     try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="3mo")
-        
-        if hist.empty or len(hist) < 20:
-            return None
-        
-        close = hist['Close']
-        volume = hist['Volume']
-        
-        # Technical indicators
-        ma_20 = close.rolling(window=20).mean().iloc[-1]
-        ma_50 = close.rolling(window=50).mean().iloc[-1]
-        
-        # RSI
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = (100 - (100 / (1 + rs))).iloc[-1]
-        
-        # MACD
-        exp1 = close.ewm(span=12).mean()
-        exp2 = close.ewm(span=26).mean()
-        macd_line = exp1 - exp2
-        macd = macd_line.iloc[-1]
-        signal = macd_line.ewm(span=9).mean().iloc[-1]
+        inputs = fetch_score_inputs(symbol, refresh)
+    except Exception as e:
+        print(f"Error analyzing {symbol}: {e}")
+        return None
+    return score_technical_inputs(symbol, inputs) if inputs else None
+
+def score_technical_inputs(symbol, inputs):
+    """CPU stage of get_technical_score - module-level so it can run in a worker process"""
+    try:
+        close = inputs['close']
+        indicators = inputs['indicators']
+        ma_20 = indicators['sma_20']
+        ma_50 = indicators['sma_50']
+        rsi = indicators['rsi']
+        macd = indicators['macd']
+        signal = indicators['signal']
         
-        current_price = close.iloc[-1]
+        current_price = indicators['price']
         
         # Calculate recent growth
-        price_1w = ((close.iloc[-1] - close.iloc[-5]) / close.iloc[-5]) * 100 if len(close) >= 5 else 0
-        price_2w = ((close.iloc[-1] - close.iloc[-10]) / close.iloc[-10]) * 100 if len(close) >= 10 else 0
-        price_1m = ((close.iloc[-1] - close.iloc[-20]) / close.iloc[-20]) * 100 if len(close) >= 20 else 0
+        price_1w = inputs['changes']['1w']
+        price_2w = inputs['changes']['2w']
+        price_1m = inputs['changes']['1m']
         
         # Scoring system
         score = 0
@@ -407,13 +456,20 @@ def get_technical_score(symbol):
             signals.append("MACD bullish")
         
         # Volume analysis
-        avg_volume = volume.tail(20).mean()
-        recent_volume = volume.iloc[-1]
-        volume_ratio = recent_volume / avg_volume if avg_volume > 0 else 1
+        volume_ratio = indicators['volume_ratio']
         if volume_ratio > 1.2:
             score += 1
             signals.append("High volume")
         
+        # Weekly/monthly confirmation (resampled from the stored daily bars)
+        trend = inputs['trend']
+        if trend.get('weekly_bullish'):
+            signals.append(f"Weekly trend confirmed (RSI {trend['weekly_rsi']:.1f})")
+        if trend.get('monthly_uptrend'):
+            signals.append(f"Monthly MA rising ({trend['monthly_ma_slope']:+.1f}%)")
+        if trend.get('weekly_bullish') and trend.get('monthly_uptrend'):
+            score += 1
+        
         # Calculate growth potential
         growth_potential, growth_confidence = calculate_growth_potential_simple(
             close, rsi, macd, signal, volume_ratio
@@ -446,12 +502,154 @@ def get_technical_score(symbol):
             'meets_growth_requirement': meets_growth_requirement,
             'price_1w': price_1w,
             'price_2w': price_2w,
-            'price_1m': price_1m
+            'price_1m': price_1m,
+            'roc': inputs['changes']['roc'],
+            'volume_ratio': volume_ratio,
+            'weekly_rsi': trend.get('weekly_rsi'),
+            'weekly_bullish': trend.get('weekly_bullish', False),
+            'monthly_ma_slope': trend.get('monthly_ma_slope'),
+            'monthly_uptrend': trend.get('monthly_uptrend', False)
         }
     except Exception as e:
         print(f"Error analyzing {symbol}: {e}")
         return None
 
+def apply_peer_ranks(analyses, snapshot=None):
+    """
+    Rank the scored symbols (universe and sector percentiles) and reward momentum leaders
+    With the prefilter's quote snapshot the peers are the whole universe - symbols this cycle
+    didn't deep-scan count with their stored-bar values - so the ranks don't move with the
+    cycle's budgeted, hot-biased subset
+    A stock in the top 10% of the universe and top 20% of its sector gets one point
+    """
+    scored = [analysis for analysis in analyses if analysis]
+    universe = None
+    if snapshot is not None:
+        universe = snapshot.rename(columns={column: name for name, column in SNAPSHOT_FEATURES.items()})
+    report = add_cross_sectional_ranks(scored, universe=universe)
+    for analysis in scored:
+        if analysis.get('momentum_pct', 0) >= 0.9 and analysis.get('momentum_sector_pct', 0) >= 0.8:
+            analysis['score'] += 1
+            analysis['signals'].append(f"Momentum leader (top {(1 - analysis['momentum_pct']) * 100:.0f}% of universe, "
+                                       f"top {(1 - analysis['momentum_sector_pct']) * 100:.0f}% of {analysis['sector']})")
+    return report
+
+def is_priority_buy(analysis, buy_threshold, previous_buy, alerted_today):
+    """A new STRONG BUY: high score, passes the growth filter, and not a BUY (or alerted) already"""
+    return (analysis['score'] >= max(PRIORITY_BUY_SCORE, buy_threshold)
+            and analysis.get('meets_growth_requirement', False)
+            and analysis['symbol'] not in previous_buy and analysis['symbol'] not in alerted_today)
+
+def send_priority_alert(analysis, session):
+    """Telegram alert for one STRONG BUY, sent mid-scan without waiting for the summary"""
+    message = (f"🚨 *PRIORITY BUY: {analysis['symbol']}* (score {analysis['score']})\n"
+               f"💰 ${analysis['current_price']:.2f} | RSI {analysis['rsi']:.1f} | {session.replace('_', ' ').title()}\n"
+               + "\n".join(f"• {signal}" for signal in analysis['signals'][:6])
+               + "\n\n_Full summary follows when the scan completes_")
+    return send_telegram_message(message)
+
+def run_streaming_scan(monitor_stocks, buy_threshold, session, deadline=None):
+    """
+    Score the universe through the staged pipeline (fetch → indicators → score → filter)
+    New STRONG BUYs are alerted the moment they are scored; everything else waits for the summary
+    With a deadline (epoch seconds) symbols not started by then are in the report's 'skipped'
+    Returns (analyses in universe order, pipeline report, symbols alerted early)
+    """
+    previous_buy = {s['symbol'] for s in load_last_recommendations().get('buy_signals', [])}
+    today = datetime.now().strftime('%Y-%m-%d')
+    sent_alerts = load_sent_alerts()
+    alerted_today = set(sent_alerts.get('priority_buy', {}).get(today, []))
+    analyses = [None] * len(monitor_stocks)
+    alerted = []
+    
+    def tag_priority(symbol, analysis):
+        # Nothing is dropped here: peer ranks need the whole snapshot at the end
+        analysis['priority'] = is_priority_buy(analysis, buy_threshold, previous_buy, alerted_today)
+        return analysis
+    
+    def deliver(index, symbol, analysis):
+        analyses[index] = analysis
+        if analysis['priority']:
+            log_message(f"🚨 Priority BUY found mid-scan: {symbol} (score {analysis['score']})")
+            send_priority_alert(analysis, session)
+            alerted_today.add(symbol)
+            alerted.append(symbol)
+            save_sent_alerts({**sent_alerts, 'priority_buy': {today: sorted(alerted_today)}})
+    
+    pipeline = ScanPipeline([
+        Stage('fetch', lambda symbol, _: load_score_history(symbol, refresh=False), workers=SCAN_IO_WORKERS),
+        Stage('indicators', build_score_inputs, workers=4),
+        Stage('score', score_technical_inputs, workers=2),
+        Stage('filter', tag_priority)
+    ])
+    report = pipeline.run(monitor_stocks, deliver,
+                          on_error=lambda symbol, e: log_message(f"⚠️ Error analyzing {symbol}: {e}"),
+                          deadline=deadline)
+    return analyses, report, alerted
+
+def score_shard(symbols):
+    """
+    Distributed scan task, run on a worker: one trend pass for the shard, then the usual score
+    Workers don't checkpoint the streaming state - each analysis carries its symbol's advanced
+    state under 'streaming_state' for the coordinator to merge, so its checkpoint stays the only writer
+    """
+    refresh_timeframe_trends(symbols)
+    analyses = [get_technical_score(symbol, refresh=False) for symbol in symbols]  # The coordinator refreshed the bars
+    states = streaming_store.export_states(symbols)
+    for analysis in analyses:
+        if analysis and analysis['symbol'] in states:
+            analysis['streaming_state'] = states[analysis['symbol']]
+    return analyses
+
+def run_distributed_market_scan(monitor_stocks, buy_threshold, session, deadline=None):
+    """
+    Score the universe on the shard workers (see distributed_scan.py)
+    Priority BUYs are alerted as each shard lands; same return shape as run_streaming_scan
+    """
+    previous_buy = {s['symbol'] for s in load_last_recommendations().get('buy_signals', [])}
+    today = datetime.now().strftime('%Y-%m-%d')
+    sent_alerts = load_sent_alerts()
+    alerted_today = set(sent_alerts.get('priority_buy', {}).get(today, []))
+    alerted = []
+    
+    def deliver_shard(symbols, results):
+        streaming_store.merge_states({analysis['symbol']: analysis.pop('streaming_state')
+                                      for analysis in results if analysis and 'streaming_state' in analysis})
+        for analysis in results:
+            if analysis and is_priority_buy(analysis, buy_threshold, previous_buy, alerted_today):
+                log_message(f"🚨 Priority BUY found mid-scan: {analysis['symbol']} (score {analysis['score']})")
+                send_priority_alert(analysis, session)
+                alerted_today.add(analysis['symbol'])
+                alerted.append(analysis['symbol'])
+                save_sent_alerts({**sent_alerts, 'priority_buy': {today: sorted(alerted_today)}})
+    
+    timeout = {'timeout': max(0.0, deadline - time.time())} if deadline is not None else {}
+    report = run_distributed_scan(monitor_stocks, 'scheduled_market_alerts:score_shard', on_shard=deliver_shard,
+                                  **timeout)
+    return report['analyses'], report, alerted
+
+def refresh_bar_store(symbols, session, deadline=None):
+    """
+    Refresh the local bar store in bulk - only missing days (or, during regular hours, only the
+    intraday bars since the last poll) are downloaded. With a deadline the refresh goes one batch
+    at a time in the given order and stops once it passes; returns (report, symbols not refreshed)
+    """
+    update = update_intraday_bars if session == "REGULAR_HOURS" else update_bars
+    if deadline is None:
+        return update(symbols), []
+    
+    started = time.time()
+    report = {}
+    for i in range(0, len(symbols), BATCH_DOWNLOAD_SIZE):
+        if time.time() >= deadline:
+            report['seconds'] = round(time.time() - started, 2)
+            return report, symbols[i:]
+        for key, value in update(symbols[i:i + BATCH_DOWNLOAD_SIZE]).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                report[key] = report.get(key, 0) + value
+    report['seconds'] = round(time.time() - started, 2)
+    return report, []
+
 def analyze_market_24x7():
     """24/7 market analysis with session-aware monitoring"""
     now = datetime.now()
@@ -462,6 +660,7 @@ def analyze_market_24x7():
         return
     
     log_message(f"🔍 Running {session} analysis at {now.strftime('%H:%M')} ({now.strftime('%A')})")
+    deadline = ScanDeadline()  # Stop cleanly instead of running into the next hourly run
     
     # Get market data (with error handling for off-hours)
     try:
@@ -491,41 +690,120 @@ def analyze_market_24x7():
         buy_threshold = 8
         watch_threshold = 6
     
+    # Leave out symbols that keep failing (delisted/renamed) - they are re-probed once their backoff expires
+    monitor_stocks, quarantined = quarantine.screen(monitor_stocks)
+    if quarantined:
+        log_message(f"🚧 Skipping {len(quarantined)} quarantined symbols: {', '.join(quarantined[:10])}")
+    
     log_message(f"📊 Analyzing {len(monitor_stocks)} stocks (thresholds: BUY≥{buy_threshold}, WATCH≥{watch_threshold})")
     
+    last_data = load_last_recommendations()
+    current_names = [s['symbol'] for s in last_data.get('buy_signals', []) + last_data.get('watch_signals', [])]
+    carryover = get_carryover()
+    if deadline.at is not None:
+        # Time budget: current BUY/WATCH first, then what the last run skipped, then the most
+        # liquid names (dollar volume from the stored bars) - a deadline cut drops the least important
+        liquidity = quote_snapshot(monitor_stocks)['dollar_volume'].to_dict()
+        monitor_stocks = prioritize_symbols(monitor_stocks, current_names, carryover, liquidity)
+        log_message(f"⏳ Time budget {deadline.seconds / 60:.0f}m: {len(current_names)} signals and "
+                    f"{len(carryover)} carried-over symbols go first")
+    
+    # Refresh the local bar store (within its share of the time budget)
+    store_report, unrefreshed = refresh_bar_store(monitor_stocks, session, deadline.share(BAR_REFRESH_SHARE))
+    if session == "REGULAR_HOURS":
+        log_message(f"⏱️ Intraday poll: {store_report.get('intraday_bars', 0)} bars for "
+                    f"{store_report.get('polled', 0)} symbols ({store_report.get('daily_updated', 0)} daily catch-ups, "
+                    f"{store_report['seconds']:.1f}s)")
+    else:
+        log_message(f"🗄️ Bar store refreshed: {store_report.get('bars_downloaded', 0)} new bars "
+                    f"({store_report.get('up_to_date', 0)} symbols already current, {store_report['seconds']:.1f}s)")
+    if unrefreshed:
+        log_message(f"⏳ Bar refresh stopped at {BAR_REFRESH_SHARE:.0%} of the time budget - "
+                    f"{len(unrefreshed)} lower-priority symbols use their stored bars")
+    
+    # Phase one: cheap snapshot of the whole universe, keep what could plausibly reach WATCH
+    # (current BUY/WATCH names always stay in, so they can't drop out unscored)
+    prefilter_report = run_prefilter(monitor_stocks, always_keep=current_names)
+    log_message(format_prefilter_report(prefilter_report))
+    
+    # Adaptive frequency: hot symbols every cycle, quiet ones every few hours, fixed budget per cycle
+    snapshot = prefilter_report['snapshot']
+    # (symbols the last run's deadline skipped are due now, like current signals)
+    scan_plan = plan_scan_cycle(prefilter_report['shortlist'],
+                                snapshot['volatility'].to_dict() if snapshot is not None else None,
+                                current_names + carryover, buy_threshold, watch_threshold)
+    log_message(format_schedule_report(scan_plan))
+    selected = set(scan_plan['selected']) | set(prefilter_report['audit'])
+    scan_stocks = [s for s in monitor_stocks if s in selected]
+    
     # Analyze stocks with progress tracking
     buy_signals = []
     watch_signals = []
-    analyzed_count = 0
     
-    for i, symbol in enumerate(monitor_stocks):
-        try:
-            analysis = get_technical_score(symbol)
-            if analysis:
-                # Apply 7% growth filter for BUY signals
-                if analysis['score'] >= buy_threshold and analysis.get('meets_growth_requirement', False):
-                    buy_signals.append(analysis)
-                elif analysis['score'] >= watch_threshold:
-                    watch_signals.append(analysis)
-            analyzed_count += 1
-            
-            # Progress update every 25 stocks
-            if (i + 1) % 25 == 0:
-                log_message(f"   📈 Analyzed {i + 1}/{len(monitor_stocks)} stocks...")
-                
-        except Exception as e:
-            log_message(f"⚠️ Error analyzing {symbol}: {e}")
-            continue
+    # Phase two: deep scan of the shortlist (plus the audit sample) in priority order - priority
+    # BUYs go out as soon as they are scored, nothing new starts after the deadline
+    if DISTRIBUTED_SCAN_ENABLED:
+        # Sharded across worker processes/nodes; each worker computes its shard's trends
+        analyses, scan_report, priority_alerts = run_distributed_market_scan(scan_stocks, buy_threshold, session,
+                                                                             deadline.at)
+        log_message(format_distributed_report(scan_report))
+    else:
+        # Weekly/monthly trends for the whole scan in one pass over the stored bars
+        trend_report = refresh_timeframe_trends(scan_stocks)
+        log_message(f"🗓️ Weekly/monthly trends for {trend_report['symbols']} symbols in {trend_report['seconds']:.1f}s")
+        analyses, scan_report, priority_alerts = run_streaming_scan(scan_stocks, buy_threshold, session, deadline.at)
+        log_message(format_pipeline_report(scan_report))
+    
+    # Coverage: what the deadline let us scan; the rest goes to the front of the next run
+    skipped = scan_report['skipped']
+    skipped_set = set(skipped)
+    covered = [s for s in scan_stocks if s not in skipped_set]
+    coverage = format_coverage(len(covered), len(scan_stocks), deadline.elapsed(), len(skipped))
+    log_message(f"📏 Coverage: {coverage}")
+    save_carryover(skipped)
+    analyzed_count = len(covered) - len(scan_report['errors'])
+    record_scan_cycle(analyses, covered)
+    if priority_alerts:
+        log_message(f"🚨 {len(priority_alerts)} priority BUY alerts sent mid-scan: {', '.join(priority_alerts)}")
+    rank_report = apply_peer_ranks(analyses, prefilter_report['snapshot'])
+    log_message(f"🏅 Ranked {rank_report['symbols']} symbols against {rank_report.get('peers', 0)} universe peers "
+                f"and their sectors in {rank_report['milliseconds']:.0f}ms")
+    
+    for analysis in analyses:
+        if analysis:
+            # Apply 7% growth filter for BUY signals
+            if analysis['score'] >= buy_threshold and analysis.get('meets_growth_requirement', False):
+                buy_signals.append(analysis)
+            elif analysis['score'] >= watch_threshold:
+                watch_signals.append(analysis)
+    
+    # Did phase one prune anything that turned out to be a signal?
+    # (the audit is a sample - the report extrapolates its misses to the whole pruned set)
+    missed = audit_misses(analyses, prefilter_report['audit'], watch_threshold)
+    audit_sampled = len([s for s in prefilter_report['audit'] if s not in skipped_set])
+    log_message(format_prefilter_report(prefilter_report, missed, audit_sampled))
     
     # Sort by score
     buy_signals.sort(key=lambda x: x['score'], reverse=True)
     watch_signals.sort(key=lambda x: x['score'], reverse=True)
     
-    # Check for significant changes
-    changes = detect_significant_changes(buy_signals, watch_signals)
+    # Check for significant changes - only among the symbols this run covered
+    changes = detect_significant_changes(buy_signals, watch_signals, skipped)
+    
+    # Signals the deadline kept us from re-checking stay as they were until a run covers them
+    if skipped:
+        buy_signals += [s for s in last_data.get('buy_signals', []) if s['symbol'] in skipped_set]
+        watch_signals += [s for s in last_data.get('watch_signals', []) if s['symbol'] in skipped_set]
+        buy_signals.sort(key=lambda x: x['score'], reverse=True)
+        watch_signals.sort(key=lambda x: x['score'], reverse=True)
     
     log_message(f"📊 Analysis complete: {len(buy_signals)} BUY, {len(watch_signals)} WATCH signals")
     log_message(f"🔄 Changes: {changes['change_summary']}")
+    log_message(http_client.format_stats())
+    
+    # Checkpoint indicator state so the next run only applies new bars
+    save_streaming_state()
+    log_message(streaming_store.format_stats())
     
     # Track overnight actions if applicable
     if is_overnight_period() and changes['has_changes']:
@@ -541,7 +819,7 @@ def analyze_market_24x7():
     
     if changes['has_changes']:
         log_message("🚨 Significant changes detected - sending email alert!")
-        send_enhanced_alert(buy_signals, watch_signals, changes, earnings, themes, session)
+        send_enhanced_alert(buy_signals, watch_signals, changes, earnings, themes, session, coverage)
         
         # Save current recommendations
         save_recommendations({
@@ -549,7 +827,12 @@ def analyze_market_24x7():
             'watch_signals': watch_signals,
             'timestamp': now.isoformat(),
             'session': session,
-            'analyzed_stocks': analyzed_count
+            'analyzed_stocks': analyzed_count,
+            'coverage': coverage,
+            'prefilter': {'pruned': len(prefilter_report['pruned']), 'audited': audit_sampled,
+                          'missed': [a['symbol'] for a in missed],
+                          'estimated_misses': estimate_misses(len(missed), audit_sampled,
+                                                              len(prefilter_report['pruned']))['estimated_misses']}
         })
     else:
         log_message("✅ No significant changes - no email sent")
@@ -559,10 +842,12 @@ def analyze_market_24x7():
         last_data = load_last_recommendations()
         last_data['timestamp'] = now.isoformat()
         last_data['session'] = session
+        last_data['coverage'] = coverage
         save_recommendations(last_data)
 
-def send_enhanced_alert(buy_signals, watch_signals, changes, earnings=None, themes=None, session="REGULAR_HOURS"):
-    """Send enhanced email alert with session-aware formatting"""
+def send_enhanced_alert(buy_signals, watch_signals, changes, earnings=None, themes=None, session="REGULAR_HOURS",
+                        coverage=None):
+    """Send enhanced email alert with session-aware formatting (`coverage`: the scan's coverage line)"""
     now = datetime.now()
     
     # Determine alert type based on session and time
@@ -604,7 +889,10 @@ def send_enhanced_alert(buy_signals, watch_signals, changes, earnings=None, them
 {'=' * 60}
 {now.strftime('%Y-%m-%d %H:%M:%S')} EST | {now.strftime('%A')}
 Session: {session_name} | Monitoring: 24/7
-
+"""
+    if coverage:
+        body += f"📏 Coverage: {coverage}\n"
+    body += """
 🔄 SIGNIFICANT CHANGES DETECTED
 ===============================
 """
@@ -721,6 +1009,54 @@ Session: {session_name} | Monitoring: 24/7
     
     send_email(subject, body)
 
+def get_morning_symbols():
+    """Symbols analyzed by the morning consolidation"""
+    from stock_universe import get_comprehensive_stock_list
+    return get_comprehensive_stock_list()[:100]  # Morning pre-market analysis
+
+def get_daily_summary_symbols():
+    """Symbols analyzed by the end-of-day summary"""
+    from stock_universe import get_comprehensive_stock_list
+    return get_comprehensive_stock_list()[:250]  # Comprehensive end-of-day analysis
+
+def get_weekend_symbols():
+    """Stocks with international exposure analyzed by the weekend summary"""
+    from stock_universe import get_comprehensive_stock_list
+    all_stocks = get_comprehensive_stock_list()
+    
+    # Filter for stocks with international exposure
+    return [s for s in all_stocks if s in [
+        'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'NVDA', 'META',  # Global tech
+        'JPM', 'BAC', 'GS', 'MS',  # Global banks
+        'XOM', 'CVX', 'COP',  # Energy with global operations
+        'JNJ', 'PFE', 'UNH',  # Healthcare multinationals
+        'KO', 'PEP', 'MCD', 'SBUX',  # Global consumer brands
+        'DIS', 'NFLX', 'CMCSA'  # Global media
+    ]][:30]  # Top 30 international exposure stocks
+
+def run_warmup(job_name, symbols):
+    """Prefetch everything a report job needs into the local caches"""
+    log_message(f"🔥 Warming caches for {job_name}...")
+    report = warm_caches(symbols)
+    log_message(format_warmup_report(report))
+    return report
+
+def warm_morning_consolidation():
+    """Warm-up ahead of the 7:00 AM morning consolidation"""
+    if not is_market_day():
+        return
+    run_warmup("morning consolidation", get_morning_symbols())
+
+def warm_daily_summary():
+    """Warm-up ahead of the 4:05 PM daily summary"""
+    if not is_market_day():
+        return
+    run_warmup("daily summary", get_daily_summary_symbols())
+
+def warm_weekend_summary():
+    """Warm-up ahead of the Saturday weekend summary"""
+    run_warmup("weekend summary", get_weekend_symbols())
+
 def send_daily_summary():
     """Send comprehensive end-of-day summary"""
     if get_market_session() != "REGULAR_HOURS":
@@ -729,9 +1065,9 @@ def send_daily_summary():
     print("📊 Sending comprehensive daily summary...")
     
     # Get final recommendations for the day
-    from stock_universe import get_comprehensive_stock_list
-    all_stocks = get_comprehensive_stock_list()
-    monitor_stocks = all_stocks[:250]  # Comprehensive end-of-day analysis
+    # Forced: the warm-up ran before the close, so its bars are still intraday partials
+    monitor_stocks = screen_symbols(get_daily_summary_symbols())
+    update_bars(monitor_stocks, force=True)
     
     buy_signals = []
     watch_signals = []
@@ -866,18 +1202,8 @@ def send_weekend_summary():
     print("🌍 Sending weekend international exposure summary...")
     
     # Focus on international exposure stocks
-    from stock_universe import get_comprehensive_stock_list
-    all_stocks = get_comprehensive_stock_list()
-    
-    # Filter for stocks with international exposure
-    international_symbols = [s for s in all_stocks if s in [
-        'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'NVDA', 'META',  # Global tech
-        'JPM', 'BAC', 'GS', 'MS',  # Global banks
-        'XOM', 'CVX', 'COP',  # Energy with global operations
-        'JNJ', 'PFE', 'UNH',  # Healthcare multinationals
-        'KO', 'PEP', 'MCD', 'SBUX',  # Global consumer brands
-        'DIS', 'NFLX', 'CMCSA'  # Global media
-    ]][:30]  # Top 30 international exposure stocks
+    international_symbols = screen_symbols(get_weekend_symbols())
+    update_bars(international_symbols)
     
     buy_signals = []
     watch_signals = []
@@ -979,7 +1305,7 @@ def send_telegram_message(message, parse_mode='Markdown'):
                 'disable_web_page_preview': True
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = http_post(url, json=payload, timeout=10)
             
             if response.status_code == 200:
                 log_message(f"✅ Telegram message sent (part {i+1}/{len(messages)})")
@@ -1160,15 +1486,15 @@ def send_morning_consolidation():
         themes = None
     
     # Get current recommendations for morning context
-    from stock_universe import get_comprehensive_stock_list
-    all_stocks = get_comprehensive_stock_list()
-    monitor_stocks = all_stocks[:100]  # Morning pre-market analysis
+    monitor_stocks = screen_symbols(get_morning_symbols())
+    update_bars(monitor_stocks)
     
     buy_signals = []
     watch_signals = []
     
-    for symbol in monitor_stocks:
-        analysis = get_technical_score(symbol)
+    # fetch_score_inputs already computes the indicators, so scoring stays in-process (a worker would only get floats)
+    analyses, _ = run_hybrid_scan(monitor_stocks, fetch_score_inputs, score_technical_inputs, cpu_workers=1)
+    for analysis in analyses:
         if analysis:
             # Apply 7% growth filter for BUY signals (pre-market)
             if analysis['score'] >= 8 and analysis.get('meets_growth_requirement', False):
@@ -1331,14 +1657,19 @@ def main():
     # Schedule 24/7 hourly analysis
     schedule.every().hour.do(analyze_market_24x7)
     
+    # Cache warm-ups run ahead of each report job so the reports are mostly compute
+    schedule.every().day.at(warmup_time(MORNING_BRIEF_TIME)).do(warm_morning_consolidation)
+    schedule.every().day.at(warmup_time(DAILY_SUMMARY_TIME)).do(warm_daily_summary)
+    schedule.every().saturday.at(warmup_time(WEEKEND_SUMMARY_TIME)).do(warm_weekend_summary)
+    
     # Schedule morning consolidation email (7:00 AM)
-    schedule.every().day.at("07:00").do(send_morning_consolidation)
+    schedule.every().day.at(MORNING_BRIEF_TIME).do(send_morning_consolidation)
     
     # Schedule daily summary at market close
-    schedule.every().day.at("16:05").do(send_daily_summary)
+    schedule.every().day.at(DAILY_SUMMARY_TIME).do(send_daily_summary)
     
     # Schedule weekend summary (Saturday 8 AM)
-    schedule.every().saturday.at("08:00").do(send_weekend_summary)
+    schedule.every().saturday.at(WEEKEND_SUMMARY_TIME).do(send_weekend_summary)
     
     print("📅 24/7 MONITORING SCHEDULE:")
     print("=" * 40)
@@ -1348,6 +1679,7 @@ def main():
     print("💤 Overnight:     8:00 PM - 4:00 AM EST (Paused)")
     print("🌍 Weekends:      Limited international monitoring")
     print("📧 Morning Brief: 7:00 AM EST (Overnight consolidation)")
+    print(f"🔥 Cache Warm-up: {WARMUP_LEAD_MINUTES} min before each report job")
     print()
     print("📧 SMART EMAIL ALERTS:")
     print("=" * 25)
@@ -6,7 +6,8 @@ import asyncio
 import json
 import sys
 from typing import Any, Dict, List, Optional
-import yfinance as yf
+from market_data import get_provider
+from fundamentals_cache import get_fundamentals
 from datetime import datetime, timedelta
 import pandas as pd
 
@@ -23,9 +24,8 @@ class MCPServer:
     async def get_stock_quote(self, symbol: str) -> Dict[str, Any]:
         """Get real-time stock quote"""
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            hist = ticker.history(period="1d")
+            info = get_fundamentals(symbol)
+            hist = get_provider().history(symbol, period="1d")
             
             if hist.empty:
                 return {"error": f"No data found for {symbol}"}
@@ -83,9 +83,8 @@ class MCPServer:
     async def analyze_stock(self, symbol: str) -> Dict[str, Any]:
         """Comprehensive stock analysis"""
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="3mo")
-            info = ticker.info
+            hist = get_provider().history(symbol, period="3mo")
+            info = get_fundamentals(symbol)
             
             if hist.empty:
                 return {"error": f"No data found for {symbol}"}
@@ -4,7 +4,7 @@ CLEANED Comprehensive Stock Universe - Only Valid Tickers
 Validated on 2025-10-31 - 533 valid stocks (82% success rate)
 """
 
-import yfinance as yf
+from fundamentals_cache import get_fundamentals, warm_fundamentals
 import requests
 from datetime import datetime, timedelta
 import json
@@ -261,11 +261,11 @@ def filter_by_market_cap(symbols, min_market_cap=1_000_000_000):
     filtered_stocks = []
     
     print(f"🔍 Filtering {len(symbols)} stocks by market cap (${min_market_cap/1_000_000_000:.0f}B+)...")
+    warm_fundamentals(symbols, silent=False)
     
     for i, symbol in enumerate(symbols):
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = get_fundamentals(symbol)
             market_cap = info.get('marketCap', 0)
             
             if market_cap >= min_market_cap:
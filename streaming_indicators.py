@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Streaming Indicators
+Incremental indicator state per symbol - a new bar costs a few arithmetic
+operations instead of a window recomputation. Committed daily bars update the
+state in O(1); today's still-forming bar is only peeked. State is checkpointed
+to disk so the hourly scheduler picks up where the last run stopped
+
+The EMAs and MACD are the exception: indicators.py anchors them at the first bar
+of the lookback window (pandas adjust=True), so a running EMA would drift from
+the scores every other report computes. They are re-run in one pass over the
+kept closes when values are read - O(window) float arithmetic, no pandas
+"""
+
+import os
+import copy
+import json
+import math
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from market_data import get_provider, MARKET_DATA_PROVIDER
+from indicators import (RSI_PERIOD, MACD_FAST, MACD_SLOW, MACD_SIGNAL, BOLLINGER_PERIOD, BOLLINGER_STD,
+                        STOCH_PERIOD, STOCH_SMOOTH, VOLUME_AVG_PERIOD)
+
+STREAMING_STATE_FILE = os.getenv('STREAMING_STATE_FILE', os.path.join(
+    'data_cache', 'indicator_state_replay.json' if MARKET_DATA_PROVIDER == 'replay' else 'indicator_state.json'))
+STATE_VERSION = 2  # Checkpoints in another layout are ignored and reseeded
+
+RESYNC_EVERY = 500  # Recompute rolling sums from the window buffer to shed float drift
+
+class RollingWindow:
+    """Fixed-size window with O(1) mean and sample variance"""
+    
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+    
+    def update(self, value: float):
+        if len(self.values) == self.window:
+            oldest = self.values[0]
+            self.total -= oldest
+            self.total_sq -= oldest * oldest
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            self.total = sum(self.values)
+            self.total_sq = sum(v * v for v in self.values)
+    
+    def clone(self) -> 'RollingWindow':
+        rolling = copy.copy(self)
+        rolling.values = self.values.copy()
+        return rolling
+    
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+    
+    def mean(self) -> float:
+        return self.total / self.window if self.full else math.nan
+    
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, like pandas rolling std)"""
+        if not self.full:
+            return math.nan
+        variance = (self.total_sq - self.total * self.total / self.window) / (self.window - 1)
+        return math.sqrt(max(variance, 0.0))
+    
+    def to_dict(self) -> Dict:
+        return {'window': self.window, 'values': list(self.values)}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RollingWindow':
+        rolling = cls(data['window'])
+        for value in data['values']:
+            rolling.update(value)
+        return rolling
+
+class RollingExtreme:
+    """Rolling max (or min) over a fixed window with a monotonic deque - amortized O(1)"""
+    
+    def __init__(self, window: int, mode: str = 'max'):
+        self.window = window
+        self.mode = mode
+        self.count = 0
+        self.candidates = deque()  # (bar number, value), values monotonic from the front
+    
+    def update(self, value: float):
+        beats = (lambda a, b: a >= b) if self.mode == 'max' else (lambda a, b: a <= b)
+        while self.candidates and beats(value, self.candidates[-1][1]):
+            self.candidates.pop()
+        self.candidates.append((self.count, value))
+        if self.candidates[0][0] <= self.count - self.window:
+            self.candidates.popleft()
+        self.count += 1
+    
+    def value(self) -> float:
+        return self.candidates[0][1] if self.count >= self.window else math.nan
+    
+    def clone(self) -> 'RollingExtreme':
+        extreme = copy.copy(self)
+        extreme.candidates = self.candidates.copy()
+        return extreme
+    
+    def to_dict(self) -> Dict:
+        return {'window': self.window, 'mode': self.mode, 'count': self.count,
+                'candidates': [list(c) for c in self.candidates]}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RollingExtreme':
+        extreme = cls(data['window'], data['mode'])
+        extreme.count = data['count']
+        extreme.candidates = deque(tuple(c) for c in data['candidates'])
+        return extreme
+
+def windowed_macd(closes: List[float]) -> Tuple[float, float, float]:
+    """
+    Latest (fast EMA, slow EMA, MACD signal) over the window, identical to pandas
+    ewm(span).mean() (adjust=True) as indicators.macd_series computes them - one pass, all three
+    """
+    fast_decay, slow_decay = 1 - 2 / (MACD_FAST + 1), 1 - 2 / (MACD_SLOW + 1)
+    signal_decay = 1 - 2 / (MACD_SIGNAL + 1)
+    fast = fast_weight = slow = slow_weight = signal = signal_weight = 0.0
+    ema_fast = ema_slow = macd_signal = math.nan
+    for close in closes:
+        valid = close == close  # NaN closes decay the weights without adding an observation
+        fast = fast * fast_decay + (close if valid else 0.0)
+        fast_weight = fast_weight * fast_decay + valid
+        slow = slow * slow_decay + (close if valid else 0.0)
+        slow_weight = slow_weight * slow_decay + valid
+        if fast_weight:
+            ema_fast, ema_slow = fast / fast_weight, slow / slow_weight
+            signal = signal * signal_decay + (ema_fast - ema_slow)
+            signal_weight = signal_weight * signal_decay + 1
+            macd_signal = signal / signal_weight
+    return ema_fast, ema_slow, macd_signal
+
+class SymbolIndicatorState:
+    """
+    Every streamed indicator for one symbol
+    The window's closes and OBV flows are kept so the window-anchored indicators (EMAs,
+    MACD, OBV) come out exactly as indicators.py computes them over the same bars
+    """
+    
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.last_date: Optional[str] = None
+        self.last_close = math.nan
+        self.last_volume = math.nan
+        self.bars = 0
+        self.gains = RollingWindow(RSI_PERIOD)
+        self.losses = RollingWindow(RSI_PERIOD)
+        self.sma_20 = RollingWindow(BOLLINGER_PERIOD)
+        self.sma_50 = RollingWindow(50)
+        self.volume = RollingWindow(VOLUME_AVG_PERIOD)
+        self.highest = RollingExtreme(STOCH_PERIOD, 'max')
+        self.lowest = RollingExtreme(STOCH_PERIOD, 'min')
+        self.stoch_k = deque(maxlen=STOCH_SMOOTH)
+        self.closes = deque()  # Closes in the canonical window
+        self.flows = deque()   # Signed volume each window bar adds to OBV
+        self.flow_total = 0.0
+        self.forming: Optional[Tuple[float, float]] = None  # (close, flow) of a peeked bar, kept out of the buffers
+    
+    def update(self, date, high: float, low: float, close: float, volume: float):
+        """Commit one closed bar - O(1)"""
+        flow = self._advance(date, high, low, close, volume)
+        self.closes.append(close)
+        self.flows.append(flow)
+        self.flow_total += flow
+    
+    def _advance(self, date, high: float, low: float, close: float, volume: float) -> float:
+        """Update everything but the window buffers; returns the bar's OBV flow"""
+        flow = 0.0
+        if self.bars:
+            delta = close - self.last_close
+            self.gains.update(max(delta, 0.0))
+            self.losses.update(max(-delta, 0.0))
+            flow = volume if delta > 0 else -volume if delta < 0 else 0.0
+        self.sma_20.update(close)
+        self.sma_50.update(close)
+        self.volume.update(volume)
+        self.highest.update(high)
+        self.lowest.update(low)
+        price_range = self.highest.value() - self.lowest.value()
+        self.stoch_k.append(100 * (close - self.lowest.value()) / price_range if price_range else math.nan)
+        
+        self.last_date = str(pd.Timestamp(date).date())
+        self.last_close = close
+        self.last_volume = volume
+        self.bars += 1
+        return flow
+    
+    def trim(self, window: int):
+        """Drop bars that have left the canonical window (the oldest `len - window`)"""
+        while len(self.closes) > window:
+            self.closes.popleft()
+            self.flow_total -= self.flows.popleft()
+    
+    def clone(self, buffers: bool = True) -> 'SymbolIndicatorState':
+        """Copy for a provisional update; without `buffers` the window closes and flows are shared"""
+        state = copy.copy(self)
+        for key in ('gains', 'losses', 'sma_20', 'sma_50', 'volume', 'highest', 'lowest'):
+            setattr(state, key, getattr(self, key).clone())
+        state.stoch_k = self.stoch_k.copy()
+        if buffers:
+            state.closes = self.closes.copy()
+            state.flows = self.flows.copy()
+        return state
+    
+    def peek(self, date, high: float, low: float, close: float, volume: float) -> 'SymbolIndicatorState':
+        """
+        State as if a still-forming bar were committed, leaving this state untouched
+        The window buffers are shared rather than copied - the bar is held in `forming` - so read
+        the provisional state before this one commits another bar
+        """
+        provisional = self.clone(buffers=False)
+        provisional.forming = (close, provisional._advance(date, high, low, close, volume))
+        return provisional
+    
+    def window_closes(self) -> List[float]:
+        """Closes of the canonical window, the forming bar included"""
+        closes = list(self.closes)
+        if self.forming is not None:
+            closes.append(self.forming[0])
+        return closes
+    
+    def values(self) -> Dict:
+        """Latest indicator values, named like indicators.IndicatorSet"""
+        avg_gain, avg_loss = self.gains.mean(), self.losses.mean()
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            rsi = math.nan
+        else:
+            rsi = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+        
+        sma_20, std_20 = self.sma_20.mean(), self.sma_20.std()
+        upper, lower = sma_20 + BOLLINGER_STD * std_20, sma_20 - BOLLINGER_STD * std_20
+        avg_volume = self.volume.mean()
+        highest, lowest = self.highest.value(), self.lowest.value()
+        
+        closes = self.window_closes()
+        ema_fast, ema_slow, signal = windowed_macd(closes)
+        has_macd = len(closes) >= MACD_SLOW
+        obv = 0.0
+        if self.flows:  # OBV starts at 0 on the window's first bar
+            obv = self.flow_total - self.flows[0] + (self.forming[1] if self.forming is not None else 0.0)
+        
+        return {
+            'price': self.last_close,
+            'rsi': rsi,
+            'sma_20': sma_20,
+            'sma_50': self.sma_50.mean(),
+            'ema_12': ema_fast,
+            'ema_26': ema_slow,
+            'macd': ema_fast - ema_slow if has_macd else 0,
+            'signal': signal if has_macd else 0,
+            'histogram': ema_fast - ema_slow - signal if has_macd else 0,
+            'upper_band': upper,
+            'lower_band': lower,
+            'band_position': (self.last_close - lower) / (upper - lower) if upper != lower else math.nan,
+            'stoch_k': self.stoch_k[-1] if self.stoch_k else math.nan,
+            'stoch_d': sum(self.stoch_k) / STOCH_SMOOTH if len(self.stoch_k) == STOCH_SMOOTH else math.nan,
+            'williams_r': -100 * (highest - self.last_close) / (highest - lowest) if highest != lowest else math.nan,
+            'obv': obv,
+            'avg_volume_20': avg_volume,
+            'volume_ratio': self.last_volume / avg_volume if avg_volume > 0 else 1,
+            'bars': self.bars
+        }
+    
+    def change(self, bars_back: int) -> float:
+        """Percent change from `bars_back` bars ago (0 without enough history)"""
+        if self.forming is not None:
+            bars_back -= 1  # The forming bar is the latest, one past the buffer
+        if not 0 <= bars_back < len(self.closes):
+            return 0
+        past = self.closes[-1 - bars_back]
+        return ((self.last_close - past) / past) * 100
+    
+    def to_dict(self) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'last_date': self.last_date,
+            'last_close': self.last_close,
+            'last_volume': self.last_volume,
+            'bars': self.bars,
+            'gains': self.gains.to_dict(),
+            'losses': self.losses.to_dict(),
+            'sma_20': self.sma_20.to_dict(),
+            'sma_50': self.sma_50.to_dict(),
+            'volume': self.volume.to_dict(),
+            'highest': self.highest.to_dict(),
+            'lowest': self.lowest.to_dict(),
+            'stoch_k': list(self.stoch_k),
+            'closes': list(self.closes),
+            'flows': list(self.flows)
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SymbolIndicatorState':
+        state = cls(data['symbol'])
+        for key in ('last_date', 'last_close', 'last_volume', 'bars'):
+            setattr(state, key, data[key])
+        for key in ('gains', 'losses', 'sma_20', 'sma_50', 'volume'):
+            setattr(state, key, RollingWindow.from_dict(data[key]))
+        state.highest = RollingExtreme.from_dict(data['highest'])
+        state.lowest = RollingExtreme.from_dict(data['lowest'])
+        state.stoch_k = deque(data['stoch_k'], maxlen=STOCH_SMOOTH)
+        state.closes = deque(data['closes'])
+        state.flows = deque(data['flows'])
+        state.flow_total = sum(state.flows)
+        return state
+    
+    def extend(self, bars: pd.DataFrame):
+        """Commit several closed bars in order"""
+        for date, high, low, close, volume in zip(bars.index, bars['High'].to_numpy(float), bars['Low'].to_numpy(float),
+                                                  bars['Close'].to_numpy(float), bars['Volume'].to_numpy(float)):
+            self.update(date, high, low, close, volume)
+    
+    @classmethod
+    def seed(cls, symbol: str, hist: pd.DataFrame) -> 'SymbolIndicatorState':
+        """Build state from a history window (the one O(window) step)"""
+        state = cls(symbol)
+        state.extend(hist)
+        return state
+
+class StreamingIndicatorStore:
+    """Per-symbol streaming states with a JSON checkpoint"""
+    
+    def __init__(self, state_file: str = STREAMING_STATE_FILE):
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self.states: Dict[str, SymbolIndicatorState] = self.load_state()
+        self.stats = {'seeded': 0, 'bars_committed': 0, 'peeked': 0, 'unchanged': 0}
+    
+    def load_state(self) -> Dict[str, SymbolIndicatorState]:
+        """Load checkpointed states from file"""
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') != STATE_VERSION:
+                    return {}
+                return {symbol: SymbolIndicatorState.from_dict(entry) for symbol, entry in data['states'].items()}
+            except Exception as e:
+                print(f"⚠️ Error loading indicator state: {e}")
+        return {}
+    
+    def save_state(self):
+        """Checkpoint every state to file"""
+        with self._lock:
+            snapshot = {'version': STATE_VERSION, 'saved_at': datetime.now().isoformat(),
+                        'states': {symbol: state.to_dict() for symbol, state in self.states.items()}}
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            tmp_path = f"{self.state_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            print(f"⚠️ Error saving indicator state: {e}")
+    
+    def sync(self, symbol: str, hist: pd.DataFrame) -> Optional[SymbolIndicatorState]:
+        """
+        Bring a symbol's state up to date with its history window and return it
+        Only bars newer than the checkpoint are applied; a bar dated today is still forming
+        and is peeked rather than committed. Gaps and revised bars trigger a reseed
+        """
+        if hist is None or hist.empty:
+            return None
+        days = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+        days = days.normalize()
+        closed_count = int(days.searchsorted(pd.Timestamp(get_provider().now().date())))
+        
+        with self._lock:
+            state = self.states.get(symbol)
+        
+        resume_at = self._resume_position(state, hist, days, closed_count)
+        if resume_at is None:
+            state = SymbolIndicatorState.seed(symbol, hist.iloc[:closed_count])
+        else:
+            state.extend(hist.iloc[resume_at:closed_count])
+        state.trim(closed_count)
+        peeking = closed_count < len(hist)
+        with self._lock:  # The scan's indicator stage syncs from several threads
+            self.states[symbol] = state
+            if resume_at is None:
+                self.stats['seeded'] += 1
+            else:
+                self.stats['bars_committed'] += closed_count - resume_at
+                self.stats['unchanged'] += resume_at == closed_count
+            self.stats['peeked'] += peeking
+        
+        if not peeking:
+            return state
+        row = hist.iloc[-1]
+        return state.peek(hist.index[-1], row['High'], row['Low'], row['Close'], row['Volume'])
+    
+    def _resume_position(self, state: Optional[SymbolIndicatorState], hist: pd.DataFrame,
+                         days: pd.DatetimeIndex, closed_count: int) -> Optional[int]:
+        """Index of the first closed bar the state hasn't seen, or None when it must be reseeded"""
+        if state is None or state.last_date is None or closed_count == 0:
+            return None
+        position = int(days.searchsorted(pd.Timestamp(state.last_date)))
+        if position >= closed_count or days[position] != pd.Timestamp(state.last_date):
+            return None  # Checkpoint is older than the window or from another history
+        if len(state.closes) <= position:
+            return None  # Window grew past the bars the state kept
+        if not math.isclose(float(hist['Close'].iloc[position]), state.last_close, rel_tol=1e-9):
+            return None  # Bar was revised since it was committed
+        return position + 1
+    
+    def export_states(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Serialized states for the given symbols (a distributed scan worker hands them back)"""
+        with self._lock:
+            return {symbol: self.states[symbol].to_dict() for symbol in symbols if symbol in self.states}
+    
+    def merge_states(self, states: Dict[str, Dict]) -> int:
+        """Adopt states advanced in another process unless ours is newer; returns how many were taken"""
+        taken = 0
+        with self._lock:
+            for symbol, data in states.items():
+                current = self.states.get(symbol)
+                if current is None or current.last_date is None or (data['last_date'] or '') >= current.last_date:
+                    self.states[symbol] = SymbolIndicatorState.from_dict(data)
+                    taken += 1
+        return taken
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, symbols=len(self.states))
+    
+    def format_stats(self) -> str:
+        """One-line summary for logs"""
+        stats = self.get_stats()
+        return (f"🌊 Streaming indicators: {stats['symbols']} symbols | {stats['bars_committed']} bars applied, "
+                f"{stats['peeked']} intraday peeks, {stats['seeded']} (re)seeded")
+
+# Global store instance
+streaming_store = StreamingIndicatorStore()
+
+def get_streaming_indicators(symbol: str, hist: pd.DataFrame) -> Optional[SymbolIndicatorState]:
+    """Convenience function: a symbol's streamed state, current as of the last bar of `hist`"""
+    return streaming_store.sync(symbol, hist)
+
+def save_streaming_state():
+    """Convenience function to checkpoint the streaming states"""
+    streaming_store.save_state()
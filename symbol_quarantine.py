@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Symbol Quarantine
+Tracks consecutive fetch failures per symbol and keeps failing (delisted,
+renamed, broken) tickers out of scans with exponential backoff, re-probing
+them in one cheap batched request once their backoff expires
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from market_data import get_provider, MARKET_DATA_PROVIDER
+
+# Optional dependency - merging saves across processes needs POSIX flock
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+QUARANTINE_FILE = os.getenv('QUARANTINE_FILE', os.path.join(
+    'data_cache', 'symbol_quarantine_replay.json' if MARKET_DATA_PROVIDER == 'replay' else 'symbol_quarantine.json'))
+
+FAILURE_THRESHOLD = 2          # Consecutive failures before a symbol is quarantined
+BASE_BACKOFF_HOURS = 6         # First quarantine period
+MAX_BACKOFF_HOURS = 24 * 14    # Never wait more than two weeks between probes
+SYSTEMIC_FAILURE_RATIO = 0.5   # A batch failing above this ratio is an outage, not dead symbols
+
+class SymbolQuarantine:
+    """Persisted failure registry with exponential backoff"""
+    
+    def __init__(self, state_file: str = QUARANTINE_FILE, failure_threshold: int = FAILURE_THRESHOLD,
+                 base_backoff_hours: float = BASE_BACKOFF_HOURS, max_backoff_hours: float = MAX_BACKOFF_HOURS):
+        self.state_file = state_file
+        self.failure_threshold = failure_threshold
+        self.base_backoff = timedelta(hours=base_backoff_hours)
+        self.max_backoff = timedelta(hours=max_backoff_hours)
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []  # (symbol, error or None for a success, time) not yet saved
+        self.data = self.load_state()
+    
+    def load_state(self) -> Dict:
+        """Load quarantine state from file"""
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error loading quarantine state: {e}")
+        return {}
+    
+    def save_state(self):
+        """
+        Save quarantine state to file
+        The scheduler, dashboard and summary scripts share the file, so this process's unsaved
+        results are replayed onto what is on disk now (under a file lock) instead of overwriting it
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            with open(f"{self.state_file}.lock", 'w') as lock_file:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                merged = self.load_state()
+                for result in pending:
+                    self._apply(merged, *result)
+                tmp_path = f"{self.state_file}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    f.write(json.dumps(merged, indent=2, default=str))
+                os.replace(tmp_path, self.state_file)
+            with self._lock:
+                for result in self._pending:  # Recorded by another thread while we were writing
+                    self._apply(merged, *result)
+                self.data = merged
+        except Exception as e:
+            with self._lock:
+                self._pending = pending + self._pending
+            print(f"⚠️ Error saving quarantine state: {e}")
+    
+    def backoff_for(self, failures: int) -> timedelta:
+        """Quarantine length after `failures` consecutive failures (doubles every failure)"""
+        exponent = max(0, failures - self.failure_threshold)
+        return min(self.max_backoff, self.base_backoff * (2 ** min(exponent, 16)))
+    
+    def _apply(self, data: Dict, symbol: str, error: Optional[str], when: datetime):
+        """Apply one fetch result to a state dict (error None = success)"""
+        if error is None:
+            data.pop(symbol, None)
+            return
+        entry = data.setdefault(symbol, {'failures': 0, 'first_failure': when.isoformat()})
+        entry['failures'] += 1
+        entry['last_failure'] = when.isoformat()
+        entry['last_error'] = error
+        if entry['failures'] >= self.failure_threshold:
+            entry['quarantined_until'] = (when + self.backoff_for(entry['failures'])).isoformat()
+    
+    def record_failure(self, symbol: str, error: str = "", save: bool = True):
+        """Count a failed fetch; quarantine once the threshold is reached"""
+        result = (symbol, str(error)[:200], datetime.now())
+        with self._lock:
+            self._apply(self.data, *result)
+            self._pending.append(result)
+        if save:
+            self.save_state()
+    
+    def record_success(self, symbol: str, save: bool = True):
+        """A good fetch clears the symbol's record"""
+        with self._lock:
+            released = symbol in self.data
+            self._apply(self.data, symbol, None, datetime.now())
+            self._pending.append((symbol, None, datetime.now()))  # Clears another process's record on the next save
+        if released and save:
+            self.save_state()
+    
+    def record_results(self, succeeded: List[str], failed: List[str], error: str = "no data returned") -> bool:
+        """
+        Record the outcome of a batch fetch
+        Returns False (and records nothing) when most of the batch failed - that's an outage, not dead symbols
+        A single failed symbol is always recorded, even when it was the whole request: one symbol
+        can't tell an outage from a dead ticker, and single-symbol refreshes must still quarantine
+        """
+        total = len(succeeded) + len(failed)
+        if total and len(failed) > 1 and len(failed) / total > SYSTEMIC_FAILURE_RATIO:
+            return False
+        
+        for symbol in succeeded:
+            self.record_success(symbol, save=False)
+        for symbol in failed:
+            self.record_failure(symbol, error, save=False)
+        if succeeded or failed:
+            self.save_state()
+        return True
+    
+    def is_quarantined(self, symbol: str, now: Optional[datetime] = None) -> bool:
+        """True while the symbol's backoff has not expired"""
+        entry = self.data.get(symbol)
+        if not entry or 'quarantined_until' not in entry:
+            return False
+        return (now or datetime.now()) < datetime.fromisoformat(entry['quarantined_until'])
+    
+    def due_for_probe(self, symbols: List[str], now: Optional[datetime] = None) -> List[str]:
+        """Quarantined symbols whose backoff expired"""
+        return [s for s in symbols
+                if 'quarantined_until' in self.data.get(s, {}) and not self.is_quarantined(s, now)]
+    
+    def probe(self, symbols: List[str], silent: bool = True) -> Dict:
+        """Re-check expired symbols with one batched 5-day history request"""
+        if not symbols:
+            return {'probed': 0, 'released': [], 'still_failing': []}
+        
+        try:
+            frames = get_provider().history_batch(symbols, period="5d")
+        except Exception as e:
+            if not silent:
+                print(f"⚠️ Quarantine probe failed: {e}")
+            return {'probed': 0, 'released': [], 'still_failing': []}
+        
+        released = [s for s in symbols if s in frames and not frames[s].empty]
+        still_failing = [s for s in symbols if s not in released]
+        self.record_results(released, still_failing, error="probe returned no data")
+        
+        if not silent:
+            print(f"🔬 Quarantine probe: {len(released)} released, {len(still_failing)} still failing")
+        return {'probed': len(symbols), 'released': released, 'still_failing': still_failing}
+    
+    def screen(self, symbols: List[str], probe: bool = True, silent: bool = True) -> Tuple[List[str], List[str]]:
+        """
+        Split symbols into (active, quarantined) before a scan
+        Expired quarantines are re-probed first when `probe` is set
+        """
+        if probe:
+            self.probe(self.due_for_probe(symbols), silent=silent)
+        
+        now = datetime.now()
+        active = [s for s in symbols if not self.is_quarantined(s, now)]
+        quarantined = [s for s in symbols if self.is_quarantined(s, now)]
+        if not silent and quarantined:
+            print(f"🚧 Skipping {len(quarantined)} quarantined symbols: "
+                  f"{', '.join(quarantined[:8])}{'...' if len(quarantined) > 8 else ''}")
+        return active, quarantined
+    
+    def quarantined_symbols(self) -> List[str]:
+        """Every symbol currently in quarantine"""
+        now = datetime.now()
+        return sorted(s for s in self.data if self.is_quarantined(s, now))
+
+# Global quarantine instance
+quarantine = SymbolQuarantine()
+
+def screen_symbols(symbols: List[str], silent: bool = True) -> List[str]:
+    """Convenience function: the symbols a scan should fetch"""
+    active, _ = quarantine.screen(symbols, silent=silent)
+    return active
+
+def record_fetch_results(succeeded: List[str], failed: List[str]) -> bool:
+    """Convenience function to record a batch download outcome"""
+    return quarantine.record_results(succeeded, failed)
+
+if __name__ == "__main__":
+    print("🚧 Symbol Quarantine")
+    print("=" * 50)
+    current = quarantine.quarantined_symbols()
+    print(f"Quarantined: {len(current)} symbols")
+    for symbol in current:
+        entry = quarantine.data[symbol]
+        print(f"   {symbol:10s} {entry['failures']} failures | until {entry['quarantined_until'][:16]} "
+              f"| {entry.get('last_error', '')}")
+    watching = [s for s in quarantine.data if s not in current]
+    if watching:
+        print(f"Watching (failed, not yet quarantined or due for probe): {', '.join(sorted(watching))}")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for the adaptive scan schedule
+Simulates scheduler cycles over a synthetic universe with fixed scores
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append('.')
+
+from adaptive_schedule import AdaptiveSchedule, activity_tier, format_schedule_report
+
+def test_activity_tiers():
+    """Signals, near-threshold scores and volatile names are hot; quiet low scorers go cold"""
+    assert activity_tier(3, 1.0, True, 7, 5) == 'hot'         # Current BUY/WATCH
+    assert activity_tier(6, 1.0, False, 7, 5) == 'hot'        # One point from BUY
+    assert activity_tier(2, 5.0, False, 7, 5) == 'hot'        # Volatile
+    assert activity_tier(3, 1.0, False, 7, 5) == 'warm'       # Two points from WATCH
+    assert activity_tier(0, 1.0, False, 7, 5) == 'cold'
+    assert activity_tier(0, 2.0, False, 7, 5) == 'cool'       # Low score, but moving
+    assert activity_tier(0, float('nan'), False, 7, 5) == 'cool'
+    assert activity_tier(None, None, False, 7, 5) == 'warm'   # Never scored
+
+def test_fixed_budget_and_refresh_rates():
+    """Each cycle scans the budget; hot names every cycle, cold ones only every few cycles"""
+    print("🧪 Testing adaptive scan schedule")
+    print("=" * 50)
+    
+    universe = [f"SYM{i:03d}" for i in range(600)]
+    scores = {s: (6 if i < 50 else 0) for i, s in enumerate(universe)}          # 50 near BUY, the rest quiet
+    volatility = {s: (1.0 if i < 500 else 2.0) for i, s in enumerate(universe)}  # 500 cold, 50 cool
+    signals = ['SYM001', 'SYM599']
+    scan_counts = {s: 0 for s in universe}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        schedule = AdaptiveSchedule(os.path.join(tmp, 'schedule.json'), budget=120)
+        for cycle in range(1, 25):
+            plan = schedule.plan(universe, volatility, signals, buy_threshold=7, watch_threshold=5)
+            assert len(plan['selected']) == 120 and set(signals) <= set(plan['selected'])
+            assert plan['selected'] == [s for s in universe if s in plan['selected']]  # Universe order
+            schedule.record([{'symbol': s, 'score': scores[s]} for s in plan['selected']], plan['selected'])
+            for symbol in plan['selected']:
+                scan_counts[symbol] += 1
+        
+        assert all(count >= 1 for count in scan_counts.values())       # Everyone scanned within the first cycles
+        hot_counts = [scan_counts[s] for s in universe[:50]] + [scan_counts['SYM599']]
+        cold_counts = [scan_counts[s] for s in universe[50:500] if s not in signals]
+        assert min(hot_counts) == 24                                    # Hot: every cycle
+        assert max(cold_counts) <= 5                                    # Cold: every few hours at most
+        print(f"✅ {format_schedule_report(plan)}")
+        print(f"   Hot scanned {min(hot_counts)}-{max(hot_counts)}x, cold {min(cold_counts)}-{max(cold_counts)}x in 24 cycles")
+        
+        # Signals stretch the budget rather than being dropped; state survives a restart
+        reloaded = AdaptiveSchedule(schedule.schedule_file, budget=1)
+        assert reloaded.data['cycle'] == 24 and reloaded.data['symbols']['SYM001']['score'] == 6
+        plan = reloaded.plan(universe, volatility, signals, buy_threshold=7, watch_threshold=5)
+        assert plan['selected'] == signals and plan['cycle'] == 25
+
+if __name__ == "__main__":
+    test_activity_tiers()
+    test_fixed_budget_and_refresh_rates()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact bar panel
+Views must not copy, and every engine must give the same answers as with per-symbol DataFrames
+"""
+
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+from bar_panel import BarPanel, frames_nbytes
+from bar_store import BarStore, slice_period
+from panel_indicators import synthetic_frames, compute_panel_indicators
+from indicators import IndicatorMemo, IndicatorSet
+
+def test_views_are_zero_copy():
+    """Per-symbol views slice the panel matrices; to_frame round-trips at float32 precision"""
+    print("🧪 Testing bar panel views")
+    print("=" * 50)
+    
+    frames = synthetic_frames(6, bars=120)
+    frames['SYM002'] = frames['SYM002'].tail(40)
+    frames['SYM004'] = frames['SYM004'].drop(frames['SYM004'].index[50:53])
+    bars = BarPanel.from_frames(frames)
+    
+    assert len(bars) == 6 and 'SYM002' in bars and 'NONE' not in bars
+    assert bars.prices['Close'].dtype == np.float32
+    assert bars.nbytes < frames_nbytes(frames)
+    
+    for symbol, hist in frames.items():
+        view = bars.view(symbol)
+        assert np.shares_memory(view.close, bars.prices['Close'])
+        assert len(view) == len(hist)
+        frame = view.to_frame()
+        assert frame.index.equals(hist.index)
+        assert np.allclose(frame['Close'], hist['Close'], rtol=1e-6)
+        assert np.array_equal(frame['Volume'], hist['Volume'])
+    
+    subset = bars.select(['SYM004', 'SYM002'])
+    assert subset.symbols == ['SYM004', 'SYM002']
+    assert np.array_equal(subset.view('SYM002').close, bars.view('SYM002').close)
+    print(f"✅ {len(bars)} views share the panel's memory ({bars.nbytes / frames_nbytes(frames):.0%} of the frames)")
+
+def test_from_store_matches_slice_period():
+    """Reading partitions straight into the panel keeps the same lookback window as get_history"""
+    frames = synthetic_frames(4, bars=300)
+    for hist in frames.values():
+        hist.index = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1), periods=len(hist),
+                                    name='Date')
+    
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root=root)
+        for symbol, hist in frames.items():
+            store.save(symbol, hist)
+        
+        for period in ("3mo", "60d"):
+            bars = BarPanel.from_store(list(frames) + ['MISSING'], period=period, store=store)
+            assert bars.symbols == list(frames)
+            for symbol, hist in frames.items():
+                expected = slice_period(hist, period)
+                frame = bars.view(symbol).to_frame()
+                assert frame.index.equals(expected.index), (symbol, period)
+                assert np.allclose(frame['High'], expected['High'], rtol=1e-6)
+
+def test_panel_indicators_match_frames():
+    """The indicator engine gives the same summaries from the panel as from DataFrames"""
+    frames = synthetic_frames(20, bars=150)
+    frames['SYM005'] = frames['SYM005'].tail(30)
+    from_frames = compute_panel_indicators(frames)
+    from_panel = compute_panel_indicators(BarPanel.from_frames(frames))
+    assert set(from_frames) == set(from_panel)
+    
+    for symbol, expected in from_frames.items():
+        actual = from_panel[symbol]
+        assert np.isclose(actual['rsi'], expected['rsi'], rtol=1e-4, atol=1e-3), symbol
+        assert np.isclose(actual['macd']['macd'], expected['macd']['macd'], rtol=1e-4, atol=1e-4), symbol
+        assert np.isclose(actual['momentum']['roc'], expected['momentum']['roc'], rtol=1e-4, atol=1e-3), symbol
+    print(f"✅ {len(from_panel)} panel summaries match the DataFrame path")
+
+def test_indicators_agree_across_paths():
+    """A symbol read as a float64 frame or through the float32 panel gets its own memo entry
+    (whichever path runs first doesn't decide the other's values), and the two agree"""
+    frames = synthetic_frames(2, bars=80)
+    frames['SYM001'].iloc[-3, frames['SYM001'].columns.get_loc('Volume')] = np.nan  # Missing volume
+    bars = BarPanel.from_frames(frames)
+    memo = IndicatorMemo()
+    
+    for symbol, hist in frames.items():
+        view_frame = bars.view(symbol).to_frame()
+        from_panel = memo.get(symbol, view_frame)
+        from_frame = memo.get(symbol, hist)
+        assert from_panel is not from_frame
+        fresh = IndicatorSet(symbol, hist)
+        assert (from_frame.rsi, from_frame.macd, from_frame.bollinger) == (fresh.rsi, fresh.macd, fresh.bollinger)
+        assert np.isclose(from_panel.rsi, from_frame.rsi, rtol=1e-4)
+        assert np.isclose(from_panel.macd['macd'], from_frame.macd['macd'], rtol=1e-4, atol=1e-4)
+        assert np.isclose(from_panel.bollinger['upper_band'], from_frame.bollinger['upper_band'], rtol=1e-5)
+    
+    # Missing volume stays missing on the panel instead of turning into 0
+    assert np.isnan(bars.view('SYM001').volume[-3]) and np.isnan(bars.right_aligned()['Volume'][1, -3])
+    assert np.isnan(compute_panel_indicators(bars)['SYM001']['volume_analysis']['avg_volume_20'])
+    assert np.isnan(IndicatorSet('SYM001', frames['SYM001']).volume_analysis['avg_volume_20'])
+    print("✅ Panel and DataFrame paths keep separate entries and agree; missing volume stays NaN")
+
+if __name__ == "__main__":
+    test_views_are_zero_copy()
+    test_from_store_matches_slice_period()
+    test_panel_indicators_match_frames()
+    test_indicators_agree_across_paths()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for the local OHLCV bar store
+Runs offline - Yahoo downloads are replaced with synthetic bars
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+import market_data
+import bar_store
+from bar_store import BarStore, slice_period
+from market_data import MarketDataProvider, set_provider
+from symbol_quarantine import SymbolQuarantine
+
+def make_bars(dates, start_price=100.0):
+    """Build a synthetic OHLCV frame for the given dates"""
+    close = start_price + np.arange(len(dates), dtype=float)
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1.0,
+        'Low': close - 1.0,
+        'Close': close,
+        'Volume': np.full(len(dates), 1_000_000.0)
+    }, index=pd.DatetimeIndex(dates, name='Date'))
+
+def test_incremental_update():
+    """Backfill once, then only the missing days are requested"""
+    print("🧪 Testing bar store incremental update")
+    print("=" * 50)
+    
+    all_dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=80)
+    requests_made = []
+    
+    def fake_download(symbols, period="60d", batch_size=50, silent=False, start=None):
+        requests_made.append({'symbols': list(symbols), 'period': period, 'start': start})
+        dates = all_dates[:70] if start is None else all_dates[all_dates >= pd.Timestamp(start)]
+        return {s: make_bars(dates, start_price=100 + all_dates.get_loc(dates[0])) for s in symbols}, {
+            'failed_symbols': [], 'batches': [{'batch': 1, 'symbols': len(symbols)}]
+        }
+    
+    original = bar_store.download_history_batches
+    original_quarantine = bar_store.quarantine
+    bar_store.download_history_batches = fake_download
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            bar_store.quarantine = SymbolQuarantine(os.path.join(root, 'quarantine.json'))
+            store = BarStore(root=root, refresh_interval_minutes=0)
+            
+            report = store.update(['AAPL', 'RY.TO'])
+            assert report['backfilled'] == 2
+            assert store.last_bar_date('AAPL') == all_dates[69]
+            assert os.path.exists(os.path.join(root, 'AAPL.npz'))
+            print(f"✅ Backfill stored {report['bars_downloaded']} bars")
+            
+            report = store.update(['AAPL', 'RY.TO'])
+            assert requests_made[-1]['start'] == all_dates[69].strftime('%Y-%m-%d')
+            assert store.last_bar_date('AAPL') == all_dates[-1]
+            assert report['bars_downloaded'] == 2 * 11  # last stored bar + 10 new days
+            print(f"✅ Incremental update downloaded {report['bars_downloaded']} bars")
+            
+            # A fresh store instance reads the same partitions back from disk
+            reloaded = BarStore(root=root).load('AAPL')
+            assert len(reloaded) == 80
+            assert reloaded['Close'].iloc[-1] == 179.0
+            window = slice_period(reloaded, '60d')  # 60 calendar days like Yahoo's period='60d', not 60 bars
+            assert window.index[0] > reloaded.index[-1] - pd.Timedelta(days=60) >= reloaded.index[-len(window) - 1]
+            print("✅ Partitions reload from disk")
+    finally:
+        bar_store.download_history_batches = original
+        bar_store.quarantine = original_quarantine
+
+class IntradayProvider(MarketDataProvider):
+    """Serves daily bars plus a growing set of 5-minute bars for today"""
+    
+    def __init__(self, now, daily_dates):
+        self.clock = now
+        self.daily_dates = daily_dates
+        self.requests = []
+    
+    def now(self):
+        return self.clock
+    
+    def history_batch(self, symbols, period="1mo", interval="1d", start=None):
+        self.requests.append({'interval': interval, 'start': start})
+        if interval == "1d":
+            dates = self.daily_dates if start is None else self.daily_dates[self.daily_dates >= pd.Timestamp(start)]
+            return {s: make_bars(dates) for s in symbols}
+        
+        session_open = pd.Timestamp(self.clock.date()) + pd.Timedelta(hours=9, minutes=30)
+        times = pd.date_range(session_open, pd.Timestamp(self.clock), freq='5min', tz='America/New_York')
+        times = times[times >= pd.Timestamp(start).tz_localize('America/New_York')]
+        bars = pd.DataFrame({
+            'Open': 200.0, 'High': 200.0 + np.arange(len(times)), 'Low': 199.0,
+            'Close': 200.5, 'Volume': 1000.0
+        }, index=times)
+        return {s: bars for s in symbols}
+    
+    def history(self, symbol, period="1mo", interval="1d", start=None):
+        return self.history_batch([symbol], period=period, interval=interval, start=start).get(symbol, pd.DataFrame())
+    
+    def info(self, symbol):
+        return {}
+    
+    def news(self, symbol):
+        return []
+    
+    def calendar(self, symbol):
+        return None
+
+def test_intraday_poll():
+    """Regular-hours polls only download 5-minute bars since the previous poll"""
+    print("🧪 Testing intraday polling")
+    print("=" * 50)
+    
+    today = pd.Timestamp.today().normalize()
+    provider = IntradayProvider(today + pd.Timedelta(hours=10, minutes=30),
+                                pd.bdate_range(end=today - pd.Timedelta(days=1), periods=60))
+    previous = market_data._provider
+    original_quarantine = bar_store.quarantine
+    try:
+        set_provider(provider)
+        with tempfile.TemporaryDirectory() as root:
+            bar_store.quarantine = SymbolQuarantine(os.path.join(root, 'quarantine.json'))
+            store = BarStore(root=root)
+            
+            report = store.update_intraday(['AAPL'])
+            assert report['daily_updated'] == 1
+            assert provider.requests[-1] == {'interval': '5m', 'start': today.to_pydatetime()}
+            bar = store.load('AAPL').iloc[-1]
+            assert store.last_bar_date('AAPL') == today
+            assert bar['Open'] == 200.0 and bar['High'] == 212.0 and bar['Volume'] == 13 * 1000.0
+            print(f"✅ First poll: daily catch-up + {report['intraday_bars']} bars since the open")
+            
+            # An hour later only the bars since 10:30 are requested
+            provider.clock = today + pd.Timedelta(hours=11, minutes=30)
+            report = store.update_intraday(['AAPL'])
+            assert report['daily_updated'] == 0
+            assert provider.requests[-1]['start'] == (today + pd.Timedelta(hours=10, minutes=30)).to_pydatetime()
+            assert report['intraday_bars'] == 13  # 10:30 re-requested + 12 new bars
+            bar = store.load('AAPL').iloc[-1]
+            assert bar['Volume'] == 25 * 1000.0  # the re-requested bar is not double counted
+            assert len(store.load('AAPL')) == 61
+            assert not store.is_stale('AAPL')
+            print(f"✅ Second poll downloaded {report['intraday_bars']} bars, today's volume {bar['Volume']:.0f}")
+    finally:
+        set_provider(previous)
+        bar_store.quarantine = original_quarantine
+
+if __name__ == "__main__":
+    test_incremental_update()
+    test_intraday_poll()
+    print("\n✅ Bar store test completed!")
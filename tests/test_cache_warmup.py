@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the pre-run cache warm-up
+Runs offline - an in-memory provider counts every fetch
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+import market_data
+import bar_store
+import symbol_quarantine
+import fundamentals_cache
+import enhanced_yahoo_client
+from bar_store import BarStore
+from market_data import MarketDataProvider, set_provider
+from symbol_quarantine import SymbolQuarantine
+from fundamentals_cache import FundamentalsCache
+from enhanced_yahoo_client import EnhancedYahooClient, SECTOR_ETFS
+from cache_warmup import warm_caches, warmup_time
+
+class CountingProvider(MarketDataProvider):
+    """Offline provider that records every call"""
+    
+    name = "counting"
+    offline = True
+    
+    def __init__(self):
+        self.calls = []
+        self.dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=30)
+    
+    def history(self, symbol, period="1mo", interval="1d", start=None):
+        self.calls.append(('history', symbol))
+        close = 100.0 + np.arange(len(self.dates), dtype=float)
+        return pd.DataFrame({'Open': close - 1.0, 'High': close + 1.0, 'Low': close - 2.0,
+                             'Close': close, 'Volume': np.full(len(self.dates), 1_000_000.0)},
+                            index=pd.DatetimeIndex(self.dates, name='Date'))
+    
+    def info(self, symbol):
+        self.calls.append(('info', symbol))
+        return {'symbol': symbol, 'longName': f"{symbol} Inc", 'marketCap': 10_000_000_000}
+    
+    def calendar(self, symbol):
+        self.calls.append(('calendar', symbol))
+        return pd.DataFrame({'Earnings': [1.0]}, index=pd.DatetimeIndex(['2024-07-25']))
+    
+    def news(self, symbol):
+        return []
+
+def test_warmup_makes_jobs_cache_hits():
+    """After a warm-up the report job's bars, earnings and themes need no fetches"""
+    print("🧪 Testing cache warm-up")
+    print("=" * 50)
+    
+    provider = CountingProvider()
+    saved = (market_data._provider, bar_store.bar_store, bar_store.quarantine, symbol_quarantine.quarantine,
+             fundamentals_cache.fundamentals_cache, enhanced_yahoo_client.CONTEXT_CACHE_FILE)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            set_provider(provider)
+            bar_store.bar_store = BarStore(root=os.path.join(tmp, 'bars'))
+            bar_store.quarantine = symbol_quarantine.quarantine = SymbolQuarantine(os.path.join(tmp, 'q.json'))
+            fundamentals_cache.fundamentals_cache = FundamentalsCache(os.path.join(tmp, 'fundamentals.json'))
+            enhanced_yahoo_client.CONTEXT_CACHE_FILE = os.path.join(tmp, 'context.json')
+            
+            report = warm_caches(['AAPL', 'MSFT'])
+            assert not report['errors'], report['errors']
+            assert report['symbols'] == 2 and report['sectors'] == len(SECTOR_ETFS)
+            assert report['earnings'] == 10 and report['themes'] == 5
+            assert bar_store.bar_store.load('XLK') is not None
+            print(f"✅ Warmed {report['symbols']} symbols + {report['sectors']} sector ETFs, "
+                  f"{report['earnings']} earnings, {report['themes']} themes")
+            
+            # What the report job does a few minutes later
+            fetches = len(provider.calls)
+            client = EnhancedYahooClient()
+            assert len(client.get_earnings_calendar(days_ahead=7)) == 10
+            assert len(client.get_investment_themes()['themes']) == 5
+            bar_store.update_bars(['AAPL', 'MSFT'])
+            assert len(provider.calls) == fetches
+            print("✅ Report job served entirely from warm caches")
+            
+            # Refresh bypasses the TTL
+            client.get_earnings_calendar(days_ahead=7, refresh=True)
+            assert len(provider.calls) > fetches
+        finally:
+            (market_data._provider, bar_store.bar_store, bar_store.quarantine, symbol_quarantine.quarantine,
+             fundamentals_cache.fundamentals_cache, enhanced_yahoo_client.CONTEXT_CACHE_FILE) = saved
+
+def test_warmup_times_follow_the_lead():
+    """Warm-up times are derived from the job times"""
+    assert warmup_time("07:00") == "06:50"
+    assert warmup_time("16:05") == "15:55"
+    assert warmup_time("00:05", lead_minutes=15) == "23:50"
+    print("✅ Warm-ups scheduled ahead of their jobs")
+
+if __name__ == "__main__":
+    test_warmup_makes_jobs_cache_hits()
+    test_warmup_times_follow_the_lead()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for cross-sectional ranks
+Percentiles must match a plain sort of the snapshot, overall and per sector
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+from cross_sectional import add_cross_sectional_ranks, ENHANCED_FEATURES, UNKNOWN_SECTOR
+
+def percentile(values, value):
+    """Rank / count with ties averaged, like pandas rank(pct=True)"""
+    below = sum(v < value for v in values)
+    equal = sum(v == value for v in values)
+    return (below + (equal + 1) / 2) / len(values)
+
+def test_ranks_match_sorting():
+    """Universe and sector percentiles for every feature, NaN left unranked"""
+    print("🧪 Testing cross-sectional ranks")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(3)
+    rows = [{'symbol': f"S{i}", 'roc': float(rng.normal(0, 5)), 'rsi': float(rng.uniform(20, 80)),
+             'volume_ratio': float(rng.lognormal(0, 0.4)), 'price_1m': float(round(rng.normal(1, 8)))}
+            for i in range(60)]
+    rows[5]['rsi'] = float('nan')
+    sectors = {row['symbol']: ['Tech', 'Energy', 'Health'][i % 3] for i, row in enumerate(rows)}
+    sectors.pop('S59')
+    
+    report = add_cross_sectional_ranks(rows, sectors=sectors)
+    assert report['symbols'] == 60
+    
+    valid_rsi = [r['rsi'] for r in rows if r['rsi'] == r['rsi']]
+    for row in rows:
+        assert np.isclose(row['momentum_pct'], percentile([r['roc'] for r in rows], row['roc']), atol=1e-4)
+        assert np.isclose(row['return_1m_pct'], percentile([r['price_1m'] for r in rows], row['price_1m']), atol=1e-4)
+        peers = [r['volume_ratio'] for r in rows if r['sector'] == row['sector']]
+        assert np.isclose(row['volume_sector_pct'], percentile(peers, row['volume_ratio']), atol=1e-4)
+        if row['symbol'] != 'S5':
+            assert np.isclose(row['rsi_pct'], percentile(valid_rsi, row['rsi']), atol=1e-4)
+    assert 'rsi_pct' not in rows[5]
+    assert rows[59]['sector'] == UNKNOWN_SECTOR and rows[59]['momentum_sector_pct'] == 1.0  # Alone in its group
+    print(f"✅ {report['symbols']} symbols ranked in {report['milliseconds']:.1f}ms")
+
+def test_nested_enhanced_fields():
+    """main_enhanced rows keep indicators in nested dicts"""
+    rows = [{'symbol': s, 'rsi': rsi, 'return_1m': ret, 'momentum': {'roc': roc},
+             'volume_analysis': {'volume_ratio': vol}}
+            for s, rsi, ret, roc, vol in [('A', 50, 1, 3, 1.0), ('B', 60, 2, 2, 2.0), ('C', 70, 3, 1, 3.0)]]
+    add_cross_sectional_ranks(rows, ENHANCED_FEATURES, sectors={'A': 'X', 'B': 'X', 'C': 'Y'})
+    assert [r['momentum_pct'] for r in rows] == [1.0, 0.6667, 0.3333]
+    assert [r['rsi_sector_pct'] for r in rows] == [0.5, 1.0, 1.0]
+    assert add_cross_sectional_ranks([None, {}])['symbols'] == 0
+
+def test_ranks_against_universe():
+    """Scanned rows rank among the whole universe, their own values replacing the stored ones"""
+    universe = pd.DataFrame({'momentum': [1.0, 2.0, 3.0, 4.0, 5.0], 'rsi': [40.0, 50.0, 60.0, 70.0, 80.0]},
+                            index=['A', 'B', 'C', 'D', 'E'])
+    rows = [{'symbol': 'A', 'roc': 10.0, 'rsi': 45.0}, {'symbol': 'F', 'roc': 0.0, 'rsi': 90.0}]
+    report = add_cross_sectional_ranks(rows, sectors={}, universe=universe)
+    assert report['symbols'] == 2 and report['peers'] == 6
+    assert rows[0]['momentum_pct'] == 1.0 and rows[1]['momentum_pct'] == round(1 / 6, 4)
+    assert rows[0]['rsi_pct'] == round(1 / 6, 4) and rows[1]['rsi_pct'] == 1.0
+    
+    # The same rows scanned on their own would both sit at the extremes of a two-symbol scan
+    alone = [{'symbol': 'B', 'roc': 2.0}, {'symbol': 'D', 'roc': 4.0}]
+    add_cross_sectional_ranks(alone, sectors={}, universe=universe)
+    assert [r['momentum_pct'] for r in alone] == [0.4, 0.8]
+    print("✅ Ranks are stable against the universe snapshot")
+
+if __name__ == "__main__":
+    test_ranks_match_sorting()
+    test_nested_enhanced_fields()
+    test_ranks_against_universe()
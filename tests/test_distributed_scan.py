@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test script for the distributed scan queue
+Fake shard tasks stand in for scoring; the queue lives in a temporary SQLite file
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+import multiprocessing
+
+sys.path.append('.')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # Workers resolve the fake tasks by module name
+
+from distributed_scan import ShardQueue, ScanWorker, run_distributed_scan, format_distributed_report
+from scan_executor import SCAN_START_METHOD
+
+# Set once in the environment so workers that re-import this module agree on the path
+HANG_MARKER = os.environ.setdefault('DISTRIBUTED_SCAN_HANG_MARKER',
+                                    os.path.join(tempfile.gettempdir(), f"distributed_scan_hang_{os.getpid()}"))
+
+def fake_score(symbols):
+    """Score = symbol number; BAD fails its whole shard"""
+    if 'BAD' in symbols:
+        raise ValueError("bad bars")
+    return [{'symbol': s, 'score': int(s[3:])} for s in symbols]
+
+def hang_once(symbols):
+    """The first worker to get a shard hangs on it (and gets killed); later attempts succeed"""
+    if not os.path.exists(HANG_MARKER):
+        open(HANG_MARKER, 'w').close()
+        time.sleep(60)
+    return fake_score(symbols)
+
+def run_worker(db_path):
+    ScanWorker(ShardQueue(db_path, heartbeat_timeout=0.5), heartbeat_seconds=0.1).run()
+
+def test_sharded_scan_merges_in_order():
+    """Local worker processes score every shard; a shard that keeps failing is reported, not lost"""
+    print("🧪 Testing distributed scan")
+    print("=" * 50)
+    
+    symbols = [f"SYM{i}" for i in range(23)] + ['BAD'] + [f"SYM{i}" for i in range(23, 30)]
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = ShardQueue(os.path.join(tmp, 'queue.db'), max_attempts=2)
+        landed = []
+        report = run_distributed_scan(symbols, 'test_distributed_scan:fake_score', shard_size=5, local_workers=2,
+                                      queue=queue, timeout=30, on_shard=lambda shard, results: landed.extend(shard))
+        
+        bad_shard = symbols[20:25]  # Shard 4 holds BAD
+        assert report['shards'] == 7 and report['failed_shards'] == 1 and report['unfinished_shards'] == 0
+        assert set(report['errors']) == set(bad_shard) and 'bad bars' in report['errors']['BAD']
+        for symbol, analysis in zip(symbols, report['analyses']):
+            assert analysis == (None if symbol in bad_shard else {'symbol': symbol, 'score': int(symbol[3:])})
+        assert sorted(landed) == sorted(s for s in symbols if s not in bad_shard)
+        assert queue.progress('any') == {'pending': 0, 'claimed': 0, 'done': 0, 'failed': 0}
+        assert len(queue.live_workers()) == 2
+        print(f"✅ {format_distributed_report(report)}")
+
+def test_dead_worker_shard_is_requeued():
+    """A worker killed mid-shard stops heartbeating; its shard goes back on the queue and is finished elsewhere"""
+    symbols = [f"SYM{i}" for i in range(6)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'queue.db')
+        queue = ShardQueue(db_path, heartbeat_timeout=0.5)
+        rescuers = []
+        # Forked before the coordinator thread starts polling SQLite
+        doomed = multiprocessing.get_context(SCAN_START_METHOD).Process(target=run_worker, args=(db_path,))
+        
+        def kill_then_rescue():
+            deadline = time.time() + 10
+            while not os.path.exists(HANG_MARKER) and time.time() < deadline:
+                time.sleep(0.05)
+            doomed.kill()
+            doomed.join()
+            rescuer = ScanWorker(ShardQueue(db_path, heartbeat_timeout=0.5), 'rescuer', heartbeat_seconds=0.1,
+                                 idle_exit=1.0)
+            rescuers.append(rescuer)
+            rescuer.run()
+        
+        helper = threading.Thread(target=kill_then_rescue)
+        try:
+            doomed.start()
+            helper.start()
+            report = run_distributed_scan(symbols, 'test_distributed_scan:hang_once', shard_size=3,
+                                          local_workers=0, queue=queue, timeout=30)
+            helper.join(timeout=10)
+        finally:
+            if os.path.exists(HANG_MARKER):
+                os.remove(HANG_MARKER)
+        
+        assert not report['errors']  # The requeue itself may be done by the rescuer or the coordinator
+        assert [a['symbol'] for a in report['analyses']] == symbols
+        assert report['workers'] == 1 and rescuers[0].shards_done == 2  # The killed worker finished nothing
+        print(f"✅ {format_distributed_report(report)}")
+
+def count_shards(db_path, where="1"):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM shards WHERE {where}").fetchone()[0]
+
+def run_coordinator(db_path, symbols):
+    """A coordinator with no workers - it waits on its shards until it is killed"""
+    run_distributed_scan(symbols, 'test_distributed_scan:fake_score', shard_size=3, local_workers=0,
+                         queue=ShardQueue(db_path), timeout=60)
+
+def test_killed_coordinator_shards_are_dropped():
+    """A killed coordinator's shards are dropped by the next run instead of being worked ahead of it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'queue.db')
+        queue = ShardQueue(db_path)
+        doomed = multiprocessing.get_context(SCAN_START_METHOD).Process(
+            target=run_coordinator, args=(db_path, [f"OLD{i}" for i in range(30)]))
+        doomed.start()
+        deadline = time.time() + 30
+        while queue.claim('probe') is None and time.time() < deadline:
+            time.sleep(0.05)
+        doomed.kill()
+        doomed.join()
+        
+        symbols = [f"NEW{i}" for i in range(6)]
+        reports = []
+        coordinator = threading.Thread(target=lambda: reports.append(run_distributed_scan(
+            symbols, 'test_distributed_scan:fake_score', shard_size=3, local_workers=0, queue=queue, timeout=30)))
+        coordinator.start()
+        while not count_shards(db_path, "symbols LIKE '%NEW%'") and time.time() < deadline:
+            time.sleep(0.01)
+        
+        # The worker starts once the new run is queued, when the old shards would still be first in line
+        worker = ScanWorker(ShardQueue(db_path), 'worker', heartbeat_seconds=0.1, idle_exit=0.5)
+        worker.run()
+        coordinator.join(timeout=10)
+        report = reports[0]
+        
+        assert report['abandoned_shards'] == 10
+        assert [a['symbol'] for a in report['analyses']] == symbols
+        assert worker.shards_done == report['shards'] == 2  # Nothing of the dead run was redone
+        assert count_shards(db_path) == 0
+        print(f"✅ {format_distributed_report(report)}")
+
+def test_purge_when_on_shard_raises():
+    """A coordinator that fails mid-merge still removes its shards"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'queue.db')
+        queue = ShardQueue(db_path)
+        worker = ScanWorker(ShardQueue(db_path), 'worker', heartbeat_seconds=0.1, idle_exit=0.5)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        
+        def explode(symbols, results):
+            raise RuntimeError("alert delivery failed")
+        
+        try:
+            run_distributed_scan([f"SYM{i}" for i in range(6)], 'test_distributed_scan:fake_score', shard_size=3,
+                                 local_workers=0, queue=queue, timeout=30, on_shard=explode)
+            raise AssertionError("on_shard error was swallowed")
+        except RuntimeError:
+            pass
+        thread.join(timeout=10)
+        assert count_shards(db_path) == 0
+
+if __name__ == "__main__":
+    test_sharded_scan_merges_in_order()
+    test_dead_worker_shard_is_requeued()
+    test_killed_coordinator_shards_are_dropped()
+    test_purge_when_on_shard_raises()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for batched downloads in main_enhanced.fetch_stocks
+Runs offline against replay fixtures; one batch is made to fail outright
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+import market_data
+import bar_store
+import indicators
+import main_enhanced
+from market_data import ReplayProvider, set_provider
+from bar_store import BarStore
+from indicators import IndicatorMemo
+from symbol_quarantine import SymbolQuarantine
+
+class FlakyReplayProvider(ReplayProvider):
+    """Replay backend that logs every batch request and fails any batch holding BROKEN"""
+    
+    def __init__(self, fixtures_dir):
+        super().__init__(fixtures_dir)
+        self.batches = []
+    
+    def history_batch(self, symbols, period="1mo", interval="1d", start=None):
+        self.batches.append(list(symbols))
+        if 'BROKEN' in symbols:
+            raise ConnectionError("batch timed out")
+        return super().history_batch(symbols, period=period, interval=interval, start=start)
+
+def write_fixtures(fixtures_dir, symbols, dates):
+    os.makedirs(os.path.join(fixtures_dir, 'history'), exist_ok=True)
+    for i, symbol in enumerate(symbols):
+        close = 50.0 + i + np.sin(np.arange(len(dates)) / 5.0) * 3
+        pd.DataFrame({
+            'Open': close - 0.5,
+            'High': close + 1.0,
+            'Low': close - 1.0,
+            'Close': close,
+            'Volume': np.full(len(dates), 1_000_000.0 + i)
+        }, index=pd.DatetimeIndex(dates, name='Date')).to_csv(os.path.join(fixtures_dir, 'history', f"{symbol}.csv"))
+
+def test_batches_split_and_partial_failures():
+    """Symbols go out in batch_size groups; missing symbols and a failed batch are reported, the rest scored"""
+    print("🧪 Testing batched fetch_stocks")
+    print("=" * 50)
+    
+    dates = pd.bdate_range('2024-01-02', '2024-06-28')
+    stored = [f"S{i}" for i in range(7)]
+    symbols = ['S0', 'S1', 'S2', 'S3', 'MISSING', 'S4', 'BROKEN', 'S5', 'S6']
+    
+    saved = (market_data._provider, main_enhanced.bar_store, bar_store.bar_store, bar_store.quarantine,
+             indicators.indicator_memo)
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = FlakyReplayProvider(os.path.join(tmp, 'fixtures'))
+        write_fixtures(provider.fixtures_dir, stored, dates)
+        try:
+            set_provider(provider)
+            store = BarStore(root=os.path.join(tmp, 'bars'))
+            main_enhanced.bar_store = bar_store.bar_store = store
+            bar_store.quarantine = SymbolQuarantine(os.path.join(tmp, 'quarantine.json'))
+            indicators.indicator_memo = IndicatorMemo()
+            
+            stock_data = main_enhanced.fetch_stocks(symbols, include_sentiment=False, silent=True, batch_size=3)
+            report = main_enhanced.LAST_FETCH_REPORT
+            
+            assert provider.batches == [symbols[0:3], symbols[3:6], symbols[6:9]]
+            assert [b['downloaded'] for b in report['batches']] == [3, 2, 0]
+            assert report['batches'][1]['failed'] == ['MISSING'] and report['batches'][1]['error'] is None
+            assert 'timed out' in report['batches'][2]['error']
+            assert report['failed_symbols'] == ['MISSING', 'BROKEN', 'S5', 'S6']
+            print(f"✅ {len(report['batches'])} batches of 3: {report['backfilled']} backfilled, "
+                  f"{len(report['failed_symbols'])} failed")
+            
+            assert list(stock_data) == ['S0', 'S1', 'S2', 'S3', 'S4']
+            for symbol, info in stock_data.items():
+                fixture = provider.history(symbol, period='1y')
+                assert np.isclose(info['close'], fixture['Close'].iloc[-1])
+                assert 0 <= info['technical_score'] <= 100 and 'momentum_pct' in info
+            
+            # The symbols of the failed batch are retried on the next call, the stored ones are not re-fetched
+            provider.batches.clear()
+            stock_data = main_enhanced.fetch_stocks(['S0', 'S5', 'S6'], include_sentiment=False, silent=True,
+                                                    batch_size=3)
+            assert provider.batches == [['S5', 'S6']]
+            assert list(stock_data) == ['S0', 'S5', 'S6']
+            print(f"✅ Retry fetched {main_enhanced.LAST_FETCH_REPORT['backfilled']} symbols, reused 1 stored")
+        finally:
+            set_provider(saved[0])
+            main_enhanced.bar_store, bar_store.bar_store, bar_store.quarantine, indicators.indicator_memo = saved[1:]
+
+if __name__ == "__main__":
+    test_batches_split_and_partial_failures()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the fundamentals cache
+Runs offline - info() calls go to a counting in-memory provider
+"""
+
+import os
+import sys
+import tempfile
+import pandas as pd
+
+sys.path.append('.')
+
+import market_data
+from market_data import MarketDataProvider, set_provider
+from fundamentals_cache import FundamentalsCache, DAY
+
+class CountingProvider(MarketDataProvider):
+    """Provider that counts info() calls"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def info(self, symbol):
+        self.calls.append(symbol)
+        if symbol == 'BAD':
+            raise ValueError("No data found")
+        return {'longName': f"{symbol} Inc", 'sector': 'Technology', 'marketCap': 2_000_000_000,
+                'dividendYield': 0.02, 'website': 'https://example.com'}
+    
+    def history(self, symbol, period="1mo", interval="1d", start=None):
+        return pd.DataFrame()
+    
+    def news(self, symbol):
+        return []
+    
+    def calendar(self, symbol):
+        return None
+
+def test_ttl_cache():
+    """Fields are served from cache until their own TTL expires"""
+    print("🧪 Testing fundamentals cache")
+    print("=" * 50)
+    
+    provider = CountingProvider()
+    previous = market_data._provider
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, 'fundamentals.json')
+        try:
+            set_provider(provider)
+            cache = FundamentalsCache(cache_file)
+            
+            report = cache.warm(['AAPL', 'MSFT', 'BAD'])
+            assert report['fetched'] == 2 and report['failed_symbols'] == ['BAD']
+            assert sorted(provider.calls) == ['AAPL', 'BAD', 'MSFT']
+            
+            info = cache.get('AAPL')
+            assert info['marketCap'] == 2_000_000_000
+            assert 'website' not in info  # untracked fields are not kept
+            assert 'trailingPE' not in info  # reported as missing, cached as None
+            assert len(provider.calls) == 3
+            print(f"✅ Warm-up then cache hit: {cache.format_stats()}")
+            
+            # A daily field expiring forces one refetch, weekly fields alone stay cached
+            cache.data['AAPL']['fetched_at']['marketCap'] -= DAY + 1
+            assert cache.get('AAPL', fields=['sector', 'longName']) and len(provider.calls) == 3
+            cache.get('AAPL')
+            assert provider.calls.count('AAPL') == 2
+            print("✅ Per-field TTL expiry refetches only when needed")
+            
+            try:
+                cache.get('BAD')
+                assert False, "provider errors should propagate"
+            except ValueError:
+                pass
+            
+            cache.save_cache()
+            reloaded = FundamentalsCache(cache_file)
+            assert reloaded.get('MSFT')['longName'] == "MSFT Inc"
+            assert provider.calls.count('MSFT') == 1
+            stats = reloaded.get_stats()
+            assert stats['hits'] == 1 and stats['misses'] == 0
+            print(f"✅ Persisted cache reloaded ({stats['symbols_cached']} symbols)")
+        finally:
+            set_provider(previous)
+
+if __name__ == "__main__":
+    test_ttl_cache()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared HTTP client
+Runs against a local keep-alive HTTP server
+"""
+
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append('.')
+
+from http_client import HTTPClient, build_retry
+
+class Handler(BaseHTTPRequestHandler):
+    """Keep-alive handler that fails the first request to /flaky"""
+    
+    protocol_version = 'HTTP/1.1'
+    hits = {}
+    
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def _handle(self):
+        length = int(self.headers.get('Content-Length', 0))
+        if length:
+            self.rfile.read(length)
+        Handler.hits[self.path] = Handler.hits.get(self.path, 0) + 1
+        if self.path.startswith('/flaky') and Handler.hits[self.path] == 1:
+            self._reply(503, {'ok': False})
+        else:
+            self._reply(200, {'ok': True, 'path': self.path})
+    
+    do_GET = _handle
+    do_POST = _handle
+    
+    def log_message(self, *args):
+        pass
+
+def test_pooling_and_retries():
+    """Requests reuse kept-alive connections; GETs retry on 503, POSTs don't"""
+    print("🧪 Testing shared HTTP client")
+    print("=" * 50)
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    
+    try:
+        client = HTTPClient(retry=build_retry(total=2, backoff_factor=0))
+        for i in range(5):
+            assert client.get(f"{base}/quote/{i}").json()['ok']
+        client.post(f"{base}/webhook", json={'symbol': 'AAPL'})
+        
+        stats = client.get_stats()
+        assert stats['requests'] == 6 and stats['new_connections'] == 1
+        assert stats['reused_connections'] == 5
+        print(f"✅ {client.format_stats()}")
+        
+        assert client.get(f"{base}/flaky-get").status_code == 200
+        assert Handler.hits['/flaky-get'] == 2
+        assert client.post(f"{base}/flaky-post", json={}).status_code == 503
+        assert Handler.hits['/flaky-post'] == 1
+        print("✅ GET retried after 503, POST left alone")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    test_pooling_and_retries()
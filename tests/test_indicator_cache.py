@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the indicator memo's disk tier
+A second process must read indicators the first one computed for the same bar
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.append('.')
+
+from indicator_cache import IndicatorResultCache
+from indicators import IndicatorMemo, SUMMARY_PARAMS
+from panel_indicators import synthetic_frames, compute_panel_indicators, indicators_match
+
+def test_results_shared_across_processes():
+    """Results survive a save/load round trip; a new bar starts over"""
+    print("🧪 Testing indicator disk tier")
+    print("=" * 50)
+    
+    frames = synthetic_frames(3, bars=70)
+    hist = frames['SYM000']
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.json')
+        first = IndicatorMemo(disk=IndicatorResultCache(path))
+        later = IndicatorMemo(disk=IndicatorResultCache(path))  # Started before anything was saved
+        
+        expected = first.get('AAA', hist).technical_summary()
+        atr = first.get('AAA', hist).atr
+        first.save_disk_tier()
+        
+        second = IndicatorMemo(disk=IndicatorResultCache(path))
+        indicator_set = second.get('AAA', hist)
+        cached = indicator_set.cached_summary()
+        assert cached is not None and indicators_match(expected, cached)
+        assert np.isclose(indicator_set.atr, atr)
+        assert second.disk.get_stats()['misses'] == 0
+        print(f"✅ {len(SUMMARY_PARAMS) + 1} results read from disk, none recomputed")
+        
+        # A process that loaded the file earlier picks up the save on its next miss
+        assert later.get('AAA', hist).cached_summary() is not None
+        
+        # New bar: a miss, and the old bar's results are dropped
+        assert second.get('AAA', hist.iloc[:-1]).cached_summary() is None
+        second.get('AAA', hist.iloc[:-1]).technical_summary()
+        assert second.disk.data['AAA']['bar'] == second.get('AAA', hist.iloc[:-1]).bar_key
+        print("✅ Newer bars replace older entries")
+
+def test_panel_results_prime_the_memo():
+    """Summaries from the panel engine are reused by later per-symbol consumers"""
+    frames = synthetic_frames(4, bars=70)
+    panel = compute_panel_indicators(frames)
+    with tempfile.TemporaryDirectory() as tmp:
+        memo = IndicatorMemo(disk=IndicatorResultCache(os.path.join(tmp, 'results.json')))
+        for symbol, summary in panel.items():
+            memo.get(symbol, frames[symbol]).store_summary(summary)
+        
+        indicator_set = memo.get('SYM002', frames['SYM002'])
+        assert indicator_set.rsi == panel['SYM002']['rsi']
+        assert indicator_set.macd is panel['SYM002']['macd']
+        assert memo.get_stats()['hits'] == 1
+
+if __name__ == "__main__":
+    test_results_shared_across_processes()
+    test_panel_results_prime_the_memo()
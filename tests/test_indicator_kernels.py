@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the indicator kernels
+The loop kernels (what numba compiles) and the NumPy kernels must agree with pandas
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+import indicator_kernels as kernels
+
+def sample_bars(bars=300):
+    """Ten-year style bars with a few missing values and flat closes"""
+    hist = kernels.synthetic_series(bars)
+    hist.iloc[40, hist.columns.get_loc('High')] = np.nan
+    hist.iloc[90, hist.columns.get_loc('Close')] = np.nan
+    hist.iloc[150, hist.columns.get_loc('Volume')] = np.nan
+    hist.iloc[200, hist.columns.get_loc('Close')] = hist['Close'].iloc[199]
+    return hist
+
+def test_kernels_match_pandas():
+    """Both kernel flavours reproduce the pandas definitions, NaN handling included"""
+    print("🧪 Testing indicator kernels")
+    print("=" * 50)
+    
+    hist = sample_bars()
+    high, low, close, volume = (hist[c].to_numpy() for c in ('High', 'Low', 'Close', 'Volume'))
+    previous = hist['Close'].shift(1)
+    tr = pd.concat([hist['High'] - hist['Low'], (hist['High'] - previous).abs(),
+                    (hist['Low'] - previous).abs()], axis=1).max(axis=1)
+    
+    expected = {
+        'max': hist['High'].rolling(window=14).max().to_numpy(),
+        'min': hist['Low'].rolling(window=14).min().to_numpy(),
+        'obv': (np.sign(hist['Close'].diff()) * hist['Volume']).fillna(0).cumsum().to_numpy(),
+        'tr': tr.to_numpy(),
+        'atr': tr.rolling(window=14).mean().to_numpy()
+    }
+    loops = {
+        'max': kernels._rolling_extreme_loop(high, 14, 1.0),
+        'min': kernels._rolling_extreme_loop(low, 14, -1.0),
+        'obv': kernels._obv_loop(close, volume),
+        'tr': kernels._true_range_loop(high, low, close),
+        'atr': kernels._rolling_mean_loop(kernels._true_range_loop(high, low, close), 14)
+    }
+    vectorized = {
+        'max': kernels._rolling_extreme_numpy(high, 14, 1),
+        'min': kernels._rolling_extreme_numpy(low, 14, -1),
+        'obv': kernels._obv_numpy(close, volume),
+        'tr': kernels._true_range_numpy(high, low, close),
+        'atr': kernels._rolling_mean_numpy(kernels._true_range_numpy(high, low, close), 14)
+    }
+    for name in expected:
+        assert np.allclose(loops[name], expected[name], rtol=1e-12, equal_nan=True), name
+        assert np.allclose(vectorized[name], expected[name], rtol=1e-12, equal_nan=True), name
+    print(f"✅ Rolling extremes, OBV, true range and ATR match pandas ({kernels.backend()} backend)")
+    
+    # Wilder smoothing: hand-rolled reference, skipping the missing bar
+    values = hist['Close'].to_numpy()
+    wilder = kernels._wilder_numpy(values, 14)
+    assert np.allclose(kernels._wilder_loop(values, 14), wilder, rtol=1e-12, equal_nan=True)
+    valid = values[~np.isnan(values)]
+    state = valid[:14].mean()
+    for x in valid[14:]:
+        state = state * 13 / 14 + x / 14
+    assert np.isclose(wilder[-1], state, rtol=1e-12)
+    assert np.isnan(wilder[12]) and np.isclose(wilder[13], valid[:14].mean())
+    assert wilder[90] == wilder[89]  # Missing bar holds the previous value
+
+def test_short_inputs_and_benchmark():
+    """Inputs shorter than the window stay NaN; the benchmark agrees with the old code"""
+    short = np.array([1.0, 2.0, 3.0])
+    for result in (kernels.rolling_max(short, 14), kernels.rolling_min(short, 14),
+                   kernels.atr(short, short, short, 14), kernels.wilder_smooth(short, 14)):
+        assert np.isnan(result).all()
+    assert kernels.obv(short[:1], short[:1]).tolist() == [0.0]
+    
+    result = kernels.run_benchmark(bars=2520, repeats=2)
+    assert not result['mismatches']
+    print(f"✅ Kernels {result['speedup']:.0f}x faster on {result['bars']} bars")
+
+if __name__ == "__main__":
+    test_kernels_match_pandas()
+    test_short_inputs_and_benchmark()
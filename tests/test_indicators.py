@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared indicator library
+Every scanner must report the same RSI/MACD for a symbol, computed once
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+import market_data
+import bar_store
+import symbol_quarantine
+import fundamentals_cache
+import indicators
+import streaming_indicators
+from bar_store import BarStore
+from market_data import MarketDataProvider, set_provider
+from symbol_quarantine import SymbolQuarantine
+from fundamentals_cache import FundamentalsCache
+from scan_executor import run_hybrid_scan
+from indicators import IndicatorMemo, IndicatorSet, get_indicators
+from streaming_indicators import StreamingIndicatorStore
+
+class WalkProvider(MarketDataProvider):
+    """Offline random-walk bars and dividend-paying fundamentals"""
+    
+    name = "walk"
+    offline = True
+    
+    def history(self, symbol, period="1mo", interval="1d", start=None):
+        rng = np.random.default_rng(sum(map(ord, symbol)))
+        dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=120)
+        close = 40 * np.exp(np.cumsum(rng.normal(0.002, 0.02, len(dates))))
+        return pd.DataFrame({'Open': close * 0.995, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+                             'Volume': rng.integers(500_000, 3_000_000, len(dates)).astype(float)},
+                            index=pd.DatetimeIndex(dates, name='Date'))
+    
+    def info(self, symbol):
+        return {'symbol': symbol, 'longName': symbol, 'dividendYield': 0.04, 'marketCap': 50_000_000_000,
+                'fiftyTwoWeekHigh': 80.0, 'fiftyTwoWeekLow': 20.0}
+    
+    def news(self, symbol):
+        return []
+    
+    def calendar(self, symbol):
+        return None
+
+def test_one_answer_per_symbol():
+    """The four scanners agree on RSI/MACD; the batch reports share one IndicatorSet"""
+    print("🧪 Testing shared indicators")
+    print("=" * 50)
+    
+    saved = (market_data._provider, bar_store.bar_store, bar_store.quarantine, symbol_quarantine.quarantine,
+             fundamentals_cache.fundamentals_cache, indicators.indicator_memo, streaming_indicators.streaming_store)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            set_provider(WalkProvider())
+            bar_store.bar_store = BarStore(root=os.path.join(tmp, 'bars'))
+            bar_store.quarantine = symbol_quarantine.quarantine = SymbolQuarantine(os.path.join(tmp, 'q.json'))
+            fundamentals_cache.fundamentals_cache = FundamentalsCache(os.path.join(tmp, 'fundamentals.json'))
+            memo = indicators.indicator_memo = IndicatorMemo()
+            streaming_indicators.streaming_store = StreamingIndicatorStore(os.path.join(tmp, 'state.json'))
+            
+            from scheduled_market_alerts import get_technical_score
+            from current_stock_summary import get_technical_analysis
+            from dividend_stock_analyzer import get_stock_dividend_data
+            from main_enhanced import fetch_stocks
+            
+            scheduled = get_technical_score('KO')
+            summary = get_technical_analysis('KO')
+            dividend = get_stock_dividend_data('KO')
+            enhanced = fetch_stocks(['KO'], include_sentiment=False, silent=True)['KO']
+            
+            assert np.isclose(scheduled['rsi'], summary['rsi'])
+            assert np.isclose(scheduled['rsi'], enhanced['rsi'])
+            assert round(scheduled['rsi'], 2) == dividend['rsi']
+            assert np.isclose(scheduled['macd'], summary['macd'])
+            assert np.isclose(summary['macd'], enhanced['macd']['macd'])
+            print(f"✅ RSI {scheduled['rsi']:.2f} / MACD {scheduled['macd']:.3f} identical in all four scanners")
+            
+            stats = memo.get_stats()
+            assert stats['misses'] == 1 and stats['hits'] == 2  # The hourly scorer streams instead
+            print(f"✅ Indicators computed once, reused {stats['hits']} times")
+            
+            # Scoring in the hybrid executor's worker processes gives the same answers
+            from scheduled_market_alerts import fetch_score_inputs, score_technical_inputs
+            from current_stock_summary import fetch_technical_inputs, analyze_technical_inputs
+            from dividend_stock_analyzer import fetch_dividend_inputs, score_dividend_stock
+            for fetch, compute, expected in ((fetch_score_inputs, score_technical_inputs, scheduled),
+                                             (fetch_technical_inputs, analyze_technical_inputs, summary),
+                                             (fetch_dividend_inputs, score_dividend_stock, dividend)):
+                scanned, report = run_hybrid_scan(['KO'], fetch, compute, cpu_workers=2, rate_per_second=0)
+                assert report['mode'] == 'processes' and scanned[0]['rsi'] == expected['rsi']
+            
+            # A new bar is a new IndicatorSet
+            hist = bar_store.get_history('KO', period="3mo")
+            assert get_indicators('KO', hist.iloc[:-1]) is not get_indicators('KO', hist)
+        finally:
+            (market_data._provider, bar_store.bar_store, bar_store.quarantine, symbol_quarantine.quarantine,
+             fundamentals_cache.fundamentals_cache, indicators.indicator_memo, streaming_indicators.streaming_store) = saved
+
+def test_short_history_fallbacks():
+    """Short histories fall back instead of raising"""
+    dates = pd.bdate_range('2024-01-02', periods=22)
+    close = pd.Series(np.linspace(10, 12, len(dates)), index=dates)
+    hist = pd.DataFrame({'Open': close, 'High': close + 0.1, 'Low': close - 0.1, 'Close': close,
+                         'Volume': 1_000.0}, index=dates)
+    indicator_set = IndicatorSet('NEW', hist)
+    assert indicator_set.macd['macd'] == 0  # Fewer than 26 bars
+    assert indicator_set.moving_averages['sma_50'] == indicator_set.sma(20)
+    assert np.isnan(indicator_set.sma(50))
+    assert indicator_set.rsi == 100  # Only gains
+    assert indicator_set.change(30) == 0
+
+def test_intraday_bar_rewrite_misses_the_memo():
+    """A poll that changes today's volume, high or low (same close) gets fresh indicators"""
+    hist = WalkProvider().history('AAA')
+    memo = IndicatorMemo()
+    before = memo.get('AAA', hist).volume_analysis['current_volume']
+    
+    for column, factor in (('Volume', 1.5), ('High', 1.01), ('Low', 0.99)):
+        polled = hist.copy()
+        polled.iloc[-1, polled.columns.get_loc(column)] *= factor
+        assert memo.get('AAA', polled) is not memo.get('AAA', hist), column
+    polled = hist.copy()
+    polled.iloc[-1, polled.columns.get_loc('Volume')] *= 1.5
+    assert memo.get('AAA', polled).volume_analysis['current_volume'] == before * 1.5
+    print("✅ Rewritten last bar recomputes, unchanged bars still hit")
+
+if __name__ == "__main__":
+    test_one_answer_per_symbol()
+    test_short_history_fallbacks()
+    test_intraday_bar_rewrite_misses_the_memo()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the market data providers
+Records synthetic fixtures and replays them offline
+"""
+
+import os
+import sys
+import tempfile
+import textwrap
+import subprocess
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+import market_data
+from market_data import MarketDataProvider, RecordingProvider, ReplayProvider, set_provider
+import bar_store
+from bar_store import BarStore
+from symbol_quarantine import SymbolQuarantine
+
+class SyntheticProvider(MarketDataProvider):
+    """In-memory provider standing in for Yahoo Finance"""
+    
+    name = "synthetic"
+    
+    def __init__(self, dates):
+        self.dates = dates
+    
+    def history(self, symbol, period="1mo", interval="1d", start=None):
+        close = 50.0 + np.arange(len(self.dates), dtype=float)
+        return pd.DataFrame({
+            'Open': close - 0.5,
+            'High': close + 1.0,
+            'Low': close - 1.0,
+            'Close': close,
+            'Volume': np.full(len(self.dates), 2_000_000.0)
+        }, index=pd.DatetimeIndex(self.dates, name='Date').tz_localize('America/New_York'))
+    
+    def info(self, symbol):
+        return {'symbol': symbol, 'marketCap': 5_000_000_000, 'dividendYield': 0.031}
+    
+    def news(self, symbol):
+        return [{'title': f"{symbol} beats estimates"}]
+    
+    def calendar(self, symbol):
+        return {'Earnings Date': ['2024-07-25']}
+
+def test_record_and_replay():
+    """Recorded fixtures replay offline with a pinned clock"""
+    print("🧪 Testing record and replay")
+    print("=" * 50)
+    
+    dates = pd.bdate_range('2024-01-02', '2024-06-28')
+    previous = market_data._provider
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = os.path.join(tmp, 'fixtures')
+        recorder = RecordingProvider(SyntheticProvider(dates), fixtures)
+        recorder.history_batch(['AAPL', 'RY.TO'], period="1y")
+        for symbol in ['AAPL', 'RY.TO']:
+            recorder.info(symbol)
+            recorder.news(symbol)
+            recorder.calendar(symbol)
+        
+        replay = ReplayProvider(fixtures)
+        assert replay.offline
+        assert replay.now().date() == dates[-1].date()
+        print(f"✅ Replay clock pinned to {replay.now():%Y-%m-%d}")
+        
+        assert len(replay.history('AAPL', period='5d')) == 5
+        three_months = replay.history('AAPL', period='3mo')
+        assert three_months.index[0] >= pd.Timestamp('2024-03-28')
+        assert three_months['Close'].iloc[-1] == 50.0 + len(dates) - 1
+        assert replay.history('MISSING', period='1mo').empty
+        print(f"✅ History windows: 5d=5 bars, 3mo={len(three_months)} bars")
+        
+        assert replay.info('RY.TO')['marketCap'] == 5_000_000_000
+        assert replay.news('AAPL')[0]['title'] == "AAPL beats estimates"
+        assert replay.calendar('AAPL') == {'Earnings Date': ['2024-07-25']}
+        assert replay.info('MISSING') == {}
+        assert replay.quote('AAPL')['price'] == three_months['Close'].iloc[-1]
+        print("✅ Info, news, calendar and quote replayed")
+        
+        # The bar store runs on the replay provider without touching the network
+        original_quarantine = bar_store.quarantine
+        try:
+            set_provider(replay)
+            bar_store.quarantine = SymbolQuarantine(os.path.join(tmp, 'quarantine.json'))
+            store = BarStore(root=os.path.join(tmp, 'bars'))
+            report = store.update(['AAPL', 'RY.TO', 'MISSING'])
+            assert report['backfilled'] == 2
+            assert report['failed_symbols'] == ['MISSING']
+            assert len(store.get_history('AAPL', period='60d', refresh=False)) == 44  # Sessions after 2024-04-29, not 60 bars
+            window = store.get_history('AAPL', period='1mo', refresh=False)
+            assert window.index[0] >= pd.Timestamp('2024-05-28')
+            print(f"✅ Bar store backfilled from fixtures ({report['bars_downloaded']} bars)")
+        finally:
+            set_provider(previous)
+            bar_store.quarantine = original_quarantine
+
+def test_bench_makes_no_live_fetch():
+    """`python market_data.py bench` scans the fixtures; the scanners never fall back to Yahoo"""
+    repo = os.path.abspath('.')
+    dates = pd.bdate_range('2024-01-02', '2024-06-28')
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = os.path.join(tmp, 'fixtures')
+        recorder = RecordingProvider(SyntheticProvider(dates), fixtures)
+        recorder.history_batch(['AAPL', 'RY.TO'], period="1y")
+        for symbol in ['AAPL', 'RY.TO']:
+            recorder.info(symbol)
+        
+        # Run the file as a script (its own __main__ copy of the module) with every Yahoo entry point trapped
+        script = textwrap.dedent(f"""
+            import sys, runpy
+            sys.path[:0] = [{repo!r}, {os.path.join(repo, 'utils')!r}]
+            import yfinance, stock_universe
+            
+            def live_fetch(*args, **kwargs):
+                print("LIVE FETCH", args[:1], flush=True)
+                raise RuntimeError("live fetch during the replay benchmark")
+            
+            yfinance.Ticker = yfinance.download = live_fetch
+            stock_universe.get_comprehensive_stock_list = lambda: ['AAPL', 'RY.TO']
+            sys.argv = ['market_data.py', 'bench']
+            runpy.run_path({os.path.join(repo, 'market_data.py')!r}, run_name='__main__')
+        """)
+        env = dict(os.environ, MARKET_DATA_FIXTURES=fixtures, BAR_STORE_DIR=os.path.join(tmp, 'bars'))
+        result = subprocess.run([sys.executable, '-c', script], cwd=tmp, env=env, capture_output=True, text=True,
+                                timeout=300)
+    
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert "LIVE FETCH" not in result.stdout, result.stdout[-2000:]
+    assert "Replay benchmark (2 symbols, as of 2024-06-28)" in result.stdout
+    print("✅ Benchmark ran offline against the fixtures")
+
+if __name__ == "__main__":
+    test_record_and_replay()
+    test_bench_makes_no_live_fetch()
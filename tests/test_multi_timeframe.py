@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for weekly/monthly trends
+The universe-wide resample must match resampling each symbol on its own
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+from indicators import rsi_series, macd_summary
+from multi_timeframe import (compute_timeframe_trends, daily_universe, resample_universe, RESAMPLE_AGG,
+                             MONTHLY_MA_PERIOD)
+from panel_indicators import synthetic_frames
+
+def test_trends_match_per_symbol_resample():
+    """Ragged and stale histories give the same weekly/monthly values as pandas per symbol"""
+    print("🧪 Testing multi-timeframe trends")
+    print("=" * 50)
+    
+    frames = synthetic_frames(12, bars=260)
+    frames['SYM003'] = frames['SYM003'].tail(90)         # Short history: no weekly MACD yet
+    frames['SYM007'] = frames['SYM007'].iloc[:-15]      # Stopped trading three weeks ago
+    frames['SYM009'] = frames['SYM009'].drop(frames['SYM009'].index[100:104])  # Missing days
+    
+    trends = compute_timeframe_trends(frames)
+    assert list(trends) == list(frames)
+    
+    for symbol, hist in frames.items():
+        weekly = hist.resample('W-FRI').agg(RESAMPLE_AGG).dropna(subset=['Close'])
+        monthly = hist['Close'].resample('ME').last().dropna()
+        expected_rsi = rsi_series(weekly['Close']).iloc[-1]
+        expected_macd = macd_summary(weekly['Close'])
+        ma = monthly.rolling(MONTHLY_MA_PERIOD).mean()
+        expected_slope = (ma.iloc[-1] - ma.iloc[-2]) / ma.iloc[-2] * 100
+        
+        trend = trends[symbol]
+        assert np.isclose(trend['weekly_rsi'], expected_rsi, equal_nan=True), symbol
+        assert np.isclose(trend['weekly_macd'], expected_macd['macd']), symbol
+        assert np.isclose(trend['weekly_signal'], expected_macd['signal']), symbol
+        assert np.isclose(trend['monthly_ma_slope'], expected_slope, equal_nan=True), symbol
+    
+    assert not trends['SYM003']['weekly_bullish'] and np.isnan(trends['SYM003']['monthly_ma_slope'])
+    print(f"✅ {len(trends)} symbols match per-symbol pandas resampling")
+    
+    # Weekly volume is the sum of the week's daily volume, weekly high the max (prices held as float32)
+    panel = resample_universe(daily_universe(frames), 'W-FRI')
+    row = panel.symbols.index('SYM000')
+    last_week = frames['SYM000'].resample('W-FRI').agg(RESAMPLE_AGG).iloc[-1]
+    assert panel.volume[row, -1] == last_week['Volume'] and panel.high[row, -1] == np.float32(last_week['High'])
+
+def test_empty_universe():
+    assert compute_timeframe_trends({}) == {}
+    assert compute_timeframe_trends({'NONE': pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])}) == {}
+
+if __name__ == "__main__":
+    test_trends_match_per_symbol_resample()
+    test_empty_universe()
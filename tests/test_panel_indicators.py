@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test script for the panel indicator engine
+Checks the vectorized pass against main_enhanced's per-symbol pandas path
+"""
+
+import sys
+import numpy as np
+
+sys.path.append('.')
+
+import indicators
+from indicators import IndicatorMemo
+from panel_indicators import (compute_panel_indicators, per_symbol_indicators, indicators_match,
+                              synthetic_frames, run_benchmark)
+from main_enhanced import analyze_stock_history
+
+def test_panel_matches_per_symbol():
+    """Ragged histories and price gaps give the same results as the calc_* functions"""
+    print("🧪 Testing panel indicators")
+    print("=" * 50)
+    
+    frames = synthetic_frames(40, bars=70)
+    for i, symbol in enumerate(list(frames)):
+        frames[symbol] = frames[symbol].tail(15 + i)  # 15..54 bars: below/above the 20, 26 and 50 bar windows
+    gappy = frames['SYM030'].copy()
+    gappy.iloc[-7, gappy.columns.get_loc('Close')] = np.nan
+    frames['SYM030'] = gappy
+    
+    panel = compute_panel_indicators(frames)
+    assert list(panel) == list(frames)
+    for symbol, hist in frames.items():
+        expected = per_symbol_indicators(hist)
+        assert indicators_match(expected, panel[symbol]), symbol
+    print(f"✅ {len(frames)} symbols match the per-symbol path")
+    
+    # The scoring gets identical input either way (memo without a disk tier, so nothing is persisted)
+    hist = frames['SYM020']
+    saved, indicators.indicator_memo = indicators.indicator_memo, IndicatorMemo()
+    try:
+        with_panel = analyze_stock_history('SYM020', hist, include_sentiment=False, silent=True,
+                                           indicators=panel['SYM020'])
+        per_symbol = analyze_stock_history('SYM020', hist, include_sentiment=False, silent=True)
+    finally:
+        indicators.indicator_memo = saved
+    assert with_panel['technical_score'] == per_symbol['technical_score']
+    assert with_panel['technical_signals'] == per_symbol['technical_signals']
+    
+    result = run_benchmark(synthetic_frames(100))
+    assert not result['mismatches']
+    print(f"✅ Panel {result['speedup']:.0f}x faster on {result['symbols']} symbols")
+
+if __name__ == "__main__":
+    test_panel_matches_per_symbol()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the two-phase scan prefilter
+Runs offline against a temporary bar store of synthetic bars
+"""
+
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+from bar_store import BarStore
+from indicators import IndicatorSet
+from prefilter import quote_snapshot, run_prefilter, audit_misses, estimate_misses, format_prefilter_report
+
+def make_bars(daily_return, bars=60, volume=1_000_000.0, last_volume=None):
+    """Steady trend ending yesterday"""
+    close = 50 * (1 + daily_return) ** np.arange(bars)
+    volumes = np.full(bars, volume)
+    if last_volume is not None:
+        volumes[-1] = last_volume
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1), periods=bars, name='Date')
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+                         'Volume': volumes}, index=dates)
+
+def test_snapshot_and_pruning():
+    """Weak names are pruned, strong/unknown/current ones kept, the snapshot matches pandas"""
+    print("🧪 Testing universe prefilter")
+    print("=" * 50)
+    
+    frames = {
+        'UP': make_bars(0.004),                                  # Above MA20, +8% a month
+        'DOWN': make_bars(-0.004),                               # 4% under MA20, -7% a month
+        'DOWN_VOLUME': make_bars(-0.004, last_volume=3_000_000),  # Same trend, but a volume spike
+        'CRASH': make_bars(-0.01),                               # -17% a month: oversold bounce candidate
+        'HELD': make_bars(-0.004),                               # Weak, but a current WATCH name
+        'SHORT': make_bars(0.0, bars=8)                          # Too little history to judge
+    }
+    for i in range(20):
+        frames[f"WEAK{i}"] = make_bars(-0.004 - i * 0.00005)
+    frames['WAVY'] = make_bars(0.004)
+    frames['WAVY'][['Open', 'High', 'Low', 'Close']] *= (1 + 0.03 * np.sin(np.arange(60)))[:, None]
+    universe = list(frames) + ['NOBARS']
+    
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root=root)
+        for symbol, hist in frames.items():
+            store.save(symbol, hist)
+        
+        snapshot = quote_snapshot(universe, store=store)
+        close = frames['DOWN']['Close']
+        assert np.isclose(snapshot.loc['DOWN', 'change_1w'], (close.iloc[-1] / close.iloc[-5] - 1) * 100, rtol=1e-4)
+        assert np.isclose(snapshot.loc['DOWN', 'change_1m'], (close.iloc[-1] / close.iloc[-20] - 1) * 100, rtol=1e-4)
+        assert np.isclose(snapshot.loc['DOWN', 'ma20_distance'],
+                          (close.iloc[-1] / close.tail(20).mean() - 1) * 100, rtol=1e-4)
+        assert np.isclose(snapshot.loc['DOWN_VOLUME', 'volume_ratio'], 3_000_000 / (22_000_000 / 20))
+        wavy = frames['WAVY']
+        expected = IndicatorSet('WAVY', wavy)
+        assert np.isclose(snapshot.loc['WAVY', 'rsi'], expected.rsi, rtol=1e-4)
+        assert np.isclose(snapshot.loc['WAVY', 'roc'], expected.momentum['roc'], rtol=1e-4)
+        
+        report = run_prefilter(universe, always_keep=['HELD'], audit_sample=5, store=store, seed=7)
+    
+    assert report['pruned'] == ['DOWN'] + [f"WEAK{i}" for i in range(20)]
+    assert report['shortlist'] == ['UP', 'DOWN_VOLUME', 'CRASH', 'HELD', 'SHORT', 'WAVY', 'NOBARS']
+    assert len(report['audit']) == 5 and set(report['audit']) <= set(report['pruned'])
+    assert report['audit'] == [s for s in universe if s in report['audit']]  # Universe order
+    print(f"✅ {format_prefilter_report(report)}")
+    
+    # A pruned symbol that scores WATCH in the audit is a miss
+    analyses = [{'symbol': report['audit'][0], 'score': 6}, {'symbol': report['audit'][1], 'score': 2},
+                {'symbol': 'UP', 'score': 8}, None]
+    missed = audit_misses(analyses, report['audit'], watch_threshold=5)
+    assert [a['symbol'] for a in missed] == [report['audit'][0]]
+    # The audit is a sample: the report says so and extrapolates to every pruned symbol
+    line = format_prefilter_report(report, missed)
+    assert f"1 miss in 5/21 sampled, est. miss rate 20% ≈ 4 pruned signals: {report['audit'][0]}" in line
+    assert "0 misses in 4/21 sampled, est. miss rate 0% ≈ 0 pruned signals)" in format_prefilter_report(report, [], 4)
+    assert "none scanned" in format_prefilter_report(report, [], 0)
+    assert estimate_misses(2, 25, 500) == {'sampled': 25, 'pruned': 500, 'missed': 2, 'miss_rate': 0.08,
+                                           'estimated_misses': 40.0}
+
+if __name__ == "__main__":
+    test_snapshot_and_pruning()
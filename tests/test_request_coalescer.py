@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for request coalescing
+Counts how often the underlying fetch really runs
+"""
+
+import sys
+import time
+import tempfile
+import threading
+import pandas as pd
+
+sys.path.append('.')
+
+from request_coalescer import RequestCoalescer
+
+def test_single_flight():
+    """Concurrent and repeated identical fetches share one request"""
+    print("🧪 Testing request coalescing")
+    print("=" * 50)
+    
+    calls = []
+    
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'symbol': 'AAPL', 'price': 190.0}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        coalescer = RequestCoalescer(cache_dir=tmp)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            coalescer.call('quote', 'AAPL', '', slow_fetch))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(calls) == 1 and len(results) == 8
+        assert all(r == {'symbol': 'AAPL', 'price': 190.0} for r in results)
+        
+        # Callers get their own copies
+        results[0]['price'] = 0
+        assert coalescer.call('quote', 'AAPL', '', slow_fetch)['price'] == 190.0
+        assert len(calls) == 1
+        
+        # A different window is a different request
+        coalescer.call('quote', 'AAPL', '5d', slow_fetch)
+        assert len(calls) == 2
+        
+        # Batch results are copied down to the frames, so one caller's edits never reach another's
+        batch = lambda: {'AAPL': pd.DataFrame({'Close': [190.0, 191.0]}), 'MSFT': pd.DataFrame({'Close': [410.0]})}
+        first = coalescer.call('history_batch', ['AAPL', 'MSFT'], '5d|1d', batch)
+        first['AAPL'].loc[0, 'Close'] = 0.0
+        first['AAPL']['Signal'] = 1
+        second = coalescer.call('history_batch', ['MSFT', 'AAPL'], '5d|1d', batch)
+        assert second['AAPL']['Close'].tolist() == [190.0, 191.0] and 'Signal' not in second['AAPL']
+        
+        stats = coalescer.get_stats()
+        assert stats['fetches'] == 3 and stats['saved_fetches'] == 9
+        print(f"✅ {coalescer.format_stats()}")
+        
+        # A second process sharing the cache directory reuses the stored result
+        other_process = RequestCoalescer(cache_dir=tmp)
+        assert other_process.call('quote', 'AAPL', '', slow_fetch)['price'] == 190.0
+        assert len(calls) == 2 and other_process.get_stats()['shared_cross_process'] == 1
+        print("✅ Result shared across processes through the cache directory")
+
+def test_errors_reach_waiters():
+    """A failed fetch raises for every waiting caller and is not cached"""
+    calls = []
+    
+    def failing_fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        raise ConnectionError("429 Too Many Requests")
+    
+    coalescer = RequestCoalescer(cross_process=False)
+    errors = []
+    
+    def worker():
+        try:
+            coalescer.call('history', 'NVDA', '1mo|1d', failing_fetch)
+        except ConnectionError as e:
+            errors.append(str(e))
+    
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1 and len(errors) == 4
+    try:
+        coalescer.call('history', 'NVDA', '1mo|1d', failing_fetch)
+    except ConnectionError:
+        pass
+    assert len(calls) == 2
+    print("✅ Errors propagate to waiters and are retried on the next call")
+
+if __name__ == "__main__":
+    test_single_flight()
+    test_errors_reach_waiters()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for scan checkpoint/resume
+A fake scan is killed part-way through in a child process, then resumed from its checkpoint
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import tempfile
+import multiprocessing
+from datetime import datetime, timedelta
+
+sys.path.append('.')
+
+from scan_checkpoint import ScanCheckpoint
+
+def fetch_number(symbol):
+    time.sleep(0.02)
+    number = int(symbol[3:])
+    if number == 5:
+        return None                    # Nothing to score - checkpointed as None
+    if number == 7:
+        raise ValueError("delisted")   # Errors are not checkpointed, so retried next run
+    return {'number': number}
+
+def score_number(symbol, payload):
+    return {'symbol': symbol, 'square': payload['number'] ** 2, 'scored_at': time.time()}
+
+def count_lines(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return sum(1 for _ in f)
+
+def scan(checkpoint_dir, symbols):
+    checkpoint = ScanCheckpoint('numbers', checkpoint_dir=checkpoint_dir)
+    return checkpoint, checkpoint.run(symbols, fetch_number, score_number, io_workers=2, cpu_workers=1,
+                                      rate_per_second=0)
+
+def test_killed_scan_resumes():
+    """A SIGKILLed scan keeps what finished; the rerun scans only the rest, stale results are re-fetched"""
+    print("🧪 Testing scan checkpoint/resume")
+    print("=" * 50)
+    
+    symbols = [f"SYM{i}" for i in range(60)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'numbers.jsonl')
+        child = multiprocessing.get_context('fork').Process(target=scan, args=(tmp, symbols))
+        child.start()
+        while count_lines(path) < 20:
+            time.sleep(0.01)
+        os.kill(child.pid, signal.SIGKILL)
+        child.join()
+        with open(path, 'a') as f:
+            f.write('{"symbol": "SYM59", "completed_at": "20')  # Torn line from a write cut short
+        
+        # Age one finished result past the limit - it has to be fetched again
+        with open(path) as f:
+            lines = f.readlines()
+        first = json.loads(lines[0])
+        first['completed_at'] = (datetime.now() - timedelta(days=2)).isoformat(timespec='seconds')
+        with open(path, 'w') as f:
+            f.writelines([json.dumps(first) + "\n"] + lines[1:])
+        
+        killed_done = {json.loads(line)['symbol'] for line in lines[1:] if line.endswith("\n")}
+        assert 'SYM7' not in killed_done and len(killed_done) < len(symbols)
+        
+        checkpoint, (results, report) = scan(tmp, symbols)
+        assert report['resumed'] == len(killed_done) and report['symbols'] == 60
+        assert report['completed'] == 60 - len(killed_done)                    # Only the rest was scanned
+        assert first['symbol'] not in killed_done and 'SYM7' in report['errors']
+        assert [r['symbol'] for r in results if r] == [s for s in symbols if s not in ('SYM5', 'SYM7')]
+        assert all(r['square'] == int(r['symbol'][3:]) ** 2 for r in results if r)
+        print(f"✅ {checkpoint.format_stats()}")
+        
+        # A completed run clears its checkpoint: the next run rescans everything
+        checkpoint.clear()
+        assert not os.path.exists(path)
+        _, (again, report) = scan(tmp, symbols)
+        assert report['resumed'] == 0 and report['completed'] == 60
+        assert min(r['scored_at'] for r in again if r) > max(r['scored_at'] for r in results if r)
+
+if __name__ == "__main__":
+    test_killed_scan_resumes()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the deadline-bounded scan
+Sleeping fake stages stand in for a slow provider; tracking files live in a temp directory
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append('.')
+
+import scheduled_market_alerts
+from scan_pipeline import ScanPipeline, Stage, format_pipeline_report
+from scan_coverage import ScanCarryover, ScanDeadline, prioritize_symbols, format_coverage
+
+def test_priority_order_and_coverage_line():
+    """Signals first, then last run's skipped symbols, then by dollar volume (unknown last)"""
+    print("🧪 Testing deadline-bounded scan")
+    print("=" * 50)
+    
+    symbols = ['LOW', 'HIGH', 'HELD', 'NEW', 'MID', 'SKIPPED']
+    liquidity = {'LOW': 1e6, 'HIGH': 5e8, 'HELD': 1e5, 'MID': 3e7, 'SKIPPED': 2e6, 'NEW': float('nan')}
+    order = prioritize_symbols(symbols, signals=['HELD'], carryover=['SKIPPED', 'GONE'], liquidity=liquidity)
+    assert order == ['HELD', 'SKIPPED', 'HIGH', 'MID', 'LOW', 'NEW']
+    
+    assert format_coverage(487, 600, 14 * 60) == "487/600 scanned in 14m"
+    assert format_coverage(487, 600, 14 * 60, 113) == "487/600 scanned in 14m - deadline reached, 113 carried over to the next run"
+    assert ScanDeadline(0).at is None and not ScanDeadline(0).expired()
+    deadline = ScanDeadline(10, started=time.time() - 360)
+    assert not deadline.expired() and deadline.share(0.5) < time.time() < deadline.at
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        ScanCarryover(os.path.join(tmp, 'carryover.json')).save_carryover(['SKIPPED', 'HIGH'])
+        assert ScanCarryover(os.path.join(tmp, 'carryover.json')).symbols == ['SKIPPED', 'HIGH']
+
+def test_pipeline_stops_at_deadline():
+    """Nothing starts after the deadline, in-flight items finish, the unstarted tail is reported as skipped"""
+    symbols = [f"SYM{i}" for i in range(200)]
+    delivered = []
+    
+    def fetch(symbol, _):
+        time.sleep(0.02)  # Slow provider
+        return symbol
+    
+    started = time.time()
+    pipeline = ScanPipeline([Stage('fetch', fetch, workers=4), Stage('score', lambda symbol, value: value)],
+                            queue_size=8)
+    report = pipeline.run(symbols, lambda index, symbol, value: delivered.append(symbol), deadline=started + 0.3)
+    elapsed = time.time() - started
+    
+    skipped = report['skipped']
+    assert skipped and delivered and len(delivered) + len(skipped) == len(symbols)
+    assert skipped == symbols[-len(skipped):]        # Priority order: the tail is what's left out
+    assert elapsed < 0.3 + 0.1                       # At most one fetch per worker past the deadline
+    print(format_pipeline_report(report))
+    print(f"✅ {format_coverage(len(delivered), len(symbols), elapsed, len(skipped))}")
+
+def test_changes_only_for_covered_symbols():
+    """A previous BUY the deadline skipped is not reported as removed; a covered one that dropped is"""
+    module = scheduled_market_alerts
+    saved = module.RECOMMENDATIONS_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            module.RECOMMENDATIONS_FILE = os.path.join(tmp, 'last_recommendations.json')
+            module.save_recommendations({'buy_signals': [{'symbol': 'SKIPPED', 'score': 8},
+                                                         {'symbol': 'DROPPED', 'score': 8},
+                                                         {'symbol': 'KEPT', 'score': 8}],
+                                         'watch_signals': []})
+            changes = module.detect_significant_changes([{'symbol': 'KEPT', 'score': 8}], [], skipped=['SKIPPED'])
+            assert changes['removed_buy'] == ['DROPPED'] and changes['new_buy'] == []
+            
+            full = module.detect_significant_changes([{'symbol': 'KEPT', 'score': 8}], [])
+            assert sorted(full['removed_buy']) == ['DROPPED', 'SKIPPED']
+        finally:
+            module.RECOMMENDATIONS_FILE = saved
+
+if __name__ == "__main__":
+    test_priority_order_and_coverage_line()
+    test_pipeline_stops_at_deadline()
+    test_changes_only_for_covered_symbols()
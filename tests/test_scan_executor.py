@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for the hybrid thread/process scan executor
+Uses sleeping fake fetches instead of network calls
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.append('.')
+
+import indicators
+from scan_executor import HybridExecutor, run_hybrid_scan, SCAN_BURST
+from market_data import throttle_request
+from indicators import IndicatorMemo, get_indicators
+from panel_indicators import synthetic_frames
+
+def fetch_number(symbol):
+    time.sleep(0.02)
+    number = int(symbol[3:])
+    if number == 5:
+        return None                    # Nothing to score
+    if number == 7:
+        raise ValueError("delisted")   # Fetch failure
+    return {'number': number}
+
+def score_number(symbol, payload):
+    if payload['number'] == 11:
+        raise ValueError("bad bars")   # Compute failure
+    return {'symbol': symbol, 'square': payload['number'] ** 2, 'pid': os.getpid()}
+
+def test_hybrid_scan_on_processes():
+    """Results keep input order, fetch and compute errors are collected, scoring leaves the parent process"""
+    print("🧪 Testing hybrid scan executor")
+    print("=" * 50)
+    
+    symbols = [f"SYM{i}" for i in range(40)]
+    progress = []
+    errors = []
+    executor = HybridExecutor(io_workers=8, cpu_workers=2, rate_per_second=0, batch_size=4)
+    executor._start_process_pool()  # Workers start once per process and are reused by every scan
+    started = time.time()
+    results, report = executor.run(symbols, fetch_number, score_number, progress_every=10,
+                                   on_progress=lambda done, total: progress.append(done),
+                                   on_error=lambda symbol, e: errors.append(symbol))
+    elapsed = time.time() - started
+    
+    assert report['mode'] == 'processes' and report['cpu_workers'] == 2
+    assert [r['symbol'] for r in results if r] == [s for s in symbols if s not in ('SYM5', 'SYM7', 'SYM11')]
+    assert results[5] is None and results[7] is None and results[11] is None
+    assert report['errors'] == {'SYM7': 'delisted', 'SYM11': 'bad bars'} and sorted(errors) == ['SYM11', 'SYM7']
+    assert all(r['square'] == int(r['symbol'][3:]) ** 2 for r in results if r)
+    assert all(r['pid'] != os.getpid() for r in results if r)
+    assert progress == [10, 20, 30, 40] and report['completed'] == 40
+    assert elapsed < 40 * 0.02  # Fetches overlap on the I/O threads
+    print(f"✅ 40 symbols in {elapsed:.2f}s on {report['io_workers']} threads + {report['cpu_workers']} processes")
+
+def test_inline_fallback():
+    """One CPU worker (or an unpicklable compute function) computes in-process with the same results"""
+    symbols = [f"SYM{i}" for i in range(12)]
+    inline, report = run_hybrid_scan(symbols, fetch_number, score_number, cpu_workers=1, rate_per_second=0)
+    assert report['mode'] == 'inline'
+    assert all(r['pid'] == os.getpid() for r in inline if r)
+    
+    # Lambdas can't be pickled to a worker process
+    results, report = run_hybrid_scan(symbols, fetch_number, lambda symbol, payload: score_number(symbol, payload),
+                                      cpu_workers=2, rate_per_second=0)
+    assert [r and r['square'] for r in results] == [r and r['square'] for r in inline]
+    assert report['errors'] == {'SYM7': 'delisted', 'SYM11': 'bad bars'}
+
+def test_io_stage_is_bounded_and_ordered():
+    """Concurrent fetches never exceed io_workers; results keep input order when completion order differs"""
+    active = {'now': 0, 'peak': 0}
+    lock = threading.Lock()
+    
+    def fetch_reversed(symbol):
+        with lock:
+            active['now'] += 1
+            active['peak'] = max(active['peak'], active['now'])
+        time.sleep(0.05 - int(symbol[3:]) * 0.001)  # Later symbols finish first
+        with lock:
+            active['now'] -= 1
+        return {'number': int(symbol[3:])}
+    
+    symbols = [f"SYM{i}" for i in range(40)]
+    started = time.time()
+    results, _ = run_hybrid_scan(symbols, fetch_reversed, score_number, io_workers=8, cpu_workers=1,
+                                 rate_per_second=0)
+    elapsed = time.time() - started
+    assert [r['symbol'] for r in results if r] == [s for s in symbols if s != 'SYM11']
+    assert active['peak'] == 8 and elapsed < 40 * 0.05 / 2
+    print(f"✅ 40 fetches in {elapsed:.2f}s, peak concurrency {active['peak']}")
+
+def fetch_live_or_stored(symbol):
+    if int(symbol[3:]) % 2:
+        throttle_request()  # Stale symbol: the live provider takes a token before going out to Yahoo
+    return {'number': int(symbol[3:])}
+
+def test_only_live_fetches_are_throttled():
+    """The rate limit spaces out network requests, not bar store reads"""
+    executor = HybridExecutor(io_workers=8, cpu_workers=1, rate_per_second=25)
+    started = time.time()
+    _, report = executor.run([f"SYM{i}" for i in range(60)], fetch_live_or_stored, score_number)
+    elapsed = time.time() - started
+    # 30 requests: the burst goes out at once, the rest at 25/s
+    assert elapsed >= (30 - SCAN_BURST - 1) / 25 and report['rate_limited_seconds'] > 0
+    
+    started = time.time()
+    _, report = executor.run([f"SYM{i}" for i in range(60)], lambda symbol: {'number': int(symbol[3:])},
+                             score_number)
+    assert report['rate_limited_seconds'] == 0 and time.time() - started < 0.3
+    print(f"✅ 30 live fetches rate-limited in {elapsed:.2f}s, 60 stored reads not throttled")
+
+FRAMES = synthetic_frames(6, bars=70)
+
+def fetch_frame(symbol):
+    return FRAMES[symbol]
+
+def score_rsi(symbol, hist):
+    return {'rsi': get_indicators(symbol, hist).rsi, 'pid': os.getpid()}
+
+def test_worker_indicators_reach_the_parent():
+    """Indicators computed in a worker are stored by the parent; the pool is reused across scans"""
+    saved = indicators.indicator_memo
+    indicators.indicator_memo = IndicatorMemo()
+    try:
+        executor = HybridExecutor(io_workers=4, cpu_workers=2, rate_per_second=0, batch_size=2)
+        results, report = executor.run(list(FRAMES), fetch_frame, score_rsi)
+        assert report['mode'] == 'processes' and all(r['pid'] != os.getpid() for r in results)
+        
+        for symbol, result in zip(FRAMES, results):
+            indicator_set = indicators.indicator_memo.get(symbol, FRAMES[symbol])
+            assert indicator_set.cached('rsi') == result['rsi']
+        print(f"✅ {len(FRAMES)} worker RSIs stored in the parent's memo")
+        
+        again, _ = executor.run(list(FRAMES), fetch_frame, score_rsi)
+        assert {r['pid'] for r in again} <= {r['pid'] for r in results} | {os.getpid()}
+    finally:
+        indicators.indicator_memo = saved
+
+if __name__ == "__main__":
+    test_hybrid_scan_on_processes()
+    test_inline_fallback()
+    test_io_stage_is_bounded_and_ordered()
+    test_only_live_fetches_are_throttled()
+    test_worker_indicators_reach_the_parent()
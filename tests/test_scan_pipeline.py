@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming scan pipeline
+Fake stages sleep instead of reading bars; the scheduler test swaps out Telegram and the tracking files
+"""
+
+import os
+import sys
+import time
+import tempfile
+import pandas as pd
+
+sys.path.append('.')
+
+import bar_store
+import scheduled_market_alerts
+from bar_store import BarStore
+from scan_pipeline import ScanPipeline, Stage, format_pipeline_report
+
+def test_items_stream_to_sink():
+    """Items reach the sink while the scan is still running; drops, errors and backpressure are reported"""
+    print("🧪 Testing streaming scan pipeline")
+    print("=" * 50)
+    
+    symbols = [f"SYM{i}" for i in range(60)]
+    arrivals = {}
+    
+    def fetch(symbol, _):
+        time.sleep(0.01)
+        return int(symbol[3:])
+    
+    def score(symbol, number):
+        if number == 13:
+            raise ValueError("bad bars")
+        return None if number % 10 == 9 else number * 2  # Every tenth symbol filtered out
+    
+    def sink(index, symbol, value):
+        arrivals[symbol] = time.time()
+        time.sleep(0.005)  # Slow sink - upstream queues fill up
+    
+    started = time.time()
+    pipeline = ScanPipeline([Stage('fetch', fetch, workers=4), Stage('score', score, workers=2)], queue_size=4)
+    report = pipeline.run(symbols, sink)
+    finished = time.time()
+    
+    assert set(arrivals) == {s for s in symbols if s != 'SYM13' and not s.endswith('9')}
+    assert report['delivered'] == len(arrivals) and report['errors'] == {'SYM13': 'bad bars'}
+    assert arrivals['SYM2'] - started < (finished - started) / 3  # Early symbols don't wait for the last one
+    
+    stages = report['stages']
+    assert stages['fetch']['processed'] == 60 and stages['fetch']['workers'] == 4
+    assert stages['score']['dropped'] == 6 and stages['score']['errors'] == 1
+    assert stages['score']['blocked_seconds'] > 0  # Backpressure from the slow sink
+    assert all(stats['max_queue_depth'] <= 5 for stats in stages.values())
+    print(format_pipeline_report(report))
+
+def test_priority_buy_sent_mid_scan():
+    """A new STRONG BUY is alerted before the scan ends, once per day, and never for an existing BUY"""
+    module = scheduled_market_alerts
+    saved = (module.load_score_history, module.build_score_inputs, module.send_telegram_message,
+             module.ALERTS_FILE, module.RECOMMENDATIONS_FILE, module.LOG_FILE)
+    
+    def make_inputs(symbol, hist):
+        strong = symbol in ('NEW', 'OLD')
+        return {
+            'indicators': {'sma_20': 100.0, 'sma_50': 95.0, 'rsi': 55.0 if strong else 80.0, 'price': 110.0,
+                           'macd': 1.5, 'signal': 1.0 if strong else 2.0, 'volume_ratio': 1.5},
+            'changes': {'1w': 2.0, '2w': 4.0, '1m': 8.0, 'roc': 8.0},
+            'trend': {'weekly_bullish': True, 'monthly_uptrend': True, 'weekly_rsi': 60.0, 'monthly_ma_slope': 1.2},
+            'close': pd.Series([100.0, 102.0, 104.0, 106.0, 110.0])
+        }
+    
+    sent = []
+    symbols = ['SLOW1', 'NEW', 'OLD'] + [f"SLOW{i}" for i in range(2, 60)]
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            module.load_score_history = lambda symbol, refresh=True: time.sleep(0.05 if symbol.startswith('SLOW') else 0) or symbol
+            module.build_score_inputs = make_inputs
+            module.send_telegram_message = lambda message: sent.append((time.time(), message)) or True
+            module.ALERTS_FILE = os.path.join(tmp, 'sent_alerts.json')
+            module.RECOMMENDATIONS_FILE = os.path.join(tmp, 'last_recommendations.json')
+            module.LOG_FILE = os.path.join(tmp, 'alerts.log')
+            module.save_recommendations({'buy_signals': [{'symbol': 'OLD', 'score': 9}], 'watch_signals': []})
+            
+            started = time.time()
+            analyses, report, alerted = module.run_streaming_scan(symbols, 7, "REGULAR_HOURS")
+            finished = time.time()
+            
+            assert alerted == ['NEW'] and len(sent) == 1 and 'PRIORITY BUY: NEW' in sent[0][1]
+            assert sent[0][0] - started < (finished - started) / 2
+            assert [a['symbol'] for a in analyses] == symbols and analyses[1]['score'] == 9
+            assert report['stages']['filter']['processed'] == len(symbols)
+            
+            # Already alerted today - the next scan stays quiet
+            _, _, alerted = module.run_streaming_scan(symbols, 7, "REGULAR_HOURS")
+            assert alerted == [] and len(sent) == 1
+            print(f"✅ Priority BUY alerted after {sent[0][0] - started:.2f}s of a {finished - started:.2f}s scan")
+        finally:
+            (module.load_score_history, module.build_score_inputs, module.send_telegram_message,
+             module.ALERTS_FILE, module.RECOMMENDATIONS_FILE, module.LOG_FILE) = saved
+
+def test_deadline_cut_refresh_scores_stored_bars():
+    """Symbols a deadline kept out of the bulk refresh are scored from the store, never downloaded one by one"""
+    module = scheduled_market_alerts
+    saved = (bar_store.bar_store, bar_store.download_history_batches, module.build_score_inputs,
+             module.ALERTS_FILE, module.RECOMMENDATIONS_FILE, module.LOG_FILE)
+    downloads = []
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1), periods=60, name='Date')
+    close = pd.Series(range(100, 160), index=dates, dtype=float)
+    bars = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1e6})
+    symbols = [f"SYM{i}" for i in range(8)]
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            bar_store.bar_store = BarStore(root=tmp, refresh_interval_minutes=0)  # Every symbol is stale
+            for symbol in symbols:
+                bar_store.bar_store.save(symbol, bars)
+            bar_store.download_history_batches = lambda symbols, **kwargs: downloads.append(list(symbols)) or ({}, {})
+            module.build_score_inputs = lambda symbol, hist: {'rows': len(hist)}
+            module.ALERTS_FILE = os.path.join(tmp, 'sent_alerts.json')
+            module.RECOMMENDATIONS_FILE = os.path.join(tmp, 'last_recommendations.json')
+            module.LOG_FILE = os.path.join(tmp, 'alerts.log')
+            
+            _, unrefreshed = module.refresh_bar_store(symbols, "AFTER_HOURS", deadline=time.time() - 1)
+            assert unrefreshed == symbols
+            
+            scored = []
+            pipeline_score = module.score_technical_inputs
+            module.score_technical_inputs = lambda symbol, inputs: scored.append(inputs['rows']) and None
+            try:
+                module.run_streaming_scan(symbols, 7, "AFTER_HOURS")
+            finally:
+                module.score_technical_inputs = pipeline_score
+            assert downloads == [] and scored == [60] * len(symbols)
+            print(f"✅ {len(symbols)} stale symbols scored from stored bars with no downloads")
+        finally:
+            (bar_store.bar_store, bar_store.download_history_batches, module.build_score_inputs,
+             module.ALERTS_FILE, module.RECOMMENDATIONS_FILE, module.LOG_FILE) = saved
+
+if __name__ == "__main__":
+    test_items_stream_to_sink()
+    test_priority_buy_sent_mid_scan()
+    test_deadline_cut_refresh_scores_stored_bars()
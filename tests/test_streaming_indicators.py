@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming indicator state
+Incremental updates must match indicators.py recomputed over the same window
+"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+
+from indicators import IndicatorSet, macd_summary, obv_series
+from streaming_indicators import StreamingIndicatorStore
+
+WINDOW = 63  # Bars in a 3mo lookback
+
+def make_bars(count, seed=11):
+    """Random-walk daily bars ending yesterday"""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+    dates = pd.bdate_range(end=end, periods=count)
+    close = 30 * np.exp(np.cumsum(rng.normal(0.001, 0.02, count)))
+    return pd.DataFrame({'Open': close * 0.998, 'High': close * (1 + rng.uniform(0, 0.02, count)),
+                         'Low': close * (1 - rng.uniform(0, 0.02, count)), 'Close': close,
+                         'Volume': rng.integers(100_000, 900_000, count).astype(float)},
+                        index=pd.DatetimeIndex(dates, name='Date'))
+
+def assert_matches(values, hist):
+    """Every streamed indicator equals indicators.py recomputed over the same bars"""
+    expected = IndicatorSet('T', hist)
+    macd = macd_summary(hist['Close'])
+    pairs = [
+        (values['rsi'], expected.rsi),
+        (values['sma_20'], expected.sma(20)),
+        (values['sma_50'], expected.sma(50)),
+        (values['upper_band'], expected.bollinger['upper_band']),
+        (values['band_position'], expected.bollinger['band_position']),
+        (values['stoch_k'], expected.momentum['stoch_k']),
+        (values['stoch_d'], expected.momentum['stoch_d']),
+        (values['williams_r'], expected.momentum['williams_r']),
+        (values['volume_ratio'], expected.volume_analysis['volume_ratio']),
+        (values['macd'], macd['macd']),
+        (values['signal'], macd['signal']),
+        (values['histogram'], macd['histogram']),
+        (values['ema_12'], expected.moving_averages['ema_12']),
+        (values['ema_26'], expected.moving_averages['ema_26']),
+        (values['obv'], obv_series(hist['Close'], hist['Volume']).iloc[-1])
+    ]
+    for actual, wanted in pairs:
+        assert np.isclose(actual, wanted, rtol=1e-9), (actual, wanted)
+
+def test_incremental_matches_recompute():
+    """Sliding the window bar by bar applies one bar per sync and stays on the canonical values"""
+    print("🧪 Testing streaming indicators")
+    print("=" * 50)
+    
+    bars = make_bars(140)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StreamingIndicatorStore(os.path.join(tmp, 'state.json'))
+        
+        state = store.sync('T', bars.iloc[:WINDOW])
+        assert store.stats['seeded'] == 1
+        assert_matches(state.values(), bars.iloc[:WINDOW])
+        
+        for end in range(WINDOW + 1, WINDOW + 15):
+            hist = bars.iloc[end - WINDOW:end]
+            state = store.sync('T', hist)
+            assert_matches(state.values(), hist)
+        assert store.stats['seeded'] == 1 and store.stats['bars_committed'] == 14
+        print(f"✅ 14 bars applied incrementally, values match indicators.py")
+        
+        # Checkpoint and resume in a "new process"
+        store.save_state()
+        resumed = StreamingIndicatorStore(os.path.join(tmp, 'state.json'))
+        hist = bars.iloc[WINDOW + 15 - WINDOW:WINDOW + 15]
+        continued = store.sync('T', hist).values()
+        restored = resumed.sync('T', hist).values()
+        assert resumed.stats == {'seeded': 0, 'bars_committed': 1, 'peeked': 0, 'unchanged': 0}
+        assert all(np.isclose(continued[k], restored[k], equal_nan=True) for k in continued)
+        print("✅ Checkpoint restores the state - next run applies only the new bar")
+        
+        # A long gap or a revised bar reseeds from the window
+        bars.iloc[WINDOW + 14, bars.columns.get_loc('Close')] *= 1.05
+        resumed.sync('T', bars.iloc[16:WINDOW + 16])
+        assert resumed.stats['seeded'] == 1
+        
+        # Streaming far past the seed never drifts from the windowed recompute
+        for end in range(WINDOW + 17, len(bars) + 1):
+            hist = bars.iloc[end - WINDOW:end]
+            assert_matches(resumed.sync('T', hist).values(), hist)
+        assert resumed.stats['seeded'] == 1
+        
+        # A window one bar longer than the kept closes (e.g. a holiday leaving the 3mo range) reseeds
+        resumed.sync('T', bars.iloc[len(bars) - WINDOW - 1:])
+        assert resumed.stats['seeded'] == 2
+        print(f"✅ EMAs, MACD and OBV match indicators.py {len(bars) - WINDOW - 16} bars after the seed")
+
+def test_forming_bar_is_peeked():
+    """Today's bar is applied provisionally and never committed"""
+    bars = make_bars(80)
+    bars.index = bars.index[:-1].append(pd.DatetimeIndex([pd.Timestamp.today().normalize()], name='Date'))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StreamingIndicatorStore(os.path.join(tmp, 'state.json'))
+        first = store.sync('T', bars).values()
+        assert_matches(first, bars)
+        
+        # Later in the day the forming bar changed - still one peek, nothing committed
+        moved = bars.copy()
+        moved.iloc[-1, moved.columns.get_loc('Close')] *= 1.03
+        second = store.sync('T', moved).values()
+        assert store.states['T'].last_date == str(bars.index[-2].date())
+        assert store.stats['peeked'] == 2 and store.stats['bars_committed'] == 0
+        assert second['price'] != first['price']
+        assert_matches(second, moved)
+        
+        # The peek shares the committed buffers instead of copying them, and still sees the forming bar
+        committed = store.states['T']
+        provisional = store.sync('T', moved)
+        assert provisional.closes is committed.closes and len(committed.closes) == len(bars) - 1
+        close = moved['Close']
+        assert np.isclose(provisional.change(4), (close.iloc[-1] / close.iloc[-5] - 1) * 100, rtol=1e-12)
+        print("✅ Intraday bar peeked without touching the committed state")
+
+def test_worker_states_merge_into_checkpoint():
+    """States a distributed scan worker advanced are saved by the coordinator, older ones are ignored"""
+    bars = make_bars(100)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'state.json')
+        coordinator = StreamingIndicatorStore(path)
+        coordinator.sync('T', bars.iloc[:WINDOW])
+        
+        worker = StreamingIndicatorStore(path)  # Same checkpoint, separate process
+        worker.sync('T', bars.iloc[5:WINDOW + 5])
+        shipped = json.loads(json.dumps(worker.export_states(['T', 'MISSING'])))  # Through the shard queue
+        assert list(shipped) == ['T']
+        assert coordinator.merge_states(shipped) == 1
+        assert coordinator.merge_states({'T': coordinator.states['T'].to_dict() | {'last_date': '2000-01-03'}}) == 0
+        coordinator.save_state()
+        
+        resumed = StreamingIndicatorStore(path)
+        hist = bars.iloc[6:WINDOW + 6]
+        assert_matches(resumed.sync('T', hist).values(), hist)
+        assert resumed.stats['seeded'] == 0 and resumed.stats['bars_committed'] == 1
+        print("✅ Worker states reach the coordinator's checkpoint")
+
+def test_concurrent_sync_counts():
+    """The indicator stage syncs from several threads; no stat increment is lost"""
+    bars = make_bars(WINDOW)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StreamingIndicatorStore(os.path.join(tmp, 'state.json'))
+        
+        def sync_many(worker):
+            for i in range(100):
+                store.sync(f"S{worker}-{i}", bars)
+        
+        threads = [threading.Thread(target=sync_many, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert store.get_stats()['seeded'] == 800 and store.get_stats()['symbols'] == 800
+
+if __name__ == "__main__":
+    test_incremental_matches_recompute()
+    test_forming_bar_is_peeked()
+    test_worker_states_merge_into_checkpoint()
+    test_concurrent_sync_counts()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for the symbol quarantine
+Runs offline - probes go to an in-memory provider
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+import pandas as pd
+
+sys.path.append('.')
+
+import market_data
+from market_data import MarketDataProvider, set_provider
+from symbol_quarantine import SymbolQuarantine
+
+class ProbeProvider(MarketDataProvider):
+    """Returns bars only for symbols listed as alive"""
+    
+    def __init__(self, alive):
+        self.alive = set(alive)
+        self.batches = []
+    
+    def history_batch(self, symbols, period="1mo", interval="1d", start=None):
+        self.batches.append(list(symbols))
+        bars = pd.DataFrame({'Open': [1.0], 'High': [1.0], 'Low': [1.0], 'Close': [1.0], 'Volume': [100.0]},
+                            index=pd.DatetimeIndex(['2024-06-28'], name='Date'))
+        return {s: bars for s in symbols if s in self.alive}
+    
+    def history(self, symbol, period="1mo", interval="1d", start=None):
+        return self.history_batch([symbol], period=period, interval=interval, start=start).get(symbol, pd.DataFrame())
+    
+    def info(self, symbol):
+        return {}
+    
+    def news(self, symbol):
+        return []
+    
+    def calendar(self, symbol):
+        return None
+
+def test_backoff_and_probe():
+    """Repeated failures quarantine a symbol, expired quarantines are re-probed in one batch"""
+    print("🧪 Testing symbol quarantine")
+    print("=" * 50)
+    
+    previous = market_data._provider
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = os.path.join(tmp, 'quarantine.json')
+        quarantine = SymbolQuarantine(state_file, failure_threshold=2, base_backoff_hours=6)
+        
+        quarantine.record_failure('TWTR', 'no data')
+        assert not quarantine.is_quarantined('TWTR')
+        quarantine.record_failure('TWTR', 'no data')
+        assert quarantine.is_quarantined('TWTR')
+        assert quarantine.backoff_for(2) == timedelta(hours=6)
+        assert quarantine.backoff_for(4) == timedelta(hours=24)
+        assert quarantine.backoff_for(40) == quarantine.max_backoff
+        print("✅ Quarantined after 2 failures, backoff doubles per failure")
+        
+        # A batch where most symbols fail is an outage - nothing is recorded
+        assert not quarantine.record_results(['AAPL'], ['MSFT', 'NVDA', 'AMD'])
+        assert 'MSFT' not in quarantine.data
+        
+        active, skipped = quarantine.screen(['AAPL', 'TWTR', 'MSFT'], probe=False)
+        assert active == ['AAPL', 'MSFT'] and skipped == ['TWTR']
+        
+        # Persisted state survives a restart
+        reloaded = SymbolQuarantine(state_file)
+        assert reloaded.is_quarantined('TWTR')
+        
+        # Once the backoff expires the symbol is re-probed with one batched request
+        for symbol in ('TWTR', 'SQ'):
+            reloaded.record_failure(symbol, 'no data')
+            reloaded.record_failure(symbol, 'no data')
+        for symbol in ('TWTR', 'SQ'):  # Saves reload the file, so expire both after the last one
+            reloaded.data[symbol]['quarantined_until'] = (datetime.now() - timedelta(minutes=1)).isoformat()
+        
+        provider = ProbeProvider(alive=['SQ', 'AAPL'])
+        try:
+            set_provider(provider)
+            active, skipped = reloaded.screen(['AAPL', 'TWTR', 'SQ'])
+        finally:
+            set_provider(previous)
+        
+        assert provider.batches == [['TWTR', 'SQ']]
+        assert active == ['AAPL', 'SQ'] and skipped == ['TWTR']
+        assert 'SQ' not in reloaded.data
+        assert reloaded.data['TWTR']['failures'] == 5  # 2 earlier + 2 above + failed probe
+        assert reloaded.is_quarantined('TWTR')
+        print(f"✅ Probe released SQ, TWTR back in quarantine until {reloaded.data['TWTR']['quarantined_until'][:16]}")
+
+def test_concurrent_saves_merge():
+    """Two processes sharing the file keep each other's failures and releases"""
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = os.path.join(tmp, 'quarantine.json')
+        seed = SymbolQuarantine(state_file, failure_threshold=2)
+        seed.record_failure('SQ', 'no data')
+        seed.record_failure('SQ', 'no data')
+        
+        # Both load the same snapshot, then record different outcomes
+        scheduler = SymbolQuarantine(state_file, failure_threshold=2)
+        dashboard = SymbolQuarantine(state_file, failure_threshold=2)
+        scheduler.record_failure('TWTR', 'no data')
+        dashboard.record_failure('TWTR', 'no data')
+        dashboard.record_results(['SQ'], ['ATVI'])
+        scheduler.record_failure('ATVI', 'no data')
+        
+        merged = SymbolQuarantine(state_file).data
+        assert merged['TWTR']['failures'] == 2 and 'quarantined_until' in merged['TWTR']
+        assert merged['ATVI']['failures'] == 2
+        assert 'SQ' not in merged  # the scheduler's stale copy doesn't bring it back
+        assert 'SQ' not in scheduler.data and scheduler.data['TWTR']['failures'] == 2
+        print(f"✅ Concurrent saves merged: {sorted(merged)}")
+
+if __name__ == "__main__":
+    test_backoff_and_probe()
+    test_concurrent_saves_merge()
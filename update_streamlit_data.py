@@ -10,6 +10,8 @@ from datetime import datetime
 import json
 import os
 
+SCAN_ATTEMPTS = int(os.getenv('SCAN_ATTEMPTS', '3'))  # Timed-out scans resume from their checkpoint
+
 def log(message):
     """Log with timestamp"""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -39,27 +41,36 @@ def run_gemma_analysis():
         return False
 
 def run_dividend_analysis():
-    """Run comprehensive dividend stock analysis (scans 600+ stocks)"""
+    """
+    Run comprehensive dividend stock analysis (scans 600+ stocks)
+    The scan checkpoints every result, so a run that times out is retried and
+    picks up where it stopped instead of starting over
+    """
     log("💰 Running dividend stock analysis (scans 600+ stocks)...")
-    try:
-        result = subprocess.run(
-            [sys.executable, 'dividend_stock_analyzer.py'],
-            capture_output=True,
-            text=True,
-            timeout=900  # 15 minutes for comprehensive scan
-        )
-        if result.returncode == 0:
-            log("✅ Dividend analysis complete")
-            return True
-        else:
-            log(f"❌ Dividend analysis failed: {result.stderr}")
+    for attempt in range(1, SCAN_ATTEMPTS + 1):
+        try:
+            result = subprocess.run(
+                [sys.executable, 'dividend_stock_analyzer.py'],
+                capture_output=True,
+                text=True,
+                timeout=900  # 15 minutes per attempt for comprehensive scan
+            )
+            if result.returncode == 0:
+                log("✅ Dividend analysis complete")
+                return True
+            else:
+                log(f"❌ Dividend analysis failed: {result.stderr}")
+                return False
+        except subprocess.TimeoutExpired:
+            if attempt < SCAN_ATTEMPTS:
+                log(f"⏱️ Dividend analysis timed out (15 min limit) - resuming from checkpoint "
+                    f"(attempt {attempt + 1}/{SCAN_ATTEMPTS})")
+            else:
+                log(f"❌ Dividend analysis timed out {SCAN_ATTEMPTS} times (15 min limit)")
+        except Exception as e:
+            log(f"❌ Error running dividend analysis: {e}")
             return False
-    except subprocess.TimeoutExpired:
-        log("❌ Dividend analysis timed out (15 min limit)")
-        return False
-    except Exception as e:
-        log(f"❌ Error running dividend analysis: {e}")
-        return False
+    return False
 
 def update_recommendations():
     """Update recommendations from scheduled alerts"""
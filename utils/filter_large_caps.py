@@ -4,7 +4,7 @@ Filter stocks by market cap and create optimized watchlists
 Focus on $10B+ market cap stocks for better liquidity and stability
 """
 
-import yfinance as yf
+from fundamentals_cache import get_fundamentals, fundamentals_cache
 import json
 from datetime import datetime
 from stock_universe import get_comprehensive_stock_list
@@ -19,11 +19,11 @@ def get_stock_info_batch(symbols, batch_size=20):
     for i in range(0, len(symbols), batch_size):
         batch = symbols[i:i + batch_size]
         print(f"🔄 Processing batch {i//batch_size + 1}/{(len(symbols)-1)//batch_size + 1}: {batch[0]} to {batch[-1]}")
+        misses_before = fundamentals_cache.stats['misses']
         
         for symbol in batch:
             try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
+                info = get_fundamentals(symbol)
                 
                 market_cap = info.get('marketCap', 0)
                 if market_cap and market_cap > 0:
@@ -46,9 +46,11 @@ def get_stock_info_batch(symbols, batch_size=20):
                 print(f"  ⚠️  {symbol}: Error - {e}")
                 continue
         
-        # Small delay between batches to be respectful to Yahoo Finance
-        time.sleep(2)
+        # Small delay between batches to be respectful to Yahoo Finance (cache hits cost nothing)
+        if fundamentals_cache.stats['misses'] > misses_before:
+            time.sleep(2)
     
+    print(fundamentals_cache.format_stats())
     return all_stock_info
 
 def create_filtered_watchlists(stock_info):
@@ -4,40 +4,23 @@ Stock Universe Validator and Cleaner
 Identifies and removes delisted/invalid tickers, updates changed symbols
 """
 
-import yfinance as yf
+from market_data import get_provider
+from fundamentals_cache import get_fundamentals
+from symbol_quarantine import quarantine
 import time
 from datetime import datetime
 import json
 
-# Known ticker changes and issues
+# Known ticker renames - delisted/acquired symbols no longer need listing here,
+# the symbol quarantine learns them from failed fetches (see symbol_quarantine.py)
 TICKER_UPDATES = {
-    # Delisted/Merged/Acquired companies
-    "ANSS": None,  # Ansys - check if still valid
     "SQ": "BLOCK",  # Square changed to Block
     "ANTM": "ELV",  # Anthem changed to Elevance Health
-    "DFS": "DFS",  # Discover Financial - should be valid, check
     "FISV": "FI",  # Fiserv changed ticker
     "CHEWY": "CHWY",  # Chewy correct ticker
-    "WBA": "WBA",  # Walgreens - should be valid, check
-    "GRUB": None,  # GrubHub acquired by Just Eat Takeaway
-    "TWTR": None,  # Twitter acquired by Elon Musk, delisted
-    "MRO": "MRO",  # Marathon Oil - should be valid, check
-    "PXD": "PXD",  # Pioneer Natural Resources - check if still valid
-    "WORK": None,  # Slack acquired by Salesforce
-    "XLNX": None,  # Xilinx acquired by AMD
     "C3AI": "AI",  # C3.ai correct ticker is AI
     "NOVA": "NVMI",  # Nova Measuring Instruments
-    "BLUE": "BLUE",  # bluebird bio - check if still valid
-    "SAGE": "SAGE",  # Sage Therapeutics - check if still valid
-    "ATVI": None,  # Activision Blizzard acquired by Microsoft
-    "ONDK": "ONDK",  # On Deck Capital - check if still valid
-    "ASTR": "ASTR",  # Astra Space - check if still valid
-    "MAXR": "MAXR",  # Maxar Technologies - check if still valid
-    "VORB": None,  # Virgin Orbit - went bankrupt
-    "HEXO": "HEXO",  # Hexo Corp - check if still valid
     "HCP": "PEAK",  # HCP changed to Healthpeak Properties
-    "PEAK": "PEAK",  # Healthpeak Properties
-    "AIRB": None,  # Invalid ticker
     
     # Additional known changes
     "FB": "META",  # Facebook to Meta
@@ -50,16 +33,16 @@ def validate_ticker(symbol, max_retries=2):
     """Validate if a ticker symbol is still active and tradeable"""
     for attempt in range(max_retries):
         try:
-            ticker = yf.Ticker(symbol)
-            
             # Try to get recent data
-            hist = ticker.history(period="5d")
-            info = ticker.info
+            hist = get_provider().history(symbol, period="5d")
+            info = get_fundamentals(symbol)
             
             # Check if we have valid data
             if hist.empty:
                 print(f"❌ {symbol}: No price history")
+                quarantine.record_failure(symbol, "no price history")
                 return False
+            quarantine.record_success(symbol)
             
             # Check if it's a valid stock (has market cap or is an ETF)
             market_cap = info.get('marketCap', 0)
@@ -86,6 +69,7 @@ def validate_ticker(symbol, max_retries=2):
         except Exception as e:
             if attempt == max_retries - 1:
                 print(f"❌ {symbol}: Error - {str(e)[:50]}...")
+                quarantine.record_failure(symbol, str(e))
                 return False
             time.sleep(1)  # Wait before retry
     
@@ -109,14 +93,16 @@ def clean_stock_universe():
     for i, symbol in enumerate(all_stocks):
         print(f"\n[{i+1}/{len(all_stocks)}] Checking {symbol}...")
         
+        # Symbols that keep failing are skipped until their quarantine backoff expires
+        if quarantine.is_quarantined(symbol):
+            print(f"🚧 {symbol}: Quarantined after repeated failures - removing")
+            invalid_stocks.append(symbol)
+            continue
+        
         # Check if we have a known update for this ticker
         if symbol in TICKER_UPDATES:
             new_symbol = TICKER_UPDATES[symbol]
-            if new_symbol is None:
-                print(f"🗑️  {symbol}: Known delisted/acquired - removing")
-                invalid_stocks.append(symbol)
-                continue
-            elif new_symbol != symbol:
+            if new_symbol != symbol:
                 print(f"🔄 {symbol} → {new_symbol}: Updating ticker")
                 if validate_ticker(new_symbol):
                     valid_stocks.append(new_symbol)
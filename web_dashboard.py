@@ -12,7 +12,7 @@ import psutil
 from datetime import datetime, timedelta
 import holidays
 from enhanced_yahoo_client import EnhancedYahooClient
-import yfinance as yf
+from market_data import get_provider
 import threading
 import time
 import numpy as np
@@ -71,8 +71,7 @@ def get_stock_market_info(symbol):
 def get_usd_cad_rate():
     """Get current USD/CAD exchange rate"""
     try:
-        ticker = yf.Ticker('USDCAD=X')
-        hist = ticker.history(period='1d')
+        hist = get_provider().history('USDCAD=X', period='1d')
         if not hist.empty:
             return float(hist['Close'].iloc[-1])
     except:
@@ -223,8 +222,7 @@ def get_top_stocks():
                 quote = client.get_stock_quote(symbol)
                 if quote:
                     # Get additional technical data
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period='5d')
+                    hist = get_provider().history(symbol, period='5d')
                     
                     if not hist.empty:
                         # Calculate 5-day change
@@ -276,8 +274,7 @@ def get_market_overview():
     market_data = {}
     for name, symbol in indices.items():
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period='2d')
+            hist = get_provider().history(symbol, period='2d')
             if not hist.empty:
                 current = hist['Close'].iloc[-1]
                 previous = hist['Close'].iloc[-2] if len(hist) > 1 else current
@@ -380,8 +377,7 @@ def api_canadian_stocks():
                 try:
                     quote = client.get_stock_quote(symbol)
                     if quote:
-                        ticker = yf.Ticker(symbol)
-                        hist = ticker.history(period='5d')
+                        hist = get_provider().history(symbol, period='5d')
                         
                         if not hist.empty:
                             current = hist['Close'].iloc[-1]